@@ -8,46 +8,79 @@ import os
 import sys
 import json
 import time
+import argparse
 from datetime import datetime
+from urllib.parse import urlsplit
 
-try:
-    import vertexai
-    from vertexai.generative_models import GenerativeModel, ChatSession
-    from google.auth import default
-    from google.auth.transport.requests import Request
-except ImportError as e:
-    print(f"Error: Required libraries not installed. {e}")
-    print("Please run: pip3 install google-cloud-aiplatform")
-    sys.exit(1)
+import tracing
+from result_output import NdjsonWriter
+
+# vertexai/google-auth(aiplatform SDK, grpc, protobuf 포함)는 로딩에 수 초가 걸리므로 SDK 단계가 처음 실행될 때
+# import_sdk()로 불러옴 - 부하/채팅/cassette/리전 선택 모듈도 해당 모드에서만 import
+vertexai = GenerativeModel = default = AnonymousCredentials = Request = None
 
 # 환경 변수에서 프로젝트 ID 가져오기 (또는 하드코딩)
 PROD_PROJECT_ID = os.environ.get('PROD_PROJECT_ID', 'my-gemini-prod-088dfe15')
 LOCATION = os.environ.get('LOCATION', 'us-central1')
+MODEL_NAME = "gemini-2.5-flash"
+FALLBACK_LOCATION = 'us-central1'
+# 로컬 Vertex AI 대체 서버 등 다른 엔드포인트 사용 시 (예: http://127.0.0.1:8080)
+API_ENDPOINT = os.environ.get('VERTEX_API_ENDPOINT')
+
+def import_sdk():
+    """Vertex AI SDK와 google-auth를 처음 필요할 때 import (설치되어 있지 않으면 종료)"""
+    global vertexai, GenerativeModel, default, AnonymousCredentials, Request
+    if vertexai is not None:
+        return
+    try:
+        with tracing.span("import_sdk"):
+            from vertexai.generative_models import GenerativeModel
+            from google.auth import default
+            from google.auth.credentials import AnonymousCredentials
+            from google.auth.transport.requests import Request
+            import vertexai
+    except ImportError as e:
+        print(f"Error: Required libraries not installed. {e}")
+        print("Please run: pip3 install google-cloud-aiplatform (or use --rest)")
+        sys.exit(1)
 
 def test_authentication():
     """인증 테스트"""
     print("1. Testing Authentication...")
+    import_sdk()
     try:
-        credentials, project = default()
+        with tracing.span("google.auth.default"):
+            credentials, project = default()
         print(f"   ✓ Default credentials loaded")
         print(f"   ✓ Service account: {credentials.service_account_email if hasattr(credentials, 'service_account_email') else 'User credentials'}")
         
         # 토큰 새로고침
-        credentials.refresh(Request())
+        with tracing.span("credentials.refresh"):
+            credentials.refresh(Request())
         print(f"   ✓ Access token refreshed")
         return True
     except Exception as e:
         print(f"   ✗ Authentication failed: {e}")
         return False
 
-def test_vertex_ai_init():
+def test_vertex_ai_init(api_endpoint=None):
     """Vertex AI 초기화 테스트"""
     print("\n2. Initializing Vertex AI...")
+    import_sdk()
     try:
-        vertexai.init(project=PROD_PROJECT_ID, location=LOCATION)
+        with tracing.span("vertexai.init", location=LOCATION):
+            if api_endpoint:
+                # 로컬 대체 엔드포인트는 인증 없이 REST로 호출
+                vertexai.init(project=PROD_PROJECT_ID, location=LOCATION,
+                              api_endpoint=api_endpoint, api_transport="rest",
+                              credentials=AnonymousCredentials())
+            else:
+                vertexai.init(project=PROD_PROJECT_ID, location=LOCATION)
         print(f"   ✓ Vertex AI initialized")
         print(f"   ✓ Project: {PROD_PROJECT_ID}")
         print(f"   ✓ Location: {LOCATION}")
+        if api_endpoint:
+            print(f"   ✓ Endpoint: {api_endpoint}")
         return True
     except Exception as e:
         print(f"   ✗ Vertex AI initialization failed: {e}")
@@ -56,34 +89,70 @@ def test_vertex_ai_init():
 def test_gemini_model():
     """Gemini 모델 접근 테스트"""
     print("\n3. Testing Gemini Model Access...")
+    import_sdk()
     try:
-        model = GenerativeModel("gemini-2.5-flash")
+        with tracing.span("GenerativeModel", model=MODEL_NAME):
+            model = GenerativeModel(MODEL_NAME)
         print(f"   ✓ Gemini Pro model loaded")
         return model
     except Exception as e:
         print(f"   ✗ Failed to load Gemini model: {e}")
         return None
 
-def test_simple_generation(model):
+def test_rest_authentication(client):
+    """REST 클라이언트 액세스 토큰 확인 (환경 변수 → 메타데이터 서버 → ADC)"""
+    print("1. Testing Authentication (REST access token)...")
+    try:
+        with tracing.span("fetch_token"):
+            source = client.authenticate()
+        print(f"   ✓ Access token from {source}")
+        return {"token_source": source}
+    except Exception as e:
+        print(f"   ✗ Authentication failed: {e}")
+        return False
+
+def test_rest_connect(client):
+    """REST 엔드포인트 연결(TCP/TLS) 테스트"""
+    print("\n2. Connecting REST client...")
+    try:
+        with tracing.span("connect", endpoint=client.endpoint):
+            seconds = client.connect()
+        print(f"   ✓ Connected to {client.endpoint} in {seconds * 1000:.1f} ms")
+        return {"endpoint": client.endpoint, "connect": seconds}
+    except Exception as e:
+        print(f"   ✗ Connection failed: {e}")
+        return False
+
+def test_simple_generation(model, stream=False):
     """간단한 텍스트 생성 테스트"""
     print("\n4. Testing Simple Text Generation...")
     try:
         prompt = "Hello Gemini! Please respond with a simple greeting. This is a test from a simulated on-premises environment."
         
         print(f"   Prompt: {prompt}")
+        if stream:
+            from gemini_stream import time_stream, print_stream_timing
+            with tracing.span("generate_content", stream=True):
+                timing = time_stream(model.generate_content, prompt)
+            print(f"   ✓ Streamed response received in {timing['total']:.2f} seconds")
+            print_stream_timing(timing)
+            print(f"   Response: {timing['text'][:200]}...")
+            return stream_record(timing)
+
         start_time = time.time()
         
-        response = model.generate_content(prompt)
+        with tracing.span("generate_content"):
+            response = model.generate_content(prompt)
         
         end_time = time.time()
         print(f"   ✓ Response received in {end_time - start_time:.2f} seconds")
         print(f"   Response: {response.text[:200]}...")
-        return True
+        return {"latency": end_time - start_time, "response_chars": len(response.text)}
     except Exception as e:
         print(f"   ✗ Text generation failed: {e}")
         return False
 
-def test_code_generation(model):
+def test_code_generation(model, stream=False):
     """코드 생성 테스트 (Gemini Code Assist 시뮬레이션)"""
     print("\n5. Testing Code Generation (Code Assist Simulation)...")
     try:
@@ -93,24 +162,46 @@ def test_code_generation(model):
         """
         
         print(f"   Code request: Generate Cloud SQL connection function")
-        start_time = time.time()
-        
-        response = model.generate_content(code_prompt)
-        
-        end_time = time.time()
-        print(f"   ✓ Code generated in {end_time - start_time:.2f} seconds")
+        if stream:
+            from gemini_stream import time_stream, print_stream_timing
+            with tracing.span("generate_content", stream=True):
+                timing = time_stream(model.generate_content, code_prompt)
+            print(f"   ✓ Code streamed in {timing['total']:.2f} seconds")
+            print_stream_timing(timing)
+            text = timing["text"]
+            record = stream_record(timing)
+        else:
+            start_time = time.time()
+
+            with tracing.span("generate_content"):
+                response = model.generate_content(code_prompt)
+
+            end_time = time.time()
+            print(f"   ✓ Code generated in {end_time - start_time:.2f} seconds")
+            text = response.text
+            record = {"latency": end_time - start_time, "response_chars": len(text)}
         print(f"   Generated code preview:")
         print("   " + "-" * 50)
         # 처음 몇 줄만 출력
-        lines = response.text.split('\n')[:10]
+        lines = text.split('\n')[:10]
         for line in lines:
             print(f"   {line}")
         print("   " + "-" * 50)
-        return True
+        return record
     except Exception as e:
         print(f"   ✗ Code generation failed: {e}")
         return False
 
+def stream_record(timing):
+    """스트리밍 타이밍 결과를 출력 레코드용 dict로 변환"""
+    return {
+        "latency": timing["total"],
+        "ttft": timing["ttft"],
+        "chunks": timing["chunks"],
+        "chunk_gaps": timing["gaps"],
+        "response_chars": len(timing["text"]),
+    }
+
 def test_chat_session(model):
     """채팅 세션 테스트"""
     print("\n6. Testing Chat Session (Multi-turn conversation)...")
@@ -118,11 +209,13 @@ def test_chat_session(model):
         chat = model.start_chat(history=[])
         
         # 첫 번째 메시지
-        response1 = chat.send_message("I'm connecting from a simulated on-premises environment through VPN. Can you confirm you received this?")
+        with tracing.span("send_message", turn=1):
+            response1 = chat.send_message("I'm connecting from a simulated on-premises environment through VPN. Can you confirm you received this?")
         print(f"   ✓ First message sent and received")
         
         # 두 번째 메시지
-        response2 = chat.send_message("Great! Now, can you explain what VPC Service Controls are in GCP?")
+        with tracing.span("send_message", turn=2):
+            response2 = chat.send_message("Great! Now, can you explain what VPC Service Controls are in GCP?")
         print(f"   ✓ Second message sent and received")
         print(f"   Chat response preview: {response2.text[:150]}...")
         
@@ -131,9 +224,11 @@ def test_chat_session(model):
         print(f"   ✗ Chat session failed: {e}")
         return False
 
+@tracing.traced("network_path")
 def test_network_path():
     """네트워크 경로 정보 출력"""
     print("\n7. Network Path Information:")
+    info = {}
     try:
         import socket
         import subprocess
@@ -143,6 +238,7 @@ def test_network_path():
         local_ip = socket.gethostbyname(hostname)
         print(f"   Source hostname: {hostname}")
         print(f"   Source IP: {local_ip}")
+        info.update(hostname=hostname, source_ip=local_ip)
         
         # API 엔드포인트 확인
         api_endpoint = f"{LOCATION}-aiplatform.googleapis.com"
@@ -150,6 +246,7 @@ def test_network_path():
             api_ip = socket.gethostbyname(api_endpoint)
             print(f"   API endpoint: {api_endpoint}")
             print(f"   API IP: {api_ip}")
+            info.update(api_endpoint=api_endpoint, api_ip=api_ip)
         except:
             print(f"   API endpoint: {api_endpoint} (IP resolution failed)")
         
@@ -160,14 +257,274 @@ def test_network_path():
                                       capture_output=True, text=True, timeout=5)
                 if result.returncode == 0:
                     print(f"   Route to API: {result.stdout.strip()}")
+                    info["route"] = result.stdout.strip()
             except:
                 pass
                 
     except Exception as e:
         print(f"   Network information unavailable: {e}")
+        info["error"] = str(e)
+    return info
 
-def main():
+def run_load_test(args, writer=None):
+    """동시 부하 테스트 실행 (--load)"""
+    print("=" * 60)
+    print("Gemini API Load Test")
+    print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Target Project: {PROD_PROJECT_ID}")
+    print(f"Location: {LOCATION}")
+    print("=" * 60)
+
+    model = load_model(args)
+    if not model:
+        return 1
+
+    workers = f"up to {args.concurrency} adaptive" if args.adaptive else str(args.concurrency)
+    if args.duration:
+        print(f"\n4. Running load: {workers} concurrent workers for {args.duration:.0f} seconds...")
+    else:
+        print(f"\n4. Running load: {args.requests} requests with {workers} concurrent workers...")
+    if args.adaptive:
+        from gemini_adaptive import run_adaptive, print_adaptive_report
+        summary = run_adaptive(model.generate_content, max_concurrency=args.concurrency,
+                               total_requests=args.requests, duration=args.duration,
+                               rpm=args.rpm, tpm=args.tpm, max_retries=args.max_retries)
+        print_adaptive_report(summary)
+    else:
+        from gemini_load import run_load, print_load_report
+        summary = run_load(model.generate_content, concurrency=args.concurrency,
+                           total_requests=args.requests, duration=args.duration)
+        print_load_report(summary)
+    ok = summary["errors"] == 0 and summary["succeeded"] > 0
+    if writer:
+        writer.emit("load", "pass" if ok else "fail", summary["wall_time"], **summary)
+    return 0 if ok else 1
+
+def run_chat_bench(args, writer=None):
+    """다중 턴 채팅 확장성 벤치마크 실행 (--chat-turns)"""
+    print("=" * 60)
+    print("Gemini Multi-turn Chat Benchmark")
+    print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Target Project: {PROD_PROJECT_ID}")
+    print(f"Location: {LOCATION}")
+    print("=" * 60)
+
+    from gemini_chat_bench import STRATEGIES, run_chat_benchmark, print_turn, print_chat_report
+    strategies = [name.strip() for name in (args.history_strategy or ",".join(STRATEGIES)).split(",")
+                  if name.strip()]
+    unknown = [name for name in strategies if name not in STRATEGIES]
+    if unknown:
+        print(f"Error: unknown history strategy {', '.join(unknown)} (choose from {', '.join(STRATEGIES)})")
+        return 1
+    model = load_model(args)
+    if not model:
+        return 1
+
+    print(f"\n4. Running {args.chat_turns}-turn chats with {args.message_kb:g} KB messages "
+          f"({', '.join(strategies)}, keep {args.keep_turns} turns)...")
+    try:
+        results = run_chat_benchmark(model, turns=args.chat_turns, strategies=strategies,
+                                     keep_turns=args.keep_turns, message_bytes=int(args.message_kb * 1024),
+                                     on_turn=print_turn)
+    except Exception as e:
+        print(f"   ✗ Chat benchmark failed: {e}")
+        if writer:
+            writer.emit("chat_benchmark", "fail", error=str(e))
+        return 1
+    print()
+    print_chat_report(results)
+    if writer:
+        for strategy, result in results.items():
+            writer.emit("chat_benchmark", "pass", result["summary"]["latency_total"],
+                        strategy=strategy, summary=result["summary"], turns=result["turns"])
+    return 0
+
+def select_location(location):
+    """--location auto: region_latency.py의 캐시된 순위(만료 시 재측정)에서 비공개 경로로 가장 빠른 정상 리전 선택"""
+    if location != "auto":
+        return location
+    from region_latency import fastest_region, access_token
+    print("Selecting the fastest healthy Vertex AI region...")
+    with tracing.span("select_location"):
+        region = fastest_region(project=PROD_PROJECT_ID, token=access_token())
+    if region is None:
+        print(f"   ⚠️  No healthy region over the private path, falling back to {FALLBACK_LOCATION}")
+        return FALLBACK_LOCATION
+    print(f"   ✓ Using {region}")
+    return region
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="Gemini API connectivity test")
+    parser.add_argument("--load", action="store_true",
+                        help="run concurrent load generation instead of the functional tests")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream the generation tests and report time-to-first-token and chunk gaps")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="number of concurrent requests in load mode (default: 8)")
+    parser.add_argument("--requests", type=int, default=100,
+                        help="total requests to send in load mode (default: 100)")
+    parser.add_argument("--duration", type=float,
+                        help="run load mode for this many seconds instead of a request count")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="load mode: adjust concurrency (up to --concurrency) from 429/latency feedback "
+                             "and report the knee point")
+    parser.add_argument("--rpm", type=float, help="adaptive load: pace request starts to this many per minute")
+    parser.add_argument("--tpm", type=float, help="adaptive load: pace to this many (input+output) tokens per minute")
+    parser.add_argument("--max-retries", type=int, default=3,
+                        help="adaptive load: retries with jittered backoff for 429/5xx (default: 3)")
+    parser.add_argument("--chat-turns", type=int,
+                        help="run the multi-turn chat benchmark for this many turns instead of the functional tests")
+    parser.add_argument("--message-kb", type=float, default=4,
+                        help="chat benchmark: size of the code block sent each turn (default: 4)")
+    parser.add_argument("--history-strategy",
+                        help="chat benchmark: comma separated history strategies to compare "
+                             "(full, window, summarize; default: all)")
+    parser.add_argument("--keep-turns", type=int, default=4,
+                        help="chat benchmark: turns kept verbatim by the window/summarize strategies (default: 4)")
+    parser.add_argument("--location", default=LOCATION,
+                        help="Vertex AI region, or 'auto' for the fastest healthy region "
+                             "(default: $LOCATION or us-central1)")
+    parser.add_argument("--api-endpoint", default=API_ENDPOINT,
+                        help="override the Vertex AI endpoint, e.g. a local stand-in server")
+    parser.add_argument("--rest", action="store_true",
+                        help="call generateContent with the built-in REST client instead of the Vertex AI SDK "
+                             "(no SDK import; starts in milliseconds)")
+    parser.add_argument("--format", choices=["text", "ndjson"], default="text",
+                        help="ndjson: one JSON record per test on stdout, human-readable text on stderr")
+    parser.add_argument("--store", metavar="PATH",
+                        help="record every test result in this SQLite history (see results_store.py) "
+                             "and flag latency regressions")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="record nested spans for every step and write them to PATH as Chrome trace-event JSON "
+                             "(open in Perfetto/chrome://tracing), or OTLP/JSON for *.otlp.json")
+    parser.add_argument("--trace-format", choices=["chrome", "otlp"],
+                        help="trace file format (default: from the --trace file name)")
+    parser.add_argument("--cassette", metavar="PATH",
+                        help="record generation/chat responses to PATH and replay them on later runs")
+    parser.add_argument("--cassette-mode", choices=["replay", "record"], default="replay",
+                        help="replay: serve recorded responses, record misses; "
+                             "record: always call the API and report latency drift (default: replay)")
+    parser.add_argument("--replay-timing", choices=["recorded", "none"], default="recorded",
+                        help="replay with the recorded latency and chunk timing, or without delay")
+    parser.add_argument("--cassette-size", type=int, default=256,
+                        help="maximum cassette entries before least-recently-used eviction (default: 256)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """메인 테스트 실행"""
+    global LOCATION
+    args = parse_args(argv)
+
+    # NDJSON 모드: 레코드는 stdout, 사람이 읽는 출력은 stderr
+    # --store: 같은 레코드를 결과 이력 저장소에도 기록 (NDJSON 출력 없이도)
+    writer = None
+    store = None
+    original_stdout = sys.stdout
+    if args.store:
+        from results_store import ResultStore
+        store = ResultStore(args.store)
+    if args.format == "ndjson" or store:
+        writer = NdjsonWriter(original_stdout if args.format == "ndjson" else None, "1_test_gemini_api",
+                              on_record=store.add if store else None)
+    if args.format == "ndjson":
+        sys.stdout = sys.stderr
+    if args.trace:
+        tracing.start("1_test_gemini_api")
+
+    try:
+        mode = "load" if args.load else "chat_bench" if args.chat_turns else "tests"
+        with tracing.span("1_test_gemini_api", mode=mode, rest=args.rest):
+            LOCATION = select_location(args.location)
+            if args.load:
+                code = run_load_test(args, writer)
+            elif args.chat_turns:
+                code = run_chat_bench(args, writer)
+            else:
+                code = run_tests(args, writer)
+        if store:
+            from results_store import report_run
+            report_run(store, writer)
+        return code
+    finally:
+        if store:
+            store.close()
+        if args.trace:
+            print(f"Trace: {tracing.stop(args.trace, args.trace_format)} spans written to {args.trace}")
+        sys.stdout = original_stdout
+
+def run_step(writer, name, func, *args, **kwargs):
+    """테스트 단계 하나를 실행하고 소요 시간과 결과를 레코드로 출력"""
+    with tracing.span(name) as step:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        step.set(status="pass" if result else "fail")
+    if writer:
+        data = result if isinstance(result, dict) else {}
+        writer.emit(name, "pass" if result else "fail", elapsed, **data)
+    return result
+
+def skip_step(writer, results, name, message):
+    """실행하지 않는 단계를 건너뜀으로 표시 (요약의 합계에서 제외)"""
+    print(message)
+    results[name] = None
+    if writer:
+        writer.emit(name, "skip")
+
+def load_model(args, writer=None, results=None):
+    """
+    인증 → Vertex AI 초기화 → 모델 로드 (results에 단계별 결과 기록), 실패하면 None
+    --rest: 액세스 토큰 → 엔드포인트 연결 후 REST 클라이언트 반환 (SDK를 불러오지 않음)
+    """
+    results = {} if results is None else results
+    client = None
+    if args.rest:
+        from gemini_rest import GeminiRestClient
+        client = GeminiRestClient(PROD_PROJECT_ID, LOCATION, MODEL_NAME, args.api_endpoint)
+    authenticate = (test_rest_authentication, client) if client else (test_authentication,)
+    # --api-endpoint 대상은 익명 자격 증명을 쓰므로 ADC 불필요
+    if args.api_endpoint:
+        skip_step(writer, results, "authentication", "1. Skipping Authentication (--api-endpoint uses anonymous credentials)")
+    elif run_step(writer, "authentication", *authenticate):
+        results["authentication"] = True
+    else:
+        return None
+    if client:
+        if not run_step(writer, "vertex_init", test_rest_connect, client):
+            return None
+        results["vertex_init"] = True
+        skip_step(writer, results, "model_load", "\n3. Skipping Gemini Model Access (the REST client calls the model directly)")
+        return client
+    if not run_step(writer, "vertex_init", test_vertex_ai_init, args.api_endpoint):
+        return None
+    results["vertex_init"] = True
+    model = run_step(writer, "model_load", test_gemini_model)
+    if model:
+        results["model_load"] = True
+    return model
+
+def live_model(args):
+    """cassette 재생 중 녹화가 없는 요청을 위한 실제 모델"""
+    print("\n   Cassette miss - preparing the live model...")
+    model = load_model(args)
+    if not model:
+        raise RuntimeError("no recording for this request and the live model could not be loaded")
+    return model
+
+def open_cassette(args):
+    """--cassette 지정 시 녹화/재생 cassette 생성 (경로 RTT는 API 엔드포인트로 측정)"""
+    from gemini_cassette import Cassette, connect_rtt
+    if args.api_endpoint:
+        endpoint = urlsplit(args.api_endpoint if "//" in args.api_endpoint else f"//{args.api_endpoint}")
+        host, port = endpoint.hostname, endpoint.port or (80 if endpoint.scheme == "http" else 443)
+    else:
+        host, port = f"{LOCATION}-aiplatform.googleapis.com", 443
+    return Cassette(args.cassette, mode=args.cassette_mode, timing=args.replay_timing,
+                    max_entries=args.cassette_size, rtt_probe=lambda: connect_rtt(host, port))
+
+def run_tests(args, writer=None):
+    """기능 테스트 실행"""
     print("=" * 60)
     print("Gemini API Connectivity Test")
     print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -184,34 +541,49 @@ def main():
         "code_generation": False,
         "chat_session": False
     }
+    cassette = None
+    if args.cassette:
+        from gemini_cassette import CassetteModel, print_cassette_summary
+        cassette = open_cassette(args)
     
-    # 1. 인증 테스트
-    if test_authentication():
-        results["authentication"] = True
+    if cassette and args.cassette_mode == "replay":
+        # 재생 모드: 녹화된 요청은 인증/초기화/모델 없이 응답하고, 녹화가 없는 요청이 처음 나올 때만 실제 모델 준비
+        for name, message in (("authentication", "1. Skipping Authentication"),
+                              ("vertex_init", "\n2. Skipping Vertex AI Initialization"),
+                              ("model_load", "\n3. Skipping Gemini Model Access")):
+            skip_step(writer, results, name, f"{message} (replaying {args.cassette})")
+        model = CassetteModel(None, cassette, MODEL_NAME, loader=lambda: live_model(args))
+    else:
+        # 1~3. 인증, Vertex AI 초기화, 모델 로드
+        model = load_model(args, writer, results)
+        if model and cassette:
+            model = CassetteModel(model, cassette, MODEL_NAME)
+
+    if model:
+        # 4. 텍스트 생성
+        if run_step(writer, "text_generation", test_simple_generation, model, stream=args.stream):
+            results["text_generation"] = True
         
-        # 2. Vertex AI 초기화
-        if test_vertex_ai_init():
-            results["vertex_init"] = True
-            
-            # 3. 모델 로드
-            model = test_gemini_model()
-            if model:
-                results["model_load"] = True
-                
-                # 4. 텍스트 생성
-                if test_simple_generation(model):
-                    results["text_generation"] = True
-                
-                # 5. 코드 생성
-                if test_code_generation(model):
-                    results["code_generation"] = True
-                
-                # 6. 채팅 세션
-                if test_chat_session(model):
-                    results["chat_session"] = True
+        # 5. 코드 생성
+        if run_step(writer, "code_generation", test_code_generation, model, stream=args.stream):
+            results["code_generation"] = True
+        
+        # 6. 채팅 세션
+        if run_step(writer, "chat_session", test_chat_session, model):
+            results["chat_session"] = True
     
+    if cassette:
+        print()
+        print_cassette_summary(cassette)
+        if writer:
+            writer.emit("cassette", "info", hits=cassette.hits, misses=cassette.misses,
+                        mode=cassette.mode, drifts=cassette.drifts)
+        cassette.close()
+
     # 7. 네트워크 정보
-    test_network_path()
+    network = test_network_path()
+    if writer:
+        writer.emit("network_path", "info", **network)
     
     # 결과 요약
     print("\n" + "=" * 60)
@@ -219,13 +591,16 @@ def main():
     print("=" * 60)
     
     passed = sum(1 for v in results.values() if v)
-    total = len(results)
+    total = sum(1 for v in results.values() if v is not None)
     
     for test_name, result in results.items():
-        status = "✓ PASS" if result else "✗ FAIL"
+        status = "- SKIP" if result is None else "✓ PASS" if result else "✗ FAIL"
         print(f"{test_name.replace('_', ' ').title()}: {status}")
     
     print(f"\nTotal: {passed}/{total} tests passed")
+    if writer:
+        writer.emit("summary", "pass" if passed == total else "fail",
+                    passed=passed, total=total, results=results)
     
     if passed == total:
         print("\n✅ All tests passed! Gemini API is accessible from the simulated on-premises environment.")
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+async_dns.py - asyncio 기반 DNS 조회 모듈
+여러 엔드포인트를 동시에 조회하며 CNAME 체인, TTL, 조회별 지연 시간을 기록하고
+TTL을 지키는 캐시를 유지. dns.tf의 비공개 영역을 흉내 내는 로컬 스텁 DNS 서버 포함
+"""
+
+import sys
+import time
+import random
+import socket
+import struct
+import asyncio
+import argparse
+import ipaddress
+
+TYPE_A = 1
+TYPE_CNAME = 5
+CLASS_IN = 1
+RCODES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+
+HEADER = struct.Struct("!HHHHHH")
+RR_FIXED = struct.Struct("!HHIH")
+# EDNS0 없는 UDP 응답 최대 크기 (RFC 1035) - 넘으면 TC 비트만 보내고 TCP 재조회를 기다림
+UDP_LIMIT = 512
+
+# dns.tf의 googleapis.com 비공개 영역
+PRIVATE_ZONE = {
+    "private.googleapis.com.": [("A", "199.36.153.8", 300), ("A", "199.36.153.9", 300),
+                                ("A", "199.36.153.10", 300), ("A", "199.36.153.11", 300)],
+    "*.googleapis.com.": [("CNAME", "private.googleapis.com.", 300)],
+}
+
+class DNSError(Exception):
+    """DNS 응답 파싱/조회 실패"""
+
+def encode_name(name):
+    """도메인 이름을 DNS 라벨 형식으로 인코딩"""
+    labels = [label for label in name.rstrip(".").split(".") if label]
+    return b"".join(bytes([len(label)]) + label.encode("idna") for label in labels) + b"\0"
+
+def build_query(name, qtype=TYPE_A, txid=None):
+    """재귀 요청(RD) 쿼리 메시지 생성"""
+    txid = random.getrandbits(16) if txid is None else txid
+    return txid, HEADER.pack(txid, 0x0100, 1, 0, 0, 0) + encode_name(name) + struct.pack("!HH", qtype, CLASS_IN)
+
+def decode_name(data, offset):
+    """압축 포인터를 따라가며 이름 해석 - (이름, 다음 오프셋) 반환"""
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        if offset >= len(data):
+            raise DNSError("truncated name")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            jumps += 1
+            if jumps > 32:
+                raise DNSError("compression loop")
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset:offset + length].decode("ascii", errors="replace"))
+        offset += length
+    return ".".join(labels).lower() + ".", end if end is not None else offset
+
+def parse_response(data):
+    """응답 메시지에서 헤더 정보와 answer 레코드 목록 추출"""
+    if len(data) < HEADER.size:
+        raise DNSError("short response")
+    txid, flags, qdcount, ancount, _, _ = HEADER.unpack_from(data)
+    offset = HEADER.size
+    for _ in range(qdcount):
+        _, offset = decode_name(data, offset)
+        offset += 4
+    answers = []
+    for _ in range(ancount):
+        name, offset = decode_name(data, offset)
+        rtype, rclass, ttl, rdlength = RR_FIXED.unpack_from(data, offset)
+        offset += RR_FIXED.size
+        rdata = data[offset:offset + rdlength]
+        if rtype == TYPE_A and rdlength == 4:
+            value = str(ipaddress.IPv4Address(rdata))
+        elif rtype == TYPE_CNAME:
+            value, _ = decode_name(data, offset)
+        else:
+            value = rdata
+        offset += rdlength
+        answers.append((name, rtype, ttl, value))
+    return {"id": txid, "rcode": flags & 0xF, "truncated": bool(flags & 0x0200), "answers": answers}
+
+def follow_chain(name, answers):
+    """answer 섹션에서 CNAME 체인을 따라가 최종 A 레코드와 최소 TTL 계산"""
+    name = name.lower().rstrip(".") + "."
+    chain = []
+    ttls = []
+    current = name
+    for _ in range(16):
+        cname = [(ttl, value) for owner, rtype, ttl, value in answers
+                 if owner == current and rtype == TYPE_CNAME]
+        if not cname:
+            break
+        ttl, current = cname[0]
+        chain.append(current)
+        ttls.append(ttl)
+    addresses = [(ttl, value) for owner, rtype, ttl, value in answers
+                 if owner == current and rtype == TYPE_A]
+    ttls += [ttl for ttl, _ in addresses]
+    return chain, [value for _, value in addresses], min(ttls) if ttls else 0
+
+def system_nameserver(path="/etc/resolv.conf"):
+    """resolv.conf의 첫 번째 nameserver"""
+    try:
+        with open(path) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == "nameserver":
+                    return fields[1]
+    except OSError:
+        pass
+    return None
+
+def read_hosts(path="/etc/hosts"):
+    """/etc/hosts의 IPv4 항목을 {이름: [주소]}로 변환"""
+    entries = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                fields = line.split("#", 1)[0].split()
+                if len(fields) < 2 or ":" in fields[0]:
+                    continue
+                for name in fields[1:]:
+                    entries.setdefault(name.lower().rstrip(".") + ".", []).append(fields[0])
+    except OSError:
+        pass
+    return entries
+
+class _ClientProtocol(asyncio.DatagramProtocol):
+    """트랜잭션 ID로 응답을 대기 중인 future에 전달"""
+
+    def __init__(self):
+        self.pending = {}
+
+    def datagram_received(self, data, addr):
+        if len(data) >= 2:
+            future = self.pending.pop(struct.unpack_from("!H", data)[0], None)
+            if future and not future.done():
+                future.set_result(data)
+
+    def error_received(self, exc):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc)
+        self.pending.clear()
+
+class AsyncResolver:
+    """
+    UDP 소켓 하나로 여러 이름을 동시에 조회하는 비동기 리졸버
+    캐시는 이벤트 루프와 무관하게 유지되므로 asyncio.run()을 반복 호출해도 재사용됨
+    """
+
+    def __init__(self, server=None, port=53, timeout=2.0, retries=1, hosts_file="/etc/hosts", use_cache=True):
+        self.server = server or system_nameserver() or "127.0.0.1"
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.hosts_file = hosts_file
+        self.use_cache = use_cache
+        self._cache = {}
+
+    def cached(self, name):
+        """만료되지 않은 캐시 항목 반환 (남은 TTL 반영)"""
+        entry = self._cache.get(name)
+        if not entry:
+            return None
+        expires, result = entry
+        remaining = expires - time.monotonic()
+        if remaining <= 0:
+            del self._cache[name]
+            return None
+        return dict(result, ttl=int(remaining), latency=0.0, cached=True, round_trips=0)
+
+    async def _query_udp(self, protocol, transport, name):
+        loop = asyncio.get_running_loop()
+        for _ in range(self.retries + 1):
+            txid, query = build_query(name)
+            while txid in protocol.pending:
+                txid, query = build_query(name)
+            future = loop.create_future()
+            protocol.pending[txid] = future
+            transport.sendto(query)
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                protocol.pending.pop(txid, None)
+        raise DNSError(f"timeout after {self.retries + 1} attempts")
+
+    async def _query_tcp(self, name):
+        """잘린(TC) 응답일 때 TCP로 재조회"""
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.server, self.port), self.timeout)
+        try:
+            _, query = build_query(name)
+            writer.write(struct.pack("!H", len(query)) + query)
+            await writer.drain()
+            length = struct.unpack("!H", await asyncio.wait_for(reader.readexactly(2), self.timeout))[0]
+            return await asyncio.wait_for(reader.readexactly(length), self.timeout)
+        finally:
+            writer.close()
+
+    async def _resolve(self, protocol, transport, hosts, name):
+        fqdn = name.lower().rstrip(".") + "."
+        if self.use_cache:
+            hit = self.cached(fqdn)
+            if hit:
+                return hit
+        if fqdn in hosts:
+            return {"name": name, "source": "hosts", "addresses": hosts[fqdn], "cname_chain": [],
+                    "ttl": None, "latency": 0.0, "rcode": "NOERROR", "cached": False, "round_trips": 0}
+
+        start = time.perf_counter()
+        round_trips = 1
+        try:
+            data = await self._query_udp(protocol, transport, fqdn)
+            response = parse_response(data)
+            if response["truncated"]:
+                round_trips += 1
+                response = parse_response(await self._query_tcp(fqdn))
+        except (DNSError, OSError, asyncio.TimeoutError) as e:
+            return {"name": name, "source": "dns", "error": str(e), "addresses": [], "cname_chain": [],
+                    "ttl": None, "latency": time.perf_counter() - start, "cached": False,
+                    "round_trips": round_trips}
+        latency = time.perf_counter() - start
+
+        chain, addresses, ttl = follow_chain(fqdn, response["answers"])
+        result = {"name": name, "source": "dns", "addresses": addresses, "cname_chain": chain, "ttl": ttl,
+                  "latency": latency, "rcode": RCODES.get(response["rcode"], str(response["rcode"])),
+                  "cached": False, "round_trips": round_trips}
+        if self.use_cache and addresses and ttl > 0:
+            self._cache[fqdn] = (time.monotonic() + ttl, result)
+        return result
+
+    async def resolve_many(self, names):
+        """여러 이름을 동시에 조회 - 입력 순서대로 결과 반환"""
+        loop = asyncio.get_running_loop()
+        hosts = read_hosts(self.hosts_file) if self.hosts_file else {}
+        family = socket.AF_INET6 if ":" in self.server else socket.AF_INET
+        transport, protocol = await loop.create_datagram_endpoint(
+            _ClientProtocol, remote_addr=(self.server, self.port), family=family)
+        try:
+            return await asyncio.gather(*(self._resolve(protocol, transport, hosts, name) for name in names))
+        finally:
+            transport.close()
+
+    def resolve_all(self, names):
+        """동기 코드에서 사용하는 resolve_many 래퍼"""
+        return asyncio.run(self.resolve_many(names))
+
+class StubDNSServer(asyncio.DatagramProtocol):
+    """
+    로컬 벤치마크용 스텁 권한 DNS 서버
+    와일드카드 CNAME을 영역 내에서 따라가 A 레코드까지 한 응답에 담음 (Cloud DNS 동작과 동일)
+    udp_limit보다 큰 응답은 UDP로는 잘린(TC) 헤더만 보내고 같은 포트의 TCP로 전체 응답
+    """
+
+    def __init__(self, zone=None, delay=0.0, udp_limit=UDP_LIMIT):
+        self.zone = {name.lower(): records for name, records in (zone or PRIVATE_ZONE).items()}
+        self.delay = delay
+        self.udp_limit = udp_limit
+        self.queries = 0
+        self.tcp_queries = 0
+        self.transport = None
+        self.tcp_server = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def lookup(self, name):
+        if name in self.zone:
+            return self.zone[name]
+        labels = name.split(".")
+        for i in range(1, len(labels) - 1):
+            wildcard = "*." + ".".join(labels[i:])
+            if wildcard in self.zone:
+                return self.zone[wildcard]
+        return None
+
+    def answer(self, query):
+        txid, _, _, _, _, _ = HEADER.unpack_from(query)
+        qname, offset = decode_name(query, HEADER.size)
+        question = query[HEADER.size:offset + 4]
+        answers = []
+        name = qname
+        rcode = 3
+        for _ in range(8):
+            records = self.lookup(name)
+            if not records:
+                break
+            rcode = 0
+            for rtype, value, ttl in records:
+                if rtype == "A":
+                    rdata = ipaddress.IPv4Address(value).packed
+                    answers.append(encode_name(name) + RR_FIXED.pack(TYPE_A, CLASS_IN, ttl, 4) + rdata)
+                else:
+                    rdata = encode_name(value)
+                    answers.append(encode_name(name) + RR_FIXED.pack(TYPE_CNAME, CLASS_IN, ttl, len(rdata)) + rdata)
+            if records[0][0] != "CNAME":
+                break
+            name = records[0][1].lower()
+        flags = 0x8500 | rcode  # QR, AA, RD
+        return HEADER.pack(txid, flags, 1, len(answers), 0, 0) + question + b"".join(answers)
+
+    def datagram_received(self, data, addr):
+        self.queries += 1
+        try:
+            response = self.answer(data)
+        except (DNSError, struct.error, IndexError):
+            return
+        if len(response) > self.udp_limit:
+            txid, flags, qdcount, _, _, _ = HEADER.unpack_from(response)
+            _, offset = decode_name(response, HEADER.size)
+            response = HEADER.pack(txid, flags | 0x0200, qdcount, 0, 0, 0) + response[HEADER.size:offset + 4]
+        if self.delay:
+            asyncio.get_running_loop().call_later(self.delay, self.transport.sendto, response, addr)
+        else:
+            self.transport.sendto(response, addr)
+
+    async def handle_tcp(self, reader, writer):
+        """길이 접두 TCP 질의 - 크기 제한 없이 응답"""
+        try:
+            while True:
+                length = struct.unpack("!H", await reader.readexactly(2))[0]
+                query = await reader.readexactly(length)
+                self.tcp_queries += 1
+                response = self.answer(query)
+                writer.write(struct.pack("!H", len(response)) + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, DNSError, struct.error, IndexError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self.transport.close()
+        if self.tcp_server:
+            self.tcp_server.close()
+
+async def start_stub_server(host="127.0.0.1", port=0, zone=None, delay=0.0, udp_limit=UDP_LIMIT):
+    """스텁 서버 시작 (같은 포트의 UDP + TCP) - (transport, protocol, 실제 포트) 반환, 종료는 protocol.close()"""
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: StubDNSServer(zone, delay, udp_limit), local_addr=(host, port))
+    port = transport.get_extra_info("sockname")[1]
+    protocol.tcp_server = await asyncio.start_server(protocol.handle_tcp, host, port)
+    return transport, protocol, port
+
+def print_results(results):
+    """조회 결과 출력"""
+    for result in results:
+        print(f"\n{result['name']}:")
+        if result.get("error"):
+            print(f"  ✗ {result['error']} ({result['latency'] * 1000:.1f} ms)")
+            continue
+        if not result["addresses"] and result.get("rcode") != "NOERROR":
+            print(f"  ✗ {result.get('rcode')}")
+        for cname in result["cname_chain"]:
+            print(f"  → CNAME {cname}")
+        for address in result["addresses"]:
+            print(f"  - {address}")
+        source = "cache" if result["cached"] else result["source"]
+        ttl = f", TTL {result['ttl']}s" if result["ttl"] is not None else ""
+        print(f"  ({source}, {result['latency'] * 1000:.1f} ms, {result['round_trips']} round trip(s){ttl})")
+
+async def benchmark(names, rounds, delay):
+    """스텁 서버를 띄워 동시 조회 비용 측정"""
+    transport, stub, port = await start_stub_server(delay=delay)
+    try:
+        resolver = AsyncResolver(server="127.0.0.1", port=port, hosts_file=None, use_cache=False)
+        results = await resolver.resolve_many(names)
+        print_results(results)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await resolver.resolve_many(names)
+        elapsed = time.perf_counter() - start
+        total = rounds * len(names)
+        print(f"\n{total} lookups in {elapsed:.3f}s ({total / elapsed:.0f} lookups/s, "
+              f"{stub.queries} queries answered by the stub)")
+    finally:
+        stub.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent DNS resolution with CNAME/TTL/latency details")
+    parser.add_argument("names", nargs="*", default=["aiplatform.googleapis.com",
+                                                     "us-central1-aiplatform.googleapis.com",
+                                                     "generativelanguage.googleapis.com"])
+    parser.add_argument("--server", help="DNS server address (default: first nameserver in resolv.conf)")
+    parser.add_argument("--port", type=int, default=53)
+    parser.add_argument("--stub", action="store_true",
+                        help="benchmark against a local stub server serving the dns.tf private zone")
+    parser.add_argument("--rounds", type=int, default=100, help="benchmark rounds in --stub mode")
+    parser.add_argument("--delay", type=float, default=0.0, help="stub server response delay in seconds")
+    args = parser.parse_args(argv)
+
+    if args.stub:
+        asyncio.run(benchmark(args.names, args.rounds, args.delay))
+        return 0
+    results = AsyncResolver(server=args.server, port=args.port).resolve_all(args.names)
+    print_results(results)
+    return 0 if all(result["addresses"] for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+bgp_sim.py - HA VPN Cloud Router BGP 경로 전파 및 최장 접두사 일치(LPM) 시뮬레이터
+vpn.tf의 Cloud Router, 터널, 라우터 인터페이스, BGP 피어로 세션을 구성하고 각 VPC의 유효 라우팅 테이블을
+계산 (최장 접두사 -> 최저 priority 값 -> 동일하면 ECMP). 터널/피어 장애 시 영향받는 접두사만 다시 계산
+"""
+
+import sys
+import time
+import argparse
+import ipaddress
+from dataclasses import dataclass, field
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from tf_model import TerraformModel, DEFAULT_TF_DIR
+
+DEFAULT_ROUTE_PRIORITY = 1000
+DEFAULT_INTERNET_GATEWAY = "default-internet-gateway"
+
+@dataclass(frozen=True)
+class Route:
+    """VPC 라우트 하나 - kind: subnet, static, default, bgp"""
+    prefix: str
+    kind: str
+    next_hop: str
+    priority: int = DEFAULT_ROUTE_PRIORITY
+    tunnel: str = None
+    session: str = None
+
+    def describe(self):
+        via = f" via {self.tunnel}" if self.tunnel else ""
+        return f"{self.kind:<7} -> {self.next_hop}{via} (priority {self.priority})"
+
+@dataclass
+class Router:
+    name: str
+    network: str
+    asn: int
+    advertise_groups: list = field(default_factory=list)
+    advertised_ranges: list = field(default_factory=list)
+
+@dataclass
+class Peer:
+    """Cloud Router BGP 피어 - 로컬 인터페이스 주소와 터널 포함"""
+    name: str
+    router: str
+    local_ip: str
+    peer_ip: str
+    peer_asn: int
+    priority: int
+    tunnel: str
+
+@dataclass
+class Session:
+    """두 라우터 피어가 맺는 BGP 세션"""
+    name: str
+    local: Peer
+    remote: Peer
+
+def _prefix(cidr):
+    network = ipaddress.IPv4Network(cidr, strict=False)
+    return int(network.network_address), network.prefixlen
+
+class RadixTrie:
+    """
+    IPv4 이진 radix 트라이 - 접두사별 값 삽입/삭제와 최장 접두사 조회
+    compile()은 트라이를 서로소 주소 구간 표로 펼쳐 NumPy searchsorted 일괄 조회에 사용
+    """
+
+    __slots__ = ("root", "size")
+
+    def __init__(self):
+        self.root = [None, None, None]  # [0 자식, 1 자식, 값]
+        self.size = 0
+
+    def insert(self, cidr, value):
+        address, length = _prefix(cidr)
+        node = self.root
+        for depth in range(length):
+            bit = (address >> (31 - depth)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+        if node[2] is None:
+            self.size += 1
+        node[2] = value
+
+    def remove(self, cidr):
+        address, length = _prefix(cidr)
+        path = [self.root]
+        for depth in range(length):
+            node = path[-1][(address >> (31 - depth)) & 1]
+            if node is None:
+                return
+            path.append(node)
+        if path[-1][2] is not None:
+            self.size -= 1
+        path[-1][2] = None
+        # 값도 자식도 없는 노드 정리
+        for depth in range(length, 0, -1):
+            node = path[depth]
+            if node[0] is None and node[1] is None and node[2] is None:
+                path[depth - 1][(address >> (32 - depth)) & 1] = None
+            else:
+                break
+
+    def lookup(self, ip):
+        """최장 일치 접두사의 값 (없으면 None)"""
+        value = int(ipaddress.IPv4Address(ip)) if isinstance(ip, str) else ip
+        node = self.root
+        best = node[2]
+        for depth in range(32):
+            node = node[(value >> (31 - depth)) & 1]
+            if node is None:
+                break
+            if node[2] is not None:
+                best = node[2]
+        return best
+
+    def compile(self):
+        """(구간 시작 주소 목록, 구간별 값 목록) - 인접한 같은 값 구간은 병합"""
+        starts = []
+        values = []
+
+        def emit(start, value):
+            if values and values[-1] is value:
+                return
+            starts.append(start)
+            values.append(value)
+
+        # 반복 DFS: 주소 순서로 방문하며 상속된 값을 구간에 배정
+        stack = [(self.root, 0, 0, None)]
+        while stack:
+            node, address, depth, inherited = stack.pop()
+            value = node[2] if node[2] is not None else inherited
+            if node[0] is None and node[1] is None:
+                emit(address, value)
+                continue
+            half = 1 << (31 - depth)
+            for bit in (1, 0):
+                child = node[bit]
+                child_address = address | (half if bit else 0)
+                if child is None:
+                    stack.append(([None, None, None], child_address, 32, value))
+                else:
+                    stack.append((child, child_address, depth + 1, value))
+        return starts, values
+
+class VpcRoutingTable:
+    """VPC 하나의 RIB(접두사별 후보 라우트)와 최적 경로 FIB(radix 트라이)"""
+
+    def __init__(self, network):
+        self.network = network
+        self.rib = {}
+        self.trie = RadixTrie()
+        self._compiled = None
+
+    def add(self, route):
+        """라우트 추가 - 최적 경로가 바뀌면 (접두사, 이전, 이후) 반환"""
+        before = self.best(route.prefix)
+        self.rib.setdefault(route.prefix, []).append(route)
+        return self._reselect(route.prefix, before)
+
+    def remove(self, predicate):
+        """조건에 맞는 라우트 제거 - 바뀐 접두사만 다시 선택하여 변경 목록 반환"""
+        changes = []
+        for prefix in list(self.rib):
+            routes = self.rib[prefix]
+            kept = [route for route in routes if not predicate(route)]
+            if len(kept) == len(routes):
+                continue
+            before = self.best(prefix)
+            if kept:
+                self.rib[prefix] = kept
+            else:
+                del self.rib[prefix]
+            change = self._reselect(prefix, before)
+            if change:
+                changes.append(change)
+        return changes
+
+    def best(self, prefix):
+        """접두사의 최적 라우트 튜플 - 최저 priority 값이 같은 라우트는 모두 (ECMP)"""
+        routes = self.rib.get(prefix)
+        if not routes:
+            return ()
+        lowest = min(route.priority for route in routes)
+        return tuple(sorted((route for route in routes if route.priority == lowest),
+                            key=lambda route: (route.tunnel or "", route.next_hop)))
+
+    def _reselect(self, prefix, before):
+        after = self.best(prefix)
+        if after == before:
+            return None
+        if after:
+            self.trie.insert(prefix, after)
+        else:
+            self.trie.remove(prefix)
+        self._compiled = None
+        return (prefix, before, after)
+
+    def lookup(self, ip):
+        """목적지 주소의 최적 라우트 튜플 (ECMP면 여러 개)"""
+        return self.trie.lookup(ip) or ()
+
+    def compiled(self):
+        """FIB를 (구간 시작 배열, 라우트 튜플 목록)으로 펼침 - 변경 후 첫 조회 때만 다시 계산"""
+        if self._compiled is None:
+            starts, values = self.trie.compile()
+            values = [value or () for value in values]
+            starts = np.array(starts, dtype=np.uint64) if np is not None else starts
+            self._compiled = (starts, values)
+        return self._compiled
+
+    def lookup_many(self, ips):
+        """
+        목적지 주소 배열 일괄 조회 - (구간 인덱스 배열, 라우트 튜플 목록) 반환
+        route_sets[index[i]]가 i번째 주소의 최적 라우트
+        """
+        starts, route_sets = self.compiled()
+        values = np.asarray(ips, dtype=np.uint64)
+        return np.searchsorted(starts, values, side="right") - 1, route_sets
+
+    def routes(self):
+        """(접두사, 최적 라우트 튜플) 목록 - 접두사 길이 내림차순"""
+        return sorted(((prefix, self.best(prefix)) for prefix in self.rib),
+                      key=lambda item: (-_prefix(item[0])[1], _prefix(item[0])[0]))
+
+def ecmp_select(route_set, flow_hash):
+    """흐름 해시로 ECMP 경로 하나 선택"""
+    return route_set[flow_hash % len(route_set)] if route_set else None
+
+def flow_hashes(src, dst, src_port=None, dst_port=None):
+    """흐름별 ECMP 해시 (배열 입력)"""
+    h = np.asarray(src, dtype=np.uint64) * np.uint64(0x9E3779B1) ^ np.asarray(dst, dtype=np.uint64)
+    if src_port is not None:
+        h = h * np.uint64(31) + np.asarray(src_port, dtype=np.uint64)
+    if dst_port is not None:
+        h = h * np.uint64(31) + np.asarray(dst_port, dtype=np.uint64)
+    return (h ^ (h >> np.uint64(16))) * np.uint64(0x45D9F3B) & np.uint64(0xFFFFFFFF)
+
+class BgpSimulator:
+    """Terraform 모델에서 라우터/세션을 만들고 VPC별 라우팅 테이블을 유지"""
+
+    def __init__(self, model):
+        self.model = model
+        self.routers = {}
+        router_labels = {}
+        for label, block in model.resources_of("google_compute_router"):
+            bgp = block.children("bgp")
+            if not bgp:
+                continue
+            attrs = bgp[0].attributes
+            name = model.value(block.attributes.get("name", label))
+            router_labels[label] = name
+            self.routers[name] = Router(
+                name=name,
+                network=model.network_name(block.attributes.get("network")),
+                asn=int(model.value(attrs.get("asn", 0))),
+                advertise_groups=list(model.value(attrs.get("advertised_groups", ["ALL_SUBNETS"])))
+                if model.value(attrs.get("advertise_mode", "DEFAULT")) == "CUSTOM" else ["ALL_SUBNETS"],
+                advertised_ranges=[model.value(r.attributes.get("range"))
+                                   for r in bgp[0].children("advertised_ip_ranges")],
+            )
+
+        self.tunnel_names = {label: model.value(block.attributes.get("name", label))
+                             for label, block in model.resources_of("google_compute_vpn_tunnel")}
+        interfaces = {}
+        for label, block in model.resources_of("google_compute_router_interface"):
+            attrs = block.attributes
+            interfaces[model.value(attrs.get("name", label))] = (
+                model.value(attrs.get("ip_range", "")).split("/")[0],
+                self._tunnel_name(model.value(attrs.get("vpn_tunnel"))),
+            )
+        self.peers = {}
+        for label, block in model.resources_of("google_compute_router_peer"):
+            attrs = block.attributes
+            local_ip, tunnel = interfaces.get(model.value(attrs.get("interface")), (None, None))
+            router = model.value(attrs.get("router"))
+            name = model.value(attrs.get("name", label))
+            self.peers[name] = Peer(name, router_labels.get(model.ref_name(router), router), local_ip,
+                                    model.value(attrs.get("peer_ip_address")), int(model.value(attrs.get("peer_asn", 0))),
+                                    int(model.value(attrs.get("advertised_route_priority", 100))), tunnel)
+        self.peer_labels = {label: model.value(block.attributes.get("name", label))
+                            for label, block in model.resources_of("google_compute_router_peer")}
+
+        # 서로의 주소를 피어 주소로 가리키는 피어 쌍 = 세션 (라우터마다 한 방향씩)
+        by_local_ip = {peer.local_ip: peer for peer in self.peers.values()}
+        self.sessions = []
+        for peer in self.peers.values():
+            remote = by_local_ip.get(peer.peer_ip)
+            if remote and remote.peer_ip == peer.local_ip and peer.router in self.routers \
+                    and remote.router in self.routers:
+                self.sessions.append(Session(f"{peer.router}/{peer.name}", peer, remote))
+
+        self.down = set()
+        self.tables = {}
+        self.converge()
+
+    def _tunnel_name(self, value):
+        if isinstance(value, str):
+            return value
+        return self.tunnel_names.get(self.model.ref_name(value))
+
+    def _canonical(self, name):
+        """Terraform 리소스 이름(dev_to_prod_tunnel1)도 GCP 이름(dev-to-prod-tunnel1)으로 변환"""
+        return self.tunnel_names.get(name) or self.peer_labels.get(name) or name
+
+    def session_up(self, session):
+        return not ({session.local.name, session.remote.name, session.local.tunnel, session.remote.tunnel}
+                    & self.down)
+
+    def advertisements(self, router):
+        """라우터가 광고하는 접두사 (ALL_SUBNETS 그룹 + advertised_ip_ranges)"""
+        prefixes = []
+        if "ALL_SUBNETS" in router.advertise_groups:
+            prefixes += [subnet.cidr for subnet in self.model.subnets if subnet.network == router.network]
+        prefixes += router.advertised_ranges
+        return list(dict.fromkeys(prefixes))
+
+    def learned_routes(self, session):
+        """세션의 로컬 라우터가 원격 라우터로부터 학습하는 동적 라우트"""
+        remote_router = self.routers[session.remote.router]
+        return [Route(prefix, "bgp", session.remote.local_ip, session.remote.priority,
+                      session.local.tunnel, session.name)
+                for prefix in self.advertisements(remote_router)]
+
+    def converge(self):
+        """모든 VPC 라우팅 테이블을 처음부터 계산"""
+        self.tables = {}
+        networks = {subnet.network for subnet in self.model.subnets} | {r.network for r in self.routers.values()}
+        for network in sorted(networks):
+            table = VpcRoutingTable(network)
+            table.add(Route("0.0.0.0/0", "default", DEFAULT_INTERNET_GATEWAY, DEFAULT_ROUTE_PRIORITY))
+            for subnet in self.model.subnets:
+                if subnet.network == network:
+                    table.add(Route(subnet.cidr, "subnet", network, 0))
+            self.tables[network] = table
+        for label, block in self.model.resources_of("google_compute_route"):
+            attrs = block.attributes
+            network = self.model.network_name(attrs.get("network"))
+            next_hop = next((str(self.model.value(attrs[key])) for key in attrs if key.startswith("next_hop_")),
+                            DEFAULT_INTERNET_GATEWAY)
+            if network in self.tables:
+                self.tables[network].add(Route(self.model.value(attrs.get("dest_range")), "static", next_hop,
+                                               int(self.model.value(attrs.get("priority", DEFAULT_ROUTE_PRIORITY)))))
+        for session in self.sessions:
+            if self.session_up(session):
+                self._install(session)
+
+    def _install(self, session):
+        table = self.tables[self.routers[session.local.router].network]
+        return [change for change in (table.add(route) for route in self.learned_routes(session)) if change]
+
+    def set_state(self, name, up):
+        """
+        터널 또는 피어 상태 변경 - 상태가 바뀐 세션의 라우트만 추가/철회하고
+        [(VPC, 접두사, 이전 최적 경로, 이후 최적 경로)] 변경 목록 반환
+        """
+        name = self._canonical(name)
+        if name not in self.tunnel_names.values() and name not in self.peers:
+            raise KeyError(f"unknown tunnel or peer: {name}")
+        before = {session.name: self.session_up(session) for session in self.sessions}
+        (self.down.discard if up else self.down.add)(name)
+        changes = []
+        for session in self.sessions:
+            now_up = self.session_up(session)
+            if now_up == before[session.name]:
+                continue
+            network = self.routers[session.local.router].network
+            if now_up:
+                found = self._install(session)
+            else:
+                found = self.tables[network].remove(lambda route, s=session.name: route.session == s)
+            changes += [(network,) + change for change in found]
+        return changes
+
+    def route(self, network, ip):
+        return self.tables[network].lookup(ip)
+
+def format_routes(route_set):
+    return "; ".join(route.describe() for route in route_set) or "no route"
+
+def print_tables(simulator):
+    for network, table in simulator.tables.items():
+        print(f"\n{network} routing table:")
+        for prefix, best in table.routes():
+            ecmp = " [ECMP]" if len(best) > 1 else ""
+            print(f"  {prefix:<18} {format_routes(best)}{ecmp}")
+
+def print_changes(changes):
+    if not changes:
+        print("  (no best-path change)")
+    for network, prefix, before, after in changes:
+        print(f"  {network:<10} {prefix:<18} {format_routes(before)}")
+        print(f"  {'':<10} {'':<18} -> {format_routes(after) if after else 'withdrawn (less specific route applies)'}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate BGP propagation and LPM routing from vpn.tf")
+    parser.add_argument("destinations", nargs="*", help="destination addresses to route")
+    parser.add_argument("--tf-dir", default=DEFAULT_TF_DIR)
+    parser.add_argument("--network", default="dev-vpc", help="VPC to route from (default: dev-vpc)")
+    parser.add_argument("--down", action="append", default=[], help="mark a tunnel or BGP peer down (repeatable)")
+    parser.add_argument("--failover", action="store_true", help="show best-path changes for each single tunnel failure")
+    parser.add_argument("--bench", type=int, metavar="N", help="route N random destinations in one batch")
+    args = parser.parse_args(argv)
+
+    simulator = BgpSimulator(TerraformModel.load(args.tf_dir))
+    print(f"BGP sessions: {len(simulator.sessions)} "
+          f"({', '.join(s.name for s in simulator.sessions if simulator.session_up(s))} up)")
+    for name in args.down:
+        print(f"\n{name} down:")
+        print_changes(simulator.set_state(name, up=False))
+    print_tables(simulator)
+
+    if args.failover:
+        for tunnel in sorted(simulator.tunnel_names.values()):
+            if tunnel in simulator.down:
+                continue
+            start = time.perf_counter()
+            changes = simulator.set_state(tunnel, up=False)
+            elapsed = time.perf_counter() - start
+            print(f"\nWhat if {tunnel} goes down ({elapsed * 1e6:.0f} us to recompute):")
+            print_changes(changes)
+            simulator.set_state(tunnel, up=True)
+
+    table = simulator.tables[args.network]
+    for destination in args.destinations:
+        print(f"\n{args.network} -> {destination}: {format_routes(table.lookup(destination))}")
+
+    if args.bench:
+        if np is None:
+            parser.error("--bench requires numpy")
+        rng = np.random.default_rng(0)
+        # 절반은 전체 주소 공간, 절반은 테이블의 접두사 안에서 추출
+        prefixes = [ipaddress.IPv4Network(prefix) for prefix, _ in table.routes()]
+        pick = rng.integers(0, len(prefixes), args.bench)
+        inside = np.array([int(n.network_address) for n in prefixes], dtype=np.uint64)[pick] + \
+            (rng.random(args.bench) * np.array([n.num_addresses for n in prefixes])[pick]).astype(np.uint64)
+        destinations = np.where(rng.random(args.bench) < 0.5, inside,
+                                rng.integers(0, 1 << 32, args.bench, dtype=np.uint64))
+        start = time.perf_counter()
+        index, route_sets = table.lookup_many(destinations)
+        hashes = flow_hashes(rng.integers(0, 1 << 32, args.bench, dtype=np.uint64), destinations)
+        elapsed = time.perf_counter() - start
+        print(f"\nRouted {args.bench:,} destinations from {args.network} in {elapsed:.3f}s "
+              f"({args.bench / elapsed:,.0f}/s)")
+        counts = {}
+        for set_index in np.unique(index).tolist():
+            route_set = route_sets[set_index]
+            selected = index == set_index
+            if len(route_set) > 1:
+                choice = (hashes[selected] % np.uint64(len(route_set))).astype(np.int64)
+                for k, route in enumerate(route_set):
+                    counts[route.describe()] = counts.get(route.describe(), 0) + int((choice == k).sum())
+            else:
+                label = format_routes(route_set)
+                counts[label] = counts.get(label, 0) + int(selected.sum())
+        for label, count in sorted(counts.items(), key=lambda item: -item[1]):
+            print(f"  {count:>10,}  {label}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
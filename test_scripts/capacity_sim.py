@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+capacity_sim.py - HA VPN 터널 위 Gemini 트래픽 용량 시뮬레이터
+개발자 수(제공 부하)별로 요청 도착을 NumPy로 한 번에 생성하고, 경로(터널 ECMP / NAT) 업링크 -> RTT ->
+Gemini 서비스(동시 처리 슬롯, 힙 기반 이벤트 처리) -> RTT -> 다운링크 순서의 FIFO 대기열 네트워크를
+모의 실행하여 지연 시간 백분위를 계산. 터널 하나 장애 시나리오는 bgp_sim의 경로 재계산 결과를 사용
+"""
+
+import sys
+import json
+import math
+import time
+import heapq
+import argparse
+import ipaddress
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from tf_model import TerraformModel, DEFAULT_TF_DIR
+from bgp_sim import BgpSimulator, flow_hashes
+
+PGA_VIP = "199.36.153.8"
+# 한 방향 HA VPN 터널 처리량 상한 (약 3 Gbps)
+TUNNEL_BANDWIDTH_MBPS = 3000.0
+# z(0.90), z(0.99) - 백분위에서 로그정규 분포 sigma 추정
+Z90 = 1.2816
+Z99 = 2.3263
+# 보정에 쓰는 1_test_gemini_api.py 생성 단계 이름
+GENERATION_CHECKS = ("text_generation", "code_generation")
+
+@dataclass
+class PathModel:
+    """요청이 지나가는 경로 하나 - 방향별 대역폭(Mbps)과 왕복 지연(초)"""
+    name: str
+    bandwidth_mbps: float
+    rtt: float
+
+class ServiceTime:
+    """Gemini 응답 시간 분포 - 측정값으로 로그정규 적합, 표본이 충분하면 경험 분포에서 재표집"""
+
+    def __init__(self, mu, sigma, samples=None):
+        self.mu = mu
+        self.sigma = sigma
+        self.samples = np.asarray(samples, dtype=float) if samples is not None and len(samples) >= 30 else None
+
+    @classmethod
+    def from_percentiles(cls, p50, p90=None, p99=None):
+        mu = math.log(p50)
+        if p90:
+            sigma = (math.log(p90) - mu) / Z90
+        elif p99:
+            sigma = (math.log(p99) - mu) / Z99
+        else:
+            sigma = 0.5
+        return cls(mu, max(sigma, 1e-6))
+
+    @classmethod
+    def from_samples(cls, samples):
+        logs = [math.log(value) for value in samples if value > 0]
+        if not logs:
+            raise ValueError("no positive timing samples")
+        mu = sum(logs) / len(logs)
+        sigma = math.sqrt(sum((value - mu) ** 2 for value in logs) / max(len(logs) - 1, 1)) if len(logs) > 1 else 0.5
+        return cls(mu, max(sigma, 1e-6), samples)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        1_test_gemini_api.py --format ndjson 출력(load 요약, text/code_generation 단계의 latency) 또는
+        한 줄에 하나씩 적힌 응답 시간(초) 파일로 보정 - --stream 레코드는 전체 응답 시간(latency)을 쓰고
+        latency가 없을 때만 ttft 사용. 쓸 수 있는 표본이 없으면 ValueError
+        """
+        samples = []
+        load_latency = None
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                if not line.startswith("{"):
+                    samples.append(float(line.split()[0]))
+                    continue
+                record = json.loads(line)
+                data = record.get("data") or {}
+                if record.get("check") == "load" and isinstance(data.get("latency"), dict):
+                    load_latency = data["latency"]
+                elif record.get("check") in GENERATION_CHECKS and record.get("status") == "pass":
+                    samples.append(data.get("latency") or data.get("ttft") or record.get("elapsed"))
+        if load_latency and load_latency.get("p50"):
+            return cls.from_percentiles(load_latency["p50"], load_latency.get("p90"), load_latency.get("p99"))
+        samples = [value for value in samples if value]
+        if not samples:
+            raise ValueError(f"{path}: no load summary, passing {'/'.join(GENERATION_CHECKS)} record "
+                             "or timing line to calibrate from")
+        return cls.from_samples(samples)
+
+    def sample(self, rng, n):
+        if self.samples is not None:
+            return rng.choice(self.samples, n)
+        return rng.lognormal(self.mu, self.sigma, n)
+
+    def describe(self):
+        p50 = math.exp(self.mu)
+        p90 = math.exp(self.mu + Z90 * self.sigma)
+        source = f"empirical, {len(self.samples)} samples" if self.samples is not None else "lognormal"
+        return f"p50 {p50:.2f}s, p90 {p90:.2f}s ({source})"
+
+def fifo_departures(arrivals, service):
+    """
+    단일 서버 FIFO 대기열의 출발 시각 (도착 순 정렬 입력)
+    Lindley 점화식 d_i = max(a_i, d_{i-1}) + s_i 를 누적 최댓값으로 풀어 벡터화:
+    d_i = S_i + max_{j<=i}(a_j - S_{j-1})
+    """
+    cumulative = np.cumsum(service)
+    return cumulative + np.maximum.accumulate(arrivals - (cumulative - service))
+
+def fifo_unsorted(arrivals, service):
+    """도착 순서가 섞인 입력용 FIFO - 정렬 후 계산하고 원래 순서로 복원"""
+    order = np.argsort(arrivals, kind="stable")
+    departures = np.empty_like(arrivals)
+    departures[order] = fifo_departures(arrivals[order], np.broadcast_to(service, arrivals.shape)[order])
+    return departures
+
+def multi_server(arrivals, service, slots):
+    """
+    slots개 동시 처리 슬롯의 FIFO 대기열 - 슬롯이 비는 시각을 최소 힙으로 관리하는 이벤트 처리
+    (slots가 None이면 대기 없음)
+    """
+    if not slots:
+        return arrivals + service
+    order = np.argsort(arrivals, kind="stable")
+    free = [0.0] * slots
+    departures = np.empty_like(arrivals)
+    for index, arrival, duration in zip(order.tolist(), arrivals[order].tolist(), service[order].tolist()):
+        start = arrival if arrival > free[0] else free[0]
+        done = start + duration
+        heapq.heapreplace(free, done)
+        departures[index] = done
+    return departures
+
+def tunnel_paths(simulator, network="dev-vpc", destination=PGA_VIP, bandwidth_mbps=TUNNEL_BANDWIDTH_MBPS, rtt=0.002):
+    """bgp_sim 라우팅 결과에서 목적지로 가는 ECMP 터널 경로 목록"""
+    routes = simulator.route(network, destination)
+    return [PathModel(route.tunnel or route.next_hop, bandwidth_mbps, rtt) for route in routes]
+
+def simulate(users, paths, service, requests_per_minute=6.0, total_requests=1_000_000, request_bytes=20_000,
+             response_bytes=4_000, service_slots=None, nat_path=None, nat_fraction=0.0, seed=0):
+    """
+    개발자 users명이 각각 분당 requests_per_minute 요청을 보내는 부하를 모의 실행
+    요청은 개발자(출발지 주소) 해시로 ECMP 경로에 고정되고, nat_fraction 비율의 개발자는 NAT 경로 사용
+    """
+    rng = np.random.default_rng(seed)
+    rate = users * requests_per_minute / 60.0
+    n = total_requests
+    arrivals = np.cumsum(rng.exponential(1.0 / rate, n))
+    user = rng.integers(0, users, n)
+
+    # 개발자별 경로: ECMP 해시 (같은 개발자의 연결은 같은 터널), 일부는 NAT
+    source = np.uint64(int(ipaddress.IPv4Address("10.0.1.0"))) + user.astype(np.uint64)
+    hashes = flow_hashes(source, np.full(n, int(ipaddress.IPv4Address(PGA_VIP)), dtype=np.uint64))
+    all_paths = list(paths) + ([nat_path] if nat_path else [])
+    if not paths and not nat_path:
+        raise ValueError("no path to the API")
+    path = (hashes % np.uint64(max(len(paths), 1))).astype(np.int64)
+    if nat_path and (nat_fraction > 0 or not paths):
+        nat_users = (hashes >> np.uint64(8)) % np.uint64(1000) < np.uint64(int(nat_fraction * 1000)) \
+            if paths else np.ones(n, dtype=bool)
+        path[nat_users] = len(paths)
+
+    service_times = service.sample(rng, n)
+    at_service = np.empty(n)
+    up_busy = []
+    for index, model in enumerate(all_paths):
+        selected = path == index
+        tx = request_bytes * 8 / (model.bandwidth_mbps * 1e6)
+        at_service[selected] = fifo_departures(arrivals[selected], np.full(selected.sum(), tx)) + model.rtt / 2
+        up_busy.append(selected.sum() * tx)
+
+    finished_service = multi_server(at_service, service_times, service_slots)
+
+    done = np.empty(n)
+    utilization = {}
+    horizon = arrivals[-1]
+    for index, model in enumerate(all_paths):
+        selected = path == index
+        tx = response_bytes * 8 / (model.bandwidth_mbps * 1e6)
+        done[selected] = fifo_unsorted(finished_service[selected] + model.rtt / 2, tx)
+        utilization[model.name] = {
+            "requests": int(selected.sum()),
+            "uplink": up_busy[index] / horizon,
+            "downlink": selected.sum() * tx / horizon,
+        }
+
+    latency = np.sort(done - arrivals)
+    return {
+        "users": users,
+        "offered_rps": rate,
+        "requests": n,
+        "latency": {"p50": float(latency[n // 2]), "p90": float(latency[int(n * 0.90)]),
+                    "p99": float(latency[int(n * 0.99)]), "max": float(latency[-1])},
+        "paths": utilization,
+        "service_utilization": float(service_times.sum() / horizon / service_slots) if service_slots else None,
+    }
+
+def sweep(user_counts, paths, service, **kwargs):
+    return [simulate(users, paths, service, **kwargs) for users in user_counts]
+
+def saturated(result):
+    """링크나 서비스 사용률이 100% 이상 - 대기열이 계속 커지는 상태"""
+    link = max(max(p["uplink"], p["downlink"]) for p in result["paths"].values())
+    return link >= 1 or (result["service_utilization"] or 0) >= 1
+
+def knee(results, factor=2.0):
+    """p99가 최저 부하의 factor배를 처음 넘는 개발자 수 (없으면 None)"""
+    if not results:
+        return None
+    baseline = results[0]["latency"]["p99"]
+    return next((r["users"] for r in results if r["latency"]["p99"] > baseline * factor), None)
+
+def capacity_search(paths, service, start_users=100, max_users=10_000_000, growth=2.0, refine=6, factor=2.0,
+                    **kwargs):
+    """
+    개발자 수를 growth배씩 늘리며 p99가 최저 부하의 factor배를 넘거나 경로가 포화될 때까지 모의 실행하고,
+    마지막 정상 부하와 처음 나빠진 부하 사이를 refine번 이분 탐색 - 개발자 수 오름차순 결과 목록
+    (서비스 슬롯 제한이 없으면 터널 대역폭이 한계를 정함)
+    """
+    results = [simulate(start_users, paths, service, **kwargs)]
+    baseline = results[0]["latency"]["p99"]
+
+    def degraded(result):
+        return result["latency"]["p99"] > baseline * factor or saturated(result)
+
+    while not degraded(results[-1]) and results[-1]["users"] < max_users:
+        users = min(int(results[-1]["users"] * growth), max_users)
+        results.append(simulate(users, paths, service, **kwargs))
+    if len(results) > 1 and degraded(results[-1]):
+        good, bad = results[-2]["users"], results[-1]["users"]
+        for _ in range(refine):
+            users = (good + bad) // 2
+            if users in (good, bad):
+                break
+            result = simulate(users, paths, service, **kwargs)
+            results.append(result)
+            good, bad = (good, users) if degraded(result) else (users, bad)
+    return sorted(results, key=lambda result: result["users"])
+
+def print_sweep(title, results):
+    print(f"\n{title}")
+    print(f"  {'users':>8} {'req/s':>9} {'p50 (s)':>9} {'p90 (s)':>9} {'p99 (s)':>9}  max link util  service util")
+    for result in results:
+        link = max(max(p["uplink"], p["downlink"]) for p in result["paths"].values())
+        service = result["service_utilization"]
+        service = f"{service * 100:>5.0f}%" if service is not None else "    -"
+        latency = result["latency"]
+        # 사용률 100% 이상은 대기열이 계속 커지는 상태 - 지연 시간은 모의 실행 길이에 비례
+        mark = "  saturated" if saturated(result) else ""
+        print(f"  {result['users']:>8,} {result['offered_rps']:>9.1f} {latency['p50']:>9.2f} {latency['p90']:>9.2f} "
+              f"{latency['p99']:>9.2f}  {link * 100:>12.1f}%  {service:>12}{mark}")
+    users = knee(results)
+    first = next((result["users"] for result in results if saturated(result)), None)
+    print(f"  p99 doubles at: {f'{users:,} users' if users else 'not reached in this range'}")
+    if first:
+        print(f"  saturated from: {first:,} users")
+    limit = min(value for value in (users, first) if value) if users or first else None
+    carried = [result["users"] for result in results if limit and result["users"] < limit]
+    if carried:
+        print(f"  carries: {max(carried):,} users before latency degrades")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate Gemini request latency vs. developer count over the HA VPN")
+    parser.add_argument("--users",
+                        help="comma separated developer counts (default: grow from 100 until p99 doubles or a path "
+                             "saturates, then bisect the knee)")
+    parser.add_argument("--max-users", type=int, default=10_000_000, help="upper bound of the automatic search")
+    parser.add_argument("--rpm", type=float, default=6.0, help="requests per developer per minute (default: 6)")
+    parser.add_argument("--requests", type=int, default=1_000_000, help="simulated requests per load level")
+    parser.add_argument("--calibrate", metavar="FILE",
+                        help="fit service times from 1_test_gemini_api.py --format ndjson output or a list of seconds")
+    parser.add_argument("--service-ms", default="1500,4000", help="service time p50,p90 in ms without --calibrate")
+    parser.add_argument("--slots", type=int, default=0, help="concurrent requests Gemini serves (0: unlimited)")
+    parser.add_argument("--bandwidth-mbps", type=float, default=TUNNEL_BANDWIDTH_MBPS, help="per-tunnel bandwidth")
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="round trip over the tunnel")
+    parser.add_argument("--request-kb", type=float, default=20.0)
+    parser.add_argument("--response-kb", type=float, default=4.0)
+    parser.add_argument("--nat-fraction", type=float, default=0.0,
+                        help="share of developers using the Cloud NAT (public) path instead of the tunnels")
+    parser.add_argument("--nat-mbps", type=float, default=1000.0)
+    parser.add_argument("--nat-rtt-ms", type=float, default=15.0)
+    parser.add_argument("--tf-dir", default=DEFAULT_TF_DIR)
+    args = parser.parse_args(argv)
+    if np is None:
+        parser.error("numpy is required")
+
+    if args.calibrate:
+        try:
+            service = ServiceTime.from_file(args.calibrate)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    else:
+        p50, p90 = (float(value) / 1000 for value in args.service_ms.split(","))
+        service = ServiceTime.from_percentiles(p50, p90)
+    print(f"Service time: {service.describe()}")
+
+    simulator = BgpSimulator(TerraformModel.load(args.tf_dir))
+    user_counts = [int(value) for value in args.users.split(",")] if args.users else None
+    nat_path = PathModel("cloud-nat", args.nat_mbps, args.nat_rtt_ms / 1000) if args.nat_fraction > 0 else None
+    options = dict(requests_per_minute=args.rpm, total_requests=args.requests, request_bytes=args.request_kb * 1000,
+                   response_bytes=args.response_kb * 1000, service_slots=args.slots or None,
+                   nat_path=nat_path, nat_fraction=args.nat_fraction)
+
+    def run(paths):
+        if user_counts:
+            return sweep(user_counts, paths, service, **options)
+        return capacity_search(paths, service, max_users=args.max_users, **options)
+
+    paths = tunnel_paths(simulator, bandwidth_mbps=args.bandwidth_mbps, rtt=args.rtt_ms / 1000)
+    start = time.perf_counter()
+    results = run(paths)
+    elapsed = time.perf_counter() - start
+    print_sweep(f"All tunnels up ({', '.join(p.name for p in paths)}): "
+                f"{len(results)} x {args.requests:,} requests in {elapsed:.1f}s", results)
+
+    tunnel = paths[0].name if paths else None
+    if tunnel and tunnel in simulator.tunnel_names.values():
+        simulator.set_state(tunnel, up=False)
+        degraded = tunnel_paths(simulator, bandwidth_mbps=args.bandwidth_mbps, rtt=args.rtt_ms / 1000)
+        if degraded and all(p.name != "default-internet-gateway" for p in degraded):
+            print_sweep(f"{tunnel} down ({', '.join(p.name for p in degraded)})", run(degraded))
+        else:
+            print(f"\n{tunnel} down: no private route left to {PGA_VIP}")
+        simulator.set_state(tunnel, up=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
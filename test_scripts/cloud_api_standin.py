@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+cloud_api_standin.py - 로컬 Compute/Cloud DNS/Service Usage/Resource Manager REST API 대체 서버
+cloud_inventory.py가 호출하는 목록/상태 API를 인벤토리(JSON)로 응답 - maxResults/pageSize와 pageToken 페이지 나눔,
+경로 RTT 주입을 지원하여 gcloud 없이 진단 엔진을 실행/측정할 수 있게 함
+서비스별 경로는 /<service>/<버전 경로> (cloud_inventory.py --api-base와 같은 규칙)
+
+인벤토리를 지정하지 않으면 Terraform 구성(vpn.tf, dns.tf, networks.tf, firewall.tf)을 본뜬 예제를 사용하며,
+cloud_inventory.py --dump로 저장한 실제 인벤토리도 그대로 응답할 수 있음
+
+사용 예:
+    python3 cloud_api_standin.py --port 8090 --page-size 2 --rtt-ms 30
+    python3 cloud_inventory.py --api-base http://127.0.0.1:8090
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+from urllib.parse import urlsplit, parse_qs
+
+from vertex_standin import MAX_HEADER_BYTES, StandInConfig, VertexStandIn, error_body
+
+DEFAULT_DEV_PROJECT = "my-onprem-sim-088dfe15"
+DEFAULT_PROD_PROJECT = "my-gemini-prod-088dfe15"
+DEFAULT_REGION = "us-central1"
+COMPUTE = "https://www.googleapis.com/compute/v1"
+
+# 목록 경로의 마지막 구성 요소 -> (인벤토리 키, 응답의 항목 키, 리전별 여부)
+COMPUTE_LISTS = {
+    "networks": ("networks", "items", False),
+    "routes": ("routes", "items", False),
+    "firewalls": ("firewalls", "items", False),
+    "subnetworks": ("subnetworks", "items", True),
+    "vpnTunnels": ("vpnTunnels", "items", True),
+    "routers": ("routers", "items", True),
+}
+
+def _side(project, region, name, cidr, peer_cidr, bgp, peer_bgp, extra):
+    """Terraform 구성의 한쪽(dev 또는 prod) 프로젝트 인벤토리"""
+    regional = f"{COMPUTE}/projects/{project}/regions/{region}"
+    network = f"{COMPUTE}/projects/{project}/global/networks/{name}-vpc"
+    peer = "prod" if name == "dev" else "dev"
+    tunnels = [{"name": f"{name}-to-{peer}-tunnel{i}", "region": regional, "status": "ESTABLISHED",
+                "detailedStatus": "Tunnel is up and running.", "peerIp": f"35.242.{i}.{10 if name == 'dev' else 20}",
+                "ikeVersion": 2, "router": f"{regional}/routers/{name}-vpn-router"} for i in (1, 2)]
+    peers = [{"name": f"{name}-bgp-peer{i}", "status": "UP", "state": "Established",
+              "ipAddress": f"169.254.{i - 1}.{bgp}", "peerIpAddress": f"169.254.{i - 1}.{peer_bgp}",
+              "uptimeSeconds": "86400", "numLearnedRoutes": 1} for i in (1, 2)]
+    best_routes = [{"destRange": peer_cidr, "nextHopIp": f"169.254.{i - 1}.{peer_bgp}", "routeType": "BGP",
+                    "priority": 100} for i in (1, 2)]
+    internet = f"{COMPUTE}/projects/{project}/global/gateways/default-internet-gateway"
+    routes = [
+        {"name": f"{name}-default-internet", "network": network, "destRange": "0.0.0.0/0", "priority": 1000,
+         "nextHopGateway": internet},
+        {"name": f"{name}-private-googleapis", "network": network, "destRange": "199.36.153.8/30", "priority": 100,
+         "nextHopGateway": internet},
+        {"name": f"{name}-subnet-route", "network": network, "destRange": cidr, "priority": 0,
+         "nextHopNetwork": network},
+    ]
+    firewalls = [
+        {"name": f"{name}-allow-from-{peer}", "network": network, "direction": "INGRESS", "priority": 1000,
+         "sourceRanges": [peer_cidr], "allowed": [{"IPProtocol": "tcp"}, {"IPProtocol": "udp"},
+                                                  {"IPProtocol": "icmp"}]},
+        {"name": f"{name}-allow-iap-ssh", "network": network, "direction": "INGRESS", "priority": 1000,
+         "sourceRanges": ["35.235.240.0/20"], "allowed": [{"IPProtocol": "tcp", "ports": ["22"]}]},
+    ]
+    # 페이지 나눔과 대량 인벤토리를 흉내 내는 추가 규칙/경로
+    for i in range(extra):
+        firewalls.append({"name": f"{name}-extra-rule-{i:04d}", "network": network, "direction": "INGRESS",
+                          "priority": 2000 + i, "sourceRanges": [f"192.168.{i % 256}.0/24"],
+                          "allowed": [{"IPProtocol": "tcp", "ports": [str(8000 + i % 1000)]}]})
+        routes.append({"name": f"{name}-extra-route-{i:04d}", "network": network,
+                       "destRange": f"172.{16 + i // 256 % 16}.{i % 256}.0/24", "priority": 1000,
+                       "nextHopIp": f"{cidr.rsplit('.', 2)[0]}.1.250"})
+    zone = {"name": "googleapis-private-zone", "dnsName": "googleapis.com.", "visibility": "private",
+            "privateVisibilityConfig": {"networks": [{"networkUrl": network}]}}
+    return {
+        "networks": [{"name": f"{name}-vpc", "selfLink": network, "autoCreateSubnetworks": False}],
+        "subnetworks": [{"name": f"{name}-subnet", "region": regional, "network": network, "ipCidrRange": cidr,
+                         "privateIpGoogleAccess": True}],
+        "vpnTunnels": tunnels,
+        "routers": [{"name": f"{name}-vpn-router", "region": regional, "network": network,
+                     "bgp": {"asn": 64514 if name == "dev" else 64515}}],
+        "routerStatus": {f"{name}-vpn-router": {"network": network, "bgpPeerStatus": peers,
+                                                "bestRoutes": best_routes}},
+        "routes": routes,
+        "firewalls": firewalls,
+        "policies": [{"name": f"{name}-dns-policy", "enableInboundForwarding": name == "prod",
+                      "networks": [{"networkUrl": network}]}],
+        "managedZones": [zone],
+        "rrsets": {"googleapis-private-zone": [
+            {"name": "private.googleapis.com.", "type": "A", "ttl": 300,
+             "rrdatas": ["199.36.153.8", "199.36.153.9", "199.36.153.10", "199.36.153.11"]},
+            {"name": "*.googleapis.com.", "type": "CNAME", "ttl": 300, "rrdatas": ["private.googleapis.com."]},
+        ]},
+        "services": [{"config": {"name": service}, "state": "ENABLED"} for service in
+                     ["compute.googleapis.com", "dns.googleapis.com"]
+                     + (["aiplatform.googleapis.com"] if name == "prod" else [])],
+        "orgPolicies": {
+            "constraints/compute.requireShieldedVm": {"constraint": "constraints/compute.requireShieldedVm",
+                                                      "booleanPolicy": {"enforced": True}},
+            "constraints/compute.vmExternalIpAccess": {"constraint": "constraints/compute.vmExternalIpAccess",
+                                                       "listPolicy": {"allValues": "DENY"}},
+        },
+    }
+
+def sample_inventory(dev=DEFAULT_DEV_PROJECT, prod=DEFAULT_PROD_PROJECT, region=DEFAULT_REGION, extra=0):
+    """Terraform 기본값(variables.tf)으로 구성된 dev/prod 프로젝트 인벤토리 - extra개의 규칙/경로 추가"""
+    return {"regions": [region], "projects": {
+        dev: _side(dev, region, "dev", "10.0.1.0/24", "10.1.1.0/24", 1, 2, extra),
+        prod: _side(prod, region, "prod", "10.1.1.0/24", "10.0.1.0/24", 2, 1, extra),
+    }}
+
+class CloudApiStandIn(VertexStandIn):
+    """인벤토리를 Google Cloud 목록 API 형식으로 응답 (VertexStandIn의 HTTP/1.1 keep-alive 처리 재사용)"""
+
+    def __init__(self, inventory=None, page_size=500, config=None):
+        super().__init__(config or StandInConfig(service_time=0.0, jitter=0.0))
+        self.inventory = inventory if inventory is not None else sample_inventory()
+        self.page_size = page_size
+        self.paths = {}
+
+    async def dispatch(self, writer, method, target, body, keep_alive, delay):
+        url = urlsplit(target)
+        self.stats.requests += 1
+        self.paths[url.path] = self.paths.get(url.path, 0) + 1
+        if delay:
+            await asyncio.sleep(delay)
+        status, payload = self.route(method, url.path, parse_qs(url.query), body)
+        await self.respond(writer, status, payload, keep_alive)
+        return keep_alive
+
+    def route(self, method, path, query, body):
+        """(HTTP 상태, 응답) - 알 수 없는 경로/프로젝트는 404"""
+        service, _, rest = path.strip("/").partition("/")
+        parts = rest.split("/")
+        # parts: [버전..., "projects", 프로젝트, ...]
+        if "projects" not in parts[:3] or len(parts) < parts.index("projects") + 2:
+            return 404, error_body(404, "NOT_FOUND", f"{path} not found")
+        index = parts.index("projects")
+        project, tail = parts[index + 1], parts[index + 2:]
+        if service == "resourcemanager" and project.endswith(":getEffectiveOrgPolicy") and method == "POST":
+            return self.org_policy(project.rsplit(":", 1)[0], body)
+        entry = self.inventory["projects"].get(project)
+        if entry is None:
+            return 404, error_body(404, "NOT_FOUND", f"project {project} not found")
+        if method != "GET":
+            return 404, error_body(404, "NOT_FOUND", f"{method} {path} not found")
+        if service == "compute":
+            return self.compute(entry, tail, query)
+        if service == "dns" and tail in (["policies"], ["managedZones"]):
+            return 200, self.page(entry.get(tail[0], []), tail[0], query, "maxResults")
+        if service == "dns" and len(tail) == 3 and tail[0] == "managedZones" and tail[2] == "rrsets":
+            return 200, self.page(entry.get("rrsets", {}).get(tail[1], []), "rrsets", query, "maxResults")
+        if service == "serviceusage" and tail == ["services"]:
+            return 200, self.page(entry.get("services", []), "services", query, "pageSize")
+        return 404, error_body(404, "NOT_FOUND", f"{path} not found")
+
+    def compute(self, entry, tail, query):
+        if len(tail) == 5 and tail[0] == "regions" and tail[2] == "routers" and tail[4] == "getRouterStatus":
+            status = entry.get("routerStatus", {}).get(tail[3])
+            if status is None:
+                return 404, error_body(404, "NOT_FOUND", f"router {tail[3]} not found")
+            return 200, {"kind": "compute#routerStatusResponse", "result": dict(status, name=tail[3])}
+        kind = tail[-1] if tail else ""
+        spec = COMPUTE_LISTS.get(kind)
+        if spec is None or (spec[2] and (len(tail) != 3 or tail[0] != "regions")) \
+                or (not spec[2] and tail[:1] != ["global"]):
+            return 404, error_body(404, "NOT_FOUND", f"{'/'.join(tail)} not found")
+        items = entry.get(spec[0], [])
+        if spec[2]:
+            items = [item for item in items if item.get("region", "").rsplit("/", 1)[-1] == tail[1]]
+        return 200, self.page(items, spec[1], query, "maxResults")
+
+    def org_policy(self, project, body):
+        entry = self.inventory["projects"].get(project)
+        try:
+            constraint = json.loads(body or b"{}")["constraint"]
+        except (ValueError, KeyError):
+            return 400, error_body(400, "INVALID_ARGUMENT", "constraint is required")
+        if entry is None:
+            return 404, error_body(404, "NOT_FOUND", f"project {project} not found")
+        return 200, entry.get("orgPolicies", {}).get(constraint, {"constraint": constraint})
+
+    def page(self, items, key, query, size_param):
+        """maxResults/pageSize와 pageToken(시작 위치)으로 나눈 한 페이지"""
+        size = min(int(query.get(size_param, [self.page_size])[0]), self.page_size)
+        start = int(query.get("pageToken", ["0"])[0])
+        payload = {key: items[start:start + size]}
+        if start + size < len(items):
+            payload["nextPageToken"] = str(start + size)
+        return payload
+
+async def start_cloud_standin(host="127.0.0.1", port=0, inventory=None, page_size=500, config=None):
+    """대체 서버 시작 - (asyncio 서버, CloudApiStandIn, 실제 포트) 반환"""
+    standin = CloudApiStandIn(inventory, page_size, config)
+    server = await asyncio.start_server(standin.handle, host, port, limit=MAX_HEADER_BYTES)
+    return server, standin, server.sockets[0].getsockname()[1]
+
+async def serve(args, inventory, config):
+    server, standin, port = await start_cloud_standin(args.host, args.port, inventory, args.page_size, config)
+    projects = ", ".join(inventory["projects"])
+    print(f"Cloud API stand-in listening on http://{args.host}:{port} for {projects} "
+          f"(use --api-base http://{args.host}:{port})", flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Compute, Cloud DNS and Service Usage APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--inventory", help="inventory JSON (e.g. from cloud_inventory.py --dump); "
+                                            "default: a sample built from the Terraform defaults")
+    parser.add_argument("--extra", type=int, default=0, help="sample inventory: extra firewall rules and routes")
+    parser.add_argument("--page-size", type=int, default=500, help="largest page returned by list calls")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="round trip added to every request")
+    args = parser.parse_args(argv)
+
+    if args.inventory:
+        try:
+            with open(args.inventory) as f:
+                inventory = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read {args.inventory}: {e}")
+    else:
+        inventory = sample_inventory(extra=args.extra)
+    config = StandInConfig(service_time=0.0, jitter=0.0, rtt=args.rtt_ms / 1000)
+    try:
+        asyncio.run(serve(args, inventory, config))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,651 @@
+#!/usr/bin/env python3
+"""
+cloud_inventory.py - Compute/Cloud DNS/Service Usage/Resource Manager REST API로 하이브리드 네트워크 진단
+diagnose_vpn_connectivity.sh, diagnose_dns_config.sh, diagnose_apis.sh, check_policy_details.sh,
+1_test_connectivity.sh가 gcloud를 수십 번 실행하며(실행마다 CLI 시작 1~2초와 인증 왕복) 확인하던 내용을
+인증된 keep-alive 연결 하나(호스트/스레드별)로 가져옴 - 목록 호출은 프로젝트/리전/종류별로 동시에 페이지를 넘기며,
+라우터 상태와 비공개 영역 레코드는 목록이 도착하는 즉시 이어서 요청하고, 응답은 TTL과 함께 디스크에 캐시
+
+--api-base를 지정하면 모든 서비스를 <base>/<service>/...로 호출 (cloud_api_standin.py, 인증 없음)
+
+사용 예:
+    python3 cloud_inventory.py --dev-project my-onprem-sim-088dfe15 --prod-project my-gemini-prod-088dfe15
+    python3 cloud_inventory.py --api-base http://127.0.0.1:8090 --refresh --format ndjson
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import ipaddress
+import threading
+import http.client
+from urllib.parse import urlencode, urlsplit
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from gemini_rest import (RestError, STALE_CONNECTION_ERRORS, TOKEN_ENV, TOKEN_REFRESH_MARGIN, error_of,
+                         fetch_token)
+from ip_classifier import IpClassifier
+from result_output import NdjsonWriter
+
+# 서비스 -> (기본 루트, 버전 경로)
+API_SERVICES = {
+    "compute": ("https://compute.googleapis.com", "/compute/v1"),
+    "dns": ("https://dns.googleapis.com", "/dns/v1"),
+    "serviceusage": ("https://serviceusage.googleapis.com", "/v1"),
+    "resourcemanager": ("https://cloudresourcemanager.googleapis.com", "/v1"),
+}
+# (인벤토리 키, 서비스, 경로, 응답의 항목 키, 리전별 여부, 추가 쿼리)
+INVENTORY_LISTS = [
+    ("networks", "compute", "projects/{project}/global/networks", "items", False, {}),
+    ("subnetworks", "compute", "projects/{project}/regions/{region}/subnetworks", "items", True, {}),
+    ("vpnTunnels", "compute", "projects/{project}/regions/{region}/vpnTunnels", "items", True, {}),
+    ("routers", "compute", "projects/{project}/regions/{region}/routers", "items", True, {}),
+    ("routes", "compute", "projects/{project}/global/routes", "items", False, {}),
+    ("firewalls", "compute", "projects/{project}/global/firewalls", "items", False, {}),
+    ("policies", "dns", "projects/{project}/policies", "policies", False, {}),
+    ("managedZones", "dns", "projects/{project}/managedZones", "managedZones", False, {}),
+    ("services", "serviceusage", "projects/{project}/services", "services", False, {"filter": "state:ENABLED"}),
+]
+ORG_CONSTRAINTS = ["constraints/compute.requireShieldedVm", "constraints/compute.vmExternalIpAccess"]
+# 터널/BGP 상태는 자주 바뀌므로 캐시 TTL을 이 값(초)으로 제한
+VOLATILE_KINDS = {"vpnTunnels", "routerStatus"}
+VOLATILE_TTL = 30
+DEFAULT_TTL = 300
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "gcp_inventory")
+PAGE_SIZE = 500
+# 429/5xx 재시도 횟수와 첫 대기 시간(초) - 지터를 더한 지수 백오프
+MAX_RETRIES = 3
+RETRY_BASE = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REQUIRED_SERVICES = {"compute.googleapis.com", "dns.googleapis.com"}
+GEMINI_SERVICES = {"aiplatform.googleapis.com"}
+PGA_VIP_ROLES = {"private_google_access", "restricted_google_access"}
+INTERNET_GATEWAY = "default-internet-gateway"
+IAP_RANGE = "35.235.240.0/20"
+
+IP_CLASSIFIER = IpClassifier()
+
+class DiskCache:
+    """URL(과 요청 본문) 키별 JSON 응답 캐시 - 파일 하나에 응답 하나, 저장 시각으로 TTL 판정"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    def path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest()[:32] + ".json")
+
+    def get(self, key, ttl):
+        try:
+            with open(self.path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key or time.time() - entry.get("fetched_at", 0) > ttl:
+            return None
+        return entry["value"]
+
+    def put(self, key, value):
+        """임시 파일에 쓰고 교체하여 동시에 읽는 프로세스가 반쯤 쓴 파일을 보지 않도록 함"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(key)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "w") as f:
+            json.dump({"key": key, "fetched_at": time.time(), "value": value}, f)
+        os.replace(temp, path)
+
+class CloudApiClient:
+    """
+    Google Cloud REST API 클라이언트 - 스레드마다 호스트별 keep-alive 연결 하나, 액세스 토큰 공유
+    api_base를 지정하면(로컬 대체 서버) 인증 헤더 없이 호출
+    """
+
+    def __init__(self, api_base=None, cache=None, ttl=DEFAULT_TTL, refresh=False, timeout=30.0,
+                 page_size=PAGE_SIZE):
+        self.api_base = api_base.rstrip("/") if api_base else None
+        self.cache = cache
+        self.ttl = ttl
+        self.refresh = refresh
+        self.timeout = timeout
+        self.page_size = page_size
+        self.token = None
+        self.token_source = None
+        self._token_expiry = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+        self.stats = {"requests": 0, "pages": 0, "cache_hits": 0, "connections": 0, "retries": 0}
+
+    def url(self, service, path):
+        root, prefix = API_SERVICES[service]
+        if self.api_base:
+            return f"{self.api_base}/{service}{prefix}/{path}"
+        return f"{root}{prefix}/{path}"
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def authenticate(self):
+        """액세스 토큰 출처 (api_base 대상은 None) - 토큰이 없으면 RuntimeError"""
+        if self.api_base:
+            return None
+        with self._lock:
+            if self.token is None or time.monotonic() >= self._token_expiry:
+                token, lifetime, source = fetch_token()
+                if token is None:
+                    raise RuntimeError(f"no access token: set {TOKEN_ENV}, run on GCE, or install google-auth")
+                self.token, self.token_source = token, source
+                self._token_expiry = time.monotonic() + max(lifetime - TOKEN_REFRESH_MARGIN, 0)
+        return self.token_source
+
+    def connection(self, scheme, host, port, fresh=False):
+        """현재 스레드의 (scheme, host, port) keep-alive 연결"""
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        key = (scheme, host, port)
+        connection = connections.get(key)
+        if connection is None or fresh:
+            if connection is not None:
+                connection.close()
+            factory = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            connection = connections[key] = factory(host, port, timeout=self.timeout)
+            with self._lock:
+                self._connections.append(connection)
+                self.stats["connections"] += 1
+        return connection
+
+    def request(self, method, url, body=None):
+        """JSON 요청 - 429/5xx는 지터를 더한 지수 백오프로 재시도, 그 밖의 오류 상태는 RestError"""
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        headers = {"Accept": "application/json"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        if not self.api_base:
+            self.authenticate()
+            headers["Authorization"] = f"Bearer {self.token}"
+        for attempt in range(MAX_RETRIES + 1):
+            connection = self.connection(parts.scheme, parts.hostname, port)
+            reused = connection.sock is not None
+            try:
+                connection.request(method, target, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # 서버가 닫은 유휴 연결 - 새 연결로 다시 보냄 (재시도 횟수에 포함하지 않음)
+                connection = self.connection(parts.scheme, parts.hostname, port, fresh=True)
+                connection.request(method, target, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            self._count("requests")
+            if response.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                self._count("retries")
+                time.sleep(RETRY_BASE * 2 ** attempt * (0.5 + random.random()))
+                continue
+            if response.status != 200:
+                raise error_of(response.status, data)
+            return json.loads(data)
+
+    def _cached(self, key, ttl, fetch):
+        ttl = self.ttl if ttl is None else ttl
+        if self.cache and not self.refresh and ttl > 0:
+            value = self.cache.get(key, ttl)
+            if value is not None:
+                self._count("cache_hits")
+                return value
+        value = fetch()
+        if self.cache:
+            self.cache.put(key, value)
+        return value
+
+    def list_all(self, service, path, items_key="items", params=None, ttl=None):
+        """목록 API의 모든 페이지 항목 (pageToken을 따라가며 결과 전체를 하나로 캐시)"""
+        url = self.url(service, path)
+        size_param = "pageSize" if service == "serviceusage" else "maxResults"
+
+        def fetch():
+            items = []
+            token = None
+            while True:
+                query = dict(params or {}, **{size_param: self.page_size})
+                if token:
+                    query["pageToken"] = token
+                page = self.request("GET", f"{url}?{urlencode(query)}")
+                self._count("pages")
+                items += page.get(items_key, [])
+                token = page.get("nextPageToken")
+                if not token:
+                    return items
+
+        return self._cached(f"GET {url}?{urlencode(params or {})}", ttl, fetch)
+
+    def get(self, service, path, ttl=None):
+        url = self.url(service, path)
+        return self._cached(f"GET {url}", ttl, lambda: self.request("GET", url))
+
+    def post(self, service, path, body, ttl=None):
+        url = self.url(service, path)
+        return self._cached(f"POST {url} {json.dumps(body, sort_keys=True)}", ttl,
+                            lambda: self.request("POST", url, body))
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
+
+def kind_ttl(client, kind):
+    return min(client.ttl, VOLATILE_TTL) if kind in VOLATILE_KINDS else client.ttl
+
+def last_segment(url):
+    return (url or "").rstrip("/").rsplit("/", 1)[-1]
+
+def collect_inventory(client, projects, regions, workers=16):
+    """
+    모든 프로젝트/리전/종류의 목록과 조직 정책을 동시에 요청하고, 라우터 목록이 오면 라우터 상태를,
+    비공개 영역 목록이 오면 레코드 목록을 이어서 요청 - 실패한 호출은 프로젝트의 errors에 기록
+    """
+    inventory = {"collected_at": time.time(), "regions": list(regions),
+                 "projects": {project: {"errors": {}} for project in projects}}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def submit(project, kind, name, func, *args):
+            pending[pool.submit(func, *args)] = (project, kind, name)
+
+        for project in projects:
+            for kind, service, path, items_key, regional, params in INVENTORY_LISTS:
+                for region in (regions if regional else [None]):
+                    submit(project, kind, region, client.list_all, service,
+                           path.format(project=project, region=region), items_key, params, kind_ttl(client, kind))
+            for constraint in ORG_CONSTRAINTS:
+                submit(project, "orgPolicies", constraint, client.post, "resourcemanager",
+                       f"projects/{project}:getEffectiveOrgPolicy", {"constraint": constraint})
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                project, kind, name = pending.pop(future)
+                entry = inventory["projects"][project]
+                try:
+                    value = future.result()
+                except (RestError, RuntimeError, OSError, http.client.HTTPException, ValueError) as e:
+                    entry["errors"][kind if kind not in ("routerStatus", "rrsets") else f"{kind}/{name}"] = str(e)
+                    continue
+                if kind in ("routerStatus", "rrsets", "orgPolicies"):
+                    entry.setdefault(kind, {})[name] = value.get("result", {}) if kind == "routerStatus" else value
+                    continue
+                entry.setdefault(kind, []).extend(value)
+                if kind == "routers":
+                    for router in value:
+                        submit(project, "routerStatus", router["name"], client.get, "compute",
+                               f"projects/{project}/regions/{last_segment(router.get('region'))}/routers/"
+                               f"{router['name']}/getRouterStatus", kind_ttl(client, "routerStatus"))
+                elif kind == "managedZones":
+                    for zone in value:
+                        if zone.get("visibility") == "private":
+                            submit(project, "rrsets", zone["name"], client.list_all, "dns",
+                                   f"projects/{project}/managedZones/{zone['name']}/rrsets", "rrsets")
+    return inventory
+
+# --- 진단 -------------------------------------------------------------------
+
+def worst(statuses):
+    statuses = list(statuses)
+    for status in ("fail", "warn", "pass"):
+        if status in statuses:
+            return status
+    return "info"
+
+def header(title):
+    print(f"\n{title}")
+    print("=" * 60)
+
+def missing(entry, kind):
+    """목록 호출이 실패했으면 오류를 출력하고 True"""
+    error = entry["errors"].get(kind)
+    if error:
+        print(f"  ✗ {kind} unavailable: {error}")
+    return bool(error)
+
+def peer_ranges(inventory, project):
+    """다른 프로젝트 서브넷 대역 목록 [(프로젝트, CIDR)]"""
+    return [(other, subnet["ipCidrRange"]) for other, entry in inventory["projects"].items() if other != project
+            for subnet in entry.get("subnetworks", []) if "ipCidrRange" in subnet]
+
+def covers(route_range, cidr):
+    try:
+        return ipaddress.ip_network(cidr, strict=False).subnet_of(ipaddress.ip_network(route_range, strict=False))
+    except (ValueError, TypeError):
+        return False
+
+def overlaps(a, b):
+    try:
+        return ipaddress.ip_network(a, strict=False).overlaps(ipaddress.ip_network(b, strict=False))
+    except (ValueError, TypeError):
+        return False
+
+def check_vpn_tunnels(inventory):
+    """VPN 터널 상태 (diagnose_vpn_connectivity.sh 1단계)"""
+    header("1. VPN Tunnels")
+    tunnels = []
+    statuses = []
+    for project, entry in inventory["projects"].items():
+        print(f"\n{project}:")
+        if missing(entry, "vpnTunnels"):
+            statuses.append("fail")
+            continue
+        if not entry.get("vpnTunnels"):
+            print("  ✗ No VPN tunnels")
+            statuses.append("fail")
+        for tunnel in entry.get("vpnTunnels", []):
+            ok = tunnel.get("status") == "ESTABLISHED"
+            statuses.append("pass" if ok else "fail")
+            print(f"  {'✓' if ok else '✗'} {tunnel['name']:<28} {tunnel.get('status', '?'):<14} "
+                  f"peer {tunnel.get('peerIp', '-'):<16} {tunnel.get('detailedStatus', '')}")
+            tunnels.append({"project": project, "name": tunnel["name"], "status": tunnel.get("status"),
+                            "peer_ip": tunnel.get("peerIp"), "detail": tunnel.get("detailedStatus")})
+    return {"status": worst(statuses), "tunnels": tunnels}
+
+def check_bgp_sessions(inventory):
+    """Cloud Router BGP 세션 (routers list + routers get-status)"""
+    header("2. BGP Sessions")
+    sessions = []
+    statuses = []
+    for project, entry in inventory["projects"].items():
+        print(f"\n{project}:")
+        if missing(entry, "routers"):
+            statuses.append("fail")
+            continue
+        for router in entry.get("routers", []):
+            name = router["name"]
+            status = entry.get("routerStatus", {}).get(name)
+            if status is None:
+                print(f"  ✗ {name}: status unavailable ({entry['errors'].get(f'routerStatus/{name}', 'not fetched')})")
+                statuses.append("fail")
+                continue
+            peers = status.get("bgpPeerStatus", [])
+            if not peers:
+                print(f"  ✗ {name}: no BGP peers")
+                statuses.append("fail")
+            for peer in peers:
+                ok = peer.get("state") == "Established" and peer.get("status") == "UP"
+                statuses.append("pass" if ok else "fail")
+                print(f"  {'✓' if ok else '✗'} {name}/{peer.get('name', '?'):<16} {peer.get('state', '?'):<12} "
+                      f"{peer.get('ipAddress', '-')} → {peer.get('peerIpAddress', '-')}, "
+                      f"up {peer.get('uptimeSeconds', '0')} s, {peer.get('numLearnedRoutes', 0)} learned routes")
+                sessions.append({"project": project, "router": name, "peer": peer.get("name"),
+                                 "state": peer.get("state"), "status": peer.get("status"),
+                                 "learned_routes": peer.get("numLearnedRoutes", 0)})
+    return {"status": worst(statuses), "sessions": sessions}
+
+def check_cross_routes(inventory):
+    """각 프로젝트에 다른 프로젝트 서브넷으로 가는 정적 경로 또는 BGP 학습 경로가 있는지"""
+    header("3. Cross-VPC Routes")
+    coverage = []
+    statuses = []
+    for project, entry in inventory["projects"].items():
+        print(f"\n{project}:")
+        if missing(entry, "routes") or missing(entry, "subnetworks"):
+            statuses.append("fail")
+            continue
+        static = [(route["destRange"], route["name"]) for route in entry.get("routes", [])
+                  if "destRange" in route and not route.get("nextHopGateway") and route["destRange"] != "0.0.0.0/0"]
+        learned = [(route["destRange"], f"BGP via {route.get('nextHopIp', '?')}")
+                   for status in entry.get("routerStatus", {}).values()
+                   for route in status.get("bestRoutes", []) if "destRange" in route]
+        for other, cidr in peer_ranges(inventory, project):
+            via = [name for route_range, name in static + learned if covers(route_range, cidr)]
+            statuses.append("pass" if via else "fail")
+            print(f"  {'✓' if via else '✗'} {cidr:<18} ({other}) {'via ' + ', '.join(sorted(set(via))) if via else 'no route'}")
+            coverage.append({"project": project, "destination": cidr, "peer_project": other, "via": sorted(set(via))})
+    return {"status": worst(statuses), "coverage": coverage}
+
+def check_firewall_rules(inventory):
+    """다른 프로젝트 서브넷에서 들어오는 트래픽을 허용하는 규칙 (diagnose_vpn_connectivity.sh 4단계)"""
+    header("4. Firewall Rules")
+    allowed = []
+    statuses = []
+    for project, entry in inventory["projects"].items():
+        rules = [rule for rule in entry.get("firewalls", [])
+                 if rule.get("direction", "INGRESS") == "INGRESS" and not rule.get("disabled")]
+        print(f"\n{project}: {len(entry.get('firewalls', []))} rules")
+        if missing(entry, "firewalls"):
+            statuses.append("fail")
+            continue
+        for other, cidr in peer_ranges(inventory, project):
+            matching = [rule for rule in rules if rule.get("allowed")
+                        and any(overlaps(source, cidr) for source in rule.get("sourceRanges", []))]
+            statuses.append("pass" if matching else "warn")
+            names = ", ".join(rule["name"] for rule in matching)
+            print(f"  {'✓' if matching else '⚠️ '} from {cidr:<18} ({other}) {names or 'no allow rule'}")
+            allowed.append({"project": project, "source": cidr, "rules": [rule["name"] for rule in matching]})
+        iap = [rule["name"] for rule in rules if IAP_RANGE in rule.get("sourceRanges", [])]
+        print(f"  {'✓' if iap else '-'} IAP TCP forwarding ({IAP_RANGE}): {', '.join(iap) or 'not allowed'}")
+    return {"status": worst(statuses), "allowed": allowed}
+
+def check_private_google_access(inventory):
+    """서브넷 Private Google Access와 PGA VIP(199.36.153.8/30)로 가는 인터넷 게이트웨이 경로"""
+    header("5. Private Google Access")
+    subnets = []
+    statuses = []
+    for project, entry in inventory["projects"].items():
+        print(f"\n{project}:")
+        if missing(entry, "subnetworks") or missing(entry, "routes"):
+            statuses.append("fail")
+            continue
+        for subnet in entry.get("subnetworks", []):
+            enabled = bool(subnet.get("privateIpGoogleAccess"))
+            statuses.append("pass" if enabled else "warn")
+            print(f"  {'✓' if enabled else '⚠️ '} {subnet['name']:<20} {subnet.get('ipCidrRange', '-'):<18} "
+                  f"Private Google Access {'on' if enabled else 'off'}")
+            subnets.append({"project": project, "name": subnet["name"], "private_google_access": enabled})
+        vip_routes = [route["name"] for route in entry.get("routes", [])
+                      if last_segment(route.get("nextHopGateway")) == INTERNET_GATEWAY
+                      and covers(route.get("destRange"), "199.36.153.8/30")]
+        statuses.append("pass" if vip_routes else "fail")
+        print(f"  {'✓' if vip_routes else '✗'} Route to private.googleapis.com VIP: "
+              f"{', '.join(vip_routes) or 'missing'}")
+    return {"status": worst(statuses), "subnets": subnets}
+
+def check_dns(inventory):
+    """DNS 정책과 googleapis.com 비공개 영역 (diagnose_dns_config.sh)"""
+    header("6. Cloud DNS")
+    zones = []
+    statuses = []
+    for project, entry in inventory["projects"].items():
+        print(f"\n{project}:")
+        if missing(entry, "policies") or missing(entry, "managedZones"):
+            statuses.append("fail")
+            continue
+        for policy in entry.get("policies", []):
+            networks = ", ".join(last_segment(network.get("networkUrl")) for network in policy.get("networks", []))
+            print(f"  Policy {policy['name']}: inbound forwarding "
+                  f"{'on' if policy.get('enableInboundForwarding') else 'off'}, networks {networks or '-'}")
+        for zone in entry.get("managedZones", []):
+            forwarding = zone.get("forwardingConfig", {}).get("targetNameServers", [])
+            print(f"  Zone {zone['name']} ({zone.get('dnsName')}, {zone.get('visibility', 'public')}"
+                  f"{', forwarding to ' + ', '.join(t.get('ipv4Address', '?') for t in forwarding) if forwarding else ''})")
+            if zone.get("dnsName") != "googleapis.com." or zone.get("visibility") != "private":
+                continue
+            if forwarding:
+                statuses.append("pass")
+                zones.append({"project": project, "zone": zone["name"], "forwarding": True})
+                continue
+            records = entry.get("rrsets", {}).get(zone["name"])
+            if records is None:
+                print(f"    ✗ records unavailable ({entry['errors'].get(f'rrsets/' + zone['name'], 'not fetched')})")
+                statuses.append("fail")
+                continue
+            vips = [address for record in records if record.get("type") == "A"
+                    for address in record.get("rrdatas", [])
+                    if IP_CLASSIFIER.classify(address).role in PGA_VIP_ROLES]
+            wildcard = any(record.get("name") == "*.googleapis.com." and record.get("type") == "CNAME"
+                           for record in records)
+            statuses.append("pass" if vips and wildcard else "warn")
+            print(f"    {'✓' if vips else '⚠️ '} A → {', '.join(vips) or 'no Private Google Access VIP'}")
+            print(f"    {'✓' if wildcard else '⚠️ '} *.googleapis.com CNAME {'present' if wildcard else 'missing'}")
+            zones.append({"project": project, "zone": zone["name"], "vip_addresses": vips, "wildcard_cname": wildcard})
+    if not zones:
+        print("\n  ✗ No private googleapis.com zone in any project - APIs resolve to public addresses")
+        statuses.append("fail")
+    return {"status": worst(statuses), "zones": zones}
+
+def check_services(inventory):
+    """필요한 API 활성화 여부 (diagnose_apis.sh) - Gemini(aiplatform)는 어느 한 프로젝트에 있으면 됨"""
+    header("7. Enabled APIs")
+    enabled = {}
+    statuses = []
+    for project, entry in inventory["projects"].items():
+        if missing(entry, "services"):
+            statuses.append("fail")
+            continue
+        names = {service.get("config", {}).get("name") or last_segment(service.get("name"))
+                 for service in entry.get("services", [])}
+        enabled[project] = sorted(names)
+        absent = sorted(REQUIRED_SERVICES - names)
+        statuses.append("fail" if absent else "pass")
+        print(f"  {'✗' if absent else '✓'} {project}: {len(names)} enabled"
+              f"{', missing ' + ', '.join(absent) if absent else ''}")
+    gemini = [project for project, names in enabled.items() if GEMINI_SERVICES <= set(names)]
+    if enabled:
+        statuses.append("pass" if gemini else "fail")
+        print(f"  {'✓' if gemini else '✗'} aiplatform.googleapis.com enabled in: {', '.join(gemini) or 'none'}")
+    return {"status": worst(statuses), "enabled": enabled}
+
+def check_org_policies(inventory):
+    """조직 정책 제약 (check_policy_details.sh) - 정보 표시"""
+    header("8. Organization Policies")
+    policies = {}
+    for project, entry in inventory["projects"].items():
+        print(f"\n{project}:")
+        for constraint in ORG_CONSTRAINTS:
+            policy = entry.get("orgPolicies", {}).get(constraint)
+            if policy is None:
+                print(f"  - {constraint}: unavailable ({entry['errors'].get('orgPolicies', 'not fetched')})")
+                continue
+            if "booleanPolicy" in policy:
+                value = f"enforced={policy['booleanPolicy'].get('enforced', False)}"
+            elif "listPolicy" in policy:
+                rule = policy["listPolicy"]
+                value = rule.get("allValues") or f"allowed={rule.get('allowedValues', [])}"
+            else:
+                value = "not set"
+            print(f"  - {constraint}: {value}")
+            policies.setdefault(project, {})[constraint] = value
+    return {"status": "info", "policies": policies}
+
+DIAGNOSES = [
+    ("vpn_tunnels", check_vpn_tunnels),
+    ("bgp_sessions", check_bgp_sessions),
+    ("cross_routes", check_cross_routes),
+    ("firewall_rules", check_firewall_rules),
+    ("private_google_access", check_private_google_access),
+    ("cloud_dns", check_dns),
+    ("enabled_apis", check_services),
+    ("org_policies", check_org_policies),
+]
+
+def diagnose(inventory):
+    """수집한 인벤토리에 모든 진단 실행 - {이름: 결과}"""
+    return {name: func(inventory) for name, func in DIAGNOSES}
+
+def print_fetch_stats(client, wall):
+    stats = client.stats
+    print(f"\nInventory collected in {wall:.2f} s: {stats['requests']} API requests ({stats['pages']} pages, "
+          f"{stats['retries']} retries) over {stats['connections']} connections, {stats['cache_hits']} cache hits")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diagnose the hybrid network from the Cloud APIs (no gcloud)")
+    parser.add_argument("--dev-project", default=os.environ.get("DEV_PROJECT_ID", "my-onprem-sim-088dfe15"),
+                        help="on-premises simulation project (default: $DEV_PROJECT_ID)")
+    parser.add_argument("--prod-project", default=os.environ.get("PROD_PROJECT_ID", "my-gemini-prod-088dfe15"),
+                        help="Gemini production project (default: $PROD_PROJECT_ID)")
+    parser.add_argument("--region", default=os.environ.get("LOCATION", "us-central1"),
+                        help="comma separated regions of the VPN, routers and subnets (default: us-central1)")
+    parser.add_argument("--api-base", help="serve every API from this base URL, e.g. a cloud_api_standin.py server")
+    parser.add_argument("--workers", type=int, default=16, help="API calls in flight at once (default: 16)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL,
+                        help=f"seconds cached inventory stays valid (tunnel/BGP status at most {VOLATILE_TTL})")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the disk cache")
+    parser.add_argument("--refresh", action="store_true", help="ignore cached responses but store the new ones")
+    parser.add_argument("--dump", metavar="PATH", help="write the collected inventory as JSON "
+                                                       "(cloud_api_standin.py --inventory can serve it)")
+    parser.add_argument("--format", choices=["text", "ndjson"], default="text",
+                        help="ndjson: one JSON record per diagnosis on stdout, human-readable text on stderr")
+    args = parser.parse_args(argv)
+
+    writer = None
+    original_stdout = sys.stdout
+    if args.format == "ndjson":
+        writer = NdjsonWriter(original_stdout, "cloud_inventory")
+        sys.stdout = sys.stderr
+
+    projects = list(dict.fromkeys([args.dev_project, args.prod_project]))
+    regions = [region.strip() for region in args.region.split(",") if region.strip()]
+    client = CloudApiClient(args.api_base, None if args.no_cache else DiskCache(args.cache_dir), args.ttl,
+                            args.refresh, args.timeout)
+    try:
+        print("=" * 60)
+        print("Hybrid Network Diagnosis (Cloud APIs)")
+        print(f"Projects: {', '.join(projects)}  Regions: {', '.join(regions)}")
+        print(f"API: {args.api_base or 'googleapis.com'}")
+        print("=" * 60)
+        start = time.perf_counter()
+        try:
+            source = client.authenticate()
+        except RuntimeError as e:
+            print(f"✗ {e}")
+            if writer:
+                writer.emit("summary", "fail", error=str(e))
+            return 1
+        if source:
+            print(f"Access token from {source}")
+        inventory = collect_inventory(client, projects, regions, args.workers)
+        wall = time.perf_counter() - start
+        print_fetch_stats(client, wall)
+        if writer:
+            writer.emit("inventory", "info", wall, **client.stats,
+                        errors={project: entry["errors"] for project, entry in inventory["projects"].items()})
+        if args.dump:
+            with open(args.dump, "w") as f:
+                json.dump(inventory, f, indent=2)
+            print(f"Inventory written to {args.dump}")
+
+        results = diagnose(inventory)
+        if writer:
+            for name, result in results.items():
+                data = dict(result)
+                writer.emit(name, data.pop("status"), **data)
+        statuses = [result["status"] for result in results.values()]
+        status = worst(statuses)
+        print("\n" + "=" * 60)
+        print("DIAGNOSIS SUMMARY:")
+        print("=" * 60)
+        for name, result in results.items():
+            mark = {"pass": "✓ PASS", "warn": "⚠️  WARN", "fail": "✗ FAIL"}.get(result["status"], "- INFO")
+            print(f"{name.replace('_', ' ').title():<24} {mark}")
+        print(f"\nTotal time: {time.perf_counter() - start:.2f} s")
+        if writer:
+            writer.emit("summary", status, time.perf_counter() - start,
+                        **{key: statuses.count(key) for key in ("pass", "warn", "fail", "info")})
+        return 1 if status == "fail" else 0
+    finally:
+        client.close()
+        sys.stdout = original_stdout
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+fleet_runner.py - 여러 온프레미스 워크스테이션에서 검증 스크립트를 SSH로 병렬 실행
+verify_gemini_private_connection.py / 1_test_gemini_api.py와 이들이 import하는 같은 디렉터리 모듈을
+부트스트랩 프로그램 하나로 묶어 대상 호스트의 `python3 -` 표준 입력으로 보내므로 대상에 설치할 것이 없음
+호스트마다 ControlMaster로 SSH 연결을 유지하여(ControlPersist) 검증기/실행 간 핸드셰이크를 반복하지 않고,
+동시 실행 수를 제한하며 각 호스트의 NDJSON 레코드를 도착하는 대로 출력한 뒤 전체 통과/실패와 지연 시간을 요약
+
+인벤토리 파일 (한 줄에 호스트 하나, # 주석):
+    NAME [DESTINATION] [port=N] [user=U] [identity=PATH] [python=python3]
+    dev-workstation-1 10.0.1.10 user=ops
+    dev-workstation-2 ws2.corp.example port=2222
+
+사용 예:
+    python3 fleet_runner.py --inventory hosts.txt --verifier verify --verifier gemini -- --rest
+    python3 fleet_runner.py --hosts dev-workstation --ssh "ssh -F ./iap_ssh_config" --verifier gemini
+"""
+
+import os
+import ast
+import sys
+import json
+import time
+import zlib
+import base64
+import shlex
+import argparse
+import tempfile
+import threading
+import subprocess
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from gemini_load import percentile
+from result_output import NdjsonWriter
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+VERIFIERS = {
+    "verify": "verify_gemini_private_connection.py",
+    "gemini": "1_test_gemini_api.py",
+}
+DEFAULT_PERSIST = 600
+STDERR_TAIL_LINES = 20
+
+# 대상 호스트의 `python3 -`가 실행하는 프로그램 - 묶인 모듈을 메모리에서 import하고 진입 스크립트를 __main__으로 실행
+BOOTSTRAP = '''\
+import os, sys, json, zlib, base64, importlib.abc, importlib.util
+SOURCES = json.loads(zlib.decompress(base64.b64decode({payload!r})))
+ENTRY, ARGV, ENV = {entry!r}, {argv!r}, {env!r}
+
+class BundleImporter(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    def find_spec(self, name, path=None, target=None):
+        if name + ".py" in SOURCES:
+            return importlib.util.spec_from_loader(name, self, origin="<fleet>/" + name + ".py")
+        return None
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        module.__file__ = module.__spec__.origin
+        exec(compile(SOURCES[module.__name__ + ".py"], module.__file__, "exec"), module.__dict__)
+
+sys.dont_write_bytecode = True
+sys.meta_path.insert(0, BundleImporter())
+os.environ.update(ENV)
+sys.argv = [ENTRY] + ARGV
+exec(compile(SOURCES[ENTRY], "<fleet>/" + ENTRY, "exec"), {{"__name__": "__main__", "__file__": "<fleet>/" + ENTRY}})
+'''
+
+def local_imports(path, directory=SCRIPT_DIR):
+    """파일이 import하는(함수 안의 지연 import 포함) 같은 디렉터리 모듈 이름"""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split(".")[0])
+    return {name for name in names if os.path.isfile(os.path.join(directory, name + ".py"))}
+
+def bundle(script, directory=None):
+    """진입 스크립트와 그 import 폐포의 {파일 이름: 소스} - directory가 없으면 스크립트가 있는 디렉터리"""
+    directory = directory or os.path.dirname(os.path.abspath(script))
+    entry = os.path.basename(script)
+    sources = {}
+    pending = [entry]
+    while pending:
+        name = pending.pop()
+        if name in sources:
+            continue
+        path = os.path.join(directory, name)
+        with open(path) as f:
+            sources[name] = f.read()
+        pending += [module + ".py" for module in local_imports(path, directory)]
+    return sources
+
+def bootstrap(script, argv=(), env=None, directory=None):
+    """대상 호스트 표준 입력으로 보낼 프로그램 (bytes)"""
+    payload = base64.b64encode(zlib.compress(json.dumps(bundle(script, directory)).encode(), 9)).decode()
+    return BOOTSTRAP.format(payload=payload, entry=os.path.basename(script), argv=list(argv),
+                            env=dict(env or {})).encode()
+
+@dataclass
+class Host:
+    name: str
+    destination: str
+    port: int = None
+    user: str = None
+    identity: str = None
+    python: str = "python3"
+
+    def ssh_args(self):
+        args = []
+        if self.port:
+            args += ["-p", str(self.port)]
+        if self.user:
+            args += ["-l", self.user]
+        if self.identity:
+            args += ["-i", self.identity]
+        return args + [self.destination]
+
+def parse_host(line):
+    """인벤토리 한 줄 - 빈 줄/주석이면 None"""
+    words = shlex.split(line, comments=True)
+    if not words:
+        return None
+    positional = [word for word in words if "=" not in word]
+    options = dict(word.split("=", 1) for word in words if "=" in word)
+    unknown = set(options) - {"port", "user", "identity", "python"}
+    if unknown or len(positional) > 2:
+        raise ValueError(f"bad inventory line: {line.strip()}")
+    return Host(positional[0], positional[-1], int(options["port"]) if "port" in options else None,
+                options.get("user"), options.get("identity"), options.get("python", "python3"))
+
+def load_inventory(path):
+    with open(path) as f:
+        return [host for host in map(parse_host, f) if host is not None]
+
+@dataclass
+class RunResult:
+    """호스트 하나에서 검증기 하나를 실행한 결과"""
+    host: str
+    verifier: str
+    status: str = "fail"
+    returncode: int = None
+    wall: float = 0.0
+    first_record: float = None
+    multiplexed: bool = False
+    records: list = field(default_factory=list)
+    stderr_tail: list = field(default_factory=list)
+    error: str = None
+
+class FleetRunner:
+    """
+    호스트별 작업을 최대 parallel개 동시에 실행 (한 호스트의 검증기들은 같은 마스터 연결로 순서대로)
+    on_record(host, verifier, record)는 레코드가 도착할 때마다 호출 (여러 스레드에서 - 호출은 직렬화됨)
+    """
+
+    def __init__(self, hosts, verifiers, argv=(), env=None, parallel=16, ssh_command=("ssh",), control_dir=None,
+                 persist=DEFAULT_PERSIST, connect_timeout=10, timeout=600, on_record=None, directory=None):
+        self.hosts = list(hosts)
+        self.verifiers = list(verifiers)
+        self.parallel = parallel
+        self.ssh_command = list(ssh_command)
+        self.control_dir = control_dir or os.path.join(tempfile.gettempdir(), f"fleet-ssh-{os.getuid()}")
+        self.persist = persist
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        self.on_record = on_record
+        self._lock = threading.Lock()
+        # 검증기마다 부트스트랩은 한 번만 생성 (--format ndjson으로 레코드 스트림 요청)
+        # directory가 없으면 검증기마다 자기 스크립트 디렉터리에서 import를 묶음
+        self.programs = {name: bootstrap(script, list(argv) + ["--format", "ndjson"], env, directory)
+                         for name, script in self.verifiers}
+
+    def ssh(self, host, *extra):
+        os.makedirs(self.control_dir, mode=0o700, exist_ok=True)
+        options = ["-o", "BatchMode=yes", "-o", f"ConnectTimeout={self.connect_timeout}",
+                   "-o", "ServerAliveInterval=15"]
+        if self.persist:
+            options += ["-o", "ControlMaster=auto", "-o", f"ControlPath={self.control_dir}/%C",
+                        "-o", f"ControlPersist={self.persist}"]
+        return self.ssh_command + options + list(extra) + host.ssh_args()
+
+    def master_running(self, host):
+        """이 호스트의 ControlMaster 연결이 살아 있는지 (ssh -O check)"""
+        if not self.persist:
+            return False
+        try:
+            return subprocess.run(self.ssh(host, "-O", "check"), stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL, timeout=self.connect_timeout).returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+
+    def close_masters(self):
+        """모든 호스트의 마스터 연결 종료 (ssh -O exit)"""
+        for host in self.hosts:
+            subprocess.run(self.ssh(host, "-O", "exit"), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def run_verifier(self, host, verifier):
+        result = RunResult(host.name, verifier, multiplexed=self.master_running(host))
+        command = self.ssh(host, "-T") + ["--", host.python, "-"]
+        start = time.perf_counter()
+        try:
+            process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE)
+        except OSError as e:
+            result.error = str(e)
+            return result
+        stderr = []
+        # 표준 오류는 별도 스레드로 비워 파이프가 차서 멈추지 않도록 함
+        drain = threading.Thread(target=lambda: stderr.extend(process.stderr), daemon=True)
+        drain.start()
+        timer = threading.Timer(self.timeout, process.kill)
+        timer.start()
+        try:
+            process.stdin.write(self.programs[verifier])
+            process.stdin.close()
+            for line in process.stdout:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if result.first_record is None:
+                    result.first_record = time.perf_counter() - start
+                result.records.append(record)
+                if self.on_record:
+                    with self._lock:
+                        self.on_record(host.name, verifier, record)
+            result.returncode = process.wait()
+        except OSError as e:
+            process.kill()
+            result.error = str(e)
+            result.returncode = process.wait()
+        finally:
+            timer.cancel()
+            drain.join(5)
+        result.wall = time.perf_counter() - start
+        result.stderr_tail = [line.decode(errors="replace").rstrip() for line in stderr[-STDERR_TAIL_LINES:]]
+        result.status = run_status(result, timed_out=result.wall >= self.timeout)
+        return result
+
+    def run_host(self, host):
+        return [self.run_verifier(host, verifier) for verifier, _ in self.verifiers]
+
+    def run(self, on_host=None):
+        """모든 호스트 실행 - 호스트가 끝나는 대로 on_host(결과 목록) 호출, 전체 결과 목록 반환"""
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.parallel, len(self.hosts)))) as pool:
+            futures = [pool.submit(self.run_host, host) for host in self.hosts]
+            for future in as_completed(futures):
+                host_results = future.result()
+                results += host_results
+                if on_host:
+                    with self._lock:
+                        on_host(host_results)
+        return results
+
+def run_status(result, timed_out=False):
+    """
+    summary 레코드가 있으면 그 상태, 없으면(부하/채팅 모드) 레코드 상태로 판정
+    시간 초과, 0이 아닌 종료 코드, 레코드 없음은 fail
+    """
+    if timed_out:
+        result.error = result.error or "timed out"
+        return "fail"
+    if result.returncode not in (0, None):
+        result.error = result.error or f"exit code {result.returncode}"
+        return "fail"
+    if not result.records:
+        result.error = result.error or "no records"
+        return "fail"
+    summary = next((record for record in reversed(result.records) if record.get("check") == "summary"), None)
+    if summary is not None:
+        return summary.get("status", "fail")
+    statuses = {record.get("status") for record in result.records}
+    return "fail" if "fail" in statuses else "warn" if "warn" in statuses else "pass"
+
+def summarize_fleet(results):
+    """검증기별 호스트 통과/경고/실패 수, 실행 시간 백분위, 검사별 상태 수와 소요 시간 백분위"""
+    fleet = {}
+    for verifier in sorted({result.verifier for result in results}):
+        runs = [result for result in results if result.verifier == verifier]
+        walls = sorted(result.wall for result in runs)
+        firsts = sorted(result.first_record for result in runs if result.first_record is not None)
+        checks = {}
+        for result in runs:
+            for record in result.records:
+                name = record.get("check")
+                if name in (None, "summary"):
+                    continue
+                entry = checks.setdefault(name, {"statuses": {}, "elapsed": []})
+                entry["statuses"][record.get("status")] = entry["statuses"].get(record.get("status"), 0) + 1
+                if record.get("elapsed") is not None:
+                    entry["elapsed"].append(record["elapsed"])
+        for entry in checks.values():
+            elapsed = sorted(entry.pop("elapsed"))
+            entry.update(p50=percentile(elapsed, 50), p90=percentile(elapsed, 90),
+                         max=elapsed[-1] if elapsed else 0.0)
+        fleet[verifier] = {
+            "hosts": len(runs),
+            "statuses": {status: sum(1 for r in runs if r.status == status) for status in ("pass", "warn", "fail")},
+            "failed_hosts": sorted(result.host for result in runs if result.status == "fail"),
+            "wall": {"p50": percentile(walls, 50), "p90": percentile(walls, 90), "max": walls[-1] if walls else 0.0},
+            "first_record_p50": percentile(firsts, 50),
+            "multiplexed": sum(1 for result in runs if result.multiplexed),
+            "checks": checks,
+        }
+    return fleet
+
+def print_record(host, verifier, record):
+    if record.get("check") == "summary":
+        return
+    elapsed = f"{record['elapsed'] * 1000:8.1f} ms" if record.get("elapsed") is not None else f"{'':>11}"
+    print(f"  [{host}] {verifier:<7} {record.get('check', '?'):<24} {record.get('status', '?'):<5} {elapsed}",
+          flush=True)
+
+def print_host(results):
+    for result in results:
+        mark = {"pass": "✓", "warn": "!"}.get(result.status, "✗")
+        via = "reused connection" if result.multiplexed else "new connection"
+        error = f" - {result.error}" if result.error else ""
+        print(f"{mark} {result.host}: {result.verifier} {result.status} in {result.wall:.2f} s ({via}){error}",
+              flush=True)
+        if result.status == "fail":
+            for line in result.stderr_tail[-5:]:
+                print(f"    {line}")
+
+def print_fleet_summary(fleet):
+    for verifier, summary in fleet.items():
+        statuses = summary["statuses"]
+        print(f"\n{verifier}: {summary['hosts']} hosts - {statuses['pass']} pass, {statuses['warn']} warn, "
+              f"{statuses['fail']} fail ({summary['multiplexed']} over reused connections)")
+        print(f"  Run time p50/p90/max: {summary['wall']['p50']:.2f} / {summary['wall']['p90']:.2f} / "
+              f"{summary['wall']['max']:.2f} s, first record p50 {summary['first_record_p50']:.2f} s")
+        if summary["failed_hosts"]:
+            print(f"  Failed: {', '.join(summary['failed_hosts'])}")
+        print(f"  {'check':<24} {'pass':>5} {'warn':>5} {'fail':>5} {'p50 (ms)':>9} {'p90 (ms)':>9} {'max (ms)':>9}")
+        for name, entry in summary["checks"].items():
+            counts = entry["statuses"]
+            print(f"  {name:<24} {counts.get('pass', 0):>5} {counts.get('warn', 0):>5} {counts.get('fail', 0):>5} "
+                  f"{entry['p50'] * 1000:>9.1f} {entry['p90'] * 1000:>9.1f} {entry['max'] * 1000:>9.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the Gemini verifiers on many hosts over multiplexed SSH",
+        epilog="arguments after -- are passed to every verifier")
+    parser.add_argument("--inventory", help="host inventory file (NAME [DESTINATION] [port= user= identity= python=])")
+    parser.add_argument("--hosts", help="comma separated SSH destinations (in addition to --inventory)")
+    parser.add_argument("--verifier", action="append", metavar="NAME|PATH",
+                        help=f"verifier to run: {', '.join(VERIFIERS)} or a script path (repeatable, default: verify)")
+    parser.add_argument("--parallel", type=int, default=16, help="hosts running at once (default: 16)")
+    parser.add_argument("--ssh", default="ssh", help="ssh command, e.g. \"ssh -F ./ssh_config\" (default: ssh)")
+    parser.add_argument("--persist", type=int, default=DEFAULT_PERSIST,
+                        help="seconds an idle multiplexed connection stays open (0: no multiplexing)")
+    parser.add_argument("--control-dir", help="directory for ControlMaster sockets")
+    parser.add_argument("--connect-timeout", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=600, help="seconds before a verifier run is killed")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="environment variable for the verifiers, e.g. PROD_PROJECT_ID=... (repeatable)")
+    parser.add_argument("--close", action="store_true", help="close the multiplexed connections when done")
+    parser.add_argument("--format", choices=["text", "ndjson"], default="text",
+                        help="ndjson: every host record (with a 'target' key) and the fleet summary on stdout")
+    args, verifier_args = parser.parse_known_args(argv)
+    if verifier_args[:1] == ["--"]:
+        verifier_args = verifier_args[1:]
+
+    hosts = load_inventory(args.inventory) if args.inventory else []
+    hosts += [Host(name, name) for name in (args.hosts or "").split(",") if name.strip()]
+    if not hosts:
+        parser.error("no hosts: use --inventory or --hosts")
+    verifiers = []
+    for name in args.verifier or ["verify"]:
+        script = os.path.join(SCRIPT_DIR, VERIFIERS[name]) if name in VERIFIERS else os.path.abspath(name)
+        if not os.path.isfile(script):
+            parser.error(f"unknown verifier: {name}")
+        verifiers.append((name, script))
+    env = dict(item.split("=", 1) for item in args.env)
+
+    writer = None
+    original_stdout = sys.stdout
+    on_record = print_record
+    if args.format == "ndjson":
+        writer = NdjsonWriter(original_stdout, "fleet_runner")
+        sys.stdout = sys.stderr
+
+        def on_record(host, verifier, record):
+            original_stdout.write(json.dumps(dict(record, target=host, verifier=verifier), default=str) + "\n")
+            original_stdout.flush()
+
+    try:
+        runner = FleetRunner(hosts, verifiers, verifier_args, env, args.parallel, shlex.split(args.ssh),
+                             args.control_dir, args.persist, args.connect_timeout, args.timeout, on_record)
+        print(f"Running {', '.join(name for name, _ in verifiers)} on {len(hosts)} hosts "
+              f"({args.parallel} at a time)")
+        start = time.perf_counter()
+        results = runner.run(on_host=print_host)
+        wall = time.perf_counter() - start
+        if args.close:
+            runner.close_masters()
+        fleet = summarize_fleet(results)
+        print_fleet_summary(fleet)
+        print(f"\nFleet run finished in {wall:.2f} s")
+        failed = any(result.status == "fail" for result in results)
+        if writer:
+            writer.emit("fleet_summary", "fail" if failed else "pass", wall, verifiers=fleet)
+        return 1 if failed else 0
+    finally:
+        sys.stdout = original_stdout
+
+if __name__ == "__main__":
+    sys.exit(main())
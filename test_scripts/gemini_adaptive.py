@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+gemini_adaptive.py - 적응형 동시성 부하 생성 모듈
+429/지연 시간 피드백으로 동시 요청 수를 AIMD(가산 증가, 승산 감소)로 조절하고
+분당 요청 수(RPM)/토큰 수(TPM) 토큰 버킷으로 속도를 제한하여 지속 가능한 최대 처리량과 knee 지점을 찾음
+재시도는 지터가 있는 지수 백오프를 사용하며 첫 시도 지연 시간과 분리하여 집계
+"""
+
+import time
+import random
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from gemini_load import DEFAULT_LOAD_PROMPT, percentile, response_tokens, summarize
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# google.api_core 예외 이름 → HTTP 상태 (code 속성이 없는 경우 대비)
+ERROR_STATUSES = {
+    "ResourceExhausted": 429, "TooManyRequests": 429, "InternalServerError": 500, "BadGateway": 502,
+    "ServiceUnavailable": 503, "GatewayTimeout": 504, "DeadlineExceeded": 504,
+}
+# 지연 시간 지수 이동 평균 가중치
+LATENCY_ALPHA = 0.1
+# 처리량이 최대치의 이 비율에 처음 도달하는 동시성이 knee
+KNEE_FRACTION = 0.9
+# 429 비율이 이 값 이하인 동시성 수준만 '지속 가능'으로 간주
+SUSTAINABLE_THROTTLE_RATIO = 0.05
+# 이보다 짧게 유지된 동시성 수준은 knee 계산과 표에서 제외
+MIN_LEVEL_SECONDS = 1.0
+
+def error_status(error):
+    """예외의 HTTP 상태 코드 (google.api_core 예외는 code 속성 보유), 알 수 없으면 None"""
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return int(code)
+    return ERROR_STATUSES.get(type(error).__name__)
+
+def is_retryable(error):
+    return error_status(error) in RETRYABLE_STATUSES or isinstance(error, (ConnectionError, TimeoutError))
+
+def backoff_delay(attempt, base=0.5, cap=30.0, rng=random):
+    """full jitter 지수 백오프: [0, min(cap, base * 2^attempt)] 구간의 균등 난수"""
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+class TokenBucket:
+    """초당 rate개 충전, 최대 burst개 누적 - 응답 후 실제 사용량으로 정산(settle) 가능"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1.0, deadline=None):
+        """
+        amount개를 꺼낼 수 있을 때까지 대기하고 대기 시간 반환 (버킷보다 큰 요청은 가득 찼을 때 허용)
+        deadline(perf_counter)이 지나면 None
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= min(amount, self.capacity):
+                    self.tokens -= amount
+                    return waited
+                wait = min((min(amount, self.capacity) - self.tokens) / self.rate, 0.5)
+            if deadline is not None and time.perf_counter() + wait >= deadline:
+                return None
+            time.sleep(wait)
+            waited += wait
+
+    def settle(self, delta):
+        """예상보다 많이(양수)/적게(음수) 쓴 양을 반영 - 잔량은 음수가 될 수 있음"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+class AimdLimiter:
+    """
+    동시 요청 수 제한기
+    - slow start: 첫 혼잡 전까지 성공마다 +1 (왕복마다 두 배)
+    - 혼잡 회피: 성공마다 +1/limit (왕복마다 +1)
+    - 혼잡(429 또는 평활 지연이 기준의 latency_tolerance배 초과): limit × backoff, 평활 지연 한 번에 최대 한 번
+      감소 전에 시작한 요청의 혼잡 신호는 이미 반영된 것으로 보고 무시 (TCP 복구 지점과 같은 규칙)
+    limit까지 요청이 차 있을 때만 증가 (RPM/TPM 속도 제한이 병목이면 limit이 근거 없이 커지지 않음)
+    슬롯은 도착 순서(FIFO)대로 배정하여 재시도 요청이 굶지 않도록 함
+    """
+
+    def __init__(self, initial=2, minimum=1, maximum=64, backoff=0.5, latency_tolerance=2.0):
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.inflight = 0
+        self.slow_start = True
+        self.smoothed = None
+        self.baseline = None
+        self.decreases = 0
+        self.history = [(0.0, int(self.limit))]
+        self.level_time = defaultdict(float)
+        self._started = time.monotonic()
+        self._level_since = self._started
+        self._last_decrease = float("-inf")
+        self._next_ticket = 0
+        self._serving = 0
+        self._abandoned = set()
+        self._cond = threading.Condition()
+
+    @property
+    def level(self):
+        return int(self.limit)
+
+    def acquire(self, deadline=None):
+        """슬롯이 빌 때까지 대기하고 현재 동시성 수준 반환 (deadline(perf_counter) 경과 시 None)"""
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            while ticket != self._serving or self.inflight >= self.level:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    # 포기한 순번은 건너뛰도록 표시
+                    self._abandoned.add(ticket)
+                    self._advance()
+                    return None
+                self._cond.wait(0.1)
+            self.inflight += 1
+            self._serving += 1
+            self._advance()
+            return self.level
+
+    def _advance(self):
+        while self._serving in self._abandoned:
+            self._abandoned.discard(self._serving)
+            self._serving += 1
+        self._cond.notify_all()
+
+    def release(self, latency=None, throttled=False, started=None):
+        """
+        요청 완료 - 429 또는 지연 증가를 혼잡으로 보고 limit 조정, 혼잡으로 판정했으면 True
+        started: 요청을 시작한 time.monotonic() 시각 (있으면 마지막 감소 전에 시작한 요청은 감소를 일으키지 않음)
+        """
+        with self._cond:
+            limited = self.inflight >= self.level
+            self.inflight -= 1
+            congested = throttled or self._latency_congested(latency)
+            now = time.monotonic()
+            before = self.level
+            if congested:
+                # 같은 혼잡 사건으로 인한 연속 감소 방지
+                fresh = started is None or started >= self._last_decrease
+                if fresh and now - self._last_decrease >= (self.smoothed or 0.0):
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self._last_decrease = now
+                    self.slow_start = False
+                    self.decreases += 1
+            elif limited and self.slow_start:
+                self.limit = min(self.maximum, self.limit + 1)
+            elif limited:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if self.level != before:
+                self.level_time[before] += now - self._level_since
+                self._level_since = now
+                self.history.append((now - self._started, self.level))
+            self._cond.notify_all()
+            return congested
+
+    def _latency_congested(self, latency):
+        if latency is None:
+            return False
+        self.smoothed = latency if self.smoothed is None else (
+            LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self.smoothed)
+        self.baseline = self.smoothed if self.baseline is None else min(self.baseline, self.smoothed)
+        return bool(self.latency_tolerance) and self.smoothed > self.baseline * self.latency_tolerance
+
+    def close(self):
+        """남은 시간을 현재 수준에 누적"""
+        with self._cond:
+            now = time.monotonic()
+            self.level_time[self.level] += now - self._level_since
+            self._level_since = now
+
+def run_adaptive(generate, max_concurrency=64, total_requests=100, duration=None, prompt=DEFAULT_LOAD_PROMPT,
+                 rpm=None, tpm=None, initial=2, max_retries=3, latency_tolerance=2.0, seed=None):
+    """
+    generate(prompt)를 AIMD 제한기가 허용하는 만큼 동시에 호출
+    rpm/tpm이 지정되면 토큰 버킷으로 요청 시작 속도 제한 (TPM은 응답의 실제 토큰 수로 정산)
+    """
+    limiter = AimdLimiter(initial=initial, maximum=max_concurrency, latency_tolerance=latency_tolerance)
+    request_bucket = TokenBucket(rpm / 60.0) if rpm else None
+    token_bucket = TokenBucket(tpm / 60.0) if tpm else None
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    issued = [0]
+    estimate = [100.0]  # 요청당 토큰 수 추정치 (실제 사용량 평균으로 갱신)
+    first_samples = []  # 첫 시도에 성공한 요청의 (latency, tokens)
+    retried = []        # 재시도 후 결과가 난 요청의 (전체 latency, 시도 횟수, 성공 여부)
+    errors = []
+    cut = []            # 기한이 지나 결과 없이 끝난 요청의 시도 횟수
+    attempts = []       # 시도별 (동시성 수준, 지연, 성공, 429 여부)
+    paced = [0.0]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def claim():
+        with lock:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return False
+            elif issued[0] >= total_requests:
+                return False
+            issued[0] += 1
+            return True
+
+    def attempt():
+        """속도 제한 → 슬롯 확보 → 호출 한 번, (응답, 예외, 지연) 반환 (기한 경과 시 None)"""
+        waited = request_bucket.acquire(deadline=deadline) if request_bucket else 0.0
+        reserved = estimate[0]
+        if token_bucket and waited is not None:
+            token_wait = token_bucket.acquire(reserved, deadline)
+            waited = None if token_wait is None else waited + token_wait
+        level = limiter.acquire(deadline) if waited is not None else None
+        if level is None:
+            return None
+        began = time.monotonic()
+        start = time.perf_counter()
+        response = error = None
+        try:
+            response = generate(prompt)
+        except Exception as e:
+            error = e
+        latency = time.perf_counter() - start
+        throttled = error is not None and error_status(error) == 429
+        limiter.release(None if error else latency, throttled, began)
+        tokens = total_tokens(response)
+        if token_bucket:
+            token_bucket.settle((tokens or reserved) - reserved)
+        with lock:
+            paced[0] += waited
+            attempts.append((level, latency, error is None, throttled))
+            if tokens:
+                estimate[0] += (tokens - estimate[0]) * 0.1
+        return response, error, latency
+
+    def worker():
+        while claim():
+            started = time.perf_counter()
+            for tries in range(max_retries + 1):
+                outcome = attempt()
+                if outcome is None:
+                    # 기한 경과: 시작한 요청은 집계에 남기고 종료 (다음 claim도 실패)
+                    with lock:
+                        cut.append(tries)
+                        if tries:
+                            retried.append((time.perf_counter() - started, tries, False))
+                    break
+                response, error, latency = outcome
+                if error is None:
+                    with lock:
+                        if tries == 0:
+                            first_samples.append((latency, response_tokens(response)))
+                        else:
+                            retried.append((time.perf_counter() - started, tries + 1, True))
+                    break
+                if tries == max_retries or not is_retryable(error):
+                    with lock:
+                        errors.append(f"{type(error).__name__}: {error}")
+                        if tries:
+                            retried.append((time.perf_counter() - started, tries + 1, False))
+                    break
+                time.sleep(backoff_delay(tries, rng=rng))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        for _ in range(max_concurrency):
+            pool.submit(worker)
+    wall_time = time.perf_counter() - started
+    limiter.close()
+
+    # 재시도 후 성공한 요청도 처리량에는 포함 (지연 백분위는 첫 시도 성공만)
+    # requests = succeeded + errors + deadline (retried는 그중 재시도한 요청의 내역)
+    summary = summarize(first_samples, errors, wall_time, limiter.level)
+    recovered = sum(1 for _, _, ok in retried if ok)
+    summary["succeeded"] += recovered
+    summary["requests"] += recovered + len(cut)
+    summary["requests_per_sec"] = summary["succeeded"] / max(wall_time, 1e-9)
+    retry_latencies = sorted(latency for latency, _, _ in retried)
+    levels = level_stats(attempts, limiter.level_time)
+    summary.update({
+        "adaptive": True,
+        "max_concurrency": max_concurrency,
+        "deadline": len(cut),
+        "first_attempt_ok": len(first_samples),
+        "throttled": sum(1 for *_, throttled in attempts if throttled),
+        "attempts": len(attempts),
+        "retried": {
+            "requests": len(retried),
+            "recovered": recovered,
+            "retries": sum(tries - 1 for _, tries, _ in retried),
+            "latency": {"p50": percentile(retry_latencies, 50), "p90": percentile(retry_latencies, 90),
+                        "max": retry_latencies[-1] if retry_latencies else 0.0},
+        },
+        "limit_decreases": limiter.decreases,
+        "limit_history": limiter.history,
+        "pacing_wait": paced[0],
+        "levels": levels,
+        "knee": find_knee(levels),
+    })
+    return summary
+
+def total_tokens(response):
+    """입력+출력 토큰 수 (TPM 할당량 기준), 없으면 0"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return 0
+    return getattr(usage, "total_token_count", 0) or 0
+
+def level_stats(attempts, level_time):
+    """동시성 수준별 처리량(성공/해당 수준 체류 시간), 첫 시도 지연 백분위, 429 비율"""
+    grouped = defaultdict(list)
+    for level, latency, ok, throttled in attempts:
+        grouped[level].append((latency, ok, throttled))
+    levels = []
+    for level in sorted(grouped):
+        rows = grouped[level]
+        latencies = sorted(latency for latency, ok, _ in rows if ok)
+        seconds = level_time.get(level, 0.0)
+        levels.append({
+            "concurrency": level,
+            "attempts": len(rows),
+            "seconds": seconds,
+            "requests_per_sec": len(latencies) / seconds if seconds > 0 else 0.0,
+            "throttle_ratio": sum(1 for *_, throttled in rows if throttled) / len(rows),
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+        })
+    return levels
+
+def find_knee(levels, min_seconds=MIN_LEVEL_SECONDS):
+    """
+    지속 가능한(429 비율 낮은) 수준 중 최대 처리량과, 그 KNEE_FRACTION에 처음 도달하는 동시성
+    체류 시간이 min_seconds 미만인 수준은 처리량 추정이 불안정하므로 제외
+    """
+    candidates = [level for level in levels
+                  if level["seconds"] >= min_seconds and level["throttle_ratio"] <= SUSTAINABLE_THROTTLE_RATIO]
+    if not candidates:
+        return None
+    best = max(candidates, key=lambda level: level["requests_per_sec"])
+    knee = next(level for level in candidates
+                if level["requests_per_sec"] >= best["requests_per_sec"] * KNEE_FRACTION)
+    return {"concurrency": knee["concurrency"], "requests_per_sec": knee["requests_per_sec"], "p50": knee["p50"],
+            "max_requests_per_sec": best["requests_per_sec"], "max_concurrency": best["concurrency"]}
+
+def print_adaptive_report(summary):
+    """적응형 부하 테스트 결과 출력 (동시성 수준별 표와 knee)"""
+    latency = summary["latency"]
+    retried = summary["retried"]
+    cut = f", {summary['deadline']} cut off by the deadline" if summary["deadline"] else ""
+    print(f"   Requests: {summary['requests']} ({summary['succeeded']} ok, {summary['errors']} failed{cut}) "
+          f"in {summary['attempts']} attempts, {summary['throttled']} throttled (429)")
+    print(f"   Wall time: {summary['wall_time']:.2f} seconds, "
+          f"pacing wait {summary['pacing_wait']:.1f} s summed over workers")
+    print(f"   Throughput: {summary['requests_per_sec']:.2f} req/s, {summary['tokens_per_sec']:.1f} tokens/s")
+    print(f"   First-attempt latency p50/p90/p99/max: {latency['p50']:.3f} / {latency['p90']:.3f} / "
+          f"{latency['p99']:.3f} / {latency['max']:.3f} s ({summary['first_attempt_ok']} requests)")
+    if retried["requests"]:
+        print(f"   Retried: {retried['requests']} requests, {retried['retries']} retries, "
+              f"{retried['recovered']} recovered, end-to-end p50/p90/max: {retried['latency']['p50']:.3f} / "
+              f"{retried['latency']['p90']:.3f} / {retried['latency']['max']:.3f} s")
+    print(f"   Concurrency limit: final {summary['concurrency']} (max {summary['max_concurrency']}), "
+          f"{summary['limit_decreases']} decreases")
+    print(f"   {'limit':>6} {'attempts':>9} {'seconds':>8} {'req/s':>8} {'429 %':>6} {'p50 (s)':>8} {'p90 (s)':>8}")
+    # 잠깐 거쳐 간 수준은 처리량 추정이 불안정하므로 생략
+    shown = [level for level in summary["levels"] if level["seconds"] >= MIN_LEVEL_SECONDS]
+    for level in shown:
+        print(f"   {level['concurrency']:>6} {level['attempts']:>9} {level['seconds']:>8.1f} "
+              f"{level['requests_per_sec']:>8.2f} {level['throttle_ratio'] * 100:>6.1f} "
+              f"{level['p50']:>8.3f} {level['p90']:>8.3f}")
+    if len(shown) < len(summary["levels"]):
+        print(f"   ({len(summary['levels']) - len(shown)} levels held under {MIN_LEVEL_SECONDS:.0f} s omitted)")
+    knee = summary["knee"]
+    if knee:
+        print(f"   Max sustainable throughput: {knee['max_requests_per_sec']:.2f} req/s "
+              f"at concurrency {knee['max_concurrency']}")
+        print(f"   Knee: concurrency {knee['concurrency']} ({knee['requests_per_sec']:.2f} req/s, "
+              f"p50 {knee['p50']:.3f} s)")
+    else:
+        print("   Knee: not found (run longer or raise --concurrency)")
+    for error in summary["error_samples"]:
+        print(f"   ✗ {error}")
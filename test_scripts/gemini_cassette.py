@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+gemini_cassette.py - Gemini 호출 녹화/재생(cassette) 캐시
+모델, 프롬프트, 생성 설정, 채팅 기록 해시를 키로 응답과 타이밍을 디스크에 저장하고
+같은 요청은 녹화된 타이밍 그대로 또는 지연 없이 재생하여 모델 지연과 할당량 없이 클라이언트 경로를 재검증
+
+저장 형식: 추가 전용(append-only) 레코드 로그
+    [유형 1바이트][키 32바이트][길이 4바이트][zlib 압축 JSON]
+    유형 R=응답 저장, T=사용(LRU 갱신), D=삭제(LRU 제거)
+열 때 헤더만 훑어 메모리 인덱스를 만들고, 죽은 레코드가 살아 있는 레코드보다 커지면 압축(compaction)
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import socket
+import struct
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from gemini_load import percentile
+
+RECORD_HEADER = struct.Struct("<c32sI")
+PUT, TOUCH, DELETE = b"R", b"T", b"D"
+MIN_COMPACT_BYTES = 65536
+
+# 지연 변화 판정 기준: 둘 중 큰 값보다 크게 변해야 유의미한 변화
+DRIFT_MIN_SECONDS = 0.05
+DRIFT_RATIO = 0.2
+# 요청 하나가 경로 RTT를 몇 번 지불하는지 (새 연결: TCP + TLS + 요청/응답)
+PATH_ROUND_TRIPS = 3
+
+def to_plain(value):
+    """SDK 객체(Content, GenerationConfig 등)를 JSON 직렬화 가능한 값으로 변환"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, "to_dict"):
+        return to_plain(value.to_dict())
+    if isinstance(value, dict):
+        return {str(k): to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    return repr(value)
+
+def user_content(contents):
+    """문자열 프롬프트를 generateContent의 contents 형식으로 정규화"""
+    if isinstance(contents, str):
+        return [{"role": "user", "parts": [{"text": contents}]}]
+    plain = to_plain(contents)
+    return plain if isinstance(plain, list) else [plain]
+
+def prompt_label(contents, width=60):
+    """녹화 목록에 표시할 마지막 사용자 메시지 앞부분"""
+    for part in user_content(contents)[-1].get("parts") or []:
+        if isinstance(part, dict) and part.get("text"):
+            return " ".join(part["text"].split())[:width]
+    return ""
+
+def history_digest(history):
+    """채팅 기록(정규화된 contents 목록)의 SHA-256"""
+    return hashlib.sha256(json.dumps(history, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+def cassette_key(model, contents, generation_config=None, history=()):
+    """모델, 프롬프트, 생성 설정, 채팅 기록 해시로 32바이트 키 생성"""
+    payload = {
+        "model": model,
+        "contents": user_content(contents),
+        "config": to_plain(generation_config) or {},
+        "history": history_digest(list(history)) if history else None,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).digest()
+
+def connect_rtt(host, port=443, attempts=3, timeout=3.0):
+    """TCP 연결 시간의 중앙값 (초) - 녹화 시점의 네트워크 경로 기준값, 실패 시 None"""
+    samples = []
+    for _ in range(attempts):
+        start = time.perf_counter()
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                samples.append(time.perf_counter() - start)
+        except OSError:
+            pass
+    return percentile(sorted(samples), 50) if samples else None
+
+class CassetteStore:
+    """추가 전용 레코드 로그 + LRU 순서의 메모리 인덱스 (키 → 오프셋, 길이)"""
+
+    def __init__(self, path, max_entries=256):
+        self.path = path
+        self.max_entries = max_entries
+        self.index = OrderedDict()
+        self.dead_bytes = 0
+        self.live_bytes = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "a+b")
+        self._load()
+        with self._lock:
+            self._maintain()
+
+    def _load(self):
+        """헤더만 읽으며 인덱스 재구성 - 중간에 끊긴 마지막 레코드는 잘라냄"""
+        self._file.seek(0)
+        offset = 0
+        size = os.fstat(self._file.fileno()).st_size
+        while offset + RECORD_HEADER.size <= size:
+            kind, key, length = RECORD_HEADER.unpack(self._file.read(RECORD_HEADER.size))
+            body = offset + RECORD_HEADER.size
+            if body + length > size or kind not in (PUT, TOUCH, DELETE):
+                break
+            self._apply(kind, key, body, length)
+            offset = body + length
+            self._file.seek(offset)
+        if offset < size:
+            self._file.truncate(offset)
+
+    def _apply(self, kind, key, body, length):
+        if kind == PUT:
+            if key in self.index:
+                self._retire(key)
+            self.index[key] = (body, length)
+            self.live_bytes += RECORD_HEADER.size + length
+            return
+        self.dead_bytes += RECORD_HEADER.size
+        if key in self.index:
+            if kind == TOUCH:
+                self.index.move_to_end(key)
+            else:
+                self._retire(key)
+
+    def _retire(self, key):
+        _, length = self.index.pop(key)
+        self.live_bytes -= RECORD_HEADER.size + length
+        self.dead_bytes += RECORD_HEADER.size + length
+
+    def _append(self, kind, key, payload=b""):
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(RECORD_HEADER.pack(kind, key, len(payload)) + payload)
+        self._file.flush()
+        return offset + RECORD_HEADER.size
+
+    def _read(self, key):
+        offset, length = self.index[key]
+        self._file.seek(offset)
+        return json.loads(zlib.decompress(self._file.read(length)))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def get(self, key, touch=True):
+        with self._lock:
+            if key not in self.index:
+                return None
+            record = self._read(key)
+            if touch:
+                self.index.move_to_end(key)
+                self._append(TOUCH, key)
+                self.dead_bytes += RECORD_HEADER.size
+                # 재생만 하는 카세트도 TOUCH 레코드가 쌓이므로 여기서도 압축
+                self._maintain()
+            return record
+
+    def put(self, key, record):
+        payload = zlib.compress(json.dumps(record, ensure_ascii=False).encode(), 6)
+        with self._lock:
+            if key in self.index:
+                self._retire(key)
+            self.index[key] = (self._append(PUT, key, payload), len(payload))
+            self.live_bytes += RECORD_HEADER.size + len(payload)
+            self._maintain()
+
+    def _maintain(self):
+        """max_entries를 넘는 오래된 항목을 내보내고, 죽은 바이트가 살아 있는 바이트보다 많으면 압축"""
+        while len(self.index) > self.max_entries:
+            evicted = next(iter(self.index))
+            self._retire(evicted)
+            self._append(DELETE, evicted)
+            self.dead_bytes += RECORD_HEADER.size
+        if self.dead_bytes > max(self.live_bytes, MIN_COMPACT_BYTES):
+            self._compact()
+
+    def compact(self):
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        """살아 있는 레코드만 LRU 순서대로 새 파일에 쓰고 원자적으로 교체"""
+        temp = self.path + ".tmp"
+        index = OrderedDict()
+        with open(temp, "wb") as out:
+            for key, (offset, length) in self.index.items():
+                self._file.seek(offset)
+                payload = self._file.read(length)
+                out.write(RECORD_HEADER.pack(PUT, key, length))
+                index[key] = (out.tell(), length)
+                out.write(payload)
+            out.flush()
+            os.fsync(out.fileno())
+        self._file.close()
+        os.replace(temp, self.path)
+        self._file = open(self.path, "a+b")
+        self.index = index
+        self.dead_bytes = 0
+
+    def items(self):
+        """(키, 레코드)를 LRU 순서(오래된 것부터)로 반환 - 사용 기록은 남기지 않음"""
+        with self._lock:
+            keys = list(self.index)
+        for key in keys:
+            record = self.get(key, touch=False)
+            if record is not None:
+                yield key, record
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class ReplayedUsage:
+    def __init__(self, usage):
+        usage = usage or {}
+        self.prompt_token_count = usage.get("prompt_token_count", 0)
+        self.candidates_token_count = usage.get("candidates_token_count", 0)
+        self.total_token_count = usage.get("total_token_count", 0)
+
+class ReplayedResponse:
+    """GenerationResponse 대용 - .text와 .usage_metadata만 제공"""
+
+    def __init__(self, text, usage=None):
+        self.text = text
+        self.usage_metadata = ReplayedUsage(usage)
+
+def usage_of(response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return {}
+    return {name: getattr(usage, name, 0) or 0
+            for name in ("prompt_token_count", "candidates_token_count", "total_token_count")}
+
+def response_text(response):
+    try:
+        return response.text
+    except ValueError:
+        # 안전 필터 등으로 텍스트가 없는 응답/청크
+        return ""
+
+def classify_drift(before, after):
+    """
+    같은 키의 이전/새 녹화 비교 - 지연 변화를 네트워크 경로와 모델 지연으로 구분
+    경로 RTT 변화 × PATH_ROUND_TRIPS가 같은 방향으로 지연 변화의 절반 이상을 설명하면 network, 아니면 model
+    """
+    delta = after["latency"] - before["latency"]
+    rtt_delta = None
+    if before.get("rtt") is not None and after.get("rtt") is not None:
+        rtt_delta = after["rtt"] - before["rtt"]
+    if abs(delta) < max(DRIFT_MIN_SECONDS, DRIFT_RATIO * before["latency"]):
+        cause = "unchanged"
+    elif rtt_delta is not None and rtt_delta * PATH_ROUND_TRIPS * delta >= delta * delta / 2:
+        cause = "network"
+    else:
+        cause = "model"
+    return {
+        "label": after.get("label", ""),
+        "before": before["latency"],
+        "after": after["latency"],
+        "delta": delta,
+        "rtt_before": before.get("rtt"),
+        "rtt_after": after.get("rtt"),
+        "network_delta": rtt_delta * PATH_ROUND_TRIPS if rtt_delta is not None else None,
+        "cause": cause,
+    }
+
+class Cassette:
+    """
+    mode:
+        replay - 녹화가 있으면 재생, 없으면 실제 호출 후 녹화
+        record - 항상 실제 호출하고 다시 녹화 (이전 녹화와의 지연 변화를 drifts에 기록)
+    timing:
+        recorded - 녹화된 지연/청크 도착 시각을 그대로 재현
+        none     - 지연 없이 즉시 반환
+    """
+
+    def __init__(self, path, mode="replay", timing="recorded", max_entries=256, rtt_probe=None):
+        self.store = CassetteStore(path, max_entries)
+        self.mode = mode
+        self.timing = timing
+        self.rtt_probe = rtt_probe
+        self.hits = 0
+        self.misses = 0
+        self.drifts = []
+        self._rtt = None
+        self._rtt_measured = False
+
+    @property
+    def rtt(self):
+        """녹화 시점 경로 RTT - 실제 호출이 처음 필요할 때 한 번만 측정 (재생만 하면 오프라인 유지)"""
+        if not self._rtt_measured and self.rtt_probe is not None:
+            self._rtt = self.rtt_probe()
+            self._rtt_measured = True
+        return self._rtt
+
+    def lookup(self, key):
+        if self.mode != "replay":
+            return None
+        record = self.store.get(key)
+        if record is not None:
+            self.hits += 1
+        return record
+
+    def record(self, key, record):
+        self.misses += 1
+        record["rtt"] = self.rtt
+        record["recorded_at"] = time.time()
+        if self.mode == "record":
+            previous = self.store.get(key, touch=False)
+            if previous is not None:
+                self.drifts.append(classify_drift(previous, record))
+        self.store.put(key, record)
+
+    def replay(self, record, stream=False):
+        if not stream:
+            if self.timing == "recorded":
+                time.sleep(record["latency"])
+            return ReplayedResponse(record["text"], record.get("usage"))
+        return self._replay_stream(record)
+
+    def _replay_stream(self, record):
+        start = time.perf_counter()
+        chunks = record.get("chunks") or [record["text"]]
+        offsets = record.get("offsets") or [record["latency"]]
+        for text, offset in zip(chunks, offsets):
+            if self.timing == "recorded":
+                wait = offset - (time.perf_counter() - start)
+                if wait > 0:
+                    time.sleep(wait)
+            yield ReplayedResponse(text, record.get("usage"))
+
+    def call(self, key, label, generate, stream=False):
+        """녹화가 있으면 재생, 없으면 generate(stream)를 호출하며 응답과 타이밍을 녹화"""
+        record = self.lookup(key)
+        if record is not None:
+            return self.replay(record, stream)
+        if stream:
+            return self._record_stream(key, label, generate)
+        start = time.perf_counter()
+        response = generate(False)
+        latency = time.perf_counter() - start
+        text = response_text(response)
+        self.record(key, {"label": label, "latency": latency, "ttft": latency, "text": text,
+                          "chunks": [text], "offsets": [latency], "usage": usage_of(response)})
+        return response
+
+    def _record_stream(self, key, label, generate):
+        start = time.perf_counter()
+        chunks, offsets, usage = [], [], {}
+        for chunk in generate(True):
+            offsets.append(time.perf_counter() - start)
+            chunks.append(response_text(chunk))
+            usage = usage_of(chunk) or usage
+            yield chunk
+        latency = time.perf_counter() - start
+        self.record(key, {"label": label, "latency": latency, "ttft": offsets[0] if offsets else latency,
+                          "text": "".join(chunks), "chunks": chunks, "offsets": offsets, "usage": usage})
+
+    def close(self):
+        self.store.close()
+
+class CassetteModel:
+    """
+    GenerativeModel 래퍼 - generate_content / start_chat 호출을 cassette로 녹화/재생
+    model이 None이면 재생 전용: 녹화가 없는 요청이 처음 나올 때 loader()로 실제 모델을 만들고,
+    loader도 없으면 LookupError (인증/초기화 없이 재생만 하는 실행용)
+    """
+
+    def __init__(self, model, cassette, name=None, loader=None):
+        if model is None and name is None:
+            raise ValueError("a model name is required without a live model")
+        self.model = model
+        self.cassette = cassette
+        self.loader = loader
+        # SDK의 _model_name은 "publishers/google/models/<id>" 형식 - 모델 없이 재생할 때와 같은 키가 되도록 id만 사용
+        self.name = (name or getattr(model, "_model_name", type(model).__name__)).rsplit("/", 1)[-1]
+        self.base_config = to_plain(getattr(model, "_generation_config", None))
+
+    def live(self):
+        """녹화가 없는 요청을 보낼 실제 모델 (없으면 loader로 한 번 생성)"""
+        if self.model is None:
+            if self.loader is None:
+                raise LookupError(f"no recording in the cassette and no live {self.name} model to call")
+            self.model = self.loader()
+        return self.model
+
+    def key(self, contents, generation_config=None, history=()):
+        config = {"model": self.base_config, "call": to_plain(generation_config)}
+        return cassette_key(self.name, contents, config, history)
+
+    def generate_content(self, contents, generation_config=None, stream=False, **kwargs):
+        label = prompt_label(contents)
+        return self.cassette.call(
+            self.key(contents, generation_config), label,
+            lambda streaming: self.live().generate_content(contents, generation_config=generation_config,
+                                                           stream=streaming, **kwargs),
+            stream=stream)
+
+    def start_chat(self, history=None):
+        return CassetteChat(self, [item for content in history or [] for item in user_content(content)])
+
+class CassetteChat:
+    """
+    ChatSession 대용 - 기록 해시를 키에 포함하고, 녹화가 없을 때는 기록 전체를 generate_content로 전송
+    (ChatSession과 같은 요청 본문이므로 앞선 턴이 재생되었어도 실제 호출이 가능)
+    """
+
+    def __init__(self, cassette_model, history):
+        self.cassette_model = cassette_model
+        self.history = history
+
+    def send_message(self, content, generation_config=None, stream=False):
+        owner = self.cassette_model
+        message = user_content(content)
+        contents = self.history + message
+        label = f"[turn {len(self.history) // 2 + 1}] " + prompt_label(content, 50)
+
+        def generate(streaming):
+            return owner.live().generate_content(contents, generation_config=generation_config, stream=streaming)
+
+        result = owner.cassette.call(owner.key(content, generation_config, self.history), label, generate,
+                                     stream=stream)
+        if stream:
+            return self._track_stream(message, result)
+        self.history = contents + [{"role": "model", "parts": [{"text": response_text(result)}]}]
+        return result
+
+    def _track_stream(self, message, chunks):
+        parts = []
+        for chunk in chunks:
+            parts.append(response_text(chunk))
+            yield chunk
+        self.history = self.history + message + [{"role": "model", "parts": [{"text": "".join(parts)}]}]
+
+def print_cassette_summary(cassette):
+    print(f"   Cassette: {cassette.hits} replayed, {cassette.misses} recorded "
+          f"({cassette.mode}, timing {cassette.timing}, {len(cassette.store)} entries)")
+    for drift in cassette.drifts:
+        rtt = ""
+        if drift["network_delta"] is not None:
+            rtt = f", path RTT {drift['rtt_before'] * 1000:.1f} → {drift['rtt_after'] * 1000:.1f} ms"
+        print(f"   {drift['cause']:>9}: {drift['label'][:40]:<40} "
+              f"{drift['before']:.2f}s → {drift['after']:.2f}s ({drift['delta']:+.2f}s{rtt})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or compact a Gemini cassette file")
+    parser.add_argument("cassette")
+    parser.add_argument("--compact", action="store_true", help="rewrite the file with live entries only")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.cassette):
+        print(f"Error: {args.cassette} not found")
+        return 1
+    store = CassetteStore(args.cassette, max_entries=sys.maxsize)
+    try:
+        if args.compact:
+            store.compact()
+        size = os.path.getsize(args.cassette)
+        print(f"{args.cassette}: {len(store)} entries, {size} bytes ({store.dead_bytes} bytes reclaimable)")
+        print(f"{'key':<12} {'recorded':<19} {'latency':>8} {'ttft':>8} {'rtt':>8} {'chunks':>6}  label")
+        for key, record in store.items():
+            recorded = datetime.fromtimestamp(record.get("recorded_at", 0)).strftime("%Y-%m-%d %H:%M:%S")
+            rtt = f"{record['rtt'] * 1000:.1f}ms" if record.get("rtt") is not None else "-"
+            print(f"{key.hex()[:12]:<12} {recorded:<19} {record['latency']:>7.2f}s {record['ttft']:>7.2f}s "
+                  f"{rtt:>8} {len(record.get('chunks') or []):>6}  {record.get('label', '')}")
+    finally:
+        store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+gemini_chat_bench.py - 다중 턴 채팅 확장성 벤치마크 모듈
+ChatSession처럼 매 턴 전체 기록을 다시 보내는 대화를 N턴까지 진행하며 턴별 요청 바이트, 입력/출력 토큰, 지연 시간을 기록
+기록 관리 전략(full, window, summarize)별로 절약되는 대역폭과 지연 시간을 비교
+"""
+
+import json
+import time
+
+from gemini_load import percentile, response_tokens
+
+STRATEGIES = ("full", "window", "summarize")
+DEFAULT_MESSAGE_BYTES = 4096
+DEFAULT_KEEP_TURNS = 4
+SUMMARY_WORDS = 120
+SUMMARY_PROMPT = ("Summarize the conversation below in at most {words} words. Keep function names, "
+                  "decisions and open questions; drop code listings.\n\n{transcript}")
+
+def code_block(size, turn):
+    """size 바이트 안팎의 결정적인 Python 코드 블록 (Code Assist 요청에 붙는 코드 흉내)"""
+    lines = [f"def handle_batch_{turn}(records, session):"]
+    length = len(lines[0])
+    i = 0
+    while length < size:
+        line = (f"    value_{i} = session.transform(records[{i}], threshold={i % 7}, "
+                f"retries={i % 3})  # step {i}")
+        lines.append(line)
+        length += len(line) + 1
+        i += 1
+    lines.append("    return session.commit()")
+    return "```python\n" + "\n".join(lines) + "\n```"
+
+def user_message(turn, size):
+    return (f"Turn {turn}: review this function and suggest one improvement in two sentences.\n"
+            + code_block(size, turn))
+
+def text_content(role, text):
+    return {"role": role, "parts": [{"text": text}]}
+
+def request_bytes(contents, generation_config):
+    """generateContent REST 요청 본문 크기 - 매 턴 터널로 다시 전송되는 양"""
+    return len(json.dumps({"contents": contents, "generationConfig": generation_config}).encode())
+
+def prompt_tokens(response):
+    """응답의 usage_metadata에서 입력 토큰 수 추출 (없으면 0)"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return 0
+    return getattr(usage, "prompt_token_count", 0) or 0
+
+def transcript(history):
+    return "\n".join(f"{content['role']}: {content['parts'][0]['text']}" for content in history)
+
+class ChatBenchmark:
+    """
+    기록을 직접 관리하며 generate_content(기록 + 새 메시지)로 대화 진행 (ChatSession과 같은 요청 본문)
+    strategy:
+        full      - 전체 기록 전송 (ChatSession 기본 동작)
+        window    - 최근 keep_turns 턴만 전송
+        summarize - 기록이 keep_turns의 두 배를 넘으면 오래된 턴을 요약 한 쌍으로 대체 (요약 호출 비용은 overhead로 집계)
+    """
+
+    def __init__(self, model, strategy="full", keep_turns=DEFAULT_KEEP_TURNS,
+                 message_bytes=DEFAULT_MESSAGE_BYTES, max_output_tokens=256):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown history strategy: {strategy}")
+        self.model = model
+        self.strategy = strategy
+        self.keep_turns = keep_turns
+        self.message_bytes = message_bytes
+        self.config = {"max_output_tokens": max_output_tokens}
+        self.history = []
+
+    def trim(self):
+        """전략에 따라 기록 축소 - 요약 호출이 있었으면 그 측정값 반환"""
+        keep = self.keep_turns * 2
+        if self.strategy == "full" or len(self.history) <= keep:
+            return None
+        if self.strategy == "window":
+            self.history = self.history[-keep:]
+            return None
+        if len(self.history) <= keep * 2:
+            return None
+        older, recent = self.history[:-keep], self.history[-keep:]
+        prompt = SUMMARY_PROMPT.format(words=SUMMARY_WORDS, transcript=transcript(older))
+        contents = [text_content("user", prompt)]
+        start = time.perf_counter()
+        response = self.model.generate_content(contents, generation_config=self.config)
+        latency = time.perf_counter() - start
+        self.history = [text_content("user", "Summary of our earlier conversation:\n" + response.text),
+                        text_content("model", "Understood, I will continue from that summary.")] + recent
+        return {"bytes": request_bytes(contents, self.config), "latency": latency,
+                "tokens": response_tokens(response)}
+
+    def turn(self, number):
+        overhead = self.trim()
+        contents = self.history + [text_content("user", user_message(number, self.message_bytes))]
+        size = request_bytes(contents, self.config)
+        start = time.perf_counter()
+        response = self.model.generate_content(contents, generation_config=self.config)
+        latency = time.perf_counter() - start
+        self.history = contents + [text_content("model", response.text)]
+        return {
+            "turn": number,
+            "history_messages": len(contents) - 1,
+            "request_bytes": size,
+            "prompt_tokens": prompt_tokens(response),
+            "response_tokens": response_tokens(response),
+            "latency": latency,
+            "overhead": overhead,
+        }
+
+    def run(self, turns, on_turn=None):
+        records = []
+        for number in range(1, turns + 1):
+            record = self.turn(number)
+            records.append(record)
+            if on_turn:
+                on_turn(self.strategy, record)
+        return records
+
+def latency_slope(records):
+    """턴 번호에 대한 지연 시간의 최소제곱 기울기 (초/턴)"""
+    if len(records) < 2:
+        return 0.0
+    xs = [record["turn"] for record in records]
+    ys = [record["latency"] for record in records]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator if denominator else 0.0
+
+def summarize_strategy(strategy, records):
+    overheads = [record["overhead"] for record in records if record["overhead"]]
+    latencies = sorted(record["latency"] for record in records)
+    return {
+        "strategy": strategy,
+        "turns": len(records),
+        "request_bytes": sum(record["request_bytes"] for record in records)
+                         + sum(overhead["bytes"] for overhead in overheads),
+        "prompt_tokens": sum(record["prompt_tokens"] for record in records),
+        "last_request_bytes": records[-1]["request_bytes"] if records else 0,
+        "latency_total": sum(latencies) + sum(overhead["latency"] for overhead in overheads),
+        "latency_p50": percentile(latencies, 50),
+        "last_latency": records[-1]["latency"] if records else 0.0,
+        "latency_slope": latency_slope(records),
+        "summary_calls": len(overheads),
+    }
+
+def run_chat_benchmark(model, turns=20, strategies=("full",), keep_turns=DEFAULT_KEEP_TURNS,
+                       message_bytes=DEFAULT_MESSAGE_BYTES, max_output_tokens=256, on_turn=None):
+    """전략별로 새 대화를 turns턴 진행하고 {전략: {"turns": [...], "summary": {...}}} 반환"""
+    results = {}
+    for strategy in strategies:
+        bench = ChatBenchmark(model, strategy, keep_turns, message_bytes, max_output_tokens)
+        records = bench.run(turns, on_turn)
+        results[strategy] = {"turns": records, "summary": summarize_strategy(strategy, records)}
+    return results
+
+def print_turn(strategy, record):
+    overhead = ""
+    if record["overhead"]:
+        overhead = f"  (+summary {record['overhead']['bytes'] / 1024:.1f} KB, {record['overhead']['latency']:.2f} s)"
+    print(f"   [{strategy:>9}] turn {record['turn']:>3}: {record['request_bytes'] / 1024:>8.1f} KB, "
+          f"{record['prompt_tokens']:>7} in / {record['response_tokens']:>4} out tokens, "
+          f"{record['latency']:.2f} s{overhead}")
+
+def print_chat_report(results):
+    """전략별 누적 전송량/지연 시간과 full 대비 절감률 출력"""
+    print(f"   {'strategy':>9} {'sent (KB)':>10} {'last (KB)':>10} {'in tokens':>10} {'time (s)':>9} "
+          f"{'p50 (s)':>8} {'slope (ms/turn)':>16} {'summaries':>10}")
+    for result in results.values():
+        summary = result["summary"]
+        print(f"   {summary['strategy']:>9} {summary['request_bytes'] / 1024:>10.1f} "
+              f"{summary['last_request_bytes'] / 1024:>10.1f} {summary['prompt_tokens']:>10} "
+              f"{summary['latency_total']:>9.2f} {summary['latency_p50']:>8.2f} "
+              f"{summary['latency_slope'] * 1000:>16.1f} {summary['summary_calls']:>10}")
+    baseline = results.get("full")
+    if not baseline:
+        return
+    base = baseline["summary"]
+    for strategy, result in results.items():
+        if strategy == "full":
+            continue
+        summary = result["summary"]
+        saved_bytes = 1 - summary["request_bytes"] / base["request_bytes"] if base["request_bytes"] else 0.0
+        saved_time = 1 - summary["latency_total"] / base["latency_total"] if base["latency_total"] else 0.0
+        print(f"   {strategy} vs full: {saved_bytes * 100:.1f}% fewer bytes over the tunnel, "
+              f"{saved_time * 100:.1f}% less time (including summary calls)")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+gemini_load.py - Gemini API 부하 생성 모듈
+하나의 GenerativeModel을 재사용하여 N개의 동시 요청을 보내고 처리량과 지연 시간 분포를 측정
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_LOAD_PROMPT = "Reply with a one-line greeting. This is a load test from a simulated on-premises environment."
+
+def percentile(sorted_values, pct):
+    """정렬된 값 목록에서 선형 보간 백분위수 계산"""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+def response_tokens(response):
+    """응답의 usage_metadata에서 출력 토큰 수 추출 (없으면 0)"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return 0
+    return getattr(usage, "candidates_token_count", 0) or 0
+
+def run_load(generate, concurrency=8, total_requests=100, duration=None, prompt=DEFAULT_LOAD_PROMPT):
+    """
+    generate(prompt)를 concurrency개의 스레드에서 동시에 호출
+    duration(초)이 지정되면 시간 기준, 아니면 total_requests 개수 기준으로 종료
+    """
+    lock = threading.Lock()
+    issued = [0]
+    samples = []
+    errors = []
+    deadline = time.perf_counter() + duration if duration else None
+
+    def claim():
+        # 다음 요청을 보낼 수 있는지 확인하고 슬롯 확보
+        with lock:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return False
+            elif issued[0] >= total_requests:
+                return False
+            issued[0] += 1
+            return True
+
+    def worker():
+        while claim():
+            start = time.perf_counter()
+            try:
+                response = generate(prompt)
+                latency = time.perf_counter() - start
+                with lock:
+                    samples.append((latency, response_tokens(response)))
+            except Exception as e:
+                with lock:
+                    errors.append(f"{type(e).__name__}: {e}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall_time = time.perf_counter() - started
+
+    return summarize(samples, errors, wall_time, concurrency)
+
+def summarize(samples, errors, wall_time, concurrency):
+    """(latency, tokens) 샘플 목록을 처리량/백분위 요약으로 변환"""
+    latencies = sorted(latency for latency, _ in samples)
+    tokens = sum(count for _, count in samples)
+    wall_time = max(wall_time, 1e-9)
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples) + len(errors),
+        "succeeded": len(samples),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "wall_time": wall_time,
+        "requests_per_sec": len(samples) / wall_time,
+        "tokens": tokens,
+        "tokens_per_sec": tokens / wall_time,
+        "latency": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+    }
+
+def print_load_report(summary):
+    """부하 테스트 결과 출력"""
+    latency = summary["latency"]
+    print(f"   Concurrency: {summary['concurrency']}")
+    print(f"   Requests: {summary['requests']} ({summary['succeeded']} ok, {summary['errors']} failed)")
+    print(f"   Wall time: {summary['wall_time']:.2f} seconds")
+    print(f"   Throughput: {summary['requests_per_sec']:.2f} req/s, {summary['tokens_per_sec']:.1f} tokens/s")
+    print(f"   Latency p50/p90/p99/max: {latency['p50']:.3f} / {latency['p90']:.3f} / "
+          f"{latency['p99']:.3f} / {latency['max']:.3f} s")
+    for error in summary["error_samples"]:
+        print(f"   ✗ {error}")
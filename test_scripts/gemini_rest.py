@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+gemini_rest.py - 표준 라이브러리만 쓰는 Vertex AI generateContent REST 클라이언트
+aiplatform SDK(grpc, protobuf 포함) 로딩에 수 초가 걸리는 짧은 점검용 - http.client keep-alive 연결로 호출하며
+GenerativeModel이 쓰는 generate_content / start_chat / usage_metadata 형태를 그대로 제공하여
+1_test_gemini_api.py의 생성/부하/채팅 테스트와 cassette에 그대로 사용
+
+액세스 토큰: GOOGLE_OAUTH_ACCESS_TOKEN 환경 변수 → GCE 메타데이터 서버 → (설치되어 있으면) google-auth ADC
+"""
+
+import os
+import json
+import time
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+TOKEN_ENV = "GOOGLE_OAUTH_ACCESS_TOKEN"
+METADATA_HOST = "169.254.169.254"
+METADATA_TOKEN_PATH = "/computeMetadata/v1/instance/service-accounts/default/token"
+# 메타데이터 서버가 없는 환경(실제 온프레미스)에서 기다리는 최대 시간
+METADATA_TIMEOUT = 0.5
+# 토큰 만료 이 시간(초) 전에 미리 갱신
+TOKEN_REFRESH_MARGIN = 60
+# 재사용한 keep-alive 연결이 서버 쪽에서 닫혀 있을 때 나는 오류 - 새 연결로 한 번 재시도
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+class RestError(Exception):
+    """HTTP 오류 응답 - code는 HTTP 상태 (gemini_adaptive.error_status가 읽는 속성)"""
+
+    def __init__(self, code, status, message):
+        super().__init__(f"{code} {status}: {message}")
+        self.code = code
+        self.status = status
+        self.message = message
+
+class Usage:
+    """usageMetadata - SDK의 usage_metadata와 같은 속성 이름"""
+
+    def __init__(self, usage):
+        self.prompt_token_count = usage.get("promptTokenCount", 0)
+        self.candidates_token_count = usage.get("candidatesTokenCount", 0)
+        self.total_token_count = usage.get("totalTokenCount", 0)
+
+class RestResponse:
+    """generateContent 응답 (스트리밍이면 청크 하나)"""
+
+    def __init__(self, payload):
+        self.raw = payload
+        self.usage_metadata = Usage(payload["usageMetadata"]) if "usageMetadata" in payload else None
+
+    @property
+    def text(self):
+        """첫 후보의 텍스트 - 텍스트가 없으면 SDK처럼 ValueError"""
+        candidates = self.raw.get("candidates") or []
+        parts = (candidates[0].get("content") or {}).get("parts") or [] if candidates else []
+        texts = [part["text"] for part in parts if "text" in part]
+        if not texts:
+            raise ValueError("response has no text part")
+        return "".join(texts)
+
+def user_contents(contents):
+    """문자열/Content dict/그 목록을 generateContent의 contents 목록으로 정규화"""
+    if isinstance(contents, str):
+        return [{"role": "user", "parts": [{"text": contents}]}]
+    if isinstance(contents, dict):
+        return [contents]
+    return [{"role": "user", "parts": [{"text": item}]} if isinstance(item, str) else item for item in contents]
+
+def camel_case(key):
+    head, *rest = key.split("_")
+    return head + "".join(word.title() for word in rest)
+
+def rest_config(config):
+    """generation_config(dict 또는 to_dict가 있는 객체)의 키를 REST 형식(camelCase)으로 변환"""
+    if config is None:
+        return None
+    if hasattr(config, "to_dict"):
+        config = config.to_dict()
+    return {camel_case(key): value for key, value in config.items()}
+
+def error_of(status, body):
+    """오류 응답 본문의 {"error": {...}}에서 RestError 생성"""
+    try:
+        error = json.loads(body).get("error") or {}
+    except ValueError:
+        error = {}
+    return RestError(status, error.get("status", "UNKNOWN"), error.get("message") or body[:200].decode("latin-1"))
+
+def metadata_token(timeout=METADATA_TIMEOUT):
+    """GCE 메타데이터 서버의 서비스 계정 토큰 - (토큰, 만료까지 초), 서버가 없으면 None"""
+    connection = http.client.HTTPConnection(METADATA_HOST, 80, timeout=timeout)
+    try:
+        connection.request("GET", METADATA_TOKEN_PATH, headers={"Metadata-Flavor": "Google"})
+        response = connection.getresponse()
+        if response.status != 200:
+            return None
+        payload = json.loads(response.read())
+        return payload["access_token"], payload.get("expires_in", 3600)
+    except (OSError, http.client.HTTPException, ValueError, KeyError):
+        return None
+    finally:
+        connection.close()
+
+def adc_token():
+    """google-auth Application Default Credentials 토큰 (설치되어 있고 성공하면) - SDK보다 가벼운 최후 수단"""
+    try:
+        import google.auth
+        from google.auth.transport.requests import Request
+    except ImportError:
+        return None
+    try:
+        credentials, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
+        credentials.refresh(Request())
+    except Exception:
+        return None
+    expiry = getattr(credentials, "expiry", None)
+    lifetime = (expiry.timestamp() - time.time()) if expiry else 3600
+    return credentials.token, lifetime
+
+def fetch_token():
+    """(토큰, 만료까지 초, 출처) - 찾지 못하면 (None, 0, None)"""
+    token = os.environ.get(TOKEN_ENV)
+    if token:
+        return token, float("inf"), TOKEN_ENV
+    for source, fetch in (("metadata server", metadata_token), ("application default credentials", adc_token)):
+        found = fetch()
+        if found:
+            return found[0], found[1], source
+    return None, 0, None
+
+class GeminiRestClient:
+    """
+    GenerativeModel 대용 - 스레드마다 keep-alive 연결 하나 (부하 테스트의 작업 스레드가 연결을 공유하지 않음)
+    api_endpoint를 지정하면(로컬 대체 서버 등) 인증 헤더 없이 호출
+    """
+
+    def __init__(self, project, location, model=DEFAULT_MODEL, api_endpoint=None, generation_config=None,
+                 timeout=60.0):
+        endpoint = urlsplit(api_endpoint if api_endpoint and "//" in api_endpoint
+                            else f"//{api_endpoint or f'{location}-aiplatform.googleapis.com'}")
+        self.secure = endpoint.scheme != "http"
+        self.host = endpoint.hostname
+        self.port = endpoint.port or (443 if self.secure else 80)
+        self.anonymous = bool(api_endpoint)
+        self.timeout = timeout
+        self.path = f"/v1/projects/{project}/locations/{location}/publishers/google/models/{model}"
+        # CassetteModel이 키를 만들 때 읽는 GenerativeModel 속성 이름
+        self._model_name = model
+        self._generation_config = generation_config
+        self.token = None
+        self.token_source = None
+        self._token_expiry = 0.0
+        self._token_lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+
+    @property
+    def endpoint(self):
+        return f"{'https' if self.secure else 'http'}://{self.host}:{self.port}"
+
+    def authenticate(self):
+        """액세스 토큰을 가져오고 출처 반환 (api_endpoint 대상은 None) - 실패하면 RuntimeError"""
+        if self.anonymous:
+            return None
+        with self._token_lock:
+            if self.token is None or time.monotonic() >= self._token_expiry:
+                token, lifetime, source = fetch_token()
+                if token is None:
+                    raise RuntimeError(f"no access token: set {TOKEN_ENV}, run on GCE, or install google-auth")
+                self.token, self.token_source = token, source
+                self._token_expiry = time.monotonic() + max(lifetime - TOKEN_REFRESH_MARGIN, 0)
+        return self.token_source
+
+    def connection(self, fresh=False):
+        """현재 스레드의 keep-alive 연결 (없거나 fresh면 새로 생성)"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or fresh:
+            if connection is not None:
+                connection.close()
+            factory = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+            connection = factory(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+            self._connections.append(connection)
+        return connection
+
+    def connect(self):
+        """현재 스레드의 연결을 미리 열고 걸린 시간(초) 반환 (TCP + TLS)"""
+        start = time.perf_counter()
+        self.connection(fresh=True).connect()
+        return time.perf_counter() - start
+
+    def _headers(self):
+        headers = {"Content-Type": "application/json"}
+        if not self.anonymous:
+            self.authenticate()
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    def _post(self, path, body):
+        """요청을 보내고 응답 헤더까지 받은 HTTPResponse 반환 - 오류 상태면 본문을 읽고 RestError"""
+        headers = self._headers()
+        connection = self.connection()
+        reused = connection.sock is not None
+        try:
+            connection.request("POST", path, body=body, headers=headers)
+            response = connection.getresponse()
+        except STALE_CONNECTION_ERRORS:
+            if not reused:
+                raise
+            connection = self.connection(fresh=True)
+            connection.request("POST", path, body=body, headers=headers)
+            response = connection.getresponse()
+        if response.status != 200:
+            raise error_of(response.status, response.read())
+        return response
+
+    def _body(self, contents, generation_config):
+        request = {"contents": user_contents(contents)}
+        config = rest_config(generation_config if generation_config is not None else self._generation_config)
+        if config:
+            request["generationConfig"] = config
+        return json.dumps(request).encode()
+
+    def generate_content(self, contents, generation_config=None, stream=False):
+        """GenerativeModel.generate_content와 같은 호출 형태 - stream이면 청크 생성기"""
+        body = self._body(contents, generation_config)
+        if stream:
+            return self._stream(body)
+        response = self._post(f"{self.path}:generateContent", body)
+        return RestResponse(json.loads(response.read()))
+
+    def _stream(self, body):
+        """streamGenerateContent?alt=sse - 'data: {...}' 줄마다 청크 하나"""
+        response = self._post(f"{self.path}:streamGenerateContent?alt=sse", body)
+        while True:
+            line = response.readline()
+            if not line:
+                break
+            if line.startswith(b"data:"):
+                yield RestResponse(json.loads(line[5:]))
+
+    def start_chat(self, history=None):
+        return RestChat(self, list(history or []))
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+        self._local = threading.local()
+
+class RestChat:
+    """ChatSession 대용 - 매 턴 전체 기록과 새 메시지를 generateContent로 전송"""
+
+    def __init__(self, client, history):
+        self.client = client
+        self.history = history
+
+    def send_message(self, content, generation_config=None, stream=False):
+        message = user_contents(content)
+        contents = self.history + message
+        if stream:
+            return self._track_stream(message, self.client.generate_content(contents, generation_config, True))
+        response = self.client.generate_content(contents, generation_config)
+        self.history = contents + [{"role": "model", "parts": [{"text": response.text}]}]
+        return response
+
+    def _track_stream(self, message, chunks):
+        parts = []
+        for chunk in chunks:
+            try:
+                parts.append(chunk.text)
+            except ValueError:
+                pass
+            yield chunk
+        self.history = self.history + message + [{"role": "model", "parts": [{"text": "".join(parts)}]}]
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+gemini_startup_bench.py - 1_test_gemini_api.py 콜드 스타트 벤치마크
+매번 새 인터프리터로 스크립트를 실행하여 프로세스 시작부터 첫 generateContent 요청이 로컬 대체 서버
+(vertex_standin.py)에 도착하기까지의 시간을 측정하고, --rest(표준 라이브러리 클라이언트)와 Vertex AI SDK 경로를 비교
+-X importtime으로 첫 요청 전에 가장 오래 걸린 import도 출력
+
+사용 예:
+    python3 gemini_startup_bench.py --runs 10
+    python3 gemini_startup_bench.py --sdk      # SDK 경로도 측정 (google-cloud-aiplatform 필요)
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+import subprocess
+
+from gemini_load import percentile
+from vertex_standin import MAX_HEADER_BYTES, StandInConfig, VertexStandIn
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1_test_gemini_api.py")
+DEFAULT_BUDGET = 0.5
+
+class ArrivalStandIn(VertexStandIn):
+    """요청 도착 시각(time.time())을 기록하는 대체 서버 - 다른 프로세스의 시작 시각과 비교"""
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.arrivals = []
+
+    async def dispatch(self, writer, method, target, body, keep_alive, delay):
+        self.arrivals.append(time.time())
+        return await super().dispatch(writer, method, target, body, keep_alive, delay)
+
+def start_background_standin(config):
+    """별도 스레드의 이벤트 루프에서 대체 서버 실행 - (ArrivalStandIn, 포트)"""
+    standin = ArrivalStandIn(config)
+    ready = threading.Event()
+    port = []
+
+    async def serve():
+        server = await asyncio.start_server(standin.handle, "127.0.0.1", 0, limit=MAX_HEADER_BYTES)
+        port.append(server.sockets[0].getsockname()[1])
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    ready.wait()
+    return standin, port[0]
+
+def run_once(standin, command, timeout):
+    """명령을 한 번 실행 - 시작부터 첫 요청 도착, 종료까지의 시간(초)"""
+    seen = len(standin.arrivals)
+    started = time.time()
+    process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout)
+    ended = time.time()
+    arrivals = standin.arrivals[seen:]
+    return {
+        "first_request": arrivals[0] - started if arrivals else None,
+        "exit": ended - started,
+        "requests": len(arrivals),
+        "returncode": process.returncode,
+    }
+
+def import_profile(command, top=8):
+    """-X importtime으로 실행하여 누적 시간이 긴 최상위 import 목록 [(초, 모듈)]"""
+    process = subprocess.run([command[0], "-X", "importtime"] + command[1:], stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # 들여쓰기 없는 이름이 스크립트가 직접 import한 모듈
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            imports.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+def bench_mode(standin, command, runs, timeout):
+    results = [run_once(standin, command, timeout) for _ in range(runs)]
+    firsts = sorted(result["first_request"] for result in results if result["first_request"] is not None)
+    exits = sorted(result["exit"] for result in results)
+    return {
+        "runs": results,
+        "first_request": {"p50": percentile(firsts, 50), "min": firsts[0], "max": firsts[-1]} if firsts else None,
+        "exit_p50": percentile(exits, 50),
+        "returncodes": sorted({result["returncode"] for result in results}),
+    }
+
+def print_mode(name, summary, budget):
+    first = summary["first_request"]
+    if first is None:
+        print(f"  {name:<6} no request reached the stand-in (exit codes {summary['returncodes']})")
+        return
+    verdict = "within" if first["p50"] <= budget else "OVER"
+    print(f"  {name:<6} first request p50 {first['p50'] * 1000:7.1f} ms (min {first['min'] * 1000:.1f}, "
+          f"max {first['max'] * 1000:.1f}), exit p50 {summary['exit_p50'] * 1000:.0f} ms  "
+          f"[{verdict} {budget * 1000:.0f} ms budget]")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start time of 1_test_gemini_api.py to its first request")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts per mode (default: 5)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET,
+                        help="seconds allowed from process start to first request (default: 0.5)")
+    parser.add_argument("--sdk", action="store_true", help="also measure the Vertex AI SDK path")
+    parser.add_argument("--stream", action="store_true", help="benchmark the streaming generation path")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds before a run is abandoned")
+    args = parser.parse_args(argv)
+
+    standin, port = start_background_standin(StandInConfig(service_time=0.0, jitter=0.0))
+    endpoint = f"http://127.0.0.1:{port}"
+    base = [sys.executable, SCRIPT, "--api-endpoint", endpoint] + (["--stream"] if args.stream else [])
+    modes = [("rest", base + ["--rest"])] + ([("sdk", base)] if args.sdk else [])
+
+    print(f"Cold start to first generateContent request ({args.runs} runs per mode, stand-in at {endpoint})")
+    summaries = {}
+    for name, command in modes:
+        summaries[name] = bench_mode(standin, command, args.runs, args.timeout)
+        print_mode(name, summaries[name], args.budget)
+    print("  Slowest imports on the REST path:")
+    for seconds, module in import_profile(modes[0][1]):
+        print(f"    {seconds * 1000:7.1f} ms  {module}")
+
+    first = summaries["rest"]["first_request"]
+    return 0 if first and first["p50"] <= args.budget else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+gemini_stream.py - Gemini 스트리밍 응답 타이밍 측정 모듈
+stream=True 응답에서 첫 토큰까지의 시간(TTFT), 청크 간 간격, 전체 시간을 기록
+"""
+
+import time
+
+from gemini_load import percentile
+
+# 청크 간격 히스토그램 구간 (밀리초 상한)
+HISTOGRAM_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500]
+
+def time_stream(generate, prompt):
+    """generate(prompt, stream=True)의 청크 도착 시각을 기록하여 타이밍 정보 반환"""
+    start = time.perf_counter()
+    offsets = []
+    parts = []
+    for chunk in generate(prompt, stream=True):
+        offsets.append(time.perf_counter() - start)
+        try:
+            parts.append(chunk.text)
+        except ValueError:
+            # 안전 필터 등으로 텍스트가 없는 청크
+            pass
+    total = time.perf_counter() - start
+
+    gaps = [later - earlier for earlier, later in zip(offsets, offsets[1:])]
+    return {
+        "ttft": offsets[0] if offsets else total,
+        "total": total,
+        "chunks": len(offsets),
+        "offsets": offsets,
+        "gaps": gaps,
+        "text": "".join(parts),
+    }
+
+def bucket_counts(values_ms, buckets=HISTOGRAM_BUCKETS_MS):
+    """밀리초 값들을 구간별 개수로 집계 (마지막 구간은 상한 초과)"""
+    counts = [0] * (len(buckets) + 1)
+    for value in values_ms:
+        for i, bound in enumerate(buckets):
+            if value < bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    return counts
+
+def print_stream_timing(timing, width=40):
+    """TTFT/청크 간격 요약과 청크 간격 히스토그램 출력"""
+    gaps = sorted(timing["gaps"])
+    print(f"   Time to first token: {timing['ttft'] * 1000:.0f} ms")
+    print(f"   Total stream time: {timing['total'] * 1000:.0f} ms over {timing['chunks']} chunks")
+    if not gaps:
+        return
+    print(f"   Inter-chunk gap p50/p90/max: {percentile(gaps, 50) * 1000:.0f} / "
+          f"{percentile(gaps, 90) * 1000:.0f} / {gaps[-1] * 1000:.0f} ms")
+
+    counts = bucket_counts([gap * 1000 for gap in gaps])
+    peak = max(counts) or 1
+    labels = []
+    lower = 0
+    for bound in HISTOGRAM_BUCKETS_MS:
+        labels.append(f"{lower}-{bound} ms")
+        lower = bound
+    labels.append(f">{lower} ms")
+
+    print("   Inter-chunk gap histogram:")
+    for label, count in zip(labels, counts):
+        bar = "#" * max(1 if count else 0, round(count * width / peak))
+        print(f"   {label:>14} | {bar + ' ' if bar else ''}{count}")
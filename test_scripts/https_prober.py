@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+https_prober.py - HTTPS 연결 단계별 타이밍 측정 모듈
+DNS, TCP 연결, TLS 핸드셰이크, 첫 바이트(TTFB), 본문 전송 시간을 따로 측정하고
+연결 풀로 재사용(warm), TLS 세션 재개(resumed), 새 연결(cold)의 비용을 비교
+"""
+
+import ssl
+import sys
+import time
+import socket
+import argparse
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+from gemini_load import percentile
+from path_prober import PGA_VIPS
+
+DEFAULT_HOST = "us-central1-aiplatform.googleapis.com"
+DEFAULT_PATH = "/v1/projects"
+PHASES = ["dns", "tcp", "tls", "ttfb", "transfer", "total"]
+
+class TimedHTTPSConnection(http.client.HTTPSConnection):
+    """
+    지정한 IP로 연결하면서 SNI/Host는 원래 호스트 이름을 사용하는 HTTPS 연결
+    connect() 단계의 TCP/TLS 소요 시간을 기록
+    """
+
+    def __init__(self, host, address, port=443, timeout=10.0, context=None, session=None):
+        super().__init__(host, port, timeout=timeout, context=context)
+        self.address = address
+        self.session = session
+        self.tcp_time = 0.0
+        self.tls_time = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        sock = socket.create_connection((self.address, self.port), self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connected = time.perf_counter()
+        self.sock = self._context.wrap_socket(sock, server_hostname=self.host, session=self.session)
+        self.tcp_time = connected - start
+        self.tls_time = time.perf_counter() - connected
+
+class ConnectionPool:
+    """(주소, 호스트)별 유휴 keep-alive 연결 풀"""
+
+    def __init__(self, context=None, timeout=10.0):
+        self.context = context or ssl.create_default_context()
+        self.context.set_alpn_protocols(["http/1.1"])
+        self.timeout = timeout
+        self._idle = {}
+        self._sessions = {}
+
+    def acquire(self, host, address, port=443, fresh=False, resume=False):
+        """유휴 연결 반환 - 없거나 fresh면 새 연결 (resume이면 이전 TLS 세션으로 재개 시도)"""
+        key = (address, host, port)
+        idle = self._idle.get(key)
+        if idle and not fresh:
+            return idle.pop(), True
+        session = self._sessions.get(key) if resume else None
+        return TimedHTTPSConnection(host, address, port, self.timeout, self.context, session), False
+
+    def release(self, conn, reusable):
+        """응답을 끝까지 읽은 연결을 풀에 반환"""
+        key = (conn.address, conn.host, conn.port)
+        if conn.sock is not None and isinstance(conn.sock, ssl.SSLSocket):
+            self._sessions[key] = conn.sock.session
+        if reusable:
+            self._idle.setdefault(key, []).append(conn)
+        else:
+            conn.close()
+
+    def close(self):
+        for connections in self._idle.values():
+            for conn in connections:
+                conn.close()
+        self._idle.clear()
+
+def resolve(host):
+    """호스트 이름 해석 시간과 IPv4 주소 목록"""
+    start = time.perf_counter()
+    infos = socket.getaddrinfo(host, 443, socket.AF_INET, socket.SOCK_STREAM)
+    return time.perf_counter() - start, list(dict.fromkeys(info[4][0] for info in infos))
+
+def timed_request(pool, host, address, path=DEFAULT_PATH, method="GET", fresh=False, resume=False, dns_time=0.0,
+                  port=443, body=None, headers=None):
+    """요청 하나를 보내고 단계별 시간(초)과 응답 정보 반환 (응답 본문은 body 키로 포함)"""
+    start = time.perf_counter()
+    conn, reused = pool.acquire(host, address, port, fresh=fresh, resume=resume)
+    try:
+        if not reused:
+            conn.connect()
+        # Connection: close 응답이면 getresponse()가 소켓을 닫으므로 TLS 정보는 미리 읽어 둠
+        tls = conn.sock
+        handshake = {
+            "resumed": bool(not reused and tls.session_reused),
+            "tls_version": tls.version(),
+            "alpn": tls.selected_alpn_protocol(),
+            "cert": tls.getpeercert(),
+        }
+        sent = time.perf_counter()
+        conn.request(method, path, body=body,
+                     headers={"Host": host, "User-Agent": "https-prober/1.0", **(headers or {})})
+        response = conn.getresponse()
+        first_byte = time.perf_counter()
+        payload = response.read()
+        done = time.perf_counter()
+    except (OSError, http.client.HTTPException):
+        conn.close()
+        raise
+
+    result = {
+        "address": address,
+        "reused": reused,
+        "resumed": handshake["resumed"],
+        "status": response.status,
+        "reason": response.reason,
+        "headers": response.getheaders()[:5],
+        "bytes": len(payload),
+        "body": payload,
+        "tls_version": handshake["tls_version"],
+        "alpn": handshake["alpn"],
+        "cert": handshake["cert"],
+        "timing": {
+            "dns": 0.0 if reused else dns_time,
+            "tcp": 0.0 if reused else conn.tcp_time,
+            "tls": 0.0 if reused else conn.tls_time,
+            "ttfb": first_byte - sent,
+            "transfer": done - first_byte,
+        },
+    }
+    result["timing"]["total"] = result["timing"]["dns"] + (done - start)
+    pool.release(conn, not response.will_close)
+    return result
+
+def probe_address(host, address, dns_time, warm_requests=5, path=DEFAULT_PATH, timeout=10.0, port=443):
+    """주소 하나에 대해 cold -> resumed -> warm x N 순서로 측정"""
+    pool = ConnectionPool(timeout=timeout)
+    try:
+        cold = timed_request(pool, host, address, path, fresh=True, dns_time=dns_time, port=port)
+        resumed = timed_request(pool, host, address, path, fresh=True, resume=True, dns_time=dns_time, port=port)
+        warm = [timed_request(pool, host, address, path, port=port) for _ in range(warm_requests)]
+        return {"address": address, "cold": cold, "resumed": resumed, "warm": warm}
+    except (OSError, http.client.HTTPException) as e:
+        return {"address": address, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        pool.close()
+
+def warm_timing(warm):
+    """warm 요청들의 단계별 p50"""
+    return {phase: percentile(sorted(r["timing"][phase] for r in warm), 50) for phase in PHASES}
+
+def probe_endpoints(host=DEFAULT_HOST, addresses=None, warm_requests=5, path=DEFAULT_PATH, timeout=10.0, port=443):
+    """여러 주소(기본: DNS 응답 주소 + PGA VIP 4개)를 동시에 측정"""
+    try:
+        dns_time, resolved = resolve(host)
+    except socket.gaierror:
+        dns_time, resolved = 0.0, []
+    addresses = addresses or list(dict.fromkeys(resolved + PGA_VIPS))
+    with ThreadPoolExecutor(max_workers=len(addresses)) as pool:
+        results = list(pool.map(lambda address: probe_address(host, address, dns_time, warm_requests,
+                                                              path, timeout, port), addresses))
+    return {"host": host, "dns_time": dns_time, "resolved": resolved, "results": results}
+
+def print_probe_report(report):
+    """주소별 cold/resumed/warm 단계별 시간 표 출력"""
+    print(f"Host: {report['host']} (DNS {report['dns_time'] * 1000:.1f} ms -> "
+          f"{', '.join(report['resolved']) or 'unresolved'})")
+    header = "".join(f"{phase:>10}" for phase in PHASES)
+    for result in report["results"]:
+        print(f"\n{result['address']}:")
+        if "error" in result:
+            print(f"  ✗ {result['error']}")
+            continue
+        cold = result["cold"]
+        print(f"  HTTP {cold['status']} {cold['reason']}, {cold['tls_version']}, ALPN {cold['alpn'] or '-'}, "
+              f"session resumed: {'yes' if result['resumed']['resumed'] else 'no'}")
+        print(f"  {'(ms)':<10}{header}")
+        rows = [("cold", cold["timing"]), ("resumed", result["resumed"]["timing"])]
+        if result["warm"]:
+            rows.append(("warm p50", warm_timing(result["warm"])))
+        for label, timing in rows:
+            print(f"  {label:<10}" + "".join(f"{timing[phase] * 1000:>10.1f}" for phase in PHASES))
+        if result["warm"]:
+            saved = cold["timing"]["total"] - warm_timing(result["warm"])["total"]
+            print(f"  Connection reuse saves {saved * 1000:.1f} ms per request "
+                  f"({saved / cold['timing']['total'] * 100:.0f}% of a cold request)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTPS phase timing over the private Google API VIPs")
+    parser.add_argument("addresses", nargs="*", help="IPv4 addresses to connect to (default: resolved addresses + PGA VIPs)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"TLS SNI / Host header (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=443)
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    parser.add_argument("--warm", type=int, default=5, help="requests on the reused connection (default: 5)")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    report = probe_endpoints(args.host, args.addresses or None, args.warm, args.path, args.timeout, args.port)
+    print_probe_report(report)
+    return 0 if all("error" not in result for result in report["results"]) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
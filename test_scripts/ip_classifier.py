@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+ip_classifier.py - CIDR 기반 IP 주소 역할 분류 모듈
+Terraform 구성의 주소 대역(PGA VIP, VPC/서브넷, BGP 링크 로컬, IAP 등)을 한 번 정렬된 구간 표로
+만들어 두고, 각 IP를 가장 구체적인(최장 접두사) 대역의 역할로 O(log n)에 분류
+"""
+
+import sys
+import json
+import bisect
+import socket
+import argparse
+import ipaddress
+import subprocess
+from collections import Counter, namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Classification = namedtuple("Classification", ["role", "network", "private"])
+
+# (CIDR, 역할, 비공개 경로 여부) - 겹치는 대역은 최장 접두사가 우선
+DEFAULT_RANGES = [
+    # Private Google Access (dns.tf의 private.googleapis.com, vpn.tf의 BGP 광고 대역)
+    ("199.36.153.8/30", "private_google_access", True),
+    ("199.36.153.4/30", "restricted_google_access", True),
+    ("199.36.153.0/24", "google_api_vip_range", True),
+    ("199.36.154.0/23", "google_api_vip_range", True),
+    # variables.tf 기본값의 VPC/서브넷
+    ("10.0.0.0/16", "dev_vpc", True),
+    ("10.0.1.0/24", "dev_subnet", True),
+    ("10.1.0.0/16", "prod_vpc", True),
+    ("10.1.1.0/24", "prod_subnet", True),
+    # vpn.tf의 Cloud Router BGP 인터페이스
+    ("169.254.0.0/30", "bgp_tunnel1", True),
+    ("169.254.1.0/30", "bgp_tunnel2", True),
+    ("169.254.169.254/32", "metadata_server", True),
+    ("169.254.0.0/16", "link_local", True),
+    # firewall.tf의 Google 관리 대역
+    ("35.235.240.0/20", "iap_tcp_forwarding", False),
+    ("35.191.0.0/16", "health_check", False),
+    ("130.211.0.0/22", "health_check", False),
+    # RFC 1918 / RFC 6598 / 루프백
+    ("10.0.0.0/8", "rfc1918", True),
+    ("172.16.0.0/12", "rfc1918", True),
+    ("192.168.0.0/16", "rfc1918", True),
+    ("100.64.0.0/10", "shared_address_space", True),
+    ("127.0.0.0/8", "loopback", True),
+]
+
+PUBLIC = Classification("public", None, False)
+
+# terraform output 이름 -> 역할
+TERRAFORM_OUTPUT_ROLES = {
+    "dev_subnet_cidr": "dev_subnet",
+    "prod_subnet_cidr": "prod_subnet",
+}
+
+class IpClassifier:
+    """겹치는 CIDR 목록을 서로소 구간으로 펼친 정렬 표 기반 분류기"""
+
+    def __init__(self, ranges=DEFAULT_RANGES):
+        networks = []
+        for index, (cidr, role, private) in enumerate(ranges):
+            network = ipaddress.ip_network(cidr, strict=False)
+            if network.version != 4:
+                continue
+            # 접두사 길이가 같으면 목록에서 뒤에 오는 대역 (예: VPC와 같은 CIDR의 서브넷)
+            networks.append((int(network.network_address), int(network.broadcast_address),
+                             (network.prefixlen, index), Classification(role, str(network), private)))
+
+        # 모든 경계에서 구간을 나누고, 각 구간에 가장 구체적인 대역을 배정
+        bounds = sorted({0, 1 << 32} | {start for start, _, _, _ in networks}
+                        | {end + 1 for _, end, _, _ in networks})
+        self.starts = []
+        self.labels = []
+        for lower, upper in zip(bounds, bounds[1:]):
+            covering = [(prefixlen, label) for start, end, prefixlen, label in networks
+                        if start <= lower and upper - 1 <= end]
+            label = max(covering, key=lambda item: item[0])[1] if covering else PUBLIC
+            if self.labels and self.labels[-1] == label:
+                continue
+            self.starts.append(lower)
+            self.labels.append(label)
+        self._np_starts = np.array(self.starts, dtype=np.uint64) if np is not None else None
+
+    @classmethod
+    def from_terraform_output(cls, directory=".", ranges=DEFAULT_RANGES):
+        """'terraform output -json'의 서브넷 CIDR로 기본 대역을 대체"""
+        result = subprocess.run(["terraform", f"-chdir={directory}", "output", "-json"],
+                                capture_output=True, text=True, timeout=60)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or "terraform output failed")
+        outputs = json.loads(result.stdout)
+        overrides = {role: outputs[name]["value"] for name, role in TERRAFORM_OUTPUT_ROLES.items()
+                     if name in outputs}
+        ranges = [(overrides.get(role, cidr), role, private) for cidr, role, private in ranges]
+        return cls(ranges)
+
+    def classify(self, ip):
+        """IP 주소 하나 분류 - IPv6나 잘못된 주소는 public으로 간주"""
+        try:
+            value = int(ipaddress.IPv4Address(ip))
+        except ValueError:
+            return PUBLIC
+        return self.labels[bisect.bisect_right(self.starts, value) - 1]
+
+    def classify_ints(self, values):
+        """정수 IPv4 주소 배열을 구간 인덱스 배열로 변환 (NumPy 필요)"""
+        return np.searchsorted(self._np_starts, np.asarray(values, dtype=np.uint64), side="right") - 1
+
+    def classify_many(self, ips):
+        """IP 문자열 목록을 일괄 분류"""
+        if np is None:
+            return [self.classify(ip) for ip in ips]
+        values = []
+        invalid = []
+        for i, ip in enumerate(ips):
+            try:
+                values.append(int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big"))
+            except OSError:
+                values.append(0)
+                invalid.append(i)
+        indexes = self.classify_ints(values)
+        labels = [self.labels[index] for index in indexes.tolist()]
+        for i in invalid:
+            labels[i] = PUBLIC
+        return labels
+
+    def role_counts(self, ips):
+        """역할별 주소 개수"""
+        return Counter(label.role for label in self.classify_many(ips))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classify IPv4 addresses by their role in the hybrid network")
+    parser.add_argument("ips", nargs="*", help="addresses to classify")
+    parser.add_argument("--file", help="read addresses from a file, one per line ('-' for stdin)")
+    parser.add_argument("--terraform-dir", help="take subnet CIDRs from 'terraform output' in this directory")
+    args = parser.parse_args(argv)
+
+    classifier = (IpClassifier.from_terraform_output(args.terraform_dir)
+                  if args.terraform_dir else IpClassifier())
+
+    for ip in args.ips:
+        label = classifier.classify(ip)
+        path = "private" if label.private else "public"
+        print(f"{ip:<16} {label.role:<26} {label.network or '-':<20} {path}")
+
+    if args.file:
+        stream = sys.stdin if args.file == "-" else open(args.file)
+        with stream:
+            ips = [line.split()[0] for line in stream if line.strip()]
+        counts = classifier.role_counts(ips)
+        print(f"\n{len(ips)} addresses:")
+        for role, count in counts.most_common():
+            print(f"  {role:<26} {count}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+netinfo.py - 프로세스 내부 네트워크 상태 조회 모듈
+ip/iptables 명령을 실행하지 않고 rtnetlink 또는 /proc/net, /sys/class/net에서 직접
+링크, 주소, 라우팅 테이블을 읽어 타입이 있는 객체로 반환
+"""
+
+import os
+import socket
+import struct
+import ipaddress
+from dataclasses import dataclass, field
+
+# netlink 메시지 타입/플래그 (linux/netlink.h, linux/rtnetlink.h)
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+RTM_GETLINK = 18
+RTM_GETADDR = 22
+RTM_GETROUTE = 26
+
+IFLA_IFNAME = 3
+IFLA_MTU = 4
+IFLA_OPERSTATE = 16
+IFLA_LINKINFO = 18
+IFLA_INFO_KIND = 1
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_LABEL = 3
+RTA_DST = 1
+RTA_OIF = 4
+RTA_GATEWAY = 5
+RTA_PRIORITY = 6
+RTA_PREFSRC = 7
+RTA_TABLE = 15
+
+RT_TABLE_MAIN = 254
+RTN_UNICAST = 1
+IFF_UP = 0x1
+RTF_UP = 0x1
+RTF_GATEWAY = 0x2
+
+NLMSGHDR = struct.Struct("=IHHII")
+RTATTR = struct.Struct("=HH")
+IFINFOMSG = struct.Struct("=BxHiII")
+IFADDRMSG = struct.Struct("=BBBBI")
+RTMSG = struct.Struct("=BBBBBBBBI")
+
+OPERSTATES = ["unknown", "notpresent", "down", "lowerlayerdown", "testing", "dormant", "up"]
+
+# VPN 터널로 간주하는 링크 종류와 이름 접두사
+VPN_LINK_KINDS = {"vti", "vti6", "xfrm", "wireguard", "ipip", "gre", "gretap", "sit", "tun"}
+VPN_NAME_PREFIXES = ("tun", "vpn", "vti", "wg", "ipsec", "xfrm")
+
+class NetinfoUnavailable(OSError):
+    """rtnetlink와 procfs 모두 사용할 수 없는 환경"""
+
+@dataclass
+class Link:
+    index: int
+    name: str
+    kind: str = ""
+    mtu: int = 0
+    operstate: str = "unknown"
+    up: bool = False
+
+    @property
+    def is_vpn(self):
+        return self.kind in VPN_LINK_KINDS or self.name.startswith(VPN_NAME_PREFIXES)
+
+@dataclass
+class Address:
+    ifindex: int
+    ifname: str
+    address: ipaddress.IPv4Address
+    prefixlen: int
+
+    @property
+    def interface(self):
+        return ipaddress.ip_interface(f"{self.address}/{self.prefixlen}")
+
+@dataclass
+class Route:
+    destination: ipaddress.IPv4Network
+    ifname: str = ""
+    gateway: ipaddress.IPv4Address = None
+    metric: int = 0
+    table: int = RT_TABLE_MAIN
+    prefsrc: ipaddress.IPv4Address = None
+
+    def describe(self):
+        """'ip route show' 형식의 한 줄 문자열"""
+        dst = "default" if self.destination.prefixlen == 0 else str(self.destination)
+        parts = [dst]
+        if self.gateway:
+            parts += ["via", str(self.gateway)]
+        if self.ifname:
+            parts += ["dev", self.ifname]
+        if self.prefsrc:
+            parts += ["src", str(self.prefsrc)]
+        if self.metric:
+            parts += ["metric", str(self.metric)]
+        return " ".join(parts)
+
+@dataclass
+class NetSnapshot:
+    """한 시점의 링크/주소/라우트 상태"""
+    source: str
+    links: list = field(default_factory=list)
+    addresses: list = field(default_factory=list)
+    routes: list = field(default_factory=list)
+
+    def link(self, name):
+        for link in self.links:
+            if link.name == name:
+                return link
+        return None
+
+    def route_get(self, ip):
+        """
+        목적지 주소에 대한 최장 접두사 일치 라우트 (같은 길이면 metric이 낮은 것)
+        정책 라우팅(ip rule)은 고려하지 않음
+        """
+        ip = ipaddress.ip_address(ip)
+        best = None
+        for route in self.routes:
+            if route.table != RT_TABLE_MAIN or ip not in route.destination:
+                continue
+            if (best is None or route.destination.prefixlen > best.destination.prefixlen
+                    or (route.destination.prefixlen == best.destination.prefixlen
+                        and route.metric < best.metric)):
+                best = route
+        return best
+
+    def vpn_links(self):
+        return [link for link in self.links if link.is_vpn]
+
+def _attributes(data, offset, end):
+    """rtattr 목록을 {type: bytes}로 변환"""
+    attrs = {}
+    while offset + RTATTR.size <= end:
+        length, kind = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        attrs[kind & 0x3FFF] = data[offset + RTATTR.size:offset + length]
+        offset += (length + 3) & ~3
+    return attrs
+
+def _cstring(value):
+    return value.split(b"\0", 1)[0].decode(errors="replace")
+
+def _netlink_dump(sock, msg_type, payload, seq):
+    """dump 요청을 보내고 (메시지 타입, 본문) 목록 수신"""
+    header = NLMSGHDR.pack(NLMSGHDR.size + len(payload), msg_type, NLM_F_REQUEST | NLM_F_DUMP, seq, 0)
+    sock.send(header + payload)
+    messages = []
+    while True:
+        data = sock.recv(1 << 16)
+        offset = 0
+        while offset + NLMSGHDR.size <= len(data):
+            length, kind, _, msg_seq, _ = NLMSGHDR.unpack_from(data, offset)
+            if length < NLMSGHDR.size:
+                return messages
+            body = data[offset + NLMSGHDR.size:offset + length]
+            offset += (length + 3) & ~3
+            if msg_seq != seq:
+                continue
+            if kind == NLMSG_DONE:
+                return messages
+            if kind == NLMSG_ERROR:
+                errno = struct.unpack_from("=i", body)[0]
+                if errno:
+                    raise OSError(-errno, os.strerror(-errno))
+                return messages
+            messages.append(body)
+
+def read_rtnetlink():
+    """rtnetlink dump로 링크/IPv4 주소/IPv4 라우트 조회"""
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    try:
+        sock.bind((0, 0))
+        snapshot = NetSnapshot(source="rtnetlink")
+
+        for body in _netlink_dump(sock, RTM_GETLINK, IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0), 1):
+            _, _, index, flags, _ = IFINFOMSG.unpack_from(body)
+            attrs = _attributes(body, IFINFOMSG.size, len(body))
+            kind = ""
+            if IFLA_LINKINFO in attrs:
+                info = _attributes(attrs[IFLA_LINKINFO], 0, len(attrs[IFLA_LINKINFO]))
+                kind = _cstring(info.get(IFLA_INFO_KIND, b""))
+            operstate = attrs.get(IFLA_OPERSTATE, b"\0")[0]
+            snapshot.links.append(Link(
+                index=index,
+                name=_cstring(attrs.get(IFLA_IFNAME, b"")),
+                kind=kind,
+                mtu=struct.unpack("=I", attrs[IFLA_MTU])[0] if IFLA_MTU in attrs else 0,
+                operstate=OPERSTATES[operstate] if operstate < len(OPERSTATES) else "unknown",
+                up=bool(flags & IFF_UP),
+            ))
+        names = {link.index: link.name for link in snapshot.links}
+
+        for body in _netlink_dump(sock, RTM_GETADDR, IFADDRMSG.pack(socket.AF_INET, 0, 0, 0, 0), 2):
+            family, prefixlen, _, _, index = IFADDRMSG.unpack_from(body)
+            if family != socket.AF_INET:
+                continue
+            attrs = _attributes(body, IFADDRMSG.size, len(body))
+            raw = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+            if not raw:
+                continue
+            snapshot.addresses.append(Address(
+                ifindex=index,
+                ifname=_cstring(attrs[IFA_LABEL]) if IFA_LABEL in attrs else names.get(index, ""),
+                address=ipaddress.IPv4Address(raw),
+                prefixlen=prefixlen,
+            ))
+
+        for body in _netlink_dump(sock, RTM_GETROUTE, RTMSG.pack(socket.AF_INET, 0, 0, 0, 0, 0, 0, 0, 0), 3):
+            family, dst_len, _, _, table, _, _, route_type, _ = RTMSG.unpack_from(body)
+            if family != socket.AF_INET or route_type != RTN_UNICAST:
+                continue
+            attrs = _attributes(body, RTMSG.size, len(body))
+            if RTA_TABLE in attrs:
+                table = struct.unpack("=I", attrs[RTA_TABLE])[0]
+            dst = ipaddress.IPv4Address(attrs[RTA_DST]) if RTA_DST in attrs else ipaddress.IPv4Address(0)
+            oif = struct.unpack("=I", attrs[RTA_OIF])[0] if RTA_OIF in attrs else 0
+            snapshot.routes.append(Route(
+                destination=ipaddress.IPv4Network(f"{dst}/{dst_len}", strict=False),
+                ifname=names.get(oif, ""),
+                gateway=ipaddress.IPv4Address(attrs[RTA_GATEWAY]) if RTA_GATEWAY in attrs else None,
+                metric=struct.unpack("=I", attrs[RTA_PRIORITY])[0] if RTA_PRIORITY in attrs else 0,
+                table=table,
+                prefsrc=ipaddress.IPv4Address(attrs[RTA_PREFSRC]) if RTA_PREFSRC in attrs else None,
+            ))
+        return snapshot
+    finally:
+        sock.close()
+
+def _hex_ipv4(value):
+    """/proc/net/route의 리틀 엔디언 16진수 주소 변환"""
+    return ipaddress.IPv4Address(struct.pack("<I", int(value, 16)))
+
+def read_procfs(proc="/proc", sys_class_net="/sys/class/net"):
+    """/proc/net/route, /proc/net/fib_trie, /sys/class/net에서 상태 조회"""
+    snapshot = NetSnapshot(source="procfs")
+
+    for name in sorted(os.listdir(sys_class_net)):
+        base = os.path.join(sys_class_net, name)
+
+        def read(attr, default=""):
+            try:
+                with open(os.path.join(base, attr)) as f:
+                    return f.read().strip()
+            except OSError:
+                return default
+
+        kind = ""
+        uevent = read("uevent")
+        for line in uevent.split("\n"):
+            if line.startswith("DEVTYPE="):
+                kind = line.split("=", 1)[1]
+        if not kind and os.path.exists(os.path.join(base, "tun_flags")):
+            kind = "tun"
+        flags = int(read("flags", "0"), 16)
+        snapshot.links.append(Link(
+            index=int(read("ifindex", "0")),
+            name=name,
+            kind=kind,
+            mtu=int(read("mtu", "0")),
+            operstate=read("operstate", "unknown"),
+            up=bool(flags & IFF_UP),
+        ))
+    indexes = {link.name: link.index for link in snapshot.links}
+
+    with open(os.path.join(proc, "net/route")) as f:
+        next(f)  # 헤더
+        for line in f:
+            fields = line.split()
+            if len(fields) < 8:
+                continue
+            ifname, dst, gateway, flags, _, _, metric, mask = fields[:8]
+            flags = int(flags, 16)
+            if not flags & RTF_UP:
+                continue
+            snapshot.routes.append(Route(
+                destination=ipaddress.IPv4Network(f"{_hex_ipv4(dst)}/{_hex_ipv4(mask)}", strict=False),
+                ifname=ifname,
+                gateway=_hex_ipv4(gateway) if flags & RTF_GATEWAY else None,
+                metric=int(metric),
+            ))
+
+    # fib_trie의 "/32 host LOCAL" 항목이 로컬 주소 - 연결된 서브넷 라우트로 인터페이스 결정
+    local = []
+    previous = None
+    with open(os.path.join(proc, "net/fib_trie")) as f:
+        for line in f:
+            text = line.strip()
+            if text.startswith("|--"):
+                previous = text[3:].strip()
+            elif text == "/32 host LOCAL" and previous:
+                local.append(ipaddress.IPv4Address(previous))
+    for address in dict.fromkeys(local):
+        connected = [route for route in snapshot.routes
+                     if route.gateway is None and route.destination.prefixlen > 0
+                     and address in route.destination]
+        connected.sort(key=lambda route: -route.destination.prefixlen)
+        if connected:
+            ifname, prefixlen = connected[0].ifname, connected[0].destination.prefixlen
+        elif address.is_loopback:
+            ifname, prefixlen = "lo", 8
+        else:
+            ifname, prefixlen = "", 32
+        snapshot.addresses.append(Address(ifindex=indexes.get(ifname, 0), ifname=ifname,
+                                          address=address, prefixlen=prefixlen))
+    return snapshot
+
+def load_snapshot():
+    """rtnetlink 우선, 실패하면 procfs로 네트워크 상태 조회"""
+    errors = []
+    for reader in (read_rtnetlink, read_procfs):
+        try:
+            return reader()
+        except (OSError, AttributeError, ValueError, StopIteration) as e:
+            errors.append(f"{reader.__name__}: {e}")
+    raise NetinfoUnavailable("; ".join(errors))
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+path_monitor.py - 비공개 경로 연속 모니터링 지원 모듈
+--watch 모드에서 잘 바뀌지 않는 검증 결과를 캐시하고, 지연 시간과 경로 분류를 롤링 윈도우로 유지
+"""
+
+import os
+import socket
+import time
+from collections import deque
+
+from gemini_load import percentile
+
+# rtnetlink 멀티캐스트 그룹 (linux/rtnetlink.h)
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+
+class NetlinkWatcher:
+    """
+    링크/주소/라우트 변경 이벤트를 구독하여 변경 세대(generation) 번호를 관리
+    netlink를 사용할 수 없는 환경에서는 매번 변경된 것으로 간주
+    """
+
+    def __init__(self):
+        self._generation = 0
+        self._sock = None
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV4_ROUTE
+                          | RTMGRP_IPV6_IFADDR | RTMGRP_IPV6_ROUTE))
+            sock.setblocking(False)
+            self._sock = sock
+        except (AttributeError, OSError):
+            pass
+
+    @property
+    def available(self):
+        return self._sock is not None
+
+    def generation(self):
+        """대기 중인 이벤트를 모두 읽고 현재 세대 번호 반환"""
+        if self._sock is None:
+            self._generation += 1
+            return self._generation
+        changed = False
+        while True:
+            try:
+                if not self._sock.recv(65536):
+                    break
+                changed = True
+            except BlockingIOError:
+                break
+            except OSError:
+                # 버퍼 넘침(ENOBUFS) 등 - 이벤트를 놓쳤으므로 변경으로 처리
+                changed = True
+                break
+        if changed:
+            self._generation += 1
+        return self._generation
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+def file_stamp(paths):
+    """파일들의 (mtime_ns, size) 튜플 - 파일이 없으면 None"""
+    stamp = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+class CachedCheck:
+    """
+    검증 함수 결과를 캐시 - 감시 파일의 mtime 또는 netlink 세대가 바뀔 때만 다시 실행
+    """
+
+    def __init__(self, func, files=(), netlink=None):
+        self.func = func
+        self.__name__ = func.__name__
+        self.files = tuple(files)
+        self.netlink = netlink
+        self.hits = 0
+        self.misses = 0
+        self._key = None
+        self._value = None
+
+    def _current_key(self):
+        generation = self.netlink.generation() if self.netlink else None
+        return (file_stamp(self.files), generation)
+
+    def __call__(self):
+        key = self._current_key()
+        if self._key is not None and key == self._key:
+            self.hits += 1
+            return self._value
+        self.misses += 1
+        self._value = self.func()
+        # 실행 도중 바뀌었을 수 있으므로 실행 전 상태를 키로 사용
+        self._key = key
+        return self._value
+
+class RollingWindow:
+    """최근 N회 실행의 단계별 소요 시간과 경로 분류를 유지"""
+
+    def __init__(self, size=60):
+        self.samples = deque(maxlen=size)
+
+    def add(self, timestamp, path, elapsed_by_check):
+        """한 회차 결과 추가 - 직전 회차와 경로 분류가 다르면 (이전, 현재) 반환"""
+        previous = self.samples[-1]["path"] if self.samples else None
+        self.samples.append({"timestamp": timestamp, "path": path, "elapsed": dict(elapsed_by_check)})
+        if previous is not None and previous != path:
+            return previous, path
+        return None
+
+    def latency_stats(self, check):
+        """단계별 롤링 p50/p90/max 소요 시간"""
+        values = sorted(sample["elapsed"][check] for sample in self.samples
+                        if check in sample["elapsed"])
+        if not values:
+            return None
+        return {"p50": percentile(values, 50), "p90": percentile(values, 90), "max": values[-1]}
+
+    def path_ratio(self, path):
+        """윈도우 안에서 특정 경로 분류가 차지하는 비율"""
+        if not self.samples:
+            return 0.0
+        return sum(1 for sample in self.samples if sample["path"] == path) / len(self.samples)
+
+def sleep_until(deadline):
+    """다음 실행 시각까지 대기 (이미 지났으면 바로 반환)"""
+    remaining = deadline - time.monotonic()
+    if remaining > 0:
+        time.sleep(remaining)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+path_prober.py - 병렬 경로 추적 모듈 (traceroute 대체)
+모든 목적지와 모든 TTL에 대한 탐침을 한 번에 보내고 ICMP 응답을 IP_RECVERR 오류 큐로 수집하여
+홉별 RTT 분포와 손실률을 약 한 번의 RTT 대기 시간 안에 측정 (root 권한 불필요, Linux 전용)
+"""
+
+import sys
+import time
+import errno
+import select
+import socket
+import struct
+import argparse
+
+from gemini_load import percentile
+from ip_classifier import IpClassifier
+
+IP_RECVERR = 11
+MSG_ERRQUEUE = 0x2000
+SO_TIMESTAMPNS = 35
+SO_EE_ORIGIN_ICMP = 2
+ICMP_DEST_UNREACH = 3
+ICMP_TIME_EXCEEDED = 11
+
+# struct sock_extended_err + 문제를 보고한 라우터의 sockaddr_in
+SOCK_EXTENDED_ERR = struct.Struct("=IBBBBII")
+
+# 커널의 첫 SYN 재전송 시각(초) - 이후 도착한 응답은 어느 SYN에 대한 것인지 알 수 없음
+TCP_SYN_RETRANSMIT = 1.0
+
+PGA_VIPS = ["199.36.153.8", "199.36.153.9", "199.36.153.10", "199.36.153.11"]
+# vpn.tf의 Prod Cloud Router BGP 인터페이스 (터널 1, 2)
+TUNNEL_PEERS = ["169.254.0.2", "169.254.1.2"]
+# PSC_IMPLEMENTATION_GUIDE.md의 PSC 엔드포인트
+PSC_ENDPOINT = "10.0.1.100"
+
+DEFAULT_TARGETS = PGA_VIPS + TUNNEL_PEERS + [PSC_ENDPOINT]
+
+class Probe:
+    """목적지/TTL/순번별 탐침 하나"""
+    __slots__ = ("target", "ttl", "index", "sock", "sent", "rtt", "address", "reached")
+
+    def __init__(self, target, ttl, index, sock):
+        self.target = target
+        self.ttl = ttl
+        self.index = index
+        self.sock = sock
+        self.sent = None
+        self.rtt = None
+        self.address = None
+        self.reached = False
+
+def _open_probe(target, ttl, mode, port):
+    """TTL이 제한된 UDP 또는 TCP SYN 탐침 소켓 생성 및 전송 - (소켓, 전송 시각) 반환"""
+    kind = socket.SOCK_DGRAM if mode == "udp" else socket.SOCK_STREAM
+    sock = socket.socket(socket.AF_INET, kind)
+    sock.setblocking(False)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+    sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+    # ICMP 수신 시각을 커널 타임스탬프로 받아 다른 탐침 전송/처리 시간이 RTT에 섞이지 않도록 함
+    sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+    if mode == "udp":
+        sock.connect((target, port))
+        sent = time.time()
+        sock.send(b"\0" * 32)
+    else:
+        sent = time.time()
+        code = sock.connect_ex((target, port))
+        if code not in (0, errno.EINPROGRESS):
+            sock.close()
+            raise OSError(code, errno.errorcode.get(code, "connect failed"))
+    return sock, sent
+
+def _read_error_queue(sock):
+    """오류 큐에서 ICMP 응답 하나를 읽어 (ICMP type, 보고 주소, 커널 수신 시각) 반환"""
+    try:
+        _, ancdata, _, _ = sock.recvmsg(512, 512, MSG_ERRQUEUE)
+    except (BlockingIOError, InterruptedError):
+        return None
+    received = None
+    answer = None
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS and len(data) >= 16:
+            seconds, nanoseconds = struct.unpack_from("=qq", data)
+            received = seconds + nanoseconds / 1e9
+            continue
+        if level != socket.IPPROTO_IP or kind != IP_RECVERR or len(data) < SOCK_EXTENDED_ERR.size + 8:
+            continue
+        _, origin, icmp_type, _, _, _, _ = SOCK_EXTENDED_ERR.unpack_from(data)
+        if origin != SO_EE_ORIGIN_ICMP:
+            continue
+        offender = socket.inet_ntoa(data[SOCK_EXTENDED_ERR.size + 4:SOCK_EXTENDED_ERR.size + 8])
+        answer = (icmp_type, offender)
+    if answer is None:
+        return None
+    return answer + (received,)
+
+def probe_paths(targets, max_hops=15, probes=3, timeout=2.0, mode="udp", port=None, interval=0.0):
+    """
+    모든 목적지의 1..max_hops TTL 탐침을 동시에 보내고 응답을 수집
+    mode="tcp"는 443 포트 SYN 탐침 (traceroute -T와 동일하게 방화벽 통과 경로 측정)
+    """
+    if port is None:
+        port = 33434 if mode == "udp" else 443
+    poller = select.poll()
+    by_fd = {}
+    all_probes = []
+    try:
+        for target in targets:
+            for ttl in range(1, max_hops + 1):
+                for index in range(probes):
+                    sock, sent = _open_probe(target, ttl, mode, port)
+                    probe = Probe(target, ttl, index, sock)
+                    probe.sent = sent
+                    by_fd[sock.fileno()] = probe
+                    all_probes.append(probe)
+                    poller.register(sock, select.POLLIN | select.POLLOUT | select.POLLERR
+                                    if mode == "tcp" else select.POLLIN | select.POLLERR)
+                    if interval:
+                        time.sleep(interval)
+
+        deadline = time.time() + timeout
+        while by_fd:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            for fd, event in poller.poll(remaining * 1000):
+                now = time.time()
+                probe = by_fd.get(fd)
+                if probe is None:
+                    continue
+                answer = _read_error_queue(probe.sock) if event & select.POLLERR else None
+                if answer:
+                    icmp_type, offender, received = answer
+                    now = received or now
+                    probe.address = offender
+                    probe.reached = icmp_type == ICMP_DEST_UNREACH
+                elif mode == "tcp" and event & (select.POLLOUT | select.POLLERR):
+                    # SYN-ACK(연결 성공) 또는 RST(ECONNREFUSED) - 목적지 도달
+                    code = probe.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if code not in (0, errno.ECONNREFUSED):
+                        continue
+                    probe.address = probe.target
+                    probe.reached = True
+                elif mode == "udp" and event & select.POLLIN:
+                    probe.address = probe.target
+                    probe.reached = True
+                else:
+                    continue
+                poller.unregister(fd)
+                del by_fd[fd]
+                probe.sock.close()
+                if mode == "tcp" and now - probe.sent >= TCP_SYN_RETRANSMIT:
+                    # 재전송된 SYN에 대한 응답 - RTT가 부정확하므로 손실로 처리
+                    probe.address = None
+                    probe.reached = False
+                    continue
+                probe.rtt = now - probe.sent
+    finally:
+        for probe in by_fd.values():
+            probe.sock.close()
+
+    return {target: summarize_target(target, [probe for probe in all_probes if probe.target == target])
+            for target in targets}
+
+def summarize_target(target, probes):
+    """탐침 결과를 TTL별 홉 요약으로 변환 - 목적지에 도달한 TTL 이후는 제외"""
+    reached_ttls = [probe.ttl for probe in probes if probe.reached and probe.address == target]
+    reached_at = min(reached_ttls) if reached_ttls else None
+    hops = []
+    for ttl in sorted({probe.ttl for probe in probes}):
+        if reached_at is not None and ttl > reached_at:
+            break
+        at_ttl = [probe for probe in probes if probe.ttl == ttl]
+        answered = [probe for probe in at_ttl if probe.rtt is not None]
+        rtts = sorted(probe.rtt * 1000 for probe in answered)
+        hops.append({
+            "ttl": ttl,
+            "addresses": sorted({probe.address for probe in answered}),
+            "sent": len(at_ttl),
+            "received": len(answered),
+            "loss": 1 - len(answered) / len(at_ttl),
+            "rtt_ms": {"min": rtts[0], "p50": percentile(rtts, 50), "max": rtts[-1]} if rtts else None,
+        })
+    # 끝부분의 무응답 홉은 생략
+    while hops and not hops[-1]["received"] and reached_at is None and len(hops) > 1:
+        if hops[-2]["received"]:
+            break
+        hops.pop()
+    return {"target": target, "reached_at": reached_at, "hops": hops}
+
+def print_paths(paths, classifier=None):
+    """목적지별 홉 표 출력"""
+    classifier = classifier or IpClassifier()
+    for target, path in paths.items():
+        label = classifier.classify(target)
+        status = f"reached at hop {path['reached_at']}" if path["reached_at"] else "not reached"
+        print(f"\n{target} ({label.role}) - {status}")
+        print(f"  {'hop':>3}  {'address':<16} {'role':<24} {'loss':>5}  rtt min/p50/max (ms)")
+        for hop in path["hops"]:
+            address = ", ".join(hop["addresses"]) or "*"
+            role = ", ".join(sorted({classifier.classify(a).role for a in hop["addresses"]})) or "-"
+            rtt = hop["rtt_ms"]
+            timing = f"{rtt['min']:.1f} / {rtt['p50']:.1f} / {rtt['max']:.1f}" if rtt else "-"
+            print(f"  {hop['ttl']:>3}  {address:<16} {role:<24} {hop['loss'] * 100:>4.0f}%  {timing}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel TTL-limited path prober for the private Google API path")
+    parser.add_argument("targets", nargs="*", help=f"IPv4 targets (default: {' '.join(DEFAULT_TARGETS)})")
+    parser.add_argument("--max-hops", type=int, default=15)
+    parser.add_argument("--probes", type=int, default=3, help="probes per hop (default: 3)")
+    parser.add_argument("--timeout", type=float, default=2.0, help="seconds to wait for replies (default: 2)")
+    parser.add_argument("--tcp", action="store_true", help="send TCP SYN probes to port 443 instead of UDP")
+    parser.add_argument("--port", type=int, help="destination port (default: 33434 for UDP, 443 for TCP)")
+    args = parser.parse_args(argv)
+
+    targets = [socket.gethostbyname(target) for target in (args.targets or DEFAULT_TARGETS)]
+    start = time.perf_counter()
+    paths = probe_paths(targets, max_hops=args.max_hops, probes=args.probes, timeout=args.timeout,
+                        mode="tcp" if args.tcp else "udp", port=args.port)
+    print_paths(paths)
+    print(f"\nProbed {len(targets)} targets x {args.max_hops} hops x {args.probes} probes "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 0 if all(path["reached_at"] for path in paths.values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+pcap_analyzer.py - 메모리 매핑 기반 pcap/pcapng 경로 분석 모듈
+캡처 파일을 mmap으로 열어 레코드 헤더만 순회하고, 패킷 필드는 고정 크기 청크 단위로 NumPy 배열에서
+바로 추출(복사 없음). 흐름별 바이트/패킷, TCP 핸드셰이크 RTT, 재전송을 집계하고 각 흐름을
+PGA VIP / PSC 엔드포인트 / VPN 터널 / 공개 인터넷 경로로 분류하여 경로별로 보고
+메모리 사용량은 청크 크기와 흐름 표 크기로 제한 (캡처 크기와 무관)
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from gemini_load import percentile
+from ip_classifier import IpClassifier, DEFAULT_RANGES
+from path_prober import PSC_ENDPOINT
+
+PCAP_MAGIC = {0xA1B2C3D4: ("<", 1e-6), 0xD4C3B2A1: (">", 1e-6),
+              0xA1B23C4D: ("<", 1e-9), 0x4D3CB2A1: (">", 1e-9)}
+PCAPNG_SHB = 0x0A0D0D0A
+PCAPNG_BYTE_ORDER = 0x1A2B3C4D
+
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LOOP = 108
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_IPV4 = 228
+LINKTYPE_LINUX_SLL2 = 276
+
+PROTO_TCP = 6
+PROTO_UDP = 17
+PROTO_ESP = 50
+TCP_SYN = 0x02
+TCP_ACK = 0x10
+# 방향별로 기억하는 최대 구멍(손실/재정렬로 건너뛴 시퀀스 구간) 수
+MAX_HOLES = 64
+
+PATHS = ["pga_vip", "psc_endpoint", "vpn_tunnel", "public_egress", "internal"]
+PATH_INDEX = {name: index for index, name in enumerate(PATHS)}
+
+# 역할 -> 경로 (우선순위가 높은 역할이 흐름의 경로를 결정)
+ROLE_PATHS = {
+    "psc_endpoint": "psc_endpoint",
+    "private_google_access": "pga_vip",
+    "restricted_google_access": "pga_vip",
+    "google_api_vip_range": "pga_vip",
+    "bgp_tunnel1": "vpn_tunnel",
+    "bgp_tunnel2": "vpn_tunnel",
+    "prod_vpc": "vpn_tunnel",
+    "prod_subnet": "vpn_tunnel",
+    "public": "public_egress",
+}
+
+def _u32(buffer, offsets):
+    """빅엔디언 uint32 필드 추출"""
+    return ((buffer[offsets].astype(np.uint64) << np.uint64(24)) | (buffer[offsets + 1].astype(np.uint64) << np.uint64(16))
+            | (buffer[offsets + 2].astype(np.uint64) << np.uint64(8)) | buffer[offsets + 3].astype(np.uint64))
+
+def _u16(buffer, offsets):
+    return (buffer[offsets].astype(np.int64) << 8) | buffer[offsets + 1].astype(np.int64)
+
+class CaptureReader:
+    """
+    pcap/pcapng 파일을 mmap으로 열고 패킷 레코드 위치를 청크 단위로 반환
+    각 청크: (타임스탬프, 데이터 오프셋, 캡처 길이, 원래 길이, 링크 타입) 배열
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.size = os.fstat(self.file.fileno()).st_size
+        if self.size < 24:
+            raise ValueError(f"{path}: not a pcap/pcapng file")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self.map, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self.map.madvise(mmap.MADV_SEQUENTIAL)
+        self.buffer = np.frombuffer(self.map, dtype=np.uint8)
+        magic = struct.unpack_from("<I", self.map, 0)[0]
+        if magic == PCAPNG_SHB:
+            self.format = "pcapng"
+        elif magic in PCAP_MAGIC:
+            self.format = "pcap"
+        else:
+            raise ValueError(f"{path}: unknown capture magic {magic:#x}")
+
+    def close(self):
+        del self.buffer
+        self.map.close()
+        self.file.close()
+
+    def _release(self, end):
+        # 처리가 끝난 페이지를 페이지 캐시에만 남기고 프로세스 상주 메모리에서 해제
+        if hasattr(self.map, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+            end -= end % mmap.PAGESIZE
+            if end > 0:
+                self.map.madvise(mmap.MADV_DONTNEED, 0, end)
+
+    def chunks(self, size=65536):
+        records = self._pcap_records() if self.format == "pcap" else self._pcapng_records()
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) == size:
+                yield self._arrays(batch)
+                self._release(batch[-1][1])
+                batch = []
+        if batch:
+            yield self._arrays(batch)
+
+    @staticmethod
+    def _arrays(batch):
+        ts, offset, caplen, origlen, linktype = zip(*batch)
+        return (np.array(ts, dtype=np.float64), np.array(offset, dtype=np.int64), np.array(caplen, dtype=np.int64),
+                np.array(origlen, dtype=np.int64), np.array(linktype, dtype=np.int64))
+
+    def _pcap_records(self):
+        magic = struct.unpack_from("<I", self.map, 0)[0]
+        order, resolution = PCAP_MAGIC[magic]
+        linktype = struct.unpack_from(order + "I", self.map, 20)[0] & 0xFFFF
+        record = struct.Struct(order + "IIII")
+        position = 24
+        end = self.size - record.size
+        while position <= end:
+            seconds, fraction, caplen, origlen = record.unpack_from(self.map, position)
+            position += record.size
+            if position + caplen > self.size:
+                break
+            yield seconds + fraction * resolution, position, caplen, origlen, linktype
+            position += caplen
+
+    def _pcapng_records(self):
+        position = 0
+        order = "<"
+        interfaces = []
+        while position + 12 <= self.size:
+            block_type = struct.unpack_from(order + "I", self.map, position)[0]
+            if block_type == PCAPNG_SHB:
+                byte_order = struct.unpack_from("<I", self.map, position + 8)[0]
+                order = "<" if byte_order == PCAPNG_BYTE_ORDER else ">"
+                interfaces = []
+            length = struct.unpack_from(order + "I", self.map, position + 4)[0]
+            if length < 12 or position + length > self.size:
+                break
+            if block_type == 1:  # Interface Description Block
+                linktype = struct.unpack_from(order + "H", self.map, position + 8)[0]
+                interfaces.append((linktype, self._tsresol(position, length, order)))
+            elif block_type == 6:  # Enhanced Packet Block
+                interface, high, low, caplen, origlen = struct.unpack_from(order + "IIIII", self.map, position + 8)
+                linktype, resolution = interfaces[interface] if interface < len(interfaces) else (LINKTYPE_ETHERNET, 1e-6)
+                yield ((high << 32) | low) * resolution, position + 28, caplen, origlen, linktype
+            elif block_type == 3:  # Simple Packet Block
+                origlen = struct.unpack_from(order + "I", self.map, position + 8)[0]
+                linktype = interfaces[0][0] if interfaces else LINKTYPE_ETHERNET
+                yield 0.0, position + 12, min(origlen, length - 16), origlen, linktype
+            position += length
+
+    def _tsresol(self, position, length, order):
+        """IDB 옵션의 if_tsresol (기본 마이크로초)"""
+        option = position + 16
+        end = position + length - 4
+        while option + 4 <= end:
+            code, size = struct.unpack_from(order + "HH", self.map, option)
+            if code == 0:
+                break
+            if code == 9 and size >= 1:
+                value = self.map[option + 4]
+                return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+            option += 4 + (size + 3) // 4 * 4
+        return 1e-6
+
+def ip_offsets(buffer, offset, caplen, linktype):
+    """링크 계층 헤더를 건너뛴 IP 헤더 위치 (IPv4가 아니면 -1)"""
+    start = np.full(len(offset), -1, dtype=np.int64)
+    size = len(buffer)
+
+    def at(index):
+        return buffer[np.minimum(index, size - 1)]
+
+    ethernet = linktype == LINKTYPE_ETHERNET
+    if ethernet.any():
+        ethertype = (at(offset + 12).astype(np.int64) << 8) | at(offset + 13)
+        vlan = ethertype == 0x8100
+        inner = (at(offset + 16).astype(np.int64) << 8) | at(offset + 17)
+        ethertype = np.where(vlan, inner, ethertype)
+        header = np.where(vlan, 18, 14)
+        start = np.where(ethernet & (ethertype == 0x0800), offset + header, start)
+    sll = linktype == LINKTYPE_LINUX_SLL
+    if sll.any():
+        protocol = (at(offset + 14).astype(np.int64) << 8) | at(offset + 15)
+        start = np.where(sll & (protocol == 0x0800), offset + 16, start)
+    sll2 = linktype == LINKTYPE_LINUX_SLL2
+    if sll2.any():
+        protocol = (at(offset).astype(np.int64) << 8) | at(offset + 1)
+        start = np.where(sll2 & (protocol == 0x0800), offset + 20, start)
+    raw = (linktype == LINKTYPE_RAW) | (linktype == LINKTYPE_IPV4)
+    start = np.where(raw, offset, start)
+    null = (linktype == LINKTYPE_NULL) | (linktype == LINKTYPE_LOOP)
+    start = np.where(null, offset + 4, start)
+
+    # IPv4 헤더(20바이트)가 캡처 범위 안에 있고 버전이 4인 패킷만
+    valid = (start >= 0) & (start + 20 <= offset + caplen)
+    valid &= (at(np.where(valid, start, 0)) >> 4) == 4
+    return np.where(valid, start, -1)
+
+def serial_diff(a, b):
+    """32비트 시퀀스 번호 a - b를 부호 있는 값으로 (RFC 1982 serial arithmetic)"""
+    return ((a - b + (1 << 31)) & 0xFFFFFFFF) - (1 << 31)
+
+def fill_holes(holes, start, end):
+    """[start, end)가 아직 보지 못한 구간과 겹치면 그 부분을 지우고 True (순서 바뀐 세그먼트)"""
+    filled = False
+    remaining = []
+    for low, high in holes:
+        if start >= high or end <= low:
+            remaining.append([low, high])
+            continue
+        filled = True
+        if low < start:
+            remaining.append([low, start])
+        if end < high:
+            remaining.append([end, high])
+    holes[:] = remaining
+    return filled
+
+class FlowTable:
+    """
+    흐름별 누적 배열 (최대 max_flows개) - 가득 차면 새 흐름은 경로별 집계에만 반영
+    방향별 상태(최대 시퀀스 끝, 아직 보지 못한 구간)는 흐름 인덱스*2+방향 위치에 저장
+    """
+
+    def __init__(self, max_flows=200_000):
+        self.max_flows = max_flows
+        self.index = {}
+        self.count = 0
+        self.keys = np.zeros((max_flows, 5), dtype=np.int64)
+        self.packets = np.zeros(max_flows, dtype=np.int64)
+        self.bytes = np.zeros(max_flows, dtype=np.int64)
+        self.first = np.full(max_flows, np.inf)
+        self.last = np.zeros(max_flows)
+        self.syn_time = np.full(max_flows, np.nan)
+        self.rtt = np.full(max_flows, np.nan)
+        self.data_segments = np.zeros(max_flows, dtype=np.int64)
+        self.retransmits = np.zeros(max_flows, dtype=np.int64)
+        self.seq_known = np.zeros(max_flows * 2, dtype=bool)
+        self.seq_max = np.zeros(max_flows * 2, dtype=np.int64)
+        self.holes = {}
+        self.untracked_packets = 0
+
+    def lookup(self, hashes, keys):
+        """흐름 해시 배열을 흐름 인덱스 배열로 변환 (새 흐름 등록, 표가 가득 차면 -1)"""
+        unique, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        indexes = np.empty(len(unique), dtype=np.int64)
+        for i, (value, row) in enumerate(zip(unique.tolist(), first.tolist())):
+            index = self.index.get(value)
+            if index is None:
+                if self.count >= self.max_flows:
+                    indexes[i] = -1
+                    continue
+                index = self.index[value] = self.count
+                self.keys[index] = keys[row]
+                self.count += 1
+            indexes[i] = index
+        return indexes[inverse]
+
+class PcapAnalyzer:
+    """청크 단위로 패킷을 처리하여 경로별/흐름별 통계 누적"""
+
+    def __init__(self, classifier=None, max_flows=200_000):
+        ranges = [(f"{PSC_ENDPOINT}/32", "psc_endpoint", True)] + list(DEFAULT_RANGES)
+        self.classifier = classifier or IpClassifier(ranges)
+        # 분류 구간 인덱스 -> (경로 인덱스, 우선순위)
+        paths = [ROLE_PATHS.get(label.role, "internal") for label in self.classifier.labels]
+        self._path_of = np.array([PATH_INDEX[path] for path in paths], dtype=np.int64)
+        priority = {"psc_endpoint": 0, "pga_vip": 1, "vpn_tunnel": 2, "public_egress": 3, "internal": 4}
+        self._rank_of = np.array([priority[path] for path in paths], dtype=np.int64)
+        self.flows = FlowTable(max_flows)
+        self.path_packets = np.zeros(len(PATHS), dtype=np.int64)
+        self.path_bytes = np.zeros(len(PATHS), dtype=np.int64)
+        self.packets = 0
+        self.non_ipv4 = 0
+        self.first = None
+        self.last = None
+
+    def classify(self, src, dst, protocol, sport, dport):
+        """패킷 배열의 경로 인덱스 - 양 끝 주소 중 우선순위가 높은 역할, ESP/IKE는 VPN 터널"""
+        src_label = self.classifier.classify_ints(src)
+        dst_label = self.classifier.classify_ints(dst)
+        path = np.where(self._rank_of[src_label] <= self._rank_of[dst_label],
+                        self._path_of[src_label], self._path_of[dst_label])
+        ike = np.isin(sport, (500, 4500)) | np.isin(dport, (500, 4500))
+        ipsec = (protocol == PROTO_ESP) | ((protocol == PROTO_UDP) & ike)
+        return np.where(ipsec, PATH_INDEX["vpn_tunnel"], path)
+
+    def process(self, buffer, ts, offset, caplen, origlen, linktype):
+        self.packets += len(ts)
+        if len(ts):
+            self.first = ts[0] if self.first is None else min(self.first, ts[0])
+            self.last = ts[-1] if self.last is None else max(self.last, ts[-1])
+        start = ip_offsets(buffer, offset, caplen, linktype)
+        ipv4 = start >= 0
+        self.non_ipv4 += int((~ipv4).sum())
+        start, ts, offset, caplen = start[ipv4], ts[ipv4], offset[ipv4], caplen[ipv4]
+        if not len(start):
+            return
+
+        end = offset + caplen
+        header = (buffer[start] & 0x0F).astype(np.int64) * 4
+        total = _u16(buffer, start + 2)
+        protocol = buffer[start + 9].astype(np.int64)
+        src = _u32(buffer, start + 12)
+        dst = _u32(buffer, start + 16)
+        l4 = start + header
+        has_ports = ((protocol == PROTO_TCP) | (protocol == PROTO_UDP)) & (l4 + 4 <= end)
+        safe = np.where(has_ports, l4, start)
+        sport = np.where(has_ports, _u16(buffer, safe), 0)
+        dport = np.where(has_ports, _u16(buffer, safe + 2), 0)
+
+        path = self.classify(src, dst, protocol, sport, dport)
+        self.path_packets += np.bincount(path, minlength=len(PATHS))
+        self.path_bytes += np.bincount(path, weights=total, minlength=len(PATHS)).astype(np.int64)
+
+        # 양방향을 하나로 묶는 정규화된 흐름 키
+        forward = (src < dst) | ((src == dst) & (sport <= dport))
+        low_ip, high_ip = np.where(forward, src, dst), np.where(forward, dst, src)
+        low_port, high_port = np.where(forward, sport, dport), np.where(forward, dport, sport)
+        hashes = (low_ip << np.uint64(32) | high_ip) * np.uint64(0x9E3779B97F4A7C15) ^ \
+            ((low_port.astype(np.uint64) << np.uint64(24)) | (high_port.astype(np.uint64) << np.uint64(8))
+             | protocol.astype(np.uint64))
+        keys = np.stack([low_ip.astype(np.int64), high_ip.astype(np.int64), low_port, high_port, protocol], axis=1)
+        flow = self.flows.lookup(hashes, keys)
+        tracked = flow >= 0
+        self.flows.untracked_packets += int((~tracked).sum())
+        f = flow[tracked]
+        np.add.at(self.flows.packets, f, 1)
+        np.add.at(self.flows.bytes, f, total[tracked])
+        np.minimum.at(self.flows.first, f, ts[tracked])
+        np.maximum.at(self.flows.last, f, ts[tracked])
+
+        tcp = tracked & (protocol == PROTO_TCP) & (l4 + 20 <= end)
+        if tcp.any():
+            self._tcp(buffer, ts[tcp], l4[tcp], total[tcp] - header[tcp], flow[tcp], (~forward[tcp]).astype(np.int64))
+
+    def _tcp(self, buffer, ts, l4, segment, flow, direction):
+        flows = self.flows
+        seq = _u32(buffer, l4 + 4).astype(np.int64)
+        flags = buffer[l4 + 13].astype(np.int64)
+        payload = segment - (buffer[l4 + 12] >> 4).astype(np.int64) * 4
+
+        # 핸드셰이크 RTT: 첫 SYN -> 반대 방향 SYN-ACK
+        syn = (flags & (TCP_SYN | TCP_ACK)) == TCP_SYN
+        for index, at in zip(flow[syn].tolist(), ts[syn].tolist()):
+            if np.isnan(flows.syn_time[index]):
+                flows.syn_time[index] = at
+        synack = (flags & (TCP_SYN | TCP_ACK)) == (TCP_SYN | TCP_ACK)
+        for index, at in zip(flow[synack].tolist(), ts[synack].tolist()):
+            if np.isnan(flows.rtt[index]) and not np.isnan(flows.syn_time[index]):
+                flows.rtt[index] = at - flows.syn_time[index]
+
+        # 방향별 기준점: SYN/SYN-ACK를 보면 ISN + 1 (SYN이 시퀀스 번호 하나를 소비)
+        handshake = (flags & TCP_SYN) != 0
+        if handshake.any():
+            sdir = flow[handshake] * 2 + direction[handshake]
+            rows = np.unique(sdir, return_index=True)[1]
+            sdir, isn = sdir[rows], seq[handshake][rows]
+            unknown = ~flows.seq_known[sdir]
+            flows.seq_max[sdir[unknown]] = isn[unknown] + 1
+            flows.seq_known[sdir[unknown]] = True
+
+        data = payload > 0
+        if not data.any():
+            return
+        seq, payload, fdir = seq[data], payload[data], flow[data] * 2 + direction[data]
+        order = np.lexsort((np.arange(len(fdir)), fdir))
+        seq, payload, fdir = seq[order], payload[order], fdir[order]
+        starts = np.concatenate([[True], fdir[1:] != fdir[:-1]])
+        group = np.cumsum(starts) - 1
+        heads = np.flatnonzero(starts)
+        head_dir = fdir[heads]
+
+        # 시퀀스 번호를 64비트로 펼침: 방향의 첫 세그먼트는 기준점에서, 나머지는 바로 앞 세그먼트에서의
+        # 부호 있는 32비트 차이(serial arithmetic)를 누적 - 기준점 아래로 재정렬된 세그먼트나 4GiB 넘는 흐름도 순서 유지
+        known = flows.seq_known[head_dir]
+        anchor = np.where(known, flows.seq_max[head_dir], seq[heads])
+        steps = serial_diff(seq, np.concatenate([[0], seq[:-1]]))
+        steps[heads] = anchor + serial_diff(seq[heads], anchor & 0xFFFFFFFF)
+        total = np.cumsum(steps)
+        before = np.concatenate([[0], total[heads[1:] - 1]])
+        start = total - before[group]
+        end = start + payload
+
+        # 방향별 누적 최댓값 (기준점 대비 상대값에 그룹 오프셋을 더해 그룹 경계를 넘지 않게 함)
+        base = anchor[group]
+        shift = group.astype(np.int64) << 42
+        running = np.maximum.accumulate(end - base + (1 << 41) + shift) - shift - (1 << 41) + base
+        # 이전 청크까지의 최댓값도 포함 (기준점을 데이터에서 잡은 방향은 첫 세그먼트 시작이 기준)
+        running = np.maximum(running, anchor[group])
+        previous = np.empty_like(running)
+        previous[1:] = running[:-1]
+        previous[heads] = anchor
+
+        # 최댓값보다 앞에서 시작하는 세그먼트는 구멍(건너뛴 구간)을 채우면 순서 바뀜, 아니면 재전송
+        # 구멍은 손실/재정렬 시에만 생기므로 해당 행만 파이썬에서 순서대로 처리
+        retransmit = np.zeros(len(fdir), dtype=bool)
+        gap, behind = start > previous, start < previous
+        for head in heads[~known].tolist():
+            # 기준점을 데이터에서 잡은 방향은 그 아래 전체가 아직 보지 못한 구간
+            flows.holes.setdefault(int(fdir[head]), []).append([-(1 << 62), int(start[head])])
+        for row in np.flatnonzero(gap | behind).tolist():
+            holes = flows.holes.setdefault(int(fdir[row]), [])
+            if gap[row]:
+                holes.append([int(previous[row]), int(start[row])])
+                del holes[:-MAX_HOLES]
+            else:
+                retransmit[row] = not fill_holes(holes, int(start[row]), int(end[row]))
+
+        f = fdir // 2
+        np.add.at(flows.data_segments, f, 1)
+        np.add.at(flows.retransmits, f, retransmit.astype(np.int64))
+        flows.seq_max[head_dir] = running[np.concatenate([heads[1:] - 1, [len(fdir) - 1]])]
+        flows.seq_known[head_dir] = True
+
+    def analyze(self, path, chunk_size=65536):
+        reader = CaptureReader(path)
+        try:
+            for ts, offset, caplen, origlen, linktype in reader.chunks(chunk_size):
+                self.process(reader.buffer, ts, offset, caplen, origlen, linktype)
+        finally:
+            reader.close()
+        return self.report()
+
+    def report(self):
+        flows = self.flows
+        count = flows.count
+        keys = flows.keys[:count]
+        flow_path = self.classify(keys[:, 0].astype(np.uint64), keys[:, 1].astype(np.uint64), keys[:, 4],
+                                  keys[:, 2], keys[:, 3])
+        paths = {}
+        for index, name in enumerate(PATHS):
+            selected = flow_path == index
+            if not self.path_packets[index] and not selected.any():
+                continue
+            rtts = sorted((flows.rtt[:count][selected] * 1000)[~np.isnan(flows.rtt[:count][selected])].tolist())
+            segments = int(flows.data_segments[:count][selected].sum())
+            retransmits = int(flows.retransmits[:count][selected].sum())
+            paths[name] = {
+                "packets": int(self.path_packets[index]),
+                "bytes": int(self.path_bytes[index]),
+                "flows": int(selected.sum()),
+                "handshake_rtt_ms": {"samples": len(rtts), "p50": percentile(rtts, 50), "p90": percentile(rtts, 90),
+                                     "max": rtts[-1]} if rtts else None,
+                "data_segments": segments,
+                "retransmits": retransmits,
+                "retransmit_rate": retransmits / segments if segments else 0.0,
+            }
+        top = np.argsort(-flows.bytes[:count])[:10]
+        return {
+            "packets": self.packets,
+            "non_ipv4": self.non_ipv4,
+            "duration": (self.last - self.first) if self.first is not None else 0.0,
+            "flows": count,
+            "untracked_packets": flows.untracked_packets,
+            "paths": paths,
+            "top_flows": [self._flow_summary(index, PATHS[flow_path[index]]) for index in top.tolist()],
+        }
+
+    def _flow_summary(self, index, path):
+        flows = self.flows
+        low, high, low_port, high_port, protocol = flows.keys[index].tolist()
+        rtt = flows.rtt[index]
+        return {
+            "flow": f"{_ip(low)}:{low_port} <-> {_ip(high)}:{high_port}/{protocol}",
+            "path": path,
+            "packets": int(flows.packets[index]),
+            "bytes": int(flows.bytes[index]),
+            "rtt_ms": None if np.isnan(rtt) else rtt * 1000,
+            "retransmits": int(flows.retransmits[index]),
+        }
+
+def _ip(value):
+    return ".".join(str((value >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+
+def print_report(report):
+    print(f"Packets: {report['packets']:,} ({report['non_ipv4']:,} non-IPv4), "
+          f"flows: {report['flows']:,}, duration: {report['duration']:.1f}s")
+    if report["untracked_packets"]:
+        print(f"  flow table full: {report['untracked_packets']:,} packets counted per path only")
+    print(f"\n  {'path':<15} {'packets':>10} {'bytes':>14} {'flows':>7}  {'hs RTT p50/p90 (ms)':>20}  retransmits")
+    for name, stats in report["paths"].items():
+        rtt = stats["handshake_rtt_ms"]
+        rtt = f"{rtt['p50']:.1f} / {rtt['p90']:.1f}" if rtt else "-"
+        print(f"  {name:<15} {stats['packets']:>10,} {stats['bytes']:>14,} {stats['flows']:>7,}  {rtt:>20}  "
+              f"{stats['retransmits']:,} ({stats['retransmit_rate'] * 100:.2f}%)")
+    if report["top_flows"]:
+        print("\nTop flows by bytes:")
+        for flow in report["top_flows"]:
+            rtt = f"{flow['rtt_ms']:.1f} ms" if flow["rtt_ms"] is not None else "-"
+            print(f"  {flow['flow']:<48} {flow['path']:<14} {flow['bytes']:>12,} B  rtt {rtt:<10} "
+                  f"retx {flow['retransmits']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a pcap/pcapng capture by network path")
+    parser.add_argument("capture", nargs="?", default="gemini_traffic.pcap")
+    parser.add_argument("--max-flows", type=int, default=200_000, help="flow table size (default: 200000)")
+    parser.add_argument("--chunk", type=int, default=65536, help="packets per processing chunk")
+    args = parser.parse_args(argv)
+    if np is None:
+        parser.error("numpy is required")
+
+    start = time.perf_counter()
+    report = PcapAnalyzer(max_flows=args.max_flows).analyze(args.capture, args.chunk)
+    elapsed = time.perf_counter() - start
+    print_report(report)
+    print(f"\nAnalyzed {os.path.getsize(args.capture):,} bytes in {elapsed:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+region_latency.py - 리전별 Vertex AI 엔드포인트 지연 시간 행렬
+여러 리전의 {region}-aiplatform.googleapis.com에 비공개 경로로 동시에 DNS 조회, TCP/TLS 연결, 작은 generateContent 호출을 보내
+지연 시간/처리량 행렬을 만들고, 순위를 만료 시간과 함께 캐시하여 가장 빠른 정상 리전을 반환 (fastest_region)
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import google.auth
+    from google.auth.transport.requests import Request
+except ImportError:
+    google = None
+
+from gemini_load import percentile
+from https_prober import ConnectionPool, resolve, timed_request
+from ip_classifier import IpClassifier
+
+DEFAULT_REGIONS = [
+    "us-central1", "us-east1", "us-east4", "us-west1", "europe-west1", "europe-west4",
+    "asia-northeast1", "asia-northeast3", "asia-southeast1",
+]
+DEFAULT_MODEL = "gemini-2.5-flash"
+DEFAULT_TTL = 600
+DEFAULT_CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                             "gemini_region_ranking.json")
+GENERATE_PROMPT = "Count from 1 to 20 separated by spaces."
+# 연결 확인용 가벼운 요청 - 인증 없이도 응답(401/404)이 오면 경로는 정상
+PING_PATH = "/v1/projects"
+
+IP_CLASSIFIER = IpClassifier()
+
+def region_host(region):
+    return f"{region}-aiplatform.googleapis.com"
+
+def configured_regions():
+    """VERTEX_REGIONS 환경 변수(쉼표 구분) 또는 기본 리전 목록"""
+    value = os.environ.get("VERTEX_REGIONS")
+    return [region.strip() for region in value.split(",") if region.strip()] if value else list(DEFAULT_REGIONS)
+
+def access_token():
+    """Application Default Credentials의 액세스 토큰 (google-auth가 없거나 실패하면 None)"""
+    if google is None:
+        return None
+    try:
+        credentials, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
+        credentials.refresh(Request())
+        return credentials.token
+    except Exception:
+        return None
+
+def generate_request(project, region, model, max_tokens):
+    path = f"/v1/projects/{project}/locations/{region}/publishers/google/models/{model}:generateContent"
+    body = json.dumps({
+        "contents": [{"role": "user", "parts": [{"text": GENERATE_PROMPT}]}],
+        "generationConfig": {"maxOutputTokens": max_tokens, "temperature": 0},
+    }).encode()
+    return path, body
+
+def probe_region(region, project=None, token=None, model=DEFAULT_MODEL, warm_requests=3, max_tokens=64,
+                 timeout=10.0):
+    """
+    리전 하나 측정: DNS → 새 연결(TCP/TLS/TTFB) → keep-alive 연결로 warm TTFB x N
+    → (토큰과 프로젝트가 있으면) 같은 연결로 generateContent 한 번
+    """
+    host = region_host(region)
+    result = {"region": region, "host": host, "healthy": False}
+    try:
+        dns_time, addresses = resolve(host)
+    except socket.gaierror as e:
+        result["error"] = f"DNS: {e}"
+        return result
+    address = addresses[0]
+    label = IP_CLASSIFIER.classify(address)
+    result.update(address=address, classification=label.role, private=label.private, dns=dns_time)
+
+    pool = ConnectionPool(timeout=timeout)
+    try:
+        cold = timed_request(pool, host, address, PING_PATH, fresh=True, dns_time=dns_time)
+        warm = [timed_request(pool, host, address, PING_PATH) for _ in range(warm_requests)]
+        result.update(tcp=cold["timing"]["tcp"], tls=cold["timing"]["tls"], connect_total=cold["timing"]["total"],
+                      ttfb=percentile(sorted(r["timing"]["ttfb"] for r in warm), 50) if warm
+                      else cold["timing"]["ttfb"])
+        result["healthy"] = cold["status"] < 500
+        if token and project:
+            path, body = generate_request(project, region, model, max_tokens)
+            response = timed_request(pool, host, address, path, method="POST", body=body,
+                                     headers={"Authorization": f"Bearer {token}",
+                                              "Content-Type": "application/json"})
+            latency = response["timing"]["ttfb"] + response["timing"]["transfer"]
+            result.update(generate_status=response["status"], generate=latency)
+            if response["status"] == 200:
+                usage = json.loads(response["body"]).get("usageMetadata", {})
+                tokens = usage.get("candidatesTokenCount", 0)
+                result.update(tokens=tokens, tokens_per_sec=tokens / latency if latency > 0 else 0.0)
+            else:
+                result["healthy"] = False
+                result["error"] = f"generateContent HTTP {response['status']} {response['reason']}"
+    except (OSError, http.client.HTTPException, ValueError) as e:
+        result["healthy"] = False
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        pool.close()
+    return result
+
+def score(result):
+    """순위 기준(초): generate 지연 시간이 있으면 그것, 없으면 DNS+연결+warm TTFB"""
+    if "generate" in result:
+        return result["generate"]
+    return result.get("connect_total", float("inf")) + result.get("ttfb", 0.0)
+
+def usable(result):
+    """정상이고 비공개 경로(PGA VIP 등)로 해석된 리전 - 공개 주소로 해석되면 비공개 경로 검증 대상이 아님"""
+    return result["healthy"] and bool(result.get("private"))
+
+def rank(results):
+    """비공개 경로의 정상 리전을 점수 순으로, 그 뒤에 공개 주소로 해석된 정상 리전, 마지막에 비정상 리전"""
+    return sorted(results, key=lambda result: (not result["healthy"], not usable(result), score(result)))
+
+def probe_regions(regions=None, project=None, token=None, model=DEFAULT_MODEL, warm_requests=3, max_tokens=64,
+                  timeout=10.0, workers=16):
+    """모든 리전을 동시에 측정하고 순위가 매겨진 행렬 반환"""
+    regions = regions or configured_regions()
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=min(workers, len(regions))) as pool:
+        results = list(pool.map(lambda region: probe_region(region, project, token, model, warm_requests,
+                                                            max_tokens, timeout), regions))
+    return {"measured_at": started, "regions": regions, "generate": bool(token and project),
+            "ranking": rank(results)}
+
+def load_ranking(path=DEFAULT_CACHE, ttl=DEFAULT_TTL, regions=None):
+    """캐시된 순위 - 만료되었거나 리전 목록이 다르면 None"""
+    try:
+        with open(path) as f:
+            matrix = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - matrix.get("measured_at", 0) > ttl:
+        return None
+    if regions is not None and sorted(matrix.get("regions", [])) != sorted(regions):
+        return None
+    return matrix
+
+def save_ranking(matrix, path=DEFAULT_CACHE):
+    """임시 파일에 쓰고 교체하여 동시에 읽는 프로세스가 반쯤 쓴 파일을 보지 않도록 함"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "w") as f:
+        json.dump(matrix, f, indent=2)
+    os.replace(temp, path)
+
+def region_matrix(regions=None, ttl=DEFAULT_TTL, cache_path=DEFAULT_CACHE, refresh=False, **probe_options):
+    """캐시가 유효하면 캐시된 행렬, 아니면 새로 측정하여 저장한 행렬 (cached 키로 구분)"""
+    regions = regions or configured_regions()
+    matrix = None if refresh else load_ranking(cache_path, ttl, regions)
+    # generate 측정이 가능한데 캐시가 연결 시간만으로 매긴 순위면 다시 측정
+    if matrix is not None and probe_options.get("token") and probe_options.get("project") and not matrix["generate"]:
+        matrix = None
+    if matrix is not None:
+        return dict(matrix, cached=True)
+    matrix = probe_regions(regions, **probe_options)
+    try:
+        save_ranking(matrix, cache_path)
+    except OSError:
+        pass
+    return dict(matrix, cached=False)
+
+def fastest_region(regions=None, ttl=DEFAULT_TTL, cache_path=DEFAULT_CACHE, refresh=False, **probe_options):
+    """비공개 경로로 가장 빠른 정상 리전 이름 (그런 리전이 없으면 None)"""
+    matrix = region_matrix(regions, ttl, cache_path, refresh, **probe_options)
+    candidates = [result for result in matrix["ranking"] if usable(result)]
+    return candidates[0]["region"] if candidates else None
+
+def print_matrix(matrix):
+    age = time.time() - matrix["measured_at"]
+    source = f"cached, measured {age:.0f} s ago" if matrix.get("cached") else "measured now"
+    print(f"Vertex AI regional endpoints ({len(matrix['regions'])} regions, {source})")
+    print(f"  {'region':<18} {'address':<16} {'path':<26} {'dns':>7} {'tcp':>7} {'tls':>7} {'ttfb':>7} "
+          f"{'generate':>9} {'tok/s':>7}")
+    for result in matrix["ranking"]:
+        if "address" not in result:
+            print(f"  {result['region']:<18} ✗ {result.get('error', 'unreachable')}")
+            continue
+        path = f"{result['classification']}{'' if result['private'] else ' (public)'}"
+
+        def ms(key, width=7):
+            return f"{result[key] * 1000:>{width}.1f}" if key in result else f"{'-':>{width}}"
+
+        tokens_per_sec = f"{result['tokens_per_sec']:>7.1f}" if "tokens_per_sec" in result else f"{'-':>7}"
+        status = "" if result["healthy"] else f"  ✗ {result.get('error', 'unhealthy')}"
+        print(f"  {result['region']:<18} {result['address']:<16} {path:<26} {ms('dns')} {ms('tcp')} {ms('tls')} "
+              f"{ms('ttfb')} {ms('generate', 9)} {tokens_per_sec}{status}")
+    candidates = [result for result in matrix["ranking"] if usable(result)]
+    if candidates:
+        basis = "generateContent latency" if matrix["generate"] else "connect + TTFB"
+        print(f"  Fastest healthy private region: {candidates[0]['region']} "
+              f"({score(candidates[0]) * 1000:.1f} ms, by {basis})")
+    else:
+        print("  No healthy region over the private path")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latency matrix of regional Vertex AI endpoints over the private path")
+    parser.add_argument("--regions", help="comma separated regions (default: $VERTEX_REGIONS or a built-in list)")
+    parser.add_argument("--project", default=os.environ.get("PROD_PROJECT_ID"),
+                        help="project for the generateContent probe (default: $PROD_PROJECT_ID)")
+    parser.add_argument("--no-generate", action="store_true", help="only measure DNS, connect and TTFB")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--max-tokens", type=int, default=64, help="output tokens for the generate probe")
+    parser.add_argument("--warm", type=int, default=3, help="keep-alive requests for the TTFB p50 (default: 3)")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL, help="seconds a cached ranking stays valid")
+    parser.add_argument("--cache", default=DEFAULT_CACHE)
+    parser.add_argument("--refresh", action="store_true", help="ignore the cached ranking")
+    parser.add_argument("--json", action="store_true", help="print the matrix as JSON")
+    args = parser.parse_args(argv)
+
+    regions = [region.strip() for region in args.regions.split(",") if region.strip()] if args.regions else None
+    token = None if args.no_generate else access_token()
+    if not args.no_generate and not (token and args.project):
+        print("generateContent probe skipped (needs --project and Application Default Credentials)",
+              file=sys.stderr)
+    matrix = region_matrix(regions, args.ttl, args.cache, args.refresh, project=args.project, token=token,
+                           model=args.model, warm_requests=args.warm, max_tokens=args.max_tokens,
+                           timeout=args.timeout)
+    if args.json:
+        print(json.dumps(matrix, indent=2))
+    else:
+        print_matrix(matrix)
+    return 0 if any(usable(result) for result in matrix["ranking"]) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
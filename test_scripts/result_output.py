@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+result_output.py - 검증 결과 NDJSON 출력 모듈
+검증 단계마다 한 줄의 JSON 레코드를 즉시 출력하여 수집기가 점진적으로 수집할 수 있도록 함
+"""
+
+import json
+import socket
+import threading
+from datetime import datetime, timezone
+
+class NdjsonWriter:
+    """
+    스레드 안전한 NDJSON 레코드 출력기 - 레코드마다 flush
+    stream이 None이면 출력하지 않고, on_record(record)가 있으면 레코드마다 호출 (예: results_store.ResultStore.add)
+    """
+
+    def __init__(self, stream, tool, on_record=None):
+        self._stream = stream
+        self._lock = threading.Lock()
+        self.on_record = on_record
+        self.tool = tool
+        self.host = socket.gethostname()
+        self.run_id = f"{self.host}-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S.%fZ')}"
+
+    def emit(self, check, status, elapsed=None, **data):
+        """검증 단계 하나의 결과를 레코드로 출력"""
+        record = {
+            "tool": self.tool,
+            "run_id": self.run_id,
+            "host": self.host,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "check": check,
+            "status": status,
+            "elapsed": round(elapsed, 6) if elapsed is not None else None,
+            "data": data,
+        }
+        with self._lock:
+            if self._stream is not None:
+                self._stream.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                self._stream.flush()
+            if self.on_record:
+                self.on_record(record)
+        return record
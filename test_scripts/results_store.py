@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+results_store.py - 검증 결과 이력 저장소 (SQLite)
+1_test_gemini_api.py / verify_gemini_private_connection.py의 --store, 또는 NDJSON 출력 파일(--ingest)의
+레코드를 실행/호스트/검사별로 저장하고 숫자 지표(소요 시간, latency, ttft 등)를 색인된 표본으로 기록
+오래된 표본은 일별 요약(count/mean/p50/p95/min/max)으로 축약하며, 일별 백분위 추이, 경로 분류가 public으로
+바뀐 실행, 기준 구간 대비 통계적으로 유의한 성능 저하(Mann-Whitney U)를 조회
+
+사용 예:
+    python3 1_test_gemini_api.py --rest --store results.sqlite3
+    python3 results_store.py --db results.sqlite3 --trend text_generation:latency --days 90
+    python3 results_store.py --db results.sqlite3 --flips public
+    python3 results_store.py --db results.sqlite3 --regressions --baseline-days 14 --recent-days 1
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import sqlite3
+import argparse
+import threading
+from datetime import datetime, timezone
+
+from gemini_load import percentile
+from ip_classifier import IpClassifier
+
+DEFAULT_DB = os.path.join(os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share")),
+                          "gemini_results.sqlite3")
+DAY = 86400
+# 이 기간(일)보다 오래된 표본은 일별 요약으로 축약 (close 시 하루 한 번)
+DEFAULT_KEEP_DAYS = 30
+# 일별 요약에 남는 백분위와 그 열
+ROLLUP_COLUMNS = {50: "p50", 95: "p95"}
+# 레코드 하나에서 기록하는 지표 수와 중첩 깊이 상한 (검사 데이터의 큰 dict가 표본을 폭증시키지 않도록)
+MAX_METRICS = 64
+MAX_DEPTH = 3
+PATHS = ("private", "public", "unknown")
+# 클수록 나쁜 지표(시간)와 클수록 좋은 지표(처리량) - 마지막 구성 요소 기준, 나머지는 회귀 검사에서 제외
+TIMING_METRICS = {"elapsed", "latency", "latency_total", "ttft", "connect", "connect_total", "dns", "tcp", "tls",
+                  "ttfb", "generate", "wall_time", "p50", "p90", "p95", "p99"}
+THROUGHPUT_METRICS = {"tokens_per_sec", "requests_per_sec", "throughput"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT UNIQUE NOT NULL,
+    tool TEXT NOT NULL,
+    host TEXT NOT NULL,
+    started REAL NOT NULL,
+    status TEXT,
+    elapsed REAL
+);
+CREATE INDEX IF NOT EXISTS runs_host_started ON runs (host, started);
+CREATE TABLE IF NOT EXISTS checks (
+    run INTEGER NOT NULL REFERENCES runs (id),
+    ts REAL NOT NULL,
+    check_name TEXT NOT NULL,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS checks_name_ts ON checks (check_name, ts);
+CREATE TABLE IF NOT EXISTS samples (
+    run INTEGER NOT NULL REFERENCES runs (id),
+    ts REAL NOT NULL,
+    check_name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+-- 값까지 포함한 커버링 인덱스 - 추이/회귀 조회가 테이블을 읽지 않고 인덱스 범위만 훑음
+CREATE INDEX IF NOT EXISTS samples_metric_ts ON samples (check_name, metric, ts, value, run);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE TABLE IF NOT EXISTS paths (
+    run INTEGER NOT NULL REFERENCES runs (id),
+    ts REAL NOT NULL,
+    tool TEXT NOT NULL,
+    host TEXT NOT NULL,
+    path TEXT NOT NULL,
+    previous TEXT
+);
+CREATE INDEX IF NOT EXISTS paths_host_ts ON paths (host, tool, ts);
+-- 전환된 관측만 담는 부분 인덱스 - 경로 전환 조회가 전체 이력을 훑지 않음
+CREATE INDEX IF NOT EXISTS paths_flips ON paths (path, ts) WHERE previous IS NOT NULL AND previous != path;
+CREATE TABLE IF NOT EXISTS daily (
+    check_name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    tool TEXT NOT NULL,
+    host TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    mean REAL, p50 REAL, p95 REAL, min REAL, max REAL,
+    PRIMARY KEY (check_name, metric, day, tool, host)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+IP_CLASSIFIER = IpClassifier()
+
+def record_time(record):
+    """레코드 timestamp(ISO 8601) → epoch 초 (없거나 잘못되면 현재 시각)"""
+    try:
+        return datetime.fromisoformat(record["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+def metrics_of(record):
+    """레코드의 숫자 지표 {점으로 이은 이름: 값} - elapsed와 data의 숫자 값(목록 제외)"""
+    metrics = {}
+    if isinstance(record.get("elapsed"), (int, float)):
+        metrics["elapsed"] = float(record["elapsed"])
+    pending = [("", record.get("data") or {}, 1)]
+    while pending and len(metrics) < MAX_METRICS:
+        prefix, data, depth = pending.pop(0)
+        for key, value in data.items():
+            name = f"{prefix}{key}"
+            if isinstance(value, bool) or value is None:
+                continue
+            if isinstance(value, (int, float)) and math.isfinite(value):
+                metrics[name] = float(value)
+            elif isinstance(value, dict) and depth < MAX_DEPTH:
+                pending.append((f"{name}.", value, depth + 1))
+            if len(metrics) >= MAX_METRICS:
+                break
+    return metrics
+
+def observed_path(record):
+    """레코드가 알려 주는 API 트래픽 경로 (private/public/unknown) - 없으면 None"""
+    data = record.get("data") or {}
+    if data.get("path") in PATHS:
+        return data["path"]
+    if record.get("check") == "network_path" and data.get("api_ip"):
+        try:
+            return "private" if IP_CLASSIFIER.classify(data["api_ip"]).private else "public"
+        except ValueError:
+            return None
+    return None
+
+def direction(metric):
+    """1: 클수록 나쁨, -1: 작을수록 나쁨, None: 회귀 검사 대상 아님"""
+    name = metric.rsplit(".", 1)[-1]
+    if name in TIMING_METRICS:
+        return 1
+    if name in THROUGHPUT_METRICS:
+        return -1
+    return None
+
+def mann_whitney(baseline, recent):
+    """
+    Mann-Whitney U 검정 (정규 근사, 동순위 보정, 연속성 보정)
+    recent가 baseline보다 크다는 단측 대립가설의 (U, p) - 값이 같은 표본만 있으면 p=1
+    """
+    n1, n2 = len(recent), len(baseline)
+    combined = sorted([(value, 0) for value in recent] + [(value, 1) for value in baseline])
+    ranks = [0.0] * len(combined)
+    ties = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        count = j - i + 1
+        ties += count ** 3 - count
+        i = j + 1
+    u = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0) - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+def merge_daily(old, new):
+    """같은 키의 일별 요약 두 개 병합 - 백분위는 표본 수 가중 평균(근사)"""
+    count = old[0] + new[0]
+    weighted = [(old[i] * old[0] + new[i] * new[0]) / count for i in (1, 2, 3)]
+    return (count, *weighted, min(old[4], new[4]), max(old[5], new[5]))
+
+class ResultStore:
+    """
+    NdjsonWriter 레코드 저장소 - add(record)는 여러 스레드에서 호출 가능
+    summary/watch_cycle 레코드마다 커밋하고, 다른 프로세스가 읽는 동안에도 쓸 수 있도록 WAL 모드 사용
+    """
+
+    def __init__(self, path=DEFAULT_DB, keep_days=DEFAULT_KEEP_DAYS):
+        self.path = path
+        self.keep_days = keep_days
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._runs = {}
+        self.added = 0
+
+    def _run(self, record, ts):
+        run_id = record.get("run_id") or f"{record.get('host', '?')}-{ts}"
+        run = self._runs.get(run_id)
+        if run is None:
+            self.db.execute("INSERT OR IGNORE INTO runs (run_id, tool, host, started) VALUES (?, ?, ?, ?)",
+                            (run_id, record.get("tool", "?"), record.get("host", "?"), ts))
+            run = self._runs[run_id] = self.db.execute("SELECT id FROM runs WHERE run_id = ?",
+                                                       (run_id,)).fetchone()[0]
+        return run
+
+    def add(self, record):
+        """레코드 하나 저장 (검사 상태, 숫자 지표, 경로 분류)"""
+        ts = record_time(record)
+        check = record.get("check", "?")
+        with self._lock:
+            run = self._run(record, ts)
+            self.db.execute("INSERT INTO checks (run, ts, check_name, status) VALUES (?, ?, ?, ?)",
+                            (run, ts, check, record.get("status")))
+            self.db.executemany("INSERT INTO samples (run, ts, check_name, metric, value) VALUES (?, ?, ?, ?, ?)",
+                                [(run, ts, check, metric, value) for metric, value in metrics_of(record).items()])
+            path = observed_path(record)
+            if path:
+                self._add_path(run, ts, record.get("tool", "?"), record.get("host", "?"), path)
+            if check == "summary":
+                self.db.execute("UPDATE runs SET status = ?, elapsed = ? WHERE id = ?",
+                                (record.get("status"), record.get("elapsed"), run))
+            if check in ("summary", "watch_cycle"):
+                self.db.commit()
+            self.added += 1
+
+    def _add_path(self, run, ts, tool, host, path):
+        """
+        경로 관측 저장 - 같은 호스트/도구의 직전 관측을 previous에 함께 기록
+        (오래된 NDJSON을 나중에 ingest해도 맞도록 바로 다음 관측의 previous도 갱신)
+        """
+        previous = self.db.execute("SELECT path FROM paths WHERE host = ? AND tool = ? AND ts <= ? "
+                                   "ORDER BY ts DESC LIMIT 1", (host, tool, ts)).fetchone()
+        self.db.execute("INSERT INTO paths (run, ts, tool, host, path, previous) VALUES (?, ?, ?, ?, ?, ?)",
+                        (run, ts, tool, host, path, previous[0] if previous else None))
+        self.db.execute("UPDATE paths SET previous = ? WHERE rowid = (SELECT rowid FROM paths "
+                        "WHERE host = ? AND tool = ? AND ts > ? ORDER BY ts LIMIT 1)", (path, host, tool, ts))
+
+    def ingest(self, lines):
+        """NDJSON 줄들 저장 (JSON이 아니거나 check가 없는 줄은 건너뜀) - 저장한 레코드 수"""
+        count = 0
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and "check" in record:
+                self.add(record)
+                count += 1
+        with self._lock:
+            self.db.commit()
+        return count
+
+    # --- 조회 -----------------------------------------------------------------
+
+    def _filters(self, host=None, tool=None, alias="runs"):
+        clauses, params = [], []
+        for column, value in (("host", host), ("tool", tool)):
+            if value:
+                clauses.append(f"{alias}.{column} = ?")
+                params.append(value)
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def trend(self, check, metric, days=90, pct=95, host=None, tool=None, now=None):
+        """
+        일별 (날짜, 표본 수, 백분위 값) - 원본 표본이 남은 날은 정확한 값,
+        축약된 날은 일별 요약의 p50/p95(호스트별 요약을 표본 수로 가중 평균)
+        """
+        since = (now or time.time()) - days * DAY
+        where, params = self._filters(host, tool)
+        join = " JOIN runs ON runs.id = samples.run" if where else ""
+        rows = self.db.execute(
+            f"SELECT CAST(samples.ts / {DAY} AS INTEGER), value FROM samples{join} "
+            f"WHERE check_name = ? AND metric = ? AND samples.ts >= ?{where}", [check, metric, since] + params)
+        by_day = {}
+        for day, value in rows:
+            by_day.setdefault(day, []).append(value)
+        points = {day: (len(values), percentile(sorted(values), pct)) for day, values in by_day.items()}
+        # 축약된 날은 저장된 백분위 열만 (열 이름은 고정 목록에서 - 95.0도 p95)
+        column = ROLLUP_COLUMNS.get(int(pct)) if pct == int(pct) else None
+        if column:
+            where, params = self._filters(host, tool, "daily")
+            rolled = self.db.execute(
+                f"SELECT day, SUM(count), SUM({column} * count) / SUM(count) FROM daily "
+                f"WHERE check_name = ? AND metric = ? AND day >= ?{where} GROUP BY day",
+                [check, metric, int(since // DAY)] + params)
+            for day, count, value in rolled:
+                if day not in points:
+                    points[day] = (count, value)
+        return [(datetime.fromtimestamp(day * DAY, timezone.utc).strftime("%Y-%m-%d"), count, value)
+                for day, (count, value) in sorted(points.items())]
+
+    def path_flips(self, to="public", days=None, host=None, tool=None, now=None):
+        """경로 분류가 다른 값에서 to로 바뀐 관측 (호스트/도구별 직전 관측과 비교)"""
+        since = (now or time.time()) - days * DAY if days else 0
+        where, params = self._filters(host, tool, "paths")
+        rows = self.db.execute(
+            "SELECT runs.run_id, paths.host, paths.tool, paths.ts, paths.previous "
+            "FROM paths JOIN runs ON runs.id = paths.run "
+            "WHERE paths.path = ? AND paths.previous IS NOT NULL AND paths.previous != paths.path "
+            f"AND paths.ts >= ?{where} ORDER BY paths.ts", [to, since] + params)
+        return [{"run_id": run_id, "host": host, "tool": tool, "ts": ts, "previous": previous, "path": to}
+                for run_id, host, tool, ts, previous in rows]
+
+    def regressions(self, baseline_days=14, recent_days=1, alpha=0.01, min_effect=0.1, min_samples=5,
+                    host=None, tool=None, check=None, now=None):
+        """
+        최근 구간의 시간/처리량 지표가 바로 앞 기준 구간보다 나빠졌는지 검사 목록 (p 오름차순)
+        Mann-Whitney 단측 p < alpha이고 중앙값 변화가 min_effect(비율) 이상이면 regression=True
+        """
+        now = now or time.time()
+        recent_start = now - recent_days * DAY
+        baseline_start = recent_start - baseline_days * DAY
+        where, params = self._filters(host, tool)
+        if check:
+            where += " AND samples.check_name = ?"
+            params.append(check)
+        rows = self.db.execute(
+            "SELECT runs.tool, samples.check_name, samples.metric, samples.ts >= ?, value "
+            f"FROM samples JOIN runs ON runs.id = samples.run WHERE samples.ts >= ? AND samples.ts <= ?{where}",
+            [recent_start, baseline_start, now] + params)
+        groups = {}
+        for tool_name, check_name, metric, recent, value in rows:
+            if direction(metric) is None:
+                continue
+            groups.setdefault((tool_name, check_name, metric), ([], []))[bool(recent)].append(value)
+        findings = []
+        for (tool_name, check_name, metric), (baseline, recent) in groups.items():
+            if len(baseline) < min_samples or len(recent) < min_samples:
+                continue
+            sign = direction(metric)
+            _, p = mann_whitney([sign * value for value in baseline], [sign * value for value in recent])
+            before, after = percentile(sorted(baseline), 50), percentile(sorted(recent), 50)
+            change = (after - before) / abs(before) if before else 0.0
+            findings.append({
+                "tool": tool_name, "check": check_name, "metric": metric, "p": p,
+                "baseline_median": before, "recent_median": after, "change": change,
+                "baseline_samples": len(baseline), "recent_samples": len(recent),
+                "regression": p < alpha and sign * change >= min_effect,
+            })
+        return sorted(findings, key=lambda finding: finding["p"])
+
+    # --- 축약 -----------------------------------------------------------------
+
+    def compact(self, keep_days=None, now=None):
+        """keep_days보다 오래된 표본을 일별 요약으로 옮기고 원본 표본/검사 행 삭제 - 축약한 표본 수"""
+        keep_days = self.keep_days if keep_days is None else keep_days
+        cutoff = int(((now or time.time()) - keep_days * DAY) // DAY) * DAY
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT samples.check_name, samples.metric, CAST(samples.ts / {DAY} AS INTEGER), runs.tool, "
+                "runs.host, value FROM samples JOIN runs ON runs.id = samples.run WHERE samples.ts < ?", (cutoff,))
+            groups = {}
+            for check, metric, day, tool, host, value in rows:
+                groups.setdefault((check, metric, day, tool, host), []).append(value)
+            for key, values in groups.items():
+                values.sort()
+                summary = (len(values), sum(values) / len(values), percentile(values, 50), percentile(values, 95),
+                           values[0], values[-1])
+                existing = self.db.execute(
+                    "SELECT count, mean, p50, p95, min, max FROM daily WHERE check_name = ? AND metric = ? "
+                    "AND day = ? AND tool = ? AND host = ?", key).fetchone()
+                if existing:
+                    summary = merge_daily(existing, summary)
+                self.db.execute("INSERT OR REPLACE INTO daily (check_name, metric, day, tool, host, count, mean, "
+                                "p50, p95, min, max) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", key + summary)
+            compacted = self.db.execute("DELETE FROM samples WHERE ts < ?", (cutoff,)).rowcount
+            self.db.execute("DELETE FROM checks WHERE ts < ?", (cutoff,))
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_compact', ?)",
+                            (str(now or time.time()),))
+            self.db.commit()
+        return compacted
+
+    def close(self):
+        """커밋하고 닫음 - 마지막 축약 후 하루가 지났으면 먼저 축약"""
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'last_compact'").fetchone()
+        if row is None or time.time() - float(row[0]) > DAY:
+            self.compact()
+        with self._lock:
+            self.db.commit()
+            self.db.execute("PRAGMA optimize")
+            self.db.close()
+
+def report_run(store, writer, recent_days=1, baseline_days=14):
+    """--store 실행 후: 저장 결과와 이 호스트/도구의 유의한 성능 저하 출력 - 저하 목록 반환"""
+    findings = [finding for finding in store.regressions(baseline_days, recent_days, host=writer.host,
+                                                         tool=writer.tool) if finding["regression"]]
+    print(f"\nStored {store.added} records in {store.path}")
+    for finding in findings:
+        print(f"⚠️  Regression: {finding['check']} {finding['metric']} median "
+              f"{finding['baseline_median']:.3f} → {finding['recent_median']:.3f} ({finding['change'] * 100:+.0f}%, "
+              f"p={finding['p']:.2g}, last {recent_days} day vs previous {baseline_days} days)")
+    return findings
+
+def print_trend(points, check, metric, pct):
+    print(f"p{pct:g} {check} {metric} by day")
+    print(f"  {'day':<12} {'samples':>8} {'value':>12}")
+    for day, count, value in points:
+        print(f"  {day:<12} {count:>8} {value:>12.4f}")
+
+def print_flips(flips, to):
+    print(f"Path classification flips to {to}: {len(flips)}")
+    for flip in flips:
+        when = datetime.fromtimestamp(flip["ts"]).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"  {when}  {flip['host']:<24} {flip['tool']:<34} {flip['previous']} → {flip['path']}  "
+              f"({flip['run_id']})")
+
+def print_regressions(findings, show_all=False):
+    flagged = [finding for finding in findings if finding["regression"]]
+    print(f"{len(flagged)} significant regressions in {len(findings)} tested metrics")
+    for finding in findings if show_all else flagged:
+        mark = "⚠️ " if finding["regression"] else "  "
+        print(f"  {mark} {finding['tool']:<34} {finding['check']:<20} {finding['metric']:<24} "
+              f"{finding['baseline_median']:>10.4f} → {finding['recent_median']:>10.4f} "
+              f"({finding['change'] * 100:+6.1f}%) p={finding['p']:.2g} "
+              f"n={finding['baseline_samples']}/{finding['recent_samples']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the history of the Gemini verification results")
+    parser.add_argument("--db", default=os.environ.get("GEMINI_RESULTS_DB", DEFAULT_DB),
+                        help="SQLite database (default: $GEMINI_RESULTS_DB or ~/.local/share/gemini_results.sqlite3)")
+    parser.add_argument("--ingest", nargs="+", metavar="FILE", help="store NDJSON result files ('-' for stdin)")
+    parser.add_argument("--trend", metavar="CHECK:METRIC", help="daily percentile, e.g. text_generation:latency")
+    parser.add_argument("--percentile", type=float, default=95)
+    parser.add_argument("--days", type=float, default=90, help="trend/flips window in days (default: 90)")
+    parser.add_argument("--flips", nargs="?", const="public", choices=PATHS, help="runs whose path changed to this")
+    parser.add_argument("--regressions", action="store_true", help="test the recent window against the baseline")
+    parser.add_argument("--baseline-days", type=float, default=14)
+    parser.add_argument("--recent-days", type=float, default=1)
+    parser.add_argument("--alpha", type=float, default=0.01, help="significance level (default: 0.01)")
+    parser.add_argument("--min-effect", type=float, default=0.1, help="smallest median change flagged (default: 0.1)")
+    parser.add_argument("--all", action="store_true", help="list every tested metric, not only regressions")
+    parser.add_argument("--compact", action="store_true", help="roll samples older than --keep-days into daily summaries")
+    parser.add_argument("--keep-days", type=float, default=DEFAULT_KEEP_DAYS)
+    parser.add_argument("--host")
+    parser.add_argument("--tool")
+    parser.add_argument("--json", action="store_true", help="print query results as JSON")
+    args = parser.parse_args(argv)
+    if not (args.ingest or args.trend or args.flips or args.regressions or args.compact):
+        parser.error("nothing to do: use --ingest, --trend, --flips, --regressions or --compact")
+    if args.trend and ":" not in args.trend:
+        parser.error("--trend takes CHECK:METRIC")
+
+    store = ResultStore(args.db, args.keep_days)
+    output = {}
+    code = 0
+    try:
+        if args.ingest:
+            for name in args.ingest:
+                try:
+                    with (open(name) if name != "-" else sys.stdin) as f:
+                        count = store.ingest(f)
+                except OSError as e:
+                    parser.error(f"cannot read {name}: {e}")
+                print(f"Ingested {count} records from {name}", file=sys.stderr)
+        if args.compact:
+            print(f"Compacted {store.compact(args.keep_days)} samples", file=sys.stderr)
+        start = time.perf_counter()
+        if args.trend:
+            check, metric = args.trend.split(":", 1)
+            output["trend"] = store.trend(check, metric, args.days, args.percentile, args.host, args.tool)
+            if not args.json:
+                print_trend(output["trend"], check, metric, args.percentile)
+        if args.flips:
+            output["flips"] = store.path_flips(args.flips, args.days, args.host, args.tool)
+            if not args.json:
+                print_flips(output["flips"], args.flips)
+        if args.regressions:
+            output["regressions"] = store.regressions(args.baseline_days, args.recent_days, args.alpha,
+                                                      args.min_effect, host=args.host, tool=args.tool)
+            if not args.json:
+                print_regressions(output["regressions"], args.all)
+            if any(finding["regression"] for finding in output["regressions"]):
+                code = 1
+        if output:
+            if args.json:
+                print(json.dumps(output, indent=2))
+            print(f"(queries took {(time.perf_counter() - start) * 1000:.1f} ms)", file=sys.stderr)
+    finally:
+        store.close()
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
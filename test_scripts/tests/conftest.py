@@ -0,0 +1,6 @@
+"""test_scripts/의 모듈을 패키지 없이 바로 import 하도록 경로 추가"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,57 @@
+"""async_dns - 로컬 스텁 DNS 서버로 CNAME 체인, TTL, 캐시, TCP 재조회 확인"""
+
+import asyncio
+import ipaddress
+
+from async_dns import AsyncResolver, start_stub_server
+
+PGA = ipaddress.ip_network("199.36.153.8/30")
+
+def resolve(names, rounds=1, zone=None, **options):
+    """스텁을 띄워 같은 리졸버로 rounds번 조회 - (라운드별 결과, 스텁)"""
+    async def run():
+        _, stub, port = await start_stub_server(zone=zone)
+        try:
+            resolver = AsyncResolver(server="127.0.0.1", port=port, hosts_file=None, timeout=1.0, **options)
+            return [await resolver.resolve_many(names) for _ in range(rounds)], stub
+        finally:
+            stub.close()
+    return asyncio.run(run())
+
+def test_wildcard_cname_chain_in_one_round_trip():
+    names = ["aiplatform.googleapis.com", "us-central1-aiplatform.googleapis.com", "private.googleapis.com"]
+    (results,), stub = resolve(names)
+    api, regional, private = results
+    for result in (api, regional):
+        assert result["cname_chain"] == ["private.googleapis.com."]
+        assert result["round_trips"] == 1 and result["rcode"] == "NOERROR"
+    assert private["cname_chain"] == []
+    for result in results:
+        assert sorted(ipaddress.ip_address(a) for a in result["addresses"]) == list(PGA)
+        assert result["ttl"] == 300 and not result["cached"]
+    # 와일드카드도 이름마다 질의 하나 (스텁이 CNAME과 A를 한 응답에 담음)
+    assert stub.queries == len(names)
+
+def test_chain_ttl_is_minimum_of_records():
+    zone = {"*.googleapis.com.": [("CNAME", "private.googleapis.com.", 600)],
+            "private.googleapis.com.": [("A", "199.36.153.8", 60)]}
+    (results,), _ = resolve(["aiplatform.googleapis.com", "missing.example.com"], zone=zone)
+    assert results[0]["ttl"] == 60 and results[0]["addresses"] == ["199.36.153.8"]
+    assert results[1]["rcode"] == "NXDOMAIN" and results[1]["addresses"] == []
+
+def test_cache_hit_within_ttl():
+    (first, second), stub = resolve(["aiplatform.googleapis.com"], rounds=2)
+    assert not first[0]["cached"] and second[0]["cached"]
+    assert second[0]["round_trips"] == 0 and 0 < second[0]["ttl"] <= 300
+    assert second[0]["addresses"] == first[0]["addresses"]
+    assert stub.queries == 1
+    (first, second), stub = resolve(["aiplatform.googleapis.com"], rounds=2, use_cache=False)
+    assert not second[0]["cached"] and stub.queries == 2
+
+def test_truncated_response_falls_back_to_tcp():
+    # A 레코드 40개 - 512바이트 UDP 한도를 넘어 TC 응답
+    zone = {"big.googleapis.com.": [("A", f"10.0.0.{i}", 30) for i in range(1, 41)]}
+    (results,), stub = resolve(["big.googleapis.com"], zone=zone)
+    assert results[0]["round_trips"] == 2
+    assert len(results[0]["addresses"]) == 40 and results[0]["ttl"] == 30
+    assert stub.queries == 1 and stub.tcp_queries == 1
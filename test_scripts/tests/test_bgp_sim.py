@@ -0,0 +1,88 @@
+"""bgp_sim - radix 트라이 최장 접두사 일치와 일괄 조회 일치, 터널 장애 시 경로 철회"""
+
+import ipaddress
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bgp_sim import BgpSimulator, RadixTrie, Route, VpcRoutingTable
+from tf_model import TerraformModel
+
+def brute_force(prefixes, address):
+    """모든 접두사를 훑는 최장 일치 (참조 구현)"""
+    best, length = None, -1
+    for cidr, value in prefixes.items():
+        network = ipaddress.IPv4Network(cidr)
+        if network.prefixlen > length and address in network:
+            best, length = value, network.prefixlen
+    return best
+
+def random_prefixes(rng, count):
+    prefixes = {}
+    for i in range(count):
+        length = rng.choice([0, 8, 12, 16, 20, 24, 25, 30, 32])
+        address = rng.getrandbits(32) if rng.random() < 0.5 else (10 << 24) | rng.getrandbits(16)
+        prefixes[str(ipaddress.IPv4Network((address, length), strict=False))] = f"hop-{i}"
+    return prefixes
+
+def probe_addresses(rng, prefixes, count):
+    """접두사 경계 주변과 무작위 주소"""
+    addresses = [0, 0xFFFFFFFF]
+    for cidr in prefixes:
+        network = ipaddress.IPv4Network(cidr)
+        first, last = int(network.network_address), int(network.broadcast_address)
+        addresses += [first, last, max(first - 1, 0), min(last + 1, 0xFFFFFFFF)]
+    return addresses + [rng.getrandbits(32) for _ in range(count)]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_trie_and_batch_lookup_match_brute_force(seed):
+    rng = random.Random(seed)
+    prefixes = random_prefixes(rng, 60)
+    trie = RadixTrie()
+    for cidr, value in prefixes.items():
+        trie.insert(cidr, value)
+    # 일부 철회 후에도 일치해야 함
+    for cidr in rng.sample(sorted(prefixes), 15):
+        trie.remove(cidr)
+        del prefixes[cidr]
+    assert trie.size == len(prefixes)
+
+    addresses = probe_addresses(rng, prefixes, 500)
+    starts, values = trie.compile()
+    index = np.searchsorted(np.array(starts, dtype=np.uint64), np.array(addresses, dtype=np.uint64),
+                            side="right") - 1
+    for address, i in zip(addresses, index.tolist()):
+        expected = brute_force(prefixes, ipaddress.IPv4Address(address))
+        assert trie.lookup(address) == expected
+        assert values[i] == expected
+
+def test_routing_table_selects_longest_then_lowest_priority():
+    table = VpcRoutingTable("vpc")
+    table.add(Route("0.0.0.0/0", "default", "gw", 1000))
+    table.add(Route("10.1.0.0/16", "bgp", "peer-a", 200, "tunnel-a", "s-a"))
+    table.add(Route("10.1.0.0/16", "bgp", "peer-b", 100, "tunnel-b", "s-b"))
+    table.add(Route("10.1.1.0/24", "bgp", "peer-a", 100, "tunnel-a", "s-a"))
+    assert [route.next_hop for route in table.lookup("10.1.1.5")] == ["peer-a"]
+    assert [route.next_hop for route in table.lookup("10.1.2.5")] == ["peer-b"]
+    table.remove(lambda route: route.session == "s-b")
+    assert [route.next_hop for route in table.lookup("10.1.2.5")] == ["peer-a"]
+    index, route_sets = table.lookup_many([int(ipaddress.IPv4Address(ip)) for ip in
+                                           ("10.1.1.5", "10.1.2.5", "8.8.8.8")])
+    assert [route_sets[i][0].next_hop for i in index.tolist()] == ["peer-a", "peer-a", "gw"]
+
+def test_tunnel_failure_withdraws_only_its_ecmp_leg():
+    simulator = BgpSimulator(TerraformModel.load())
+    network = next(iter(simulator.tables))
+    prefix, best = next((prefix, best) for prefix, best in simulator.tables[network].routes() if len(best) > 1)
+    tunnel = best[0].tunnel
+    address = str(ipaddress.IPv4Network(prefix).network_address + 1)
+
+    changes = simulator.set_state(tunnel, False)
+    assert changes
+    remaining = simulator.route(network, address)
+    assert remaining and all(route.tunnel != tunnel for route in remaining)
+
+    simulator.set_state(tunnel, True)
+    assert simulator.route(network, address) == best
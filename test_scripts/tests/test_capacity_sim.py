@@ -0,0 +1,124 @@
+"""capacity_sim - NDJSON 출력으로 서비스 시간 보정, 대기열 계산, 터널 용량 탐색"""
+
+import json
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bgp_sim import BgpSimulator
+from capacity_sim import (PathModel, ServiceTime, capacity_search, fifo_departures, multi_server, saturated, simulate,
+                          tunnel_paths)
+from tf_model import DEFAULT_TF_DIR, TerraformModel
+
+def ndjson(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return str(path)
+
+def median(service):
+    """로그정규 적합의 중앙값 (표본의 기하 평균)"""
+    return math.exp(service.mu)
+
+def step(check, status="pass", elapsed=1.0, **data):
+    return {"tool": "1_test_gemini_api", "check": check, "status": status, "elapsed": elapsed, "data": data}
+
+def test_generation_records_use_latency(tmp_path):
+    path = ndjson(tmp_path / "run.ndjson", [
+        step("authentication", elapsed=0.3),
+        step("text_generation", latency=2.0, response_chars=80),
+        step("code_generation", latency=8.0, response_chars=900),
+        step("chat_session"),
+    ])
+    assert median(ServiceTime.from_file(path)) == pytest.approx(4.0)
+
+def test_stream_records(tmp_path):
+    path = ndjson(tmp_path / "stream.ndjson", [
+        step("text_generation", latency=3.0, ttft=0.4, chunks=5),
+        step("code_generation", ttft=0.9, chunks=12),
+    ])
+    assert median(ServiceTime.from_file(path)) == pytest.approx(math.sqrt(0.9 * 3.0))
+
+def test_failed_steps_are_ignored(tmp_path):
+    path = ndjson(tmp_path / "run.ndjson", [
+        step("text_generation", status="fail"),
+        step("code_generation", latency=5.0),
+    ])
+    assert median(ServiceTime.from_file(path)) == pytest.approx(5.0)
+
+def test_load_summary_wins(tmp_path):
+    path = ndjson(tmp_path / "load.ndjson", [
+        step("text_generation", latency=9.0),
+        step("load", latency={"p50": 1.5, "p90": 3.0, "p99": 6.0}),
+    ])
+    assert median(ServiceTime.from_file(path)) == pytest.approx(1.5)
+
+def test_plain_timing_lines(tmp_path):
+    path = tmp_path / "times.txt"
+    path.write_text("1.25\n\n2.5 seconds\n")
+    assert median(ServiceTime.from_file(str(path))) == pytest.approx(math.sqrt(1.25 * 2.5))
+
+def test_many_samples_are_resampled_empirically(tmp_path):
+    path = ndjson(tmp_path / "run.ndjson", [step("text_generation", latency=1.0 + i / 10) for i in range(40)])
+    service = ServiceTime.from_file(path)
+    assert len(service.samples) == 40
+    assert service.samples.min() == pytest.approx(1.0)
+
+def test_no_matching_samples_is_an_error(tmp_path):
+    path = ndjson(tmp_path / "run.ndjson", [step("authentication"), step("simple_generation", latency=2.0)])
+    with pytest.raises(ValueError, match="calibrate"):
+        ServiceTime.from_file(path)
+
+# --- 대기열 계산과 모의 실행 ------------------------------------------------------
+
+def lindley(arrivals, service):
+    departures, last = [], 0.0
+    for arrival, duration in zip(arrivals, service):
+        last = max(arrival, last) + duration
+        departures.append(last)
+    return departures
+
+def test_fifo_departures_matches_lindley_recursion():
+    rng = np.random.default_rng(3)
+    arrivals = np.cumsum(rng.exponential(1.0, 500))
+    service = rng.exponential(0.9, 500)
+    assert fifo_departures(arrivals, service) == pytest.approx(lindley(arrivals, service))
+
+def test_multi_server_slots():
+    arrivals = np.array([0.0, 0.0, 0.0, 1.0])
+    service = np.array([2.0, 2.0, 2.0, 0.5])
+    assert list(multi_server(arrivals, service, None)) == [2.0, 2.0, 2.0, 1.5]
+    # 슬롯 2개: 세 번째 요청은 t=2에 시작, 네 번째는 t=2에 빈 슬롯에서
+    assert list(multi_server(arrivals, service, 2)) == [2.0, 2.0, 4.0, 2.5]
+    # 슬롯 1개는 단일 서버 FIFO와 같음
+    assert list(multi_server(arrivals, service, 1)) == pytest.approx(lindley(arrivals, service))
+
+SERVICE = ServiceTime.from_percentiles(1.5, 4.0)
+OPTIONS = dict(total_requests=20_000, request_bytes=2_000_000, response_bytes=400_000)
+
+def test_simulate_idle_latency_is_service_time():
+    paths = [PathModel("t1", 3000.0, 0.002), PathModel("t2", 3000.0, 0.002)]
+    result = simulate(100, paths, SERVICE, **OPTIONS)
+    assert result["latency"]["p50"] == pytest.approx(1.5, rel=0.05)
+    assert sum(path["requests"] for path in result["paths"].values()) == 20_000
+    assert min(path["requests"] for path in result["paths"].values()) > 8_000
+    assert not saturated(result)
+    with pytest.raises(ValueError):
+        simulate(100, [], SERVICE, **OPTIONS)
+
+def test_capacity_halves_with_one_tunnel_down():
+    simulator = BgpSimulator(TerraformModel.load(DEFAULT_TF_DIR))
+    paths = tunnel_paths(simulator)
+    assert len(paths) == 2
+    both = capacity_search(paths, SERVICE, **OPTIONS)
+    simulator.set_state(paths[0].name, up=False)
+    one = capacity_search(tunnel_paths(simulator), SERVICE, **OPTIONS)
+    assert [path.name for path in tunnel_paths(simulator)] == [paths[1].name]
+
+    def limit(results):
+        assert saturated(results[-1]) and not saturated(results[0])
+        return next(result["users"] for result in results if saturated(result))
+
+    # 요청 2 MB(16 Mbit) x 분당 6회 - 터널 하나(3 Gbps, 초당 187.5건)는 1,875명에서 포화
+    assert 1_700 < limit(one) < 2_100
+    assert limit(both) / limit(one) == pytest.approx(2.0, rel=0.15)
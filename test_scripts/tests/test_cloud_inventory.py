@@ -0,0 +1,128 @@
+"""cloud_inventory - 로컬 Compute/DNS API 대체 서버에 대한 수집, 페이지 나눔, 디스크 캐시, 진단"""
+
+import asyncio
+import io
+import json
+import threading
+
+import pytest
+
+import cloud_inventory
+from cloud_api_standin import DEFAULT_DEV_PROJECT, DEFAULT_PROD_PROJECT, CloudApiStandIn, sample_inventory
+from cloud_inventory import CloudApiClient, DiskCache, collect_inventory, diagnose
+from gemini_rest import RestError
+from vertex_standin import MAX_HEADER_BYTES
+
+PROJECTS = [DEFAULT_DEV_PROJECT, DEFAULT_PROD_PROJECT]
+
+def start_cloud_standin(inventory, page_size=2):
+    standin = CloudApiStandIn(inventory, page_size)
+    ready = threading.Event()
+    port = []
+
+    async def serve():
+        server = await asyncio.start_server(standin.handle, "127.0.0.1", 0, limit=MAX_HEADER_BYTES)
+        port.append(server.sockets[0].getsockname()[1])
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    ready.wait()
+    return standin, f"http://127.0.0.1:{port[0]}"
+
+def collect(inventory, cache=None, base=None, **options):
+    if base is None:
+        _, base = start_cloud_standin(inventory)
+    client = CloudApiClient(base, cache, **options)
+    try:
+        return client, collect_inventory(client, PROJECTS, ["us-central1"])
+    finally:
+        client.close()
+
+def statuses(inventory):
+    return {name: result["status"] for name, result in diagnose(inventory).items()}
+
+def test_collects_every_page():
+    client, inventory = collect(sample_inventory(extra=9))
+    dev = inventory["projects"][DEFAULT_DEV_PROJECT]
+    assert dev["errors"] == {}
+    assert len(dev["firewalls"]) == 11 and len(dev["routes"]) == 12
+    assert set(dev["routerStatus"]) == {"dev-vpn-router"}
+    assert len(dev["rrsets"]["googleapis-private-zone"]) == 2
+    assert client.stats["pages"] > client.stats["requests"] / 2
+    # 연결은 요청마다가 아니라 작업 스레드마다
+    assert client.stats["connections"] < client.stats["requests"]
+
+def test_sample_inventory_passes():
+    _, inventory = collect(sample_inventory())
+    result = statuses(inventory)
+    assert result.pop("org_policies") == "info"
+    assert set(result.values()) == {"pass"}
+
+def test_disk_cache_skips_requests(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    _, base = start_cloud_standin(sample_inventory())
+    first, inventory = collect(None, cache, base)
+    cached, again = collect(None, cache, base)
+    assert first.stats["requests"] > 0 and cached.stats["requests"] == 0
+    assert again["projects"] == inventory["projects"]
+    refreshed, _ = collect(None, cache, base, refresh=True)
+    assert refreshed.stats["requests"] == first.stats["requests"]
+
+def test_volatile_status_expires_sooner(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path))
+    _, base = start_cloud_standin(sample_inventory())
+    collect(None, cache, base)
+    monkeypatch.setattr(cloud_inventory, "VOLATILE_TTL", 0)
+    client, _ = collect(None, cache, base)
+    # 터널 목록과 라우터 상태만 다시 요청
+    assert client.stats["requests"] == 4
+
+def test_broken_network_is_diagnosed():
+    broken = sample_inventory()
+    dev = broken["projects"][DEFAULT_DEV_PROJECT]
+    prod = broken["projects"][DEFAULT_PROD_PROJECT]
+    dev["vpnTunnels"][0]["status"] = "NO_INCOMING_PACKETS"
+    dev["routerStatus"]["dev-vpn-router"]["bgpPeerStatus"][1]["state"] = "Idle"
+    dev["routerStatus"]["dev-vpn-router"]["bestRoutes"] = []
+    dev["firewalls"] = dev["firewalls"][1:]
+    for entry in (dev, prod):
+        entry["rrsets"]["googleapis-private-zone"][0]["rrdatas"] = ["142.250.1.95"]
+    prod["services"] = prod["services"][:2]
+    _, inventory = collect(broken)
+    result = statuses(inventory)
+    assert result["vpn_tunnels"] == "fail"
+    assert result["bgp_sessions"] == "fail"
+    assert result["cross_routes"] == "fail"
+    assert result["firewall_rules"] == "warn"
+    assert result["cloud_dns"] == "warn"
+    assert result["enabled_apis"] == "fail"
+
+def test_unknown_project_is_recorded():
+    _, base = start_cloud_standin(sample_inventory())
+    client = CloudApiClient(base)
+    inventory = collect_inventory(client, [DEFAULT_DEV_PROJECT, "missing-project"], ["us-central1"])
+    errors = inventory["projects"]["missing-project"]["errors"]
+    assert "404" in errors["vpnTunnels"] and "404" in errors["orgPolicies"]
+    assert statuses(inventory)["vpn_tunnels"] == "fail"
+    with pytest.raises(RestError) as error:
+        client.get("compute", "projects/missing-project/global/networks")
+    assert error.value.code == 404
+    client.close()
+
+def test_dump_is_served_back(tmp_path):
+    _, inventory = collect(sample_inventory(extra=3))
+    dumped = json.loads(json.dumps(inventory))
+    _, again = collect(dumped)
+    assert again["projects"] == inventory["projects"]
+
+def test_main_ndjson(tmp_path, monkeypatch):
+    _, base = start_cloud_standin(sample_inventory())
+    out = io.StringIO()
+    monkeypatch.setattr("sys.stdout", out)
+    code = cloud_inventory.main(["--api-base", base, "--cache-dir", str(tmp_path), "--format", "ndjson"])
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert code == 0
+    assert records[0]["check"] == "inventory" and records[-1]["check"] == "summary"
+    assert records[-1]["status"] == "pass"
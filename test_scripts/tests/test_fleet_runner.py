@@ -0,0 +1,130 @@
+"""fleet_runner - import 묶음, 부트스트랩, 가짜 ssh로 실행한 호스트 병렬 실행과 요약"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from fleet_runner import FleetRunner, Host, bootstrap, bundle, local_imports, main, parse_host, summarize_fleet
+from gemini_startup_bench import SCRIPT, start_background_standin
+from vertex_standin import StandInConfig
+
+# ssh 대신 쓰는 스크립트 - 옵션을 건너뛰고 원격 명령을 로컬에서 실행 (-O check는 마스터 없음)
+FAKE_SSH = textwrap.dedent("""\
+    #!{python}
+    import os, sys
+    args = sys.argv[1:]
+    with_value = {{"-o", "-p", "-l", "-i", "-F", "-S"}}
+    while args and args[0].startswith("-") and args[0] != "--":
+        if args[0] == "-O":
+            sys.exit(255)
+        args = args[2:] if args[0] in with_value else args[1:]
+    destination, command = args[0], [arg for arg in args[1:] if arg != "--"]
+    os.environ["FAKE_SSH_HOST"] = destination
+    os.execvp(command[0], command)
+""")
+
+PROBE = textwrap.dedent("""\
+    import sys, os
+    from result_output import NdjsonWriter
+
+    def main():
+        from helper import status_for
+        writer = NdjsonWriter(sys.stdout, "probe")
+        host = os.environ["FAKE_SSH_HOST"]
+        status = status_for(host)
+        writer.emit("reach", status, 0.01, host=host, argv=sys.argv[1:])
+        writer.emit("summary", status)
+        return 0
+
+    sys.exit(main())
+""")
+
+HELPER = "def status_for(host):\n    return 'fail' if host.startswith('bad') else 'pass'\n"
+
+@pytest.fixture
+def fake_ssh(tmp_path):
+    path = tmp_path / "ssh"
+    path.write_text(FAKE_SSH.format(python=sys.executable))
+    path.chmod(0o755)
+    return str(path)
+
+@pytest.fixture
+def probe_dir(tmp_path):
+    directory = tmp_path / "scripts"
+    directory.mkdir()
+    (directory / "probe.py").write_text(PROBE)
+    (directory / "helper.py").write_text(HELPER)
+    with open(os.path.join(os.path.dirname(SCRIPT), "result_output.py")) as f:
+        (directory / "result_output.py").write_text(f.read())
+    return str(directory)
+
+def test_bundle_follows_lazy_imports():
+    sources = bundle(SCRIPT)
+    assert {"1_test_gemini_api.py", "result_output.py", "gemini_rest.py", "gemini_cassette.py",
+            "region_latency.py", "https_prober.py"} <= set(sources)
+    assert "fleet_runner.py" not in sources
+
+def test_local_imports_ignore_stdlib(probe_dir):
+    assert local_imports(os.path.join(probe_dir, "probe.py"), probe_dir) == {"result_output", "helper"}
+
+def test_bootstrap_runs_from_stdin(probe_dir, tmp_path):
+    program = bootstrap(os.path.join(probe_dir, "probe.py"), ["--x"], {"FAKE_SSH_HOST": "bad-1"}, probe_dir)
+    # 스크립트 디렉터리가 아닌 곳에서 실행해도 묶인 모듈만으로 동작
+    process = subprocess.run([sys.executable, "-"], input=program, capture_output=True, cwd=tmp_path)
+    assert process.returncode == 0, process.stderr
+    assert b'"status": "fail"' in process.stdout and b'"--x"' in process.stdout
+
+def test_parse_host():
+    host = parse_host("ws-1 10.0.1.10 port=2222 user=ops  # lab")
+    assert (host.name, host.destination, host.port, host.user) == ("ws-1", "10.0.1.10", 2222, "ops")
+    assert parse_host("ws-2").destination == "ws-2"
+    assert parse_host("   # comment") is None
+    with pytest.raises(ValueError):
+        parse_host("ws-3 a b")
+
+def test_fleet_run_streams_and_summarizes(fake_ssh, probe_dir, tmp_path):
+    hosts = [Host(name, name, python=sys.executable) for name in ("good-1", "good-2", "bad-1")]
+    streamed = []
+    runner = FleetRunner(hosts, [("probe", os.path.join(probe_dir, "probe.py"))], argv=["--flag"], parallel=2,
+                         ssh_command=[fake_ssh], control_dir=str(tmp_path / "ctl"),
+                         on_record=lambda host, verifier, record: streamed.append((host, record["check"])),
+                         directory=probe_dir)
+    results = runner.run()
+    statuses = {result.host: result.status for result in results}
+    assert statuses == {"good-1": "pass", "good-2": "pass", "bad-1": "fail"}
+    assert ("bad-1", "reach") in streamed and len(streamed) == 6
+    assert all(result.records[0]["data"]["argv"] == ["--flag", "--format", "ndjson"] for result in results)
+    fleet = summarize_fleet(results)["probe"]
+    assert fleet["statuses"] == {"pass": 2, "warn": 0, "fail": 1}
+    assert fleet["failed_hosts"] == ["bad-1"]
+    assert fleet["checks"]["reach"]["statuses"] == {"pass": 2, "fail": 1}
+
+def test_main_runs_script_outside_script_dir(fake_ssh, probe_dir, tmp_path, capsys):
+    # 검증기 경로를 주면 그 스크립트의 디렉터리에서 import를 묶음
+    code = main(["--hosts", "good-1,bad-1", "--verifier", os.path.join(probe_dir, "probe.py"), "--ssh", fake_ssh,
+                 "--control-dir", str(tmp_path / "ctl"), "--persist", "0", "--format", "ndjson"])
+    assert code == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    reach = {record["target"]: record["status"] for record in records if record["check"] == "reach"}
+    assert reach == {"good-1": "pass", "bad-1": "fail"}
+    assert records[-1]["check"] == "fleet_summary"
+
+def test_unreachable_host_fails(tmp_path, probe_dir):
+    runner = FleetRunner([Host("gone", "gone")], [("probe", os.path.join(probe_dir, "probe.py"))],
+                         ssh_command=["false"], control_dir=str(tmp_path / "ctl"), directory=probe_dir)
+    result, = runner.run()
+    assert result.status == "fail" and result.error
+
+def test_gemini_rest_over_fake_ssh(fake_ssh, tmp_path):
+    _, port = start_background_standin(StandInConfig(service_time=0.0, jitter=0.0))
+    hosts = [Host(f"ws-{i}", f"ws-{i}", python=sys.executable) for i in range(2)]
+    runner = FleetRunner(hosts, [("gemini", SCRIPT)], ["--rest", "--api-endpoint", f"http://127.0.0.1:{port}"],
+                         ssh_command=[fake_ssh], control_dir=str(tmp_path / "ctl"))
+    results = runner.run()
+    assert [result.status for result in results] == ["pass", "pass"], [r.stderr_tail for r in results]
+    checks = summarize_fleet(results)["gemini"]["checks"]
+    assert checks["text_generation"]["statuses"] == {"pass": 2}
@@ -0,0 +1,105 @@
+"""gemini_adaptive - AIMD 제한기 수렴과 부하 실행 집계"""
+
+import heapq
+
+import pytest
+
+import gemini_adaptive
+from gemini_adaptive import AimdLimiter, run_adaptive
+
+class Throttled(Exception):
+    code = 429
+
+def simulate(limiter, clock, capacity, completions, latency=1.0):
+    """
+    동시 처리 용량이 capacity인 서버에 대한 닫힌 부하 (끝난 요청 자리는 곧바로 새 요청이 채움)
+    용량을 넘겨 시작한 요청은 429 - 완료마다 (시각, limit) 반환
+    """
+    inflight = []
+    levels = []
+
+    def fill():
+        while limiter.inflight < limiter.level:
+            limiter.acquire()
+            # 완료 시각이 겹치지 않도록 결정적인 ±10% 변동
+            jitter = latency * 0.1 * ((len(levels) * 7919 + limiter.inflight * 104729) % 201 - 100) / 100
+            heapq.heappush(inflight, (clock[0] + latency + jitter, len(levels), limiter.inflight > capacity,
+                                      clock[0]))
+
+    fill()
+    while len(levels) < completions:
+        clock[0], _, throttled, started = heapq.heappop(inflight)
+        limiter.release(None if throttled else latency, throttled, started)
+        levels.append((clock[0], limiter.level))
+        fill()
+    return levels
+
+@pytest.fixture
+def clock(monkeypatch):
+    """제한기의 time.monotonic을 시뮬레이션 시각으로 대체"""
+    now = [0.0]
+    monkeypatch.setattr(gemini_adaptive.time, "monotonic", lambda: now[0])
+    return now
+
+def test_aimd_converges_below_capacity(clock):
+    limiter = AimdLimiter(initial=2, maximum=64, latency_tolerance=0)
+    capacity = 10
+    levels = [level for _, level in simulate(limiter, clock, capacity, 3000)]
+    steady = levels[len(levels) // 2:]
+    # 톱니 모양: 용량 근처까지 왕복마다 +1, 429가 나면 절반
+    assert capacity // 2 <= min(steady)
+    assert max(steady) <= capacity + 2
+    assert capacity * 0.6 <= sum(steady) / len(steady) <= capacity * 1.1
+    assert limiter.decreases >= 5
+    assert not limiter.slow_start
+
+def test_slow_start_reaches_capacity_quickly(clock):
+    limiter = AimdLimiter(initial=1, maximum=256, latency_tolerance=0)
+    levels = simulate(limiter, clock, 100, 2000)
+    # 왕복마다 두 배: 1 → 100 까지 약 7 왕복, 그 뒤 첫 감소
+    first_over = next(at for at, level in levels if level > 100)
+    assert first_over <= 8
+    assert limiter.decreases >= 1
+
+def test_limit_does_not_grow_when_not_saturated(clock):
+    limiter = AimdLimiter(initial=4, maximum=64, latency_tolerance=0)
+    for _ in range(100):
+        limiter.acquire()
+        limiter.release(0.1)
+    assert limiter.level == 4
+
+def test_requests_are_fully_accounted():
+    calls = [0]
+
+    def generate(prompt):
+        calls[0] += 1
+        if calls[0] % 4 == 0:
+            raise ValueError("bad request")
+        return None
+
+    summary = run_adaptive(generate, max_concurrency=4, total_requests=40, max_retries=0, seed=1)
+    assert summary["requests"] == 40
+    assert summary["requests"] == summary["succeeded"] + summary["errors"] + summary["deadline"]
+    assert summary["errors"] == 10
+
+def test_deadline_cut_requests_are_counted():
+    # 분당 60건(초당 1건, 버스트 1) - 첫 요청 뒤로는 모두 속도 제한 대기 중 기한 경과
+    summary = run_adaptive(lambda prompt: None, max_concurrency=4, duration=0.3, rpm=60, seed=1)
+    assert summary["succeeded"] == 1
+    assert summary["deadline"] >= 1
+    assert summary["requests"] == summary["succeeded"] + summary["errors"] + summary["deadline"]
+
+def test_retries_recover_throttled_requests(monkeypatch):
+    monkeypatch.setattr(gemini_adaptive, "backoff_delay", lambda attempt, rng=None: 0.0)
+    calls = [0]
+
+    def generate(prompt):
+        calls[0] += 1
+        if calls[0] <= 3:
+            raise Throttled("quota")
+        return None
+
+    summary = run_adaptive(generate, max_concurrency=2, total_requests=10, max_retries=5, seed=1)
+    assert summary["succeeded"] == 10
+    assert summary["throttled"] == 3
+    assert summary["retried"]["recovered"] >= 1
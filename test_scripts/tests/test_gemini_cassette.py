@@ -0,0 +1,45 @@
+"""gemini_cassette - 레코드 로그 재구성, LRU 내보내기, 재생만 할 때의 압축"""
+
+import os
+
+from gemini_cassette import MIN_COMPACT_BYTES, RECORD_HEADER, Cassette, CassetteStore, cassette_key
+
+def key(i):
+    return cassette_key("gemini-pro", f"prompt {i}")
+
+def test_store_reopens_in_lru_order(tmp_path):
+    path = str(tmp_path / "c.cassette")
+    store = CassetteStore(path)
+    for i in range(3):
+        store.put(key(i), {"text": f"answer {i}"})
+    assert store.get(key(0)) == {"text": "answer 0"}
+    store.close()
+    store = CassetteStore(path)
+    assert list(store.index) == [key(1), key(2), key(0)]
+    assert store.get(key(2), touch=False) == {"text": "answer 2"}
+    store.close()
+
+def test_max_entries_applied_after_load(tmp_path):
+    path = str(tmp_path / "c.cassette")
+    store = CassetteStore(path)
+    for i in range(4):
+        store.put(key(i), {"text": f"answer {i}"})
+    store.close()
+    store = CassetteStore(path, max_entries=2)
+    assert list(store.index) == [key(2), key(3)]
+    store.close()
+    assert len(CassetteStore(path)) == 2
+
+def test_replay_only_cassette_stays_bounded(tmp_path):
+    path = str(tmp_path / "c.cassette")
+    cassette = Cassette(path, timing="none")
+    cassette.store.put(key(0), {"text": "answer", "latency": 0.0, "usage": {}})
+    replays = 3 * MIN_COMPACT_BYTES // RECORD_HEADER.size
+    for _ in range(replays):
+        assert cassette.call(key(0), "prompt 0", generate=None).text == "answer"
+    assert cassette.hits == replays
+    # TOUCH 레코드만 쌓여도 압축 - 파일은 압축 기준 근처를 넘지 않음
+    assert os.path.getsize(path) <= MIN_COMPACT_BYTES + 2 * RECORD_HEADER.size + 1024
+    assert cassette.store.dead_bytes <= MIN_COMPACT_BYTES
+    cassette.close()
+    assert CassetteStore(path).get(key(0))["text"] == "answer"
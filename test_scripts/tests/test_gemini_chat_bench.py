@@ -0,0 +1,75 @@
+"""gemini_chat_bench - 기록 관리 전략(window, summarize)의 trim과 턴별 요청 크기"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from gemini_chat_bench import ChatBenchmark, latency_slope, run_chat_benchmark, text_content
+
+class FakeModel:
+    """generate_content 호출의 contents를 기록하고 입력 메시지 수를 토큰 수로 돌려주는 모델"""
+
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, contents, generation_config=None):
+        self.calls.append(contents)
+        usage = SimpleNamespace(prompt_token_count=len(contents), candidates_token_count=7)
+        return SimpleNamespace(text=f"reply {len(self.calls)}", usage_metadata=usage)
+
+def history(turns):
+    return [text_content(role, f"{role} {turn}") for turn in range(turns) for role in ("user", "model")]
+
+def texts(contents):
+    return [content["parts"][0]["text"] for content in contents]
+
+def test_full_keeps_everything():
+    bench = ChatBenchmark(FakeModel(), "full", keep_turns=2)
+    bench.history = history(10)
+    assert bench.trim() is None and len(bench.history) == 20
+
+def test_window_keeps_recent_turns():
+    model = FakeModel()
+    bench = ChatBenchmark(model, "window", keep_turns=2)
+    bench.history = history(2)
+    assert bench.trim() is None and len(bench.history) == 4
+    bench.history = history(5)
+    assert bench.trim() is None
+    assert texts(bench.history) == ["user 3", "model 3", "user 4", "model 4"]
+    assert not model.calls
+
+def test_summarize_replaces_older_turns():
+    model = FakeModel()
+    bench = ChatBenchmark(model, "summarize", keep_turns=2)
+    # 기록이 keep_turns의 두 배(8개)를 넘을 때까지는 요약하지 않음
+    bench.history = history(4)
+    assert bench.trim() is None and not model.calls
+
+    bench.history = history(5)
+    overhead = bench.trim()
+    assert len(model.calls) == 1
+    prompt = texts(model.calls[0])[0]
+    assert "user 0" in prompt and "model 2" in prompt and "user 3" not in prompt
+    assert overhead["bytes"] > len(prompt) and overhead["tokens"] == 7 and overhead["latency"] >= 0
+    assert [content["role"] for content in bench.history] == ["user", "model"] * 3
+    assert texts(bench.history)[0].endswith("reply 1")
+    assert texts(bench.history)[2:] == ["user 3", "model 3", "user 4", "model 4"]
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError, match="unknown history strategy"):
+        ChatBenchmark(FakeModel(), "drop")
+
+def test_request_size_stays_bounded():
+    results = run_chat_benchmark(FakeModel(), turns=12, strategies=("full", "window", "summarize"), keep_turns=2,
+                                 message_bytes=512)
+    full, window, summarize = (results[name]["turns"] for name in ("full", "window", "summarize"))
+    assert [record["history_messages"] for record in full] == [2 * i for i in range(12)]
+    assert max(record["history_messages"] for record in window) == 4
+    assert max(record["history_messages"] for record in summarize) <= 8
+    assert full[-1]["request_bytes"] > 2 * window[-1]["request_bytes"]
+    assert results["summarize"]["summary"]["summary_calls"] == sum(1 for r in summarize if r["overhead"]) > 0
+    assert results["window"]["summary"]["request_bytes"] < results["full"]["summary"]["request_bytes"]
+
+def test_latency_slope():
+    assert latency_slope([{"turn": t, "latency": 0.5 + 0.25 * t} for t in range(1, 6)]) == pytest.approx(0.25)
+    assert latency_slope([{"turn": 1, "latency": 3.0}]) == 0.0
@@ -0,0 +1,33 @@
+"""gemini_load - 백분위/요약과 로컬 stand-in을 대상으로 한 --load 실행"""
+
+import importlib
+import json
+
+from gemini_load import percentile, summarize
+from gemini_startup_bench import start_background_standin
+from vertex_standin import StandInConfig
+
+def test_percentile_and_summary():
+    assert percentile([], 50) == 0.0 and percentile([2.0], 99) == 2.0
+    values = [float(i) for i in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 90), percentile(values, 99)) == (50.5, 90.1, 99.01)
+    summary = summarize([(0.1, 10), (0.3, 30)], ["boom"], 2.0, 4)
+    assert (summary["requests"], summary["succeeded"], summary["errors"]) == (3, 2, 1)
+    assert summary["requests_per_sec"] == 1.0 and summary["tokens_per_sec"] == 20.0
+    assert summary["latency"]["max"] == 0.3
+
+def test_load_mode_against_standin(capsys):
+    _, port = start_background_standin(StandInConfig(service_time=0.01, jitter=0.005))
+    gemini = importlib.import_module("1_test_gemini_api")
+    code = gemini.main(["--rest", "--api-endpoint", f"http://127.0.0.1:{port}", "--load", "--requests", "40",
+                        "--concurrency", "4", "--format", "ndjson"])
+    assert code == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+    load, = [record for record in records if record["check"] == "load"]
+    data = load["data"]
+    assert load["status"] == "pass"
+    assert data["requests"] == data["succeeded"] == 40 and data["errors"] == 0
+    assert data["concurrency"] == 4
+    assert data["requests_per_sec"] > 0 and data["tokens_per_sec"] > 0 and data["tokens"] > 0
+    latency = data["latency"]
+    assert 0 < latency["p50"] <= latency["p90"] <= latency["p99"] <= latency["max"]
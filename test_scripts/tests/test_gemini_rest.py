@@ -0,0 +1,76 @@
+"""gemini_rest - 로컬 대체 서버에 대한 REST 클라이언트와 1_test_gemini_api.py 지연 import"""
+
+import subprocess
+import sys
+
+import pytest
+
+from gemini_adaptive import error_status, is_retryable
+from gemini_load import response_tokens
+from gemini_rest import GeminiRestClient, RestError, camel_case, rest_config, user_contents
+from gemini_startup_bench import SCRIPT, start_background_standin
+from vertex_standin import StandInConfig
+
+@pytest.fixture(scope="module")
+def standin():
+    return start_background_standin(StandInConfig(service_time=0.0, jitter=0.0, response_tokens=40))
+
+@pytest.fixture
+def client(standin):
+    _, port = standin
+    client = GeminiRestClient("p", "us-central1", api_endpoint=f"http://127.0.0.1:{port}")
+    yield client
+    client.close()
+
+def test_generate_content(client):
+    response = client.generate_content("hello", generation_config={"max_output_tokens": 40})
+    assert response.text
+    assert response_tokens(response) == 40
+    assert response.usage_metadata.prompt_token_count > 0
+
+def test_stream_chunks(client):
+    chunks = list(client.generate_content("hello", stream=True))
+    assert len(chunks) > 1
+    assert "".join(chunk.text for chunk in chunks)
+
+def test_keep_alive_connection_is_reused(client, standin):
+    stand, _ = standin
+    client.generate_content("one")
+    connections = stand.stats.max_connections
+    for _ in range(5):
+        client.generate_content("again")
+    assert stand.stats.max_connections == connections
+
+def test_chat_sends_history(client):
+    chat = client.start_chat()
+    chat.send_message("first")
+    chat.send_message("second")
+    assert [content["role"] for content in chat.history] == ["user", "model", "user", "model"]
+
+def test_http_errors_carry_status_code():
+    _, port = start_background_standin(StandInConfig(service_time=0.0, rate_limit_rate=1.0))
+    client = GeminiRestClient("p", "us-central1", api_endpoint=f"http://127.0.0.1:{port}")
+    with pytest.raises(RestError) as raised:
+        client.generate_content("hello")
+    assert raised.value.status == "RESOURCE_EXHAUSTED"
+    assert error_status(raised.value) == 429 and is_retryable(raised.value)
+
+def test_request_shapes():
+    assert user_contents("hi") == [{"role": "user", "parts": [{"text": "hi"}]}]
+    assert rest_config({"max_output_tokens": 5, "topP": 0.5}) == {"maxOutputTokens": 5, "topP": 0.5}
+    assert camel_case("candidate_count") == "candidateCount"
+
+def test_endpoint_defaults_to_regional_https():
+    client = GeminiRestClient("proj", "europe-west4")
+    assert client.endpoint == "https://europe-west4-aiplatform.googleapis.com:443"
+    assert client.path.startswith("/v1/projects/proj/locations/europe-west4/")
+
+def test_script_import_defers_heavy_modules():
+    code = ("import importlib.util, sys\n"
+            f"spec = importlib.util.spec_from_file_location('gemini_api', {SCRIPT!r})\n"
+            "spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+            "heavy = {'vertexai', 'google.auth', 'numpy', 'region_latency', 'gemini_cassette', 'gemini_load',\n"
+            "         'gemini_adaptive', 'gemini_chat_bench', 'gemini_rest'}\n"
+            "print(sorted(heavy & set(sys.modules)))\n")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
@@ -0,0 +1,99 @@
+"""https_prober - 로컬 TLS 서버에 대한 cold/resumed/warm 단계 타이밍과 연결 풀 재사용"""
+
+import http.server
+import shutil
+import ssl
+import subprocess
+import threading
+
+import pytest
+
+from https_prober import PHASES, ConnectionPool, timed_request, warm_timing
+
+HOST = "localhost"
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/close":
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    if not shutil.which("openssl"):
+        pytest.skip("openssl is required to create a test certificate")
+    directory = tmp_path_factory.mktemp("tls")
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", f"/CN={HOST}",
+                    "-addext", f"subjectAltName=DNS:{HOST}", "-keyout", str(key), "-out", str(cert)],
+                   check=True, capture_output=True)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    context.set_alpn_protocols(["http/1.1"])
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.socket = context.wrap_socket(httpd.socket, server_side=True)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address[1], str(cert)
+    httpd.shutdown()
+    httpd.server_close()
+
+def pool_for(cert):
+    return ConnectionPool(context=ssl.create_default_context(cafile=cert), timeout=5.0)
+
+def test_cold_resumed_and_warm_requests(server):
+    port, cert = server
+    pool = pool_for(cert)
+    try:
+        cold = timed_request(pool, HOST, "127.0.0.1", "/", fresh=True, dns_time=0.25, port=port)
+        resumed = timed_request(pool, HOST, "127.0.0.1", "/", fresh=True, resume=True, port=port)
+        warm = [timed_request(pool, HOST, "127.0.0.1", "/", port=port) for _ in range(3)]
+    finally:
+        pool.close()
+
+    assert (cold["status"], cold["body"], cold["alpn"]) == (200, b'{"ok": true}', "http/1.1")
+    assert not cold["reused"] and not cold["resumed"]
+    assert cold["timing"]["dns"] == 0.25 and cold["timing"]["tcp"] > 0 and cold["timing"]["tls"] > 0
+    assert cold["timing"]["total"] >= 0.25 + cold["timing"]["tcp"] + cold["timing"]["tls"] + cold["timing"]["ttfb"]
+    assert not resumed["reused"] and resumed["resumed"]
+    # warm 요청은 풀의 keep-alive 연결을 재사용 - 연결 단계 비용 없음
+    assert all(r["reused"] and not r["resumed"] for r in warm)
+    assert all(r["timing"][phase] == 0.0 for r in warm for phase in ("dns", "tcp", "tls"))
+    assert set(warm_timing(warm)) == set(PHASES)
+
+def test_pool_reuse_and_close(server):
+    port, cert = server
+    pool = pool_for(cert)
+    try:
+        first = timed_request(pool, HOST, "127.0.0.1", "/", port=port)
+        assert not first["reused"] and timed_request(pool, HOST, "127.0.0.1", "/", port=port)["reused"]
+        # Connection: close 응답의 연결은 풀에 반환되지 않음
+        assert timed_request(pool, HOST, "127.0.0.1", "/close", port=port)["reused"]
+        assert not timed_request(pool, HOST, "127.0.0.1", "/", port=port)["reused"]
+        # fresh 요청은 유휴 연결이 있어도 새 연결을 염
+        assert not timed_request(pool, HOST, "127.0.0.1", "/", fresh=True, port=port)["reused"]
+        assert sum(len(idle) for idle in pool._idle.values()) == 2
+    finally:
+        pool.close()
+    assert not pool._idle
+
+def test_untrusted_certificate_is_an_error(server):
+    port, _ = server
+    pool = ConnectionPool(timeout=5.0)
+    with pytest.raises(ssl.SSLCertVerificationError):
+        timed_request(pool, HOST, "127.0.0.1", "/", port=port)
+    assert not pool._idle
+
+def test_warm_timing_is_per_phase_median():
+    warm = [{"timing": {phase: value for phase in PHASES}} for value in (0.3, 0.1, 0.2)]
+    assert warm_timing(warm) == {phase: pytest.approx(0.2) for phase in PHASES}
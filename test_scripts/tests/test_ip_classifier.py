@@ -0,0 +1,85 @@
+"""ip_classifier - 대역 경계, 겹치는 Terraform 출력 대역, 일괄/단일 분류 일치"""
+
+import ipaddress
+import json
+import random
+import subprocess
+
+import pytest
+
+import ip_classifier
+from ip_classifier import DEFAULT_RANGES, PUBLIC, IpClassifier
+
+def reference(ip, ranges=DEFAULT_RANGES):
+    """정렬 표 없이 계산한 최장 접두사 일치 (같은 길이면 뒤의 대역)"""
+    address = ipaddress.IPv4Address(ip)
+    best = None
+    for index, (cidr, role, private) in enumerate(ranges):
+        network = ipaddress.ip_network(cidr)
+        if address in network and (best is None or (network.prefixlen, index) >= best[0]):
+            best = ((network.prefixlen, index), (role, str(network), private))
+    return best[1] if best else (PUBLIC.role, PUBLIC.network, PUBLIC.private)
+
+def boundary_addresses(ranges=DEFAULT_RANGES):
+    for cidr, _, _ in ranges:
+        network = ipaddress.ip_network(cidr)
+        first, last = int(network.network_address), int(network.broadcast_address)
+        for value in (first - 1, first, first + 1, last - 1, last, last + 1):
+            if 0 <= value < 1 << 32:
+                yield str(ipaddress.IPv4Address(value))
+
+def test_default_range_boundaries():
+    classifier = IpClassifier()
+    for ip in boundary_addresses():
+        assert tuple(classifier.classify(ip)) == reference(ip), ip
+
+def test_known_addresses():
+    classifier = IpClassifier()
+    assert classifier.classify("199.36.153.8").role == "private_google_access"
+    assert classifier.classify("199.36.153.12").role == "google_api_vip_range"
+    assert classifier.classify("169.254.0.1").role == "bgp_tunnel1"
+    assert classifier.classify("169.254.169.254").role == "metadata_server"
+    assert classifier.classify("10.0.1.10") == ("dev_subnet", "10.0.1.0/24", True)
+    assert classifier.classify("35.235.240.1") == ("iap_tcp_forwarding", "35.235.240.0/20", False)
+    assert classifier.classify("142.250.1.95") == PUBLIC
+    assert classifier.classify("2001:db8::1") == PUBLIC and classifier.classify("not-an-ip") == PUBLIC
+
+def fake_terraform(monkeypatch, outputs, returncode=0):
+    def run(cmd, **kwargs):
+        assert cmd[:1] == ["terraform"] and "output" in cmd
+        return subprocess.CompletedProcess(cmd, returncode, json.dumps(outputs), "no state")
+    monkeypatch.setattr(ip_classifier.subprocess, "run", run)
+
+def test_terraform_output_overlapping_ranges(monkeypatch):
+    # 서브넷이 VPC 전체와 같거나 VPC를 벗어나도 서브넷 역할이 우선
+    fake_terraform(monkeypatch, {"dev_subnet_cidr": {"value": "10.0.0.0/16"},
+                                 "prod_subnet_cidr": {"value": "10.1.128.0/17"},
+                                 "unrelated": {"value": "x"}})
+    classifier = IpClassifier.from_terraform_output("infra")
+    ranges = [(dict(dev_subnet="10.0.0.0/16", prod_subnet="10.1.128.0/17").get(role, cidr), role, private)
+              for cidr, role, private in DEFAULT_RANGES]
+    assert classifier.classify("10.0.200.1").role == "dev_subnet"
+    assert classifier.classify("10.1.1.5").role == "prod_vpc"
+    assert classifier.classify("10.1.200.5") == ("prod_subnet", "10.1.128.0/17", True)
+    for ip in boundary_addresses(ranges):
+        assert tuple(classifier.classify(ip)) == reference(ip, ranges), ip
+
+def test_terraform_output_failure(monkeypatch):
+    fake_terraform(monkeypatch, {}, returncode=1)
+    with pytest.raises(RuntimeError, match="no state"):
+        IpClassifier.from_terraform_output()
+
+def test_classify_many_matches_classify():
+    classifier = IpClassifier()
+    rng = random.Random(5)
+    ips = list(boundary_addresses())
+    ips += [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(2000)]
+    ips += ["0.0.0.0", "255.255.255.255", "bogus", "::1", ""]
+    assert classifier.classify_many(ips) == [classifier.classify(ip) for ip in ips]
+    assert classifier.role_counts(["10.0.1.1", "10.0.1.2", "8.8.8.8"]) == {"dev_subnet": 2, "public": 1}
+
+def test_classify_many_without_numpy(monkeypatch):
+    classifier = IpClassifier()
+    monkeypatch.setattr(ip_classifier, "np", None)
+    ips = ["199.36.153.9", "bogus", "172.20.0.1"]
+    assert [label.role for label in classifier.classify_many(ips)] == ["private_google_access", "public", "rfc1918"]
@@ -0,0 +1,172 @@
+"""netinfo - rtnetlink dump 메시지와 procfs/sysfs 파일 파싱, 최장 접두사 라우트 선택"""
+
+import ipaddress
+import socket
+import struct
+
+import pytest
+
+import netinfo
+from netinfo import (IFADDRMSG, IFINFOMSG, NLMSGHDR, RTATTR, RTMSG, NetSnapshot, Route, read_procfs,
+                     read_rtnetlink)
+
+def rtattr(kind, value):
+    data = RTATTR.pack(RTATTR.size + len(value), kind) + value
+    return data + b"\0" * (-len(data) % 4)
+
+def message(kind, seq, body):
+    data = NLMSGHDR.pack(NLMSGHDR.size + len(body), kind, 2, seq, 0) + body
+    return data + b"\0" * (-len(data) % 4)
+
+def ip(value):
+    return ipaddress.IPv4Address(value).packed
+
+def u32(value):
+    return struct.pack("=I", value)
+
+LINKS = [
+    IFINFOMSG.pack(0, 772, 1, 0x9, 0) + rtattr(netinfo.IFLA_IFNAME, b"lo\0") + rtattr(netinfo.IFLA_MTU, u32(65536))
+    + rtattr(netinfo.IFLA_OPERSTATE, b"\0"),
+    IFINFOMSG.pack(0, 1, 2, 0x1003, 0) + rtattr(netinfo.IFLA_IFNAME, b"ens4\0") + rtattr(netinfo.IFLA_MTU, u32(1460))
+    + rtattr(netinfo.IFLA_OPERSTATE, b"\x06"),
+    IFINFOMSG.pack(0, 65534, 3, 0x91, 0) + rtattr(netinfo.IFLA_IFNAME, b"tunnel-a\0")
+    + rtattr(netinfo.IFLA_LINKINFO, rtattr(netinfo.IFLA_INFO_KIND, b"wireguard\0")),
+]
+ADDRESSES = [
+    IFADDRMSG.pack(socket.AF_INET, 8, 0, 0, 1) + rtattr(netinfo.IFA_LOCAL, ip("127.0.0.1"))
+    + rtattr(netinfo.IFA_LABEL, b"lo\0"),
+    IFADDRMSG.pack(socket.AF_INET, 24, 0, 0, 2) + rtattr(netinfo.IFA_ADDRESS, ip("10.0.1.10")),
+    IFADDRMSG.pack(socket.AF_INET6, 64, 0, 0, 2) + rtattr(netinfo.IFA_ADDRESS, b"\xfe\x80" + b"\0" * 14),
+]
+ROUTES = [
+    RTMSG.pack(socket.AF_INET, 0, 0, 0, 254, 0, 0, 1, 0) + rtattr(netinfo.RTA_GATEWAY, ip("10.0.1.1"))
+    + rtattr(netinfo.RTA_OIF, u32(2)) + rtattr(netinfo.RTA_PRIORITY, u32(100)),
+    RTMSG.pack(socket.AF_INET, 30, 0, 0, 254, 0, 0, 1, 0) + rtattr(netinfo.RTA_DST, ip("199.36.153.8"))
+    + rtattr(netinfo.RTA_OIF, u32(3)),
+    RTMSG.pack(socket.AF_INET, 24, 0, 0, 254, 0, 0, 1, 0) + rtattr(netinfo.RTA_DST, ip("10.0.1.0"))
+    + rtattr(netinfo.RTA_OIF, u32(2)) + rtattr(netinfo.RTA_PREFSRC, ip("10.0.1.10")),
+    # local 테이블(RTN_LOCAL)과 다른 테이블 번호(RTA_TABLE)
+    RTMSG.pack(socket.AF_INET, 32, 0, 0, 255, 0, 0, 2, 0) + rtattr(netinfo.RTA_DST, ip("10.0.1.10")),
+    RTMSG.pack(socket.AF_INET, 0, 0, 0, 252, 0, 0, 1, 0) + rtattr(netinfo.RTA_TABLE, u32(1000))
+    + rtattr(netinfo.RTA_OIF, u32(3)),
+]
+
+class FakeNetlinkSocket:
+    """dump 요청마다 캡처한 메시지를 두 번의 recv로 나누어 돌려주는 rtnetlink 소켓"""
+
+    replies = {netinfo.RTM_GETLINK: LINKS, netinfo.RTM_GETADDR: ADDRESSES, netinfo.RTM_GETROUTE: ROUTES}
+
+    def __init__(self, *args):
+        self.pending = []
+
+    def bind(self, address):
+        pass
+
+    def send(self, data):
+        _, kind, flags, seq, _ = NLMSGHDR.unpack_from(data)
+        assert flags & netinfo.NLM_F_DUMP
+        bodies = self.replies[kind]
+        # 다른 요청의 메시지(seq 불일치)는 무시되어야 함
+        self.pending = [message(16, seq + 100, bodies[0]) + b"".join(message(16, seq, body) for body in bodies[:2]),
+                        b"".join(message(16, seq, body) for body in bodies[2:]) + message(netinfo.NLMSG_DONE, seq,
+                                                                                          u32(0))]
+
+    def recv(self, size):
+        return self.pending.pop(0)
+
+    def close(self):
+        pass
+
+def test_read_rtnetlink_parses_dump(monkeypatch):
+    monkeypatch.setattr(netinfo.socket, "socket", FakeNetlinkSocket)
+    snapshot = read_rtnetlink()
+    assert snapshot.source == "rtnetlink"
+    assert [(link.name, link.mtu, link.operstate, link.up) for link in snapshot.links] == [
+        ("lo", 65536, "unknown", True), ("ens4", 1460, "up", True), ("tunnel-a", 0, "unknown", True)]
+    assert [link.name for link in snapshot.vpn_links()] == ["tunnel-a"]
+    assert [(a.ifname, str(a.interface)) for a in snapshot.addresses] == [("lo", "127.0.0.1/8"),
+                                                                          ("ens4", "10.0.1.10/24")]
+    assert [route.describe() for route in snapshot.routes] == [
+        "default via 10.0.1.1 dev ens4 metric 100", "199.36.153.8/30 dev tunnel-a",
+        "10.0.1.0/24 dev ens4 src 10.0.1.10", "default dev tunnel-a"]
+    assert snapshot.routes[-1].table == 1000
+    assert snapshot.route_get("199.36.153.9").ifname == "tunnel-a"
+    assert snapshot.route_get("8.8.8.8").gateway == ipaddress.IPv4Address("10.0.1.1")
+
+def test_netlink_error_raises(monkeypatch):
+    class Failing(FakeNetlinkSocket):
+        def send(self, data):
+            seq = NLMSGHDR.unpack_from(data)[3]
+            self.pending = [message(netinfo.NLMSG_ERROR, seq, struct.pack("=i", -1) + data)]
+
+    monkeypatch.setattr(netinfo.socket, "socket", Failing)
+    with pytest.raises(OSError):
+        read_rtnetlink()
+
+PROC_ROUTE = """\
+Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT
+ens4\t00000000\t0101000A\t0003\t0\t0\t100\t00000000\t0\t0\t0
+ens4\t0001000A\t00000000\t0001\t0\t0\t0\t00FFFFFF\t0\t0\t0
+wg0\t089924C7\t00000000\t0001\t0\t0\t0\tFCFFFFFF\t0\t0\t0
+ens4\t0002000A\t00000000\t0000\t0\t0\t0\t00FFFFFF\t0\t0\t0
+"""
+
+FIB_TRIE = """\
+Main:
+  +-- 0.0.0.0/0 3 0 5
+     |-- 0.0.0.0
+        /0 universe UNICAST
+     +-- 10.0.1.0/24 2 0 2
+        |-- 10.0.1.0
+           /24 link UNICAST
+        |-- 10.0.1.10
+           /32 host LOCAL
+  +-- 127.0.0.0/8 2 0 2
+     |-- 127.0.0.1
+        /32 host LOCAL
+Local:
+  +-- 0.0.0.0/0 3 0 5
+     |-- 10.0.1.10
+        /32 host LOCAL
+     |-- 172.31.0.5
+        /32 host LOCAL
+"""
+
+def write_link(base, name, **files):
+    directory = base / name
+    directory.mkdir(parents=True)
+    for attr, value in files.items():
+        (directory / attr).write_text(value + "\n")
+
+def test_read_procfs(tmp_path):
+    proc, sys_net = tmp_path / "proc", tmp_path / "net"
+    (proc / "net").mkdir(parents=True)
+    (proc / "net" / "route").write_text(PROC_ROUTE)
+    (proc / "net" / "fib_trie").write_text(FIB_TRIE)
+    write_link(sys_net, "lo", ifindex="1", mtu="65536", operstate="unknown", flags="0x9")
+    write_link(sys_net, "ens4", ifindex="2", mtu="1460", operstate="up", flags="0x1003")
+    write_link(sys_net, "wg0", ifindex="3", mtu="1420", operstate="unknown", flags="0x91", uevent="DEVTYPE=wireguard")
+    write_link(sys_net, "tap9", ifindex="4", flags="0x1002", tun_flags="0x1002")
+
+    snapshot = read_procfs(str(proc), str(sys_net))
+    assert snapshot.source == "procfs"
+    assert {link.name: (link.index, link.kind, link.up) for link in snapshot.links} == {
+        "ens4": (2, "", True), "lo": (1, "", True), "tap9": (4, "tun", False), "wg0": (3, "wireguard", True)}
+    # 플래그에 RTF_UP이 없는 라우트는 제외
+    assert [route.describe() for route in snapshot.routes] == [
+        "default via 10.0.1.1 dev ens4 metric 100", "10.0.1.0/24 dev ens4", "199.36.153.8/30 dev wg0"]
+    assert [(a.ifname, a.ifindex, str(a.interface)) for a in snapshot.addresses] == [
+        ("ens4", 2, "10.0.1.10/24"), ("lo", 1, "127.0.0.1/8"), ("", 0, "172.31.0.5/32")]
+    assert snapshot.route_get("199.36.153.10").ifname == "wg0"
+
+def test_route_get_prefers_longest_prefix_then_metric():
+    snapshot = NetSnapshot("test", routes=[
+        Route(ipaddress.IPv4Network("0.0.0.0/0"), "ens4", metric=100),
+        Route(ipaddress.IPv4Network("199.36.153.0/24"), "ens4", metric=10),
+        Route(ipaddress.IPv4Network("199.36.153.8/30"), "vti0", metric=200),
+        Route(ipaddress.IPv4Network("199.36.153.8/30"), "vti1", metric=100),
+        Route(ipaddress.IPv4Network("199.36.153.8/32"), "other", table=100),
+    ])
+    assert snapshot.route_get("199.36.153.8").ifname == "vti1"
+    assert snapshot.route_get("199.36.153.20").ifname == "ens4"
+    assert snapshot.route_get("1.1.1.1").metric == 100
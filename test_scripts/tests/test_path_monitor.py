@@ -0,0 +1,75 @@
+"""path_monitor - CachedCheck 무효화(파일, netlink 세대), RollingWindow 통계와 경로 전환"""
+
+import os
+
+import pytest
+
+from path_monitor import CachedCheck, NetlinkWatcher, RollingWindow, file_stamp
+
+class FakeNetlink:
+    def __init__(self):
+        self.value = 0
+
+    def generation(self):
+        return self.value
+
+def counting():
+    calls = []
+
+    def check():
+        calls.append(1)
+        return {"status": "pass", "run": len(calls)}
+    return check, calls
+
+def test_cached_check_invalidated_by_file_change(tmp_path):
+    path = tmp_path / "resolv.conf"
+    path.write_text("nameserver 169.254.169.254\n")
+    func, calls = counting()
+    check = CachedCheck(func, files=[str(path), str(tmp_path / "missing")])
+    assert check()["run"] == 1 and check()["run"] == 1
+    assert (check.hits, check.misses) == (1, 1)
+    path.write_text("nameserver 10.0.0.2\nsearch internal\n")
+    assert check()["run"] == 2
+    (tmp_path / "missing").write_text("")
+    assert check()["run"] == 3 and len(calls) == 3
+    assert check.__name__ == "check"
+
+def test_cached_check_invalidated_by_netlink_generation():
+    func, calls = counting()
+    netlink = FakeNetlink()
+    check = CachedCheck(func, netlink=netlink)
+    check()
+    check()
+    netlink.value += 1
+    check()
+    assert len(calls) == 2 and check.hits == 1
+
+def test_netlink_watcher_never_caches_without_netlink():
+    watcher = NetlinkWatcher()
+    if watcher.available:
+        # 이벤트가 없으면 세대가 그대로
+        assert watcher.generation() == watcher.generation()
+    watcher.close()
+    assert not watcher.available
+    assert watcher.generation() != watcher.generation()
+
+def test_file_stamp(tmp_path):
+    path = tmp_path / "hosts"
+    path.write_text("x")
+    stamp, missing = file_stamp([str(path), str(tmp_path / "none")])
+    assert stamp == (os.stat(path).st_mtime_ns, 1) and missing is None
+
+def test_rolling_window():
+    window = RollingWindow(size=4)
+    assert window.path_ratio("private") == 0.0 and window.latency_stats("dns") is None
+    assert window.add(0, "private", {"dns": 0.01, "connection": 0.2}) is None
+    assert window.add(1, "private", {"dns": 0.03}) is None
+    assert window.add(2, "public", {"dns": 0.02, "connection": 0.4}) == ("private", "public")
+    assert window.add(3, "public", {"dns": 0.04}) is None
+    assert window.latency_stats("dns") == pytest.approx({"p50": 0.025, "p90": 0.037, "max": 0.04})
+    assert window.latency_stats("connection")["max"] == 0.4
+    assert window.path_ratio("public") == 0.5
+    # 가장 오래된 회차는 밀려남
+    window.add(4, "public", {"dns": 1.0})
+    assert len(window.samples) == 4 and window.path_ratio("public") == 0.75
+    assert window.latency_stats("connection") == {"p50": 0.4, "p90": 0.4, "max": 0.4}
@@ -0,0 +1,89 @@
+"""path_prober - 홉 요약, IP_RECVERR 오류 큐 파싱, 루프백 UDP/TCP 탐침"""
+
+import socket
+import struct
+import sys
+
+import pytest
+
+import path_prober
+from path_prober import (ICMP_DEST_UNREACH, ICMP_TIME_EXCEEDED, IP_RECVERR, SO_EE_ORIGIN_ICMP, SO_TIMESTAMPNS,
+                         SOCK_EXTENDED_ERR, Probe, _read_error_queue, probe_paths, summarize_target)
+
+def probe(target, ttl, index, rtt=None, address=None, reached=False):
+    result = Probe(target, ttl, index, None)
+    result.sent = 0.0
+    result.rtt = rtt
+    result.address = address
+    result.reached = reached
+    return result
+
+def test_summarize_stops_at_destination():
+    target = "199.36.153.8"
+    probes = [
+        probe(target, 1, 0, 0.001, "10.0.1.1"), probe(target, 1, 1, 0.003, "10.0.1.1"),
+        probe(target, 2, 0), probe(target, 2, 1, 0.010, "169.254.0.1"),
+        probe(target, 3, 0, 0.020, target, True), probe(target, 3, 1, 0.030, target, True),
+        probe(target, 4, 0, 0.020, target, True),
+    ]
+    path = summarize_target(target, probes)
+    assert path["reached_at"] == 3
+    assert [hop["ttl"] for hop in path["hops"]] == [1, 2, 3]
+    assert path["hops"][0]["rtt_ms"] == pytest.approx({"min": 1.0, "p50": 2.0, "max": 3.0})
+    assert path["hops"][1]["addresses"] == ["169.254.0.1"]
+    assert path["hops"][1]["loss"] == 0.5
+
+def test_summarize_trims_silent_tail():
+    target = "10.0.1.100"
+    probes = [probe(target, 1, 0, 0.001, "10.0.1.1")] + [probe(target, ttl, 0) for ttl in range(2, 6)]
+    path = summarize_target(target, probes)
+    assert path["reached_at"] is None
+    # 마지막 응답 홉 다음의 무응답 홉 하나만 남김
+    assert [(hop["ttl"], hop["received"], hop["rtt_ms"]) for hop in path["hops"]] == [
+        (1, 1, pytest.approx({"min": 1.0, "p50": 1.0, "max": 1.0})), (2, 0, None)]
+
+def recverr(icmp_type, offender, origin=SO_EE_ORIGIN_ICMP):
+    return SOCK_EXTENDED_ERR.pack(113, origin, icmp_type, 0, 0, 0, 0) + struct.pack(
+        "=HH4s8x", socket.AF_INET, 0, socket.inet_aton(offender))
+
+class ErrorQueueSocket:
+    def __init__(self, *ancdata):
+        self.ancdata = list(ancdata)
+
+    def recvmsg(self, size, ancsize, flags):
+        assert flags == path_prober.MSG_ERRQUEUE
+        if not self.ancdata:
+            raise BlockingIOError
+        return b"", self.ancdata, 0, None
+
+def test_read_error_queue():
+    stamp = (socket.SOL_SOCKET, SO_TIMESTAMPNS, struct.pack("=qq", 1_700_000_000, 250_000_000))
+    sock = ErrorQueueSocket(stamp, (socket.IPPROTO_IP, IP_RECVERR, recverr(ICMP_TIME_EXCEEDED, "169.254.0.1")))
+    assert _read_error_queue(sock) == (ICMP_TIME_EXCEEDED, "169.254.0.1", 1_700_000_000.25)
+    # 타임스탬프가 없으면 수신 시각 None, ICMP가 아닌 오류(로컬 EMSGSIZE 등)는 무시
+    sock = ErrorQueueSocket((socket.IPPROTO_IP, IP_RECVERR, recverr(ICMP_DEST_UNREACH, "10.0.1.100")))
+    assert _read_error_queue(sock) == (ICMP_DEST_UNREACH, "10.0.1.100", None)
+    assert _read_error_queue(ErrorQueueSocket((socket.IPPROTO_IP, IP_RECVERR, recverr(3, "127.0.0.1", 1)))) is None
+    assert _read_error_queue(ErrorQueueSocket()) is None
+
+linux = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="IP_RECVERR is Linux only")
+
+@linux
+def test_udp_probe_to_closed_loopback_port():
+    closed = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    closed.bind(("127.0.0.1", 0))
+    port = closed.getsockname()[1]
+    closed.close()
+    path = probe_paths(["127.0.0.1"], max_hops=3, probes=2, timeout=2.0, port=port)["127.0.0.1"]
+    assert path["reached_at"] == 1
+    assert [(hop["ttl"], hop["addresses"], hop["received"]) for hop in path["hops"]] == [(1, ["127.0.0.1"], 2)]
+
+@linux
+def test_tcp_probe_to_loopback_listener():
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        path = probe_paths(["127.0.0.1"], max_hops=2, probes=2, timeout=2.0, mode="tcp",
+                           port=listener.getsockname()[1])["127.0.0.1"]
+    assert path["reached_at"] == 1
+    assert path["hops"][0]["loss"] == 0.0
@@ -0,0 +1,91 @@
+"""pcap_analyzer 재전송 집계 - 합성 pcap으로 재정렬/재전송/시퀀스 번호 순환 확인"""
+
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pcap_analyzer import PcapAnalyzer, TCP_ACK, TCP_SYN
+
+CLIENT, SERVER = "10.0.1.10", "199.36.153.8"
+
+def ipv4(address):
+    return bytes(int(part) for part in address.split("."))
+
+def tcp_packet(src, dst, sport, dport, seq, flags=TCP_ACK, payload=b""):
+    tcp = struct.pack("!HHIIBBHHH", sport, dport, seq & 0xFFFFFFFF, 0, 5 << 4, flags, 65535, 0, 0) + payload
+    header = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 20 + len(tcp), 0, 0, 64, 6, 0, ipv4(src), ipv4(dst))
+    return header + tcp
+
+def write_pcap(path, packets):
+    """LINKTYPE_RAW(101) pcap - 패킷 간 1ms 간격"""
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 101))
+        for i, packet in enumerate(packets):
+            f.write(struct.pack("<IIII", 1_700_000_000, i * 1000, len(packet), len(packet)) + packet)
+
+def data(seq, size=100):
+    return tcp_packet(CLIENT, SERVER, 40000, 443, seq, TCP_ACK, b"x" * size)
+
+def handshake(isn):
+    return [tcp_packet(CLIENT, SERVER, 40000, 443, isn, TCP_SYN),
+            tcp_packet(SERVER, CLIENT, 443, 40000, 5000, TCP_SYN | TCP_ACK),
+            tcp_packet(CLIENT, SERVER, 40000, 443, isn + 1, TCP_ACK)]
+
+def retransmits(tmp_path, packets, chunk_size=65536):
+    path = tmp_path / "capture.pcap"
+    write_pcap(path, packets)
+    report = PcapAnalyzer().analyze(str(path), chunk_size)
+    stats = report["paths"]["pga_vip"]
+    return stats["data_segments"], stats["retransmits"]
+
+def test_in_order_stream_has_no_retransmits(tmp_path):
+    packets = handshake(1000) + [data(1001 + i * 100) for i in range(6)]
+    assert retransmits(tmp_path, packets) == (6, 0)
+
+def test_reordered_segment_is_not_a_retransmit(tmp_path):
+    # 두 번째 세그먼트가 세 번째 뒤에 도착 (재정렬) - 재전송 아님
+    seqs = [1001, 1201, 1101, 1301, 1401, 1501]
+    packets = handshake(1000) + [data(seq) for seq in seqs]
+    assert retransmits(tmp_path, packets) == (6, 0)
+
+def test_reordered_segment_below_first_data_without_syn(tmp_path):
+    # SYN 없이 캡처가 시작되고 첫 데이터보다 앞선 세그먼트가 늦게 도착
+    seqs = [1101, 1001, 1201, 1301, 1401, 1501, 1601, 1701, 1801]
+    assert retransmits(tmp_path, [data(seq) for seq in seqs]) == (9, 0)
+
+def test_duplicate_segments_are_retransmits(tmp_path):
+    seqs = [1001, 1101, 1201, 1101, 1301, 1201, 1401]
+    packets = handshake(1000) + [data(seq) for seq in seqs]
+    assert retransmits(tmp_path, packets) == (7, 2)
+
+def test_retransmit_of_filled_hole(tmp_path):
+    # 1101 손실 -> 나중에 채워짐(재정렬 아님) -> 같은 세그먼트가 다시 오면 재전송
+    seqs = [1001, 1201, 1301, 1101, 1101]
+    packets = handshake(1000) + [data(seq) for seq in seqs]
+    assert retransmits(tmp_path, packets) == (5, 1)
+
+def test_sequence_wraparound(tmp_path):
+    isn = 0xFFFFFFFF - 250
+    seqs = [isn + 1 + i * 100 for i in range(6)]
+    packets = handshake(isn) + [data(seq) for seq in seqs] + [data(seqs[2])]
+    assert retransmits(tmp_path, packets) == (7, 1)
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3])
+def test_state_carries_across_chunks(tmp_path, chunk_size):
+    seqs = [1001, 1201, 1101, 1301, 1201, 1401]
+    packets = handshake(1000) + [data(seq) for seq in seqs]
+    assert retransmits(tmp_path, packets, chunk_size) == (6, 1)
+
+def test_flow_longer_than_4gib(tmp_path):
+    # 헤더만 캡처(snaplen)하고 IP 길이로 64KB 세그먼트를 표시 - 시퀀스 번호가 한 바퀴 넘게 돎
+    size = 65495
+    count = (1 << 32) // size + 2000
+    isn = 0x7FFFFFFF
+    packets = handshake(isn)
+    for i in range(count):
+        packet = data(isn + 1 + i * size, 0)
+        packets.append(packet[:2] + struct.pack("!H", 40 + size) + packet[4:])
+    packets.append(packets[-1])
+    assert retransmits(tmp_path, packets) == (count + 1, 1)
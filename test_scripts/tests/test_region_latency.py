@@ -0,0 +1,65 @@
+"""region_latency - 순위(비공개 경로 우선), 캐시 만료/리전 목록 무효화, fastest_region"""
+
+import json
+import time
+
+import pytest
+
+import region_latency
+from region_latency import fastest_region, load_ranking, rank, save_ranking
+
+def result(region, connect, healthy=True, private=True, **extra):
+    return dict({"region": region, "healthy": healthy, "private": private, "connect_total": connect, "ttfb": 0.01},
+                **extra)
+
+def test_rank_prefers_private_healthy_regions():
+    ranking = rank([
+        result("public-fast", 0.01, private=False),
+        result("down", 0.001, healthy=False),
+        result("private-slow", 0.20),
+        result("private-fast", 0.05),
+        result("generated", 0.01, generate=0.5),
+    ])
+    assert [r["region"] for r in ranking] == ["private-fast", "private-slow", "generated", "public-fast", "down"]
+
+def test_load_ranking_ttl_and_region_set(tmp_path):
+    path = str(tmp_path / "ranking.json")
+    save_ranking({"measured_at": time.time() - 100, "regions": ["a", "b"], "generate": False, "ranking": []}, path)
+    assert load_ranking(path, ttl=600, regions=["b", "a"])["regions"] == ["a", "b"]
+    assert load_ranking(path, ttl=50, regions=["a", "b"]) is None
+    assert load_ranking(path, ttl=600, regions=["a", "c"]) is None
+    assert load_ranking(str(tmp_path / "missing.json")) is None
+    (tmp_path / "broken.json").write_text("{")
+    assert load_ranking(str(tmp_path / "broken.json")) is None
+
+@pytest.fixture
+def probes(monkeypatch):
+    calls = []
+    measured = {
+        "us-central1": result("us-central1", 0.08),
+        "europe-west4": result("europe-west4", 0.02, private=False, classification="public"),
+        "asia-northeast3": result("asia-northeast3", 0.01, healthy=False),
+        "us-east4": result("us-east4", 0.05),
+    }
+
+    def probe(region, *args):
+        calls.append(region)
+        return dict(measured[region])
+
+    monkeypatch.setattr(region_latency, "probe_region", probe)
+    return calls, measured
+
+def test_fastest_region_skips_public_and_unhealthy(probes, tmp_path):
+    calls, measured = probes
+    cache = str(tmp_path / "ranking.json")
+    regions = list(measured)
+    assert fastest_region(regions, cache_path=cache) == "us-east4"
+    assert sorted(calls) == sorted(regions)
+    # 유효한 캐시에서는 다시 측정하지 않음
+    assert fastest_region(regions, cache_path=cache) == "us-east4"
+    assert len(calls) == len(regions)
+    with open(cache) as f:
+        assert [r["region"] for r in json.load(f)["ranking"]][-2:] == ["europe-west4", "asia-northeast3"]
+    # 리전 목록이 바뀌면 재측정, 공개 주소로만 해석되는 리전뿐이면 None
+    assert fastest_region(["europe-west4", "asia-northeast3"], cache_path=cache) is None
+    assert len(calls) == len(regions) + 2
@@ -0,0 +1,51 @@
+"""result_output - NDJSON 레코드 형태, 줄 단위 flush, on_record 전달"""
+
+import io
+import json
+import threading
+from datetime import datetime
+
+from result_output import NdjsonWriter
+
+class FlushCounter(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+def test_record_shape():
+    stream = FlushCounter()
+    writer = NdjsonWriter(stream, "verify_gemini_private_connection")
+    record = writer.emit("dns", "pass", 0.01234567, resolved={"aiplatform.googleapis.com": ["199.36.153.8"]},
+                         note="한글")
+    assert set(record) == {"tool", "run_id", "host", "timestamp", "check", "status", "elapsed", "data"}
+    assert record["tool"] == "verify_gemini_private_connection" and record["check"] == "dns"
+    assert record["elapsed"] == 0.012346 and record["run_id"].startswith(record["host"] + "-")
+    assert datetime.fromisoformat(record["timestamp"]).utcoffset().total_seconds() == 0
+    line = stream.getvalue()
+    assert line.endswith("\n") and "한글" in line and stream.flushes == 1
+    assert json.loads(line) == record
+    assert writer.emit("summary", "info")["elapsed"] is None
+
+def test_records_of_a_run_share_run_id_and_are_whole_lines():
+    stream = io.StringIO()
+    received = []
+    writer = NdjsonWriter(stream, "tool", on_record=received.append)
+    threads = [threading.Thread(target=lambda i=i: [writer.emit(f"check-{i}", "pass", 0.1, n=n) for n in range(50)])
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(records) == len(received) == 400
+    assert {record["run_id"] for record in records} == {writer.run_id}
+
+def test_without_stream_only_calls_on_record():
+    received = []
+    writer = NdjsonWriter(None, "tool", on_record=received.append)
+    record = writer.emit("dns", "fail", 1.0, error="timeout")
+    assert received == [record] and record["data"] == {"error": "timeout"}
@@ -0,0 +1,144 @@
+"""results_store - 레코드 저장, 일별 추이와 축약, 경로 전환, Mann-Whitney 회귀 검출"""
+
+import importlib
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from gemini_startup_bench import start_background_standin
+from result_output import NdjsonWriter
+from results_store import DAY, ResultStore, main, mann_whitney, metrics_of, observed_path
+from vertex_standin import StandInConfig
+
+NOW = 1_760_054_400.0  # UTC 자정 - 하루 단위 기록이 날짜 경계와 맞도록
+
+def record(check, status="pass", elapsed=None, ts=NOW, run_id="run-1", host="ws-1",
+           tool="1_test_gemini_api", **data):
+    return {"tool": tool, "run_id": run_id, "host": host, "check": check, "status": status, "elapsed": elapsed,
+            "timestamp": datetime.fromtimestamp(ts, timezone.utc).isoformat(), "data": data}
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite3"))
+    yield store
+    store.db.close()
+
+def add_latency_history(store, days, per_day, latency, start=NOW, check="text_generation"):
+    """days일 동안 하루 per_day번 실행 - latency(day, rng)가 생성 지연 시간"""
+    rng = random.Random(7)
+    for day in range(days):
+        for i in range(per_day):
+            ts = start - (day * DAY + i * DAY / per_day) - 60
+            run_id = f"run-{day}-{i}"
+            store.add(record(check, elapsed=1.0, ts=ts, run_id=run_id, latency=latency(day, rng)))
+            store.add(record("summary", ts=ts, run_id=run_id))
+    store.db.commit()
+
+def test_metrics_flatten_numbers():
+    metrics = metrics_of(record("load", elapsed=2.5, wall_time=2.4, ok=True, latency={"p95": 0.8, "hist": [1, 2]},
+                                name="x"))
+    assert metrics == {"elapsed": 2.5, "wall_time": 2.4, "latency.p95": 0.8}
+
+def test_observed_path():
+    assert observed_path(record("summary", path="public")) == "public"
+    assert observed_path(record("network_path", "info", api_ip="199.36.153.9")) == "private"
+    assert observed_path(record("network_path", "info", api_ip="142.250.1.95")) == "public"
+    assert observed_path(record("text_generation", latency=1.0)) is None
+
+def test_mann_whitney():
+    rng = random.Random(1)
+    baseline = [rng.gauss(1.0, 0.1) for _ in range(40)]
+    assert mann_whitney(baseline, [rng.gauss(1.3, 0.1) for _ in range(20)])[1] < 1e-6
+    assert mann_whitney(baseline, [rng.gauss(1.0, 0.1) for _ in range(20)])[1] > 0.01
+    assert mann_whitney([1.0] * 10, [1.0] * 10)[1] == 1.0
+
+def test_trend_spans_raw_and_compacted_days(store):
+    add_latency_history(store, 90, 20, lambda day, rng: 1.0 + day / 100 + rng.random() / 10)
+    raw = store.trend("text_generation", "latency", days=91, now=NOW)
+    assert len(raw) == 90
+    compacted = store.compact(keep_days=30, now=NOW)
+    assert compacted > 0
+    assert store.db.execute("SELECT MIN(ts) FROM samples").fetchone()[0] >= NOW - 31 * DAY
+    after = store.trend("text_generation", "latency", days=91, now=NOW)
+    assert [day for day, _, _ in after] == [day for day, _, _ in raw]
+    assert [count for _, count, _ in after] == [count for _, count, _ in raw]
+    for (_, _, before), (_, _, value) in zip(raw, after):
+        assert value == pytest.approx(before, rel=1e-9)
+    # 다른 백분위는 축약된 날을 제외하고 원본 표본으로만 계산
+    assert len(store.trend("text_generation", "latency", days=91, pct=90, now=NOW)) < 35
+
+def test_trend_cli_explicit_percentile(tmp_path, capsys):
+    # argparse가 float로 넘기는 --percentile 95 / 50도 축약된 날의 p95 / p50 열을 사용
+    path = str(tmp_path / "results.sqlite3")
+    store = ResultStore(path)
+    add_latency_history(store, 40, 5, lambda day, rng: 1.0 + day / 100, start=time.time())
+    assert store.compact(keep_days=10) > 0
+    store.db.close()
+    days = {}
+    for pct in ("95", "50", "95.0", "90"):
+        assert main(["--db", path, "--trend", "text_generation:latency", "--percentile", pct, "--days", "45",
+                     "--json"]) == 0
+        days[pct] = len(json.loads(capsys.readouterr().out)["trend"])
+    assert days["95"] == days["50"] == days["95.0"] >= 40
+    # 요약이 없는 백분위는 원본 표본이 남은 날만
+    assert days["90"] <= 12
+
+def test_path_flips(store):
+    for i, path in enumerate(["private", "private", "public", "private", "public", "public"]):
+        store.add(record("summary", ts=NOW + i, run_id=f"r{i}", tool="verify_gemini_private_connection",
+                         path=path))
+    store.add(record("summary", ts=NOW + 10, run_id="other", host="ws-2", tool="verify_gemini_private_connection",
+                     path="public"))
+    flips = store.path_flips("public", now=NOW + 20)
+    assert [flip["run_id"] for flip in flips] == ["r2", "r4"]
+    assert all(flip["previous"] == "private" for flip in flips)
+    assert [flip["run_id"] for flip in store.path_flips("private", now=NOW + 20)] == ["r3"]
+    # 나중에 ingest한 오래된 관측도 앞뒤 관측과 비교
+    store.add(record("summary", ts=NOW + 0.5, run_id="late", tool="verify_gemini_private_connection",
+                     path="public"))
+    assert [flip["run_id"] for flip in store.path_flips("public", now=NOW + 20)] == ["late", "r2", "r4"]
+    assert [flip["run_id"] for flip in store.path_flips("private", now=NOW + 20)] == ["r1", "r3"]
+
+def test_regression_flagged_against_baseline(store):
+    add_latency_history(store, 15, 12, lambda day, rng: (1.6 if day == 0 else 1.0) + rng.random() / 10)
+    findings = {(f["check"], f["metric"]): f for f in store.regressions(now=NOW)}
+    latency = findings[("text_generation", "latency")]
+    assert latency["regression"] and latency["change"] > 0.4 and latency["p"] < 1e-6
+    # 일정한 elapsed는 변화 없음
+    assert not findings[("text_generation", "elapsed")]["regression"]
+
+def test_no_regression_for_noise(store):
+    add_latency_history(store, 15, 12, lambda day, rng: 1.0 + rng.random() / 10)
+    assert not any(finding["regression"] for finding in store.regressions(now=NOW))
+
+def test_writer_without_stream_feeds_store(store):
+    writer = NdjsonWriter(None, "verify_gemini_private_connection", on_record=store.add)
+    writer.emit("dns", "pass", 0.02)
+    writer.emit("summary", "pass", 0.5, path="private")
+    assert store.db.execute("SELECT status, elapsed FROM runs").fetchall() == [("pass", 0.5)]
+    assert store.path_flips("private") == []
+
+def test_verifier_imports_store_only_with_flag():
+    code = ("import sys; import verify_gemini_private_connection\n"
+            "print(sorted({'results_store', 'sqlite3'} & set(sys.modules)))\n")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    assert output.strip() == "[]"
+
+def test_gemini_main_store(tmp_path):
+    _, port = start_background_standin(StandInConfig(service_time=0.0, jitter=0.0))
+    gemini = importlib.import_module("1_test_gemini_api")
+    path = str(tmp_path / "history.sqlite3")
+    for _ in range(2):
+        assert gemini.main(["--rest", "--api-endpoint", f"http://127.0.0.1:{port}", "--store", path]) == 0
+    db = sqlite3.connect(path)
+    assert db.execute("SELECT COUNT(*), MIN(status) FROM runs").fetchone() == (2, "pass")
+    checks = {name for name, in db.execute("SELECT DISTINCT check_name FROM samples")}
+    assert {"text_generation", "code_generation", "chat_session", "vertex_init"} <= checks
@@ -0,0 +1,49 @@
+"""tf_diagram - 저장소 .tf에서 뽑은 토폴로지, 해시 캐시, 합성 토폴로지 렌더링 규모"""
+
+import time
+
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from tf_diagram import DEFAULT_TF_DIR, TerraformModel, build_topology, draw, synthetic_model, topology_hash
+
+@pytest.fixture(scope="module")
+def topology():
+    return build_topology(TerraformModel.load(DEFAULT_TF_DIR))
+
+def test_topology_from_repo_terraform(topology):
+    assert len(topology["projects"]) == 2
+    assert len(topology["tunnels"]) == 4
+    assert all(tunnel["peer"] for tunnel in topology["tunnels"])
+    assert {link["kind"] for link in topology["google_apis"]} == {"pga", "dns"}
+
+def test_hash_follows_topology(topology):
+    key = topology_hash(topology, format="png", dpi=150, title=None)
+    assert key == topology_hash(build_topology(TerraformModel.load(DEFAULT_TF_DIR)), format="png", dpi=150,
+                                title=None)
+    assert key != topology_hash(topology, format="svg", dpi=150, title=None)
+    changed = dict(topology, tunnels=topology["tunnels"][:2])
+    assert key != topology_hash(changed, format="png", dpi=150, title=None)
+
+def test_unchanged_topology_comes_from_cache(topology, tmp_path):
+    cache = str(tmp_path / "cache")
+    first = draw(topology, str(tmp_path / "a.png"), cache)
+    assert not first["cached"] and first["boxes"] > 10 and first["texts"] > 10
+    second = draw(topology, str(tmp_path / "b.png"), cache)
+    assert second["cached"] and second["hash"] == first["hash"]
+    assert (tmp_path / "b.png").read_bytes() == (tmp_path / "a.png").read_bytes()
+    assert not draw(topology, str(tmp_path / "c.png"), cache, force=True)["cached"]
+    svg = draw(topology, str(tmp_path / "a.svg"), cache)
+    assert not svg["cached"] and (tmp_path / "a.svg").read_text().lstrip().startswith("<?xml")
+
+def test_synthetic_topology_scales(tmp_path):
+    model = synthetic_model(16)
+    assert len(model.resources) > 400
+    topology = build_topology(model)
+    assert len(topology["projects"]) == 17 and len(topology["tunnels"]) == 64
+    start = time.perf_counter()
+    result = draw(topology, str(tmp_path / "big.png"), None)
+    assert time.perf_counter() - start < 5
+    assert result["boxes"] > 200
+    assert (tmp_path / "big.png").stat().st_size > 10_000
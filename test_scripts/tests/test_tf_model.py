@@ -0,0 +1,99 @@
+"""tf_model - HCL 파싱과 방화벽 평가 (단일 흐름 참조 구현과 벡터화 평가 일치)"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from tf_model import FirewallEngine, FirewallRule, Subnet, TerraformModel, parse_hcl
+
+SUBNETS = [Subnet("app", "vpc-a", "10.0.0.0/24"), Subnet("db", "vpc-a", "10.0.1.0/24"),
+           Subnet("edge", "vpc-b", "10.1.0.0/24")]
+TAGS = ["web", "db", "ssh"]
+PROTOCOLS = ["tcp", "udp", "icmp", "esp"]
+
+@pytest.fixture(scope="module")
+def model():
+    return TerraformModel.load()
+
+def random_rules(rng, count):
+    """우선순위가 겹치고 CIDR/포트 구간이 서로 걸치는 무작위 규칙"""
+    rules = []
+    for i in range(count):
+        protocols = []
+        for _ in range(rng.randint(1, 2)):
+            number = rng.choice([6, 17, 1, None])
+            ports = None
+            if number in (6, 17) and rng.random() < 0.8:
+                low = rng.randint(0, 65000)
+                ports = [(low, low + rng.choice([0, 10, 1000]))]
+            protocols.append((number, ports))
+        prefix = rng.choice([8, 16, 20, 24, 28, 32])
+        address = rng.choice(["10.0.0.0", "10.0.1.0", "10.1.0.0", "192.168.0.0", "0.0.0.0"])
+        rules.append(FirewallRule(
+            name=f"rule-{i}", network=rng.choice(["vpc-a", "vpc-b"]), action=rng.choice(["allow", "deny"]),
+            direction=rng.choice(["INGRESS", "EGRESS"]), priority=rng.choice([100, 500, 1000]),
+            ranges=[f"{address}/{0 if address == '0.0.0.0' else prefix}"], protocols=protocols,
+            target_tags=rng.sample(TAGS, rng.randint(0, 1))))
+    return rules
+
+def random_flows(rng, count):
+    hosts = ["10.0.0.5", "10.0.0.200", "10.0.1.9", "10.1.0.7", "192.168.0.1", "8.8.8.8"]
+    return ([rng.choice(hosts) for _ in range(count)], [rng.choice(hosts) for _ in range(count)],
+            [rng.choice([22, 80, 443, 3306, rng.randint(0, 65535)]) for _ in range(count)],
+            [rng.choice(PROTOCOLS) for _ in range(count)])
+
+def assert_agree(engine, flows, tags, direction):
+    allowed, indexes = engine.evaluate_many(*flows, target_tags=tags, direction=direction)
+    for i, flow in enumerate(zip(*flows)):
+        decision = engine.evaluate(*flow, target_tags=tags, direction=direction)
+        assert (decision.allowed, decision.rule) == (bool(allowed[i]), engine.rule_name(indexes[i], direction)), flow
+
+@pytest.mark.parametrize("count", [5, 70, 150])  # 규칙 비트마스크가 여러 64비트 워드에 걸치는 경우 포함
+@pytest.mark.parametrize("direction", ["INGRESS", "EGRESS"])
+def test_vectorized_matches_reference(count, direction):
+    rng = random.Random(count)
+    engine = FirewallEngine(random_rules(rng, count), SUBNETS)
+    flows = random_flows(rng, 400)
+    for tags in ((), ("web",), ("db", "ssh")):
+        assert_agree(engine, flows, tags, direction)
+
+def test_repo_firewall_vectorized_matches_reference(model):
+    engine = model.firewall()
+    rng = random.Random(7)
+    hosts = [subnet.cidr.rsplit(".", 1)[0] + ".10" for subnet in model.subnets] + ["35.235.240.5", "8.8.8.8"]
+    flows = ([rng.choice(hosts) for _ in range(300)], [rng.choice(hosts) for _ in range(300)],
+             [rng.choice([22, 80, 443, 500, 4500, 3389]) for _ in range(300)],
+             [rng.choice(PROTOCOLS) for _ in range(300)])
+    tags = sorted({tag for instance in model.instances for tag in instance.tags})
+    for direction in ("INGRESS", "EGRESS"):
+        assert_agree(engine, flows, (), direction)
+        assert_agree(engine, flows, tags, direction)
+
+def test_priority_and_deny_precedence():
+    rules = [FirewallRule("allow-ssh", "vpc-a", "allow", ranges=["0.0.0.0/0"], protocols=[(6, [(22, 22)])]),
+             FirewallRule("deny-ssh", "vpc-a", "deny", ranges=["0.0.0.0/0"], protocols=[(6, [(22, 22)])]),
+             FirewallRule("allow-web", "vpc-a", "allow", priority=100, ranges=["192.168.0.0/16"],
+                          protocols=[(6, [(80, 80), (443, 443)])])]
+    engine = FirewallEngine(rules, SUBNETS)
+    assert engine.evaluate("192.168.1.1", "10.0.0.5", 22, "tcp").rule == "deny-ssh"
+    assert engine.evaluate("192.168.1.1", "10.0.0.5", 443, "tcp").allowed
+    assert not engine.evaluate("192.168.1.1", "10.1.0.7", 443, "tcp").allowed
+    assert engine.evaluate("10.0.0.5", "8.8.8.8", 53, "udp", direction="EGRESS").allowed
+
+def test_parse_hcl_blocks():
+    attributes, (block,) = parse_hcl('''
+resource "google_compute_firewall" "allow_ssh" {
+  name    = "allow-ssh"
+  network = google_compute_network.dev.id
+  allow {
+    protocol = "tcp"
+    ports    = ["22", "8000-8080"]
+  }
+  source_ranges = ["35.235.240.0/20"] # IAP
+}
+''')
+    assert attributes == {}
+    assert (block.type, block.labels) == ("resource", ["google_compute_firewall", "allow_ssh"])
+    assert block.children("allow")[0].attributes["ports"] == ["22", "8000-8080"]
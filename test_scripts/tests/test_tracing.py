@@ -0,0 +1,110 @@
+"""tracing - no-op 비활성 경로, 중첩/스레드 스팬, Chrome/OTLP 내보내기, 두 스크립트의 계측"""
+
+import importlib
+import json
+import sys
+import time
+
+import pytest
+
+import tracing
+from gemini_startup_bench import start_background_standin
+from vertex_standin import StandInConfig
+
+@pytest.fixture(autouse=True)
+def stopped():
+    yield
+    tracing.stop()
+
+def chrome_events(path):
+    with open(path) as f:
+        return [event for event in json.load(f)["traceEvents"] if event["ph"] == "X"]
+
+def test_disabled_span_is_shared_noop():
+    assert not tracing.enabled()
+    with tracing.span("anything", key=1) as span:
+        span.set(status="pass")
+    assert span is tracing.NOOP_SPAN
+    assert tracing.stop("unused.json") == 0
+
+def test_nested_spans_and_exports(tmp_path):
+    tracer = tracing.start("unit")
+    with tracing.span("outer", mode="tests"):
+        with tracing.span("inner") as inner:
+            time.sleep(0.002)
+            inner.set(status="pass")
+        with pytest.raises(ValueError):
+            with tracing.span("broken"):
+                raise ValueError("bad")
+    outer, inner, broken = sorted(tracer.spans, key=lambda span: span.start)
+    assert inner.parent_id == outer.span_id and broken.parent_id == outer.span_id
+    assert outer.parent_id is None and broken.error == "ValueError: bad"
+
+    assert tracing.stop(str(tmp_path / "trace.json")) == 3
+    events = {event["name"]: event for event in chrome_events(tmp_path / "trace.json")}
+    assert events["inner"]["args"] == {"status": "pass"} and events["inner"]["dur"] >= 2000
+    assert events["outer"]["ts"] <= events["inner"]["ts"]
+    assert events["outer"]["ts"] + events["outer"]["dur"] >= events["inner"]["ts"] + events["inner"]["dur"]
+
+    tracer.write(str(tmp_path / "trace.otlp.json"))
+    with open(tmp_path / "trace.otlp.json") as f:
+        spans = json.load(f)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {span["name"]: span for span in spans}
+    assert by_name["inner"]["parentSpanId"] == by_name["outer"]["spanId"]
+    assert "parentSpanId" not in by_name["outer"]
+    assert by_name["broken"]["status"] == {"code": 2, "message": "ValueError: bad"}
+    assert {"key": "mode", "value": {"stringValue": "tests"}} in by_name["outer"]["attributes"]
+    assert len({span["traceId"] for span in spans}) == 1
+
+    # 두 형식 모두 같은 요약
+    chrome = tracing.summarize(tracing.load_spans(str(tmp_path / "trace.json")))
+    otlp = tracing.summarize(tracing.load_spans(str(tmp_path / "trace.otlp.json")))
+    assert [row[:2] for row in chrome] == [row[:2] for row in otlp]
+
+def test_summary_self_time():
+    # outer 10ms 안에 inner 6ms - outer 자체 시간은 4ms
+    rows = {name: (count, total, own) for name, count, total, own in
+            tracing.summarize([("outer", 1, 0, 10_000), ("inner", 1, 1_000, 6_000), ("other", 2, 500, 3_000)])}
+    assert rows["outer"] == (1, 10_000, 4_000)
+    assert rows["inner"] == (1, 6_000, 6_000)
+    assert rows["other"] == (1, 3_000, 3_000)
+
+def test_worker_thread_spans_attach_to_root():
+    verify = importlib.import_module("verify_gemini_private_connection")
+    tracer = tracing.start("verify")
+
+    def command():
+        out, _, code = verify.run_command([sys.executable, "-c", "print('ok')"])
+        return {"status": "pass" if out == "ok" and code == 0 else "fail"}
+
+    checks = [("first", command, ()), ("second", command, ("first",))]
+    with tracing.span("root"):
+        results = verify.run_checks(checks, echo=False)
+    assert {name: result["data"]["status"] for name, result in results.items()} == {"first": "pass",
+                                                                                   "second": "pass"}
+    spans = {span.span_id: span for span in tracer.spans}
+    root = next(span for span in spans.values() if span.name == "root")
+    commands = [span for span in spans.values() if span.name == "run_command"]
+    assert len(commands) == 2
+    for span in commands:
+        check = spans[span.parent_id]
+        assert check.name in ("first", "second") and check.parent_id == root.span_id
+        assert check.thread == span.thread != root.thread
+        assert span.attributes["returncode"] == 0
+
+def test_gemini_main_trace(tmp_path):
+    _, port = start_background_standin(StandInConfig(service_time=0.0, jitter=0.0))
+    gemini = importlib.import_module("1_test_gemini_api")
+    path = str(tmp_path / "gemini.json")
+    assert gemini.main(["--rest", "--api-endpoint", f"http://127.0.0.1:{port}", "--trace", path]) == 0
+    assert not tracing.enabled()
+    events = chrome_events(path)
+    names = [event["name"] for event in events]
+    for name in ("1_test_gemini_api", "vertex_init", "connect", "text_generation", "code_generation",
+                 "chat_session", "network_path"):
+        assert name in names
+    assert names.count("generate_content") == 2 and names.count("send_message") == 2
+    text = next(event for event in events if event["name"] == "text_generation")
+    generate = next(event for event in events if event["name"] == "generate_content")
+    assert text["ts"] <= generate["ts"] and generate["ts"] + generate["dur"] <= text["ts"] + text["dur"]
+    assert text["args"]["status"] == "pass"
@@ -0,0 +1,65 @@
+"""vertex_standin - 로컬 대체 서버의 요청 처리"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from vertex_standin import StandInConfig, start_standin
+
+GENERATE = "/v1/projects/p/locations/us-central1/publishers/google/models/gemini-2.5-flash:generateContent"
+
+def exchange(raw, config=None):
+    """대체 서버를 띄우고 raw 요청을 보낸 뒤 (상태 줄, 본문 JSON, 통계) 반환"""
+
+    async def run():
+        server, standin, port = await start_standin("127.0.0.1", 0, config or StandInConfig(service_time=0))
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(raw)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = head.split(b"\r\n", 1)[0].decode()
+            length = int(next(line.split(b":", 1)[1] for line in head.split(b"\r\n")
+                              if line.lower().startswith(b"content-length")))
+            body = json.loads(await reader.readexactly(length))
+            writer.close()
+            return status, body, standin.stats.snapshot()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(run())
+
+def request(body, content_length=None):
+    payload = json.dumps(body).encode()
+    length = len(payload) if content_length is None else content_length
+    return (f"POST {GENERATE} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {length}\r\n\r\n").encode() + payload
+
+def test_generate_content():
+    status, body, _ = exchange(request({"contents": [{"role": "user", "parts": [{"text": "hello"}]}]}))
+    assert status == "HTTP/1.1 200 OK"
+    assert body["candidates"][0]["content"]["parts"][0]["text"]
+    assert body["usageMetadata"]["candidatesTokenCount"] > 0
+
+@pytest.mark.parametrize("value", ["abc", "-5", "12, 12"])
+def test_malformed_content_length_is_bad_request(value):
+    status, body, stats = exchange(request({"contents": []}, content_length=value))
+    assert status == "HTTP/1.1 400 Bad Request"
+    assert body["error"]["status"] == "INVALID_ARGUMENT"
+    assert stats["statuses"] == {400: 1}
+
+def test_rate_limit_rejected_before_service_time():
+    # 429는 서비스 시간(1초)을 기다리지 않고 바로, 503은 처리 후
+    body = {"contents": [{"role": "user", "parts": [{"text": "hello"}]}]}
+    for config, code, status in ((StandInConfig(service_time=1.0, jitter=0, rate_limit_rate=1.0), 429,
+                                  "RESOURCE_EXHAUSTED"),
+                                 (StandInConfig(service_time=0.2, jitter=0, error_rate=1.0), 503, "UNAVAILABLE")):
+        start = time.perf_counter()
+        line, response, stats = exchange(request(body), config)
+        elapsed = time.perf_counter() - start
+        assert line.startswith(f"HTTP/1.1 {code}") and response["error"]["status"] == status
+        assert (elapsed < 0.5) if code == 429 else (elapsed >= 0.2)
+        assert stats["max_inflight"] == (0 if code == 429 else 1)
@@ -0,0 +1,735 @@
+#!/usr/bin/env python3
+"""
+tf_diagram.py - Terraform 모델로 그리는 하이브리드 네트워크 아키텍처 다이어그램
+tf_model.py가 파싱한 프로젝트, VPC, 서브넷, VM, HA VPN 게이트웨이/터널, Cloud Router(BGP), NAT, DNS 영역,
+방화벽 규칙을 자동 배치하여 Agg 백엔드로 그림 (상자/선은 종류별 컬렉션 하나씩, 글자는 글리프 경로 컬렉션 하나)
+토폴로지 해시로 출력을 캐시하므로 .tf가 바뀌지 않으면 다시 그리지 않음
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import hashlib
+import argparse
+import ipaddress
+import re
+
+try:
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection, PathCollection, PolyCollection
+    from matplotlib.font_manager import FontProperties, findfont, get_font
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+    from matplotlib.path import Path
+    try:
+        from matplotlib.ft2font import LoadFlags
+        NO_HINTING = LoadFlags.NO_HINTING
+    except ImportError:
+        from matplotlib.ft2font import LOAD_NO_HINTING as NO_HINTING
+    import numpy as np
+except ImportError:
+    Figure = None
+
+from tf_model import TerraformModel, DEFAULT_TF_DIR, parse_hcl
+from bgp_sim import BgpSimulator
+
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "gcp_diagrams")
+DEFAULT_OUTPUT = "gcp-hybrid-network-architecture.png"
+CACHE_ENTRIES = 32
+# 배치/스타일이 바뀌면 올려서 이전 캐시를 무효화
+STYLE_VERSION = 1
+
+# Private Google Access VIP 대역 (ip_classifier.py의 google_api_vip_range)
+GOOGLE_API_RANGE = ipaddress.ip_network("199.36.153.0/24")
+EXTERNAL_PROJECT = "(external)"
+DEFAULT_PROJECT = "(provider default project)"
+
+# 배치 단위 (1단위 = 0.5인치)
+INCH_PER_UNIT = 0.5
+# 큰 토폴로지는 해상도를 낮춰 픽셀 수(그리기/PNG 인코딩 시간)를 제한
+MAX_MEGAPIXELS = 12
+PAD = 0.35
+GAP = 0.25
+PROJECT_GAP = 3.0
+NODE_W, NODE_H = 2.6, 0.95
+SERVICE_W, SERVICE_H = 2.6, 0.95
+SUBNET_MIN_W = 5.8
+LINE_H = 0.27
+MAX_COLUMNS = 4
+MAX_RULE_LINES = 6
+# VPC가 이보다 많으면 간략 표시 (방화벽은 요약 한 줄, VM은 이름과 머신 유형만)
+COMPACT_NETWORKS = 8
+HEADER = {"project": 1.0, "network": 0.75, "subnet": 0.5}
+
+PROJECT_COLORS = ["#4285F4", "#EA4335", "#34A853", "#FBBC04", "#7E57C2", "#00897B", "#F4511E", "#5C6BC0"]
+# 종류별 (채움, 테두리, 선 굵기, 선 모양)
+BOX_STYLES = {
+    "project": ("#E8F0FE", None, 2.5, "solid"),
+    "network": ("#E3F2FD", None, 1.5, "solid"),
+    "subnet": ("#FFFFFF", None, 1.0, "dashed"),
+    "instance": ("#E8F5E9", "#2E7D32", 1.2, "solid"),
+    "gateway": ("#34A853", "#1B5E20", 1.2, "solid"),
+    "router": ("#EDE7F6", "#5E35B1", 1.2, "solid"),
+    "nat": ("#FFF3E0", "#F57C00", 1.2, "solid"),
+    "dns": ("#E0F7FA", "#00838F", 1.2, "solid"),
+    "firewall": ("#FFEBEE", "#D32F2F", 1.0, "solid"),
+    "google_apis": ("#FFF8E1", "#FBBC04", 2.0, "solid"),
+}
+# 종류별 (색, 굵기, 선 모양)
+LINE_STYLES = {
+    "tunnel": ("#34A853", 2.0, "solid"),
+    "external": ("#34A853", 2.0, "dashdot"),
+    "pga": ("#1976D2", 1.5, "dashed"),
+    "dns": ("#00838F", 1.2, "dotted"),
+}
+# 글자 종류별 (크기 pt, 굵기, 모양, 글꼴, 가로 정렬, 세로 정렬, 줄 간격, 색, 배경 상자)
+TEXT_STYLES = {
+    "title": (22, "bold", "normal", "sans-serif", "center", "bottom", 1.2, "black", False),
+    "subtitle": (13, "normal", "italic", "sans-serif", "center", "bottom", 1.2, "black", False),
+    "project": (13, "bold", "normal", "sans-serif", "left", "top", 1.2, "black", False),
+    "network": (10.5, "bold", "normal", "sans-serif", "left", "top", 1.2, "black", False),
+    "subnet": (8.5, "normal", "normal", "sans-serif", "left", "top", 1.2, "black", False),
+    "node": (7, "normal", "normal", "sans-serif", "center", "center", 1.3, "black", False),
+    "gateway": (7, "normal", "normal", "sans-serif", "center", "center", 1.3, "white", False),
+    "rules": (7, "normal", "normal", "monospace", "left", "top", 1.45, "black", False),
+    "link": (7, "normal", "normal", "sans-serif", "center", "center", 1.3, "black", True),
+}
+
+# --- 모델 → 토폴로지 ----------------------------------------------------------
+
+def _text(value):
+    """풀리지 않은 보간(랜덤 접미사 등)은 [참조]로 표시"""
+    return re.sub(r"\$\{\s*([^}]*?)\s*\}", r"[\1]", value if isinstance(value, str) else str(value))
+
+def _name(model, block, label):
+    return _text(model.value(block.attributes.get("name", label)))
+
+def _project_label(model, block):
+    return model.ref_name(block.attributes.get("project")) or DEFAULT_PROJECT
+
+def build_topology(model):
+    """
+    다이어그램에 필요한 것만 담은 JSON 직렬화 가능한 토폴로지 - 캐시 키도 이 값의 해시
+    {"projects": [...], "networks": {...}, "tunnels": [...], "google_apis": [...]}
+    """
+    projects = {}
+    for label, block in model.resources_of("google_project"):
+        projects[label] = {"label": label, "name": _name(model, block, label),
+                           "project_id": _text(model.value(block.attributes.get("project_id", label))),
+                           "networks": []}
+
+    def project(label):
+        if label not in projects:
+            projects[label] = {"label": label, "name": label, "project_id": label, "networks": []}
+        return projects[label]
+
+    networks = {}
+    for label, block in model.resources_of("google_compute_network"):
+        name = model.networks[label]
+        networks[name] = {"name": name, "project": _project_label(model, block), "subnets": [], "gateways": [],
+                          "routers": [], "nats": [], "dns": [], "rules": []}
+        project(networks[name]["project"])["networks"].append(name)
+
+    def network(name, owner=DEFAULT_PROJECT):
+        if name not in networks:
+            networks[name] = {"name": name, "project": owner, "subnets": [], "gateways": [],
+                              "routers": [], "nats": [], "dns": [], "rules": []}
+            project(owner)["networks"].append(name)
+        return networks[name]
+
+    subnets = {}
+    for subnet in model.subnets:
+        block = model.resources[("google_compute_subnetwork", subnet.name)]
+        subnets[subnet.name] = entry = {"name": _name(model, block, subnet.name), "cidr": subnet.cidr,
+                                        "region": _text(subnet.region), "pga": subnet.private_google_access,
+                                        "instances": []}
+        network(subnet.network)["subnets"].append(entry)
+    for label, block in model.resources_of("google_compute_instance"):
+        interfaces = block.children("network_interface")
+        subnet = subnets.get(model.ref_name(interfaces[0].attributes.get("subnetwork"))) if interfaces else None
+        if subnet is not None:
+            subnet["instances"].append({"name": _name(model, block, label),
+                                        "machine_type": _text(model.value(block.attributes.get("machine_type", ""))),
+                                        "external_ip": any(i.children("access_config") for i in interfaces)})
+
+    gateways = {}
+    for kind in ("google_compute_ha_vpn_gateway", "google_compute_vpn_gateway"):
+        for label, block in model.resources_of(kind):
+            name = _name(model, block, label)
+            gateways[label] = name
+            network(model.network_name(block.attributes.get("network")))["gateways"].append(
+                {"name": name, "ha": kind.endswith("ha_vpn_gateway")})
+    externals = {}
+    for label, block in model.resources_of("google_compute_external_vpn_gateway"):
+        externals[label] = name = _name(model, block, label)
+        addresses = [_text(model.value(i.attributes.get("ip_address", ""))) for i in block.children("interface")]
+        # 외부(온프레미스) 게이트웨이는 별도 "프로젝트"로 묶음
+        network(f"{name} (peer)", EXTERNAL_PROJECT)["gateways"].append(
+            {"name": name, "ha": False, "external": True, "addresses": addresses})
+        projects[EXTERNAL_PROJECT]["name"] = "On-premises / external peers"
+
+    bgp = BgpSimulator(model)
+    router_names = {}
+    for label, block in model.resources_of("google_compute_router"):
+        name = _name(model, block, label)
+        router_names[label] = name
+        router = bgp.routers.get(name)
+        network(model.network_name(block.attributes.get("network")))["routers"].append(
+            {"name": name, "asn": router.asn if router else None,
+             "ranges": [_text(r) for r in router.advertised_ranges] if router else []})
+    for label, block in model.resources_of("google_compute_router_nat"):
+        router = model.value(block.attributes.get("router"))
+        router = router_names.get(model.ref_name(router), router)
+        owner = next((n for n in networks.values() if any(r["name"] == router for r in n["routers"])), None)
+        if owner is not None:
+            owner["nats"].append({"name": _name(model, block, label), "router": router})
+    for label, block in model.resources_of("google_dns_managed_zone"):
+        visible = [model.ref_name(n.attributes.get("network_url"))
+                   for config in block.children("private_visibility_config") for n in config.children("networks")]
+        zone = {"name": _name(model, block, label), "dns_name": _text(model.value(block.attributes.get("dns_name", ""))),
+                "visibility": _text(model.value(block.attributes.get("visibility", "public")))}
+        for network_label in visible:
+            if network_label in model.networks:
+                network(model.networks[network_label])["dns"].append(zone)
+
+    for rule in model.firewall_rules:
+        if rule.network in networks:
+            networks[rule.network]["rules"].append({"name": _text(rule.name), "action": rule.action,
+                                                    "direction": rule.direction, "priority": rule.priority,
+                                                    "disabled": rule.disabled})
+    for entry in networks.values():
+        entry["rules"].sort(key=lambda r: (r["direction"], r["priority"], r["action"] != "deny", r["name"]))
+
+    sessions = {}
+    for session in bgp.sessions:
+        sessions.setdefault(session.local.tunnel, []).append(f"{session.local.local_ip}↔{session.remote.local_ip}")
+    tunnels = []
+    for label, block in model.resources_of("google_compute_vpn_tunnel"):
+        attrs = block.attributes
+        local = gateways.get(model.ref_name(attrs.get("vpn_gateway")))
+        peer = gateways.get(model.ref_name(attrs.get("peer_gcp_gateway"))) \
+            or externals.get(model.ref_name(attrs.get("peer_external_gateway")))
+        if local is None or peer is None:
+            continue
+        name = _name(model, block, label)
+        router = router_names.get(model.ref_name(attrs.get("router")))
+        tunnels.append({"name": name, "gateway": local, "peer": peer, "router": router,
+                        "interface": model.value(attrs.get("vpn_gateway_interface", 0)),
+                        "external": peer in externals.values(), "bgp": sorted(sessions.get(name, []))})
+
+    google_apis = []
+    for entry in networks.values():
+        for router in entry["routers"]:
+            if any(_in_google_range(r) for r in router["ranges"]):
+                google_apis.append({"network": entry["name"], "node": router["name"], "kind": "pga",
+                                    "label": ", ".join(r for r in router["ranges"] if _in_google_range(r))})
+        for zone in entry["dns"]:
+            if zone["dns_name"].rstrip(".").endswith("googleapis.com"):
+                google_apis.append({"network": entry["name"], "node": zone["name"], "kind": "dns",
+                                    "label": zone["dns_name"]})
+
+    return {"projects": [p for p in projects.values() if p["networks"]], "networks": networks,
+            "tunnels": tunnels, "google_apis": google_apis}
+
+def _in_google_range(cidr):
+    try:
+        return ipaddress.ip_network(cidr, strict=False).subnet_of(GOOGLE_API_RANGE)
+    except (ValueError, TypeError):
+        return False
+
+def topology_hash(topology, **options):
+    """토폴로지와 출력 옵션의 SHA-256 - 같으면 같은 그림"""
+    document = json.dumps({"topology": topology, "style": STYLE_VERSION, **options}, sort_keys=True, default=str)
+    return hashlib.sha256(document.encode()).hexdigest()
+
+# --- 자동 배치 ----------------------------------------------------------------
+
+def _grid(count, width_limit=MAX_COLUMNS):
+    """count개를 담는 (열, 행) - 가로로 길게, 최대 width_limit열"""
+    if not count:
+        return 0, 0
+    columns = max(1, min(count, width_limit, math.ceil(math.sqrt(count * 2))))
+    return columns, math.ceil(count / columns)
+
+def _short(text, limit=24):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+class Layout:
+    """
+    상자, 선, 글자를 좌표(위쪽이 0, 아래로 증가)와 함께 모음 - 그리기 전에 크기가 모두 정해짐
+    anchors: 노드 이름 → 중심 좌표 (터널/API 연결선의 끝점)
+    """
+
+    def __init__(self, topology, title=None):
+        self.topology = topology
+        self.boxes = []
+        self.lines = []
+        self.texts = []
+        self.anchors = {}
+        self.width = self.height = 0.0
+        self.title = title
+        self.compact = len(topology["networks"]) > COMPACT_NETWORKS
+        self._arrange()
+
+    def box(self, kind, x, y, w, h, edge=None):
+        self.boxes.append((kind, x, y, w, h, edge))
+
+    def text(self, style, x, y, text, color=None):
+        self.texts.append((style, x, y, text, color))
+
+    # 크기 계산 (아래에서 위로)
+
+    def subnet_size(self, subnet):
+        columns, rows = _grid(len(subnet["instances"]))
+        width = max(SUBNET_MIN_W, columns * (NODE_W + GAP) + GAP)
+        return width, HEADER["subnet"] + rows * (NODE_H + GAP) + GAP
+
+    def services(self, network):
+        items = [("gateway", g["name"], ("HA VPN" if g["ha"] else "VPN") + f"\n{_short(g['name'])}"
+                  + ("".join(f"\n{a}" for a in g.get("addresses", [])[:2])))
+                 for g in network["gateways"]]
+        items += [("router", r["name"], f"Cloud Router\n{_short(r['name'])}"
+                   + (f"\nASN {r['asn']}" if r["asn"] else "")) for r in network["routers"]]
+        items += [("nat", n["name"], f"Cloud NAT\n{_short(n['name'])}") for n in network["nats"]]
+        items += [("dns", z["name"], f"DNS ({z['visibility']})\n{_short(z['dns_name'])}") for z in network["dns"]]
+        return items
+
+    def rule_lines(self, network):
+        rules = network["rules"]
+        if not rules:
+            return []
+        if self.compact:
+            allow = sum(rule["action"] == "allow" for rule in rules)
+            return [f"Firewall: {allow} allow · {len(rules) - allow} deny"]
+        lines = [f"Firewall rules ({len(rules)})"]
+        for rule in rules[:MAX_RULE_LINES]:
+            mark = "-" if rule["disabled"] else "✓" if rule["action"] == "allow" else "✗"
+            lines.append(f"{mark} {rule['direction'][:2]} {rule['priority']:>5} {_short(rule['name'], 30)}")
+        if len(rules) > MAX_RULE_LINES:
+            lines.append(f"  … {len(rules) - MAX_RULE_LINES} more")
+        return lines
+
+    def network_size(self, network):
+        widths = [self.subnet_size(subnet)[0] for subnet in network["subnets"]]
+        services = self.services(network)
+        columns, rows = _grid(len(services))
+        rules = self.rule_lines(network)
+        inner = max(widths + [columns * (SERVICE_W + GAP) - GAP, SUBNET_MIN_W if rules else 0, 3.0])
+        height = HEADER["network"] + sum(self.subnet_size(subnet)[1] + GAP for subnet in network["subnets"])
+        height += rows * (SERVICE_H + GAP)
+        if rules:
+            height += len(rules) * LINE_H + 2 * 0.15 + GAP
+        return inner + 2 * PAD, height + PAD
+
+    def project_size(self, project):
+        sizes = [self.network_size(self.topology["networks"][name]) for name in project["networks"]]
+        return (max(width for width, _ in sizes) + 2 * PAD,
+                HEADER["project"] + sum(height + GAP for _, height in sizes) + PAD)
+
+    # 배치 (위에서 아래로)
+
+    def _arrange(self):
+        projects = self.topology["projects"]
+        sizes = [self.project_size(project) for project in projects]
+        columns = max(1, math.ceil(math.sqrt(len(projects)))) if projects else 1
+        column_widths = [max((sizes[i][0] for i in range(c, len(sizes), columns)), default=0)
+                         for c in range(columns)]
+        row_heights = [max(height for _, height in sizes[r:r + columns]) for r in range(0, len(sizes), columns)]
+        top = 2.2 if self.title else 0.5
+        self.facing = self.gateway_sides({project["label"]: index % columns for index, project in enumerate(projects)})
+        for index, project in enumerate(projects):
+            column, row = index % columns, index // columns
+            x = PAD + sum(column_widths[:column]) + column * PROJECT_GAP
+            y = top + sum(row_heights[:row]) + row * PROJECT_GAP
+            self.place_project(project, index, x, y, column_widths[column], sizes[index][1])
+        self.width = PAD * 2 + sum(column_widths) + (columns - 1) * PROJECT_GAP
+        self.height = top + sum(row_heights) + max(len(row_heights) - 1, 0) * PROJECT_GAP + PAD
+        self.place_links()
+        # 범례 자리
+        self.height += 1.8
+        if self.title:
+            self.text("title", self.width / 2, 1.2, self.title)
+            self.text("subtitle", self.width / 2, 1.9,
+                      f"Generated from Terraform · {len(projects)} projects, {len(self.topology['networks'])} VPCs, "
+                      f"{len(self.topology['tunnels'])} tunnels")
+
+    def gateway_sides(self, project_columns):
+        """
+        VPC별로 VPN 게이트웨이를 둘 쪽 - 터널 상대 프로젝트가 주로 오른쪽 열에 있으면 오른쪽(+1)
+        게이트웨이가 상대를 향하므로 터널 선이 다른 상자를 가로지르지 않음
+        """
+        owner = {gateway["name"]: network["name"] for network in self.topology["networks"].values()
+                 for gateway in network["gateways"]}
+        networks = self.topology["networks"]
+        votes = {}
+        for tunnel in self.topology["tunnels"]:
+            local, peer = owner.get(tunnel["gateway"]), owner.get(tunnel["peer"])
+            if local is None or peer is None:
+                continue
+            own = project_columns.get(networks[local]["project"], 0)
+            other = project_columns.get(networks[peer]["project"], 0)
+            votes[local] = votes.get(local, 0) + (other > own) - (other < own)
+        return {name: vote > 0 for name, vote in votes.items()}
+
+    def place_project(self, project, index, x, y, width, height):
+        color = "#616161" if project["label"] == EXTERNAL_PROJECT else PROJECT_COLORS[index % len(PROJECT_COLORS)]
+        self.box("project", x, y, width, height, color)
+        self.text("project", x + PAD, y + 0.25, project["name"], color)
+        self.text("subnet", x + PAD, y + 0.65, project["project_id"])
+        y += HEADER["project"]
+        for name in project["networks"]:
+            network = self.topology["networks"][name]
+            _, net_height = self.network_size(network)
+            self.place_network(network, x + PAD, y, width - 2 * PAD, net_height, color)
+            y += net_height + GAP
+
+    def place_network(self, network, x, y, width, height, color):
+        self.box("network", x, y, width, height, color)
+        cidrs = ", ".join(subnet["cidr"] for subnet in network["subnets"])
+        self.text("network", x + PAD, y + 0.2, f"VPC {network['name']}" + (f"  ({cidrs})" if cidrs else ""))
+        inner_x, inner_w = x + PAD, width - 2 * PAD
+        y += HEADER["network"]
+        for subnet in network["subnets"]:
+            _, sub_height = self.subnet_size(subnet)
+            self.place_subnet(subnet, inner_x, y, inner_w, sub_height, color)
+            y += sub_height + GAP
+        services = self.services(network)
+        columns, _ = _grid(len(services))
+        right = self.facing.get(network["name"], False)
+        for index, (kind, name, label) in enumerate(services):
+            offset = (index % columns) * (SERVICE_W + GAP)
+            sx = inner_x + inner_w - SERVICE_W - offset if right else inner_x + offset
+            sy = y + (index // columns) * (SERVICE_H + GAP)
+            self.box(kind, sx, sy, SERVICE_W, SERVICE_H)
+            self.text("gateway" if kind == "gateway" else "node", sx + SERVICE_W / 2, sy + SERVICE_H / 2, label)
+            self.anchors[name] = (sx + SERVICE_W / 2, sy + SERVICE_H / 2)
+        y += _grid(len(services))[1] * (SERVICE_H + GAP)
+        rules = self.rule_lines(network)
+        if rules:
+            rule_height = len(rules) * LINE_H + 2 * 0.15
+            self.box("firewall", inner_x, y, inner_w, rule_height)
+            self.text("rules", inner_x + 0.15, y + 0.15, "\n".join(rules))
+
+    def place_subnet(self, subnet, x, y, width, height, color):
+        self.box("subnet", x, y, width, height, color)
+        pga = " · Private Google Access" if subnet["pga"] else ""
+        self.text("subnet", x + 0.2, y + 0.15, f"{subnet['name']}  {subnet['cidr']}  {subnet['region']}{pga}")
+        columns, _ = _grid(len(subnet["instances"]))
+        for index, instance in enumerate(subnet["instances"]):
+            ix = x + GAP + (index % columns) * (NODE_W + GAP)
+            iy = y + HEADER["subnet"] + (index // columns) * (NODE_H + GAP)
+            self.box("instance", ix, iy, NODE_W, NODE_H)
+            external = "" if self.compact else "\nexternal IP" if instance["external_ip"] else "\nno external IP"
+            self.text("node", ix + NODE_W / 2, iy + NODE_H / 2,
+                      f"{_short(instance['name'])}\n{instance['machine_type']}{external}")
+
+    def place_links(self):
+        """게이트웨이 쌍마다 인터페이스별 터널 선 하나와 요약 라벨 하나, Google API 연결선"""
+        pairs = {}
+        for tunnel in self.topology["tunnels"]:
+            if tunnel["gateway"] in self.anchors and tunnel["peer"] in self.anchors:
+                pairs.setdefault(tuple(sorted((tunnel["gateway"], tunnel["peer"]))), []).append(tunnel)
+        for (a, b), tunnels in pairs.items():
+            (x1, y1), (x2, y2) = self.anchors[a], self.anchors[b]
+            length = math.hypot(x2 - x1, y2 - y1) or 1.0
+            nx, ny = -(y2 - y1) / length, (x2 - x1) / length
+            interfaces = sorted({str(t["interface"]) for t in tunnels})
+            kind = "external" if any(t["external"] for t in tunnels) else "tunnel"
+            for i, _ in enumerate(interfaces):
+                offset = (i - (len(interfaces) - 1) / 2) * 0.18
+                self.lines.append((kind, [(x1 + nx * offset, y1 + ny * offset), (x2 + nx * offset, y2 + ny * offset)]))
+            # 세션은 양쪽 라우터에서 한 번씩 보이므로 주소 쌍으로 중복 제거
+            sessions = sorted({"↔".join(sorted(session.split("↔"))) for t in tunnels for session in t["bgp"]})
+            label = f"HA VPN · {len(tunnels)} tunnels" if len(interfaces) > 1 else f"VPN · {len(tunnels)} tunnels"
+            if sessions:
+                label += f"\nBGP {len(sessions)} sessions" + "".join(f"\n{s}" for s in sessions[:2])
+            self.text("link", (x1 + x2) / 2, (y1 + y2) / 2, label)
+
+        links = [link for link in self.topology["google_apis"] if link["node"] in self.anchors]
+        if links:
+            x, y, w, h = self.width / 2 - 4.0, self.height + 1.5, 8.0, 1.3
+            self.box("google_apis", x, y, w, h)
+            self.text("network", x + 0.3, y + 0.2, "Google APIs (Private Google Access)")
+            self.text("subnet", x + 0.3, y + 0.65, "private.googleapis.com 199.36.153.8/30 · Vertex AI / Gemini")
+            for link in links:
+                sx, sy = self.anchors[link["node"]]
+                self.lines.append((link["kind"], [(sx, sy), (x + w / 2, y)]))
+            self.height = y + h + PAD
+
+# --- 그리기 -------------------------------------------------------------------
+
+def render(layout, path, dpi=150, fmt=None):
+    """Layout을 파일로 그림 (pyplot 없이 Figure + Agg 캔버스) - 그린 상자/선/글자 수"""
+    if Figure is None:
+        raise RuntimeError("matplotlib is required to render diagrams (pip3 install matplotlib)")
+    inches = (max(layout.width, 1) * INCH_PER_UNIT, max(layout.height, 1) * INCH_PER_UNIT)
+    dpi = min(dpi, math.sqrt(MAX_MEGAPIXELS * 1e6 / (inches[0] * inches[1])))
+    figure = Figure(figsize=inches, dpi=dpi)
+    FigureCanvasAgg(figure)
+    ax = figure.add_axes((0, 0, 1, 1))
+    ax.set_xlim(0, max(layout.width, 1))
+    ax.set_ylim(max(layout.height, 1), 0)
+    ax.axis("off")
+
+    # 상자는 바깥쪽부터 차례로 (배치 순서 = 겹침 순서) 하나의 컬렉션으로
+    vertices, faces, edges, widths, styles = [], [], [], [], []
+    for kind, x, y, w, h, edge in layout.boxes:
+        face, default_edge, width, style = BOX_STYLES[kind]
+        vertices.append(((x, y), (x + w, y), (x + w, y + h), (x, y + h)))
+        faces.append(face)
+        edges.append(edge or default_edge or "#616161")
+        widths.append(width)
+        styles.append(style)
+    ax.add_collection(PolyCollection(vertices, facecolors=faces, edgecolors=edges, linewidths=widths,
+                                     linestyles=styles, zorder=1))
+    for kind, (color, width, style) in LINE_STYLES.items():
+        segments = [segment for line_kind, segment in layout.lines if line_kind == kind]
+        if segments:
+            # 터널은 상자 위에, Google API 연결선은 상자 뒤에 (프로젝트 가장자리에서 나오도록)
+            ax.add_collection(LineCollection(segments, colors=color, linewidths=width, linestyles=style,
+                                             zorder=2 if kind in ("tunnel", "external") else 0.5))
+    # 글자도 Text 아티스트 수백 개 대신 글리프 윤곽선 경로 컬렉션 하나로 (배경 상자는 그 아래 컬렉션 하나)
+    glyphs = GlyphPaths()
+    paths, colors, backgrounds = [], [], []
+    for style, x, y, text, color in layout.texts:
+        outline, extent = glyphs.label(style, x, y, text)
+        paths.append(outline)
+        colors.append(color or TEXT_STYLES[style][7])
+        if TEXT_STYLES[style][8]:
+            x0, y0, x1, y1 = extent
+            backgrounds.append(((x0 - 0.12, y0 - 0.1), (x1 + 0.12, y0 - 0.1), (x1 + 0.12, y1 + 0.1), (x0 - 0.12, y1 + 0.1)))
+    if backgrounds:
+        ax.add_collection(PolyCollection(backgrounds, facecolors="white", edgecolors="#9E9E9E", linewidths=0.6,
+                                         zorder=2.5))
+    ax.add_collection(PathCollection(paths, facecolors=colors, edgecolors="none", linewidths=0, zorder=3,
+                                     transform=ax.transData))
+    ax.legend(handles=[Line2D([], [], color=LINE_STYLES["tunnel"][0], lw=2, label="HA VPN tunnels (BGP)"),
+                       Line2D([], [], color=LINE_STYLES["pga"][0], lw=1.5, ls="--", label="PGA route advertisement"),
+                       Line2D([], [], color=LINE_STYLES["dns"][0], lw=1.2, ls=":", label="Private DNS override"),
+                       Patch(facecolor=BOX_STYLES["instance"][0], edgecolor=BOX_STYLES["instance"][1], label="VM"),
+                       Patch(facecolor=BOX_STYLES["firewall"][0], edgecolor=BOX_STYLES["firewall"][1],
+                             label="Firewall rules")],
+              loc="lower right", fontsize=8, frameon=True)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    fmt = fmt or output_format(path)
+    # PNG는 압축보다 속도 우선 (크기 차이는 작음)
+    options = {"pil_kwargs": {"compress_level": 1}} if fmt == "png" else {}
+    figure.savefig(path, format=fmt, facecolor="white", **options)
+    return len(layout.boxes), len(layout.lines), len(layout.texts)
+
+class GlyphPaths:
+    """
+    글자열을 데이터 좌표의 채움 경로로 변환 - 글리프 윤곽선과 진행 폭은 (글꼴, 문자)별로 한 번만 읽음
+    (커닝은 생략, 다이어그램 라벨에는 충분)
+    """
+
+    FONT_SCALE = 100.0
+    CAP_HEIGHT = 0.73
+    DESCENT = 0.24
+
+    def __init__(self):
+        self.fonts = {}
+        self.glyphs = {}
+        self.lines = {}
+
+    def font(self, weight, slant, family):
+        key = (weight, slant, family)
+        if key not in self.fonts:
+            font = get_font(findfont(FontProperties(family=family, weight=weight, style=slant)))
+            font.set_size(self.FONT_SCALE, 72)
+            self.fonts[key] = font
+        return self.fonts[key]
+
+    def line(self, key, text):
+        """한 줄의 (정점, 코드, 폭) - 글꼴 크기 FONT_SCALE pt 기준, 기준선 y=0"""
+        cached = self.lines.get((key, text))
+        if cached is not None:
+            return cached
+        font = self.font(*key)
+        vertices, codes, x = [], [], 0.0
+        for char in text:
+            glyph = self.glyphs.get((key, char))
+            if glyph is None:
+                loaded = font.load_char(ord(char), flags=NO_HINTING)
+                glyph_vertices, glyph_codes = font.get_path()
+                glyph = self.glyphs[(key, char)] = (glyph_vertices, glyph_codes, loaded.linearHoriAdvance / 65536)
+            if len(glyph[0]):
+                vertices.append(glyph[0] + (x, 0.0))
+                codes.append(glyph[1])
+            x += glyph[2]
+        cached = self.lines[(key, text)] = (np.concatenate(vertices) if vertices else np.empty((0, 2)),
+                                            np.concatenate(codes) if codes else np.empty(0, np.uint8), x)
+        return cached
+
+    def label(self, style, x, y, text):
+        """여러 줄 라벨의 Path와 범위 (x0, y0, x1, y1) - y축은 아래로 증가"""
+        size, weight, slant, family, ha, va, spacing = TEXT_STYLES[style][:7]
+        key = (weight, slant, family)
+        points = 72 * INCH_PER_UNIT
+        scale = size / self.FONT_SCALE / points
+        step = size * spacing / points
+        lines = [self.line(key, line) for line in text.split("\n")]
+        cap, descent = size * self.CAP_HEIGHT / points, size * self.DESCENT / points
+        height = (len(lines) - 1) * step + cap
+        baseline = {"top": y + cap, "center": y - height / 2 + cap, "bottom": y - height - descent + cap}[va]
+        vertices, codes, left, right = [], [], math.inf, -math.inf
+        for index, (line_vertices, line_codes, width) in enumerate(lines):
+            x0 = x - width * scale / 2 if ha == "center" else x
+            left, right = min(left, x0), max(right, x0 + width * scale)
+            if len(line_vertices):
+                vertices.append(line_vertices * (scale, -scale) + (x0, baseline + index * step))
+                codes.append(line_codes)
+        path = Path(np.concatenate(vertices), np.concatenate(codes)) if vertices else Path(np.empty((0, 2)))
+        return path, (left, baseline - cap, right, baseline + height - cap + descent)
+
+def output_format(path):
+    return os.path.splitext(path)[1].lstrip(".").lower() or "png"
+
+def draw(topology, output, cache_dir=DEFAULT_CACHE_DIR, dpi=150, title=None, force=False):
+    """
+    토폴로지 그림을 output에 저장 - 같은 해시의 그림이 캐시에 있으면 그리지 않고 복사
+    {"path", "hash", "cached", "seconds", "boxes", "lines", "texts"} 반환
+    """
+    start = time.perf_counter()
+    fmt = output_format(output)
+    key = topology_hash(topology, format=fmt, dpi=dpi, title=title)
+    cached_path = os.path.join(cache_dir, f"{key}.{fmt}") if cache_dir else None
+    result = {"path": output, "hash": key, "cached": False, "boxes": 0, "lines": 0, "texts": 0}
+    if cached_path and not force and os.path.exists(cached_path):
+        if os.path.abspath(cached_path) != os.path.abspath(output):
+            shutil.copyfile(cached_path, output)
+        os.utime(cached_path)
+        result.update(cached=True, seconds=time.perf_counter() - start)
+        return result
+    layout = Layout(topology, title)
+    result["boxes"], result["lines"], result["texts"] = render(layout, output, dpi, fmt)
+    if cached_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary = f"{cached_path}.{os.getpid()}.tmp"
+        shutil.copyfile(output, temporary)
+        os.replace(temporary, cached_path)
+        prune_cache(cache_dir)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+def prune_cache(cache_dir, keep=CACHE_ENTRIES):
+    """가장 오래 쓰이지 않은 그림부터 지워 keep개만 유지"""
+    entries = sorted((entry for entry in os.scandir(cache_dir) if entry.is_file() and not entry.name.endswith(".tmp")),
+                     key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[keep:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+# --- 합성 토폴로지 (규모 벤치마크) ----------------------------------------------
+
+def synthetic_hcl(spokes, subnets=2, vms=3, rules=4):
+    """
+    허브 프로젝트 하나와 spokes개 스포크 프로젝트의 HCL - 스포크마다 VPC, 서브넷, VM, HA VPN 게이트웨이,
+    BGP Cloud Router, 허브와의 터널 2쌍(인터페이스/피어 포함), 방화벽 규칙
+    """
+    parts = []
+
+    def project(label):
+        parts.append(f'resource "google_project" "{label}" {{\n  name = "{label}"\n  project_id = "{label}-x"\n}}\n')
+
+    def vpc(label, index):
+        parts.append(f'resource "google_compute_network" "{label}_vpc" {{\n  name = "{label}-vpc"\n'
+                     f'  project = google_project.{label}.project_id\n}}\n')
+        parts.append(f'resource "google_compute_ha_vpn_gateway" "{label}_gw" {{\n  name = "{label}-gw"\n'
+                     f'  project = google_project.{label}.project_id\n  network = google_compute_network.{label}_vpc.id\n}}\n')
+        parts.append(f'resource "google_compute_router" "{label}_router" {{\n  name = "{label}-router"\n'
+                     f'  project = google_project.{label}.project_id\n  network = google_compute_network.{label}_vpc.id\n'
+                     f'  bgp {{\n    asn = {64512 + index}\n  }}\n}}\n')
+        for s in range(subnets):
+            parts.append(f'resource "google_compute_subnetwork" "{label}_s{s}" {{\n  name = "{label}-subnet-{s}"\n'
+                         f'  project = google_project.{label}.project_id\n  network = google_compute_network.{label}_vpc.id\n'
+                         f'  ip_cidr_range = "10.{index}.{s}.0/24"\n  region = "us-central1"\n}}\n')
+            for v in range(vms):
+                parts.append(f'resource "google_compute_instance" "{label}_s{s}_vm{v}" {{\n'
+                             f'  name = "{label}-vm-{s}-{v}"\n  machine_type = "e2-medium"\n'
+                             f'  project = google_project.{label}.project_id\n'
+                             f'  network_interface {{\n    subnetwork = google_compute_subnetwork.{label}_s{s}.id\n  }}\n}}\n')
+        for r in range(rules):
+            action = "deny" if r % 3 == 2 else "allow"
+            parts.append(f'resource "google_compute_firewall" "{label}_fw{r}" {{\n  name = "{label}-rule-{r}"\n'
+                         f'  network = google_compute_network.{label}_vpc.name\n  priority = {1000 + r}\n'
+                         f'  source_ranges = ["10.0.0.0/8"]\n  {action} {{\n    protocol = "tcp"\n'
+                         f'    ports = ["{443 + r}"]\n  }}\n}}\n')
+
+    def tunnel(label, local, peer, interface, local_ip, peer_ip, asn):
+        parts.append(f'resource "google_compute_vpn_tunnel" "{label}" {{\n  name = "{label.replace("_", "-")}"\n'
+                     f'  vpn_gateway = google_compute_ha_vpn_gateway.{local}_gw.id\n'
+                     f'  peer_gcp_gateway = google_compute_ha_vpn_gateway.{peer}_gw.id\n'
+                     f'  router = google_compute_router.{local}_router.id\n  vpn_gateway_interface = {interface}\n}}\n')
+        parts.append(f'resource "google_compute_router_interface" "{label}_if" {{\n  name = "{label}-if"\n'
+                     f'  router = google_compute_router.{local}_router.name\n  ip_range = "{local_ip}/30"\n'
+                     f'  vpn_tunnel = google_compute_vpn_tunnel.{label}.name\n}}\n')
+        parts.append(f'resource "google_compute_router_peer" "{label}_peer" {{\n  name = "{label}-peer"\n'
+                     f'  router = google_compute_router.{local}_router.name\n  interface = "{label}-if"\n'
+                     f'  peer_ip_address = "{peer_ip}"\n  peer_asn = {asn}\n}}\n')
+
+    project("hub")
+    vpc("hub", 0)
+    for spoke in range(1, spokes + 1):
+        label = f"spoke{spoke}"
+        project(label)
+        vpc(label, spoke)
+        for interface in range(2):
+            base = 4 * (2 * spoke + interface)
+            hub_ip = f"169.254.{base // 256}.{base % 256 + 1}"
+            spoke_ip = f"169.254.{base // 256}.{base % 256 + 2}"
+            tunnel(f"hub_to_{label}_{interface}", "hub", label, interface, hub_ip, spoke_ip, 64512 + spoke)
+            tunnel(f"{label}_to_hub_{interface}", label, "hub", interface, spoke_ip, hub_ip, 64512)
+    return "".join(parts)
+
+def synthetic_model(spokes, **options):
+    return TerraformModel(parse_hcl(synthetic_hcl(spokes, **options))[1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Draw the hybrid network architecture from the Terraform files")
+    parser.add_argument("-o", "--output", action="append",
+                        help=f"output file, format from the extension: png, svg, pdf (repeatable; default: {DEFAULT_OUTPUT})")
+    parser.add_argument("--tf-dir", default=DEFAULT_TF_DIR, help="directory with the *.tf files (default: repo root)")
+    parser.add_argument("--tfvars", action="append", help="tfvars file (default: terraform.tfvars if present)")
+    parser.add_argument("--dpi", type=float, default=150)
+    parser.add_argument("--title", default="Google Cloud Hybrid Network Architecture")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="always render and do not store the result")
+    parser.add_argument("--force", action="store_true", help="render even if the topology is cached")
+    parser.add_argument("--json", action="store_true", help="print the extracted topology instead of drawing")
+    parser.add_argument("--synthetic", type=int, metavar="SPOKES",
+                        help="draw a generated hub-and-spoke topology with this many spoke projects (benchmark)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    model = synthetic_model(args.synthetic) if args.synthetic else TerraformModel.load(args.tf_dir, args.tfvars)
+    topology = build_topology(model)
+    parsed = time.perf_counter() - start
+    if args.json:
+        print(json.dumps(topology, indent=2, ensure_ascii=False))
+        return 0
+    if Figure is None:
+        print("Error: matplotlib is not installed (pip3 install matplotlib)")
+        return 1
+
+    print(f"Model: {len(model.resources)} resources, {len(topology['projects'])} projects, "
+          f"{len(topology['networks'])} VPCs, {len(topology['tunnels'])} tunnels ({parsed * 1000:.0f} ms)")
+    for output in args.output or [DEFAULT_OUTPUT]:
+        result = draw(topology, output, None if args.no_cache else args.cache_dir, args.dpi, args.title, args.force)
+        if result["cached"]:
+            print(f"{output}: unchanged topology {result['hash'][:12]}, copied from cache "
+                  f"({result['seconds'] * 1000:.0f} ms)")
+        else:
+            print(f"{output}: rendered {result['boxes']} boxes, {result['lines']} links, {result['texts']} labels "
+                  f"in {result['seconds']:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
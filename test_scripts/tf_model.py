@@ -0,0 +1,710 @@
+#!/usr/bin/env python3
+"""
+tf_model.py - 오프라인 Terraform 토폴로지 모델 및 방화벽 규칙 평가 엔진
+*.tf 파일과 terraform.tfvars를 직접 파싱(HCL 부분 집합)하여 VPC, 서브넷, VM, 방화벽 규칙을 만들고
+GCP 방화벽 의미론(우선순위, 같은 우선순위에서는 deny 우선, 암시적 ingress 거부/egress 허용)으로
+"src -> dst:port/proto 허용 여부"를 배포 없이 대량 평가
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import socket
+import argparse
+import ipaddress
+from collections import namedtuple
+from dataclasses import dataclass, field
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ip_classifier import IpClassifier
+
+DEFAULT_TF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+# Terraform 식 중 값으로 풀지 않는 것들
+Ref = namedtuple("Ref", ["path"])
+Call = namedtuple("Call", ["name", "args"])
+Raw = namedtuple("Raw", ["text"])
+
+class HclError(ValueError):
+    """지원하지 않는 HCL 구문"""
+
+@dataclass
+class Block:
+    type: str
+    labels: list
+    attributes: dict = field(default_factory=dict)
+    blocks: list = field(default_factory=list)
+
+    def children(self, block_type):
+        return [block for block in self.blocks if block.type == block_type]
+
+# --- HCL 부분 집합 파서 -------------------------------------------------------
+
+TOKEN_RE = re.compile(r"""
+    (?P<newline>\n)
+  | (?P<space>[ \t\r]+)
+  | (?P<comment>\#[^\n]*|//[^\n]*|/\*.*?\*/)
+  | (?P<heredoc><<-?(?P<marker>[A-Za-z_]\w*)[ \t]*\n)
+  | (?P<number>\d+(?:\.\d+)?(?![\w-]))
+  | (?P<ident>[A-Za-z_][\w-]*(?:\.[\w-]+|\[\d+\]|\[\*\]|\["[^"]*"\])*)
+  | (?P<string>")
+  | (?P<punct>==|!=|<=|>=|&&|\|\||=>|\.\.\.|[{}\[\]()=,:?+\-*/%<>!.])
+""", re.VERBOSE | re.DOTALL)
+
+def _read_string(text, pos):
+    """따옴표 문자열 읽기 - ${ } 보간 안의 중첩 따옴표/중괄호 허용. (값, 다음 위치) 반환"""
+    out = []
+    i = pos
+    while i < len(text):
+        ch = text[i]
+        if ch == '"':
+            return "".join(out), i + 1
+        if ch == "\\" and i + 1 < len(text):
+            escaped = text[i + 1]
+            out.append({"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}.get(escaped, "\\" + escaped))
+            i += 2
+            continue
+        if text.startswith("${", i) or text.startswith("%{", i):
+            depth = 0
+            start = i
+            while i < len(text):
+                if text[i] == "{":
+                    depth += 1
+                elif text[i] == "}":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                elif text[i] == '"':
+                    _, i = _read_string(text, i + 1)
+                    continue
+                i += 1
+            out.append(text[start:i + 1])
+            i += 1
+            continue
+        out.append(ch)
+        i += 1
+    raise HclError("unterminated string")
+
+def tokenize(text):
+    """(종류, 값) 토큰 목록 - 공백과 주석은 버리고 줄바꿈은 유지"""
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            line = text.count("\n", 0, pos) + 1
+            raise HclError(f"line {line}: unexpected character {text[pos]!r}")
+        kind = match.lastgroup
+        pos = match.end()
+        if kind in ("space", "comment"):
+            if kind == "comment" and "\n" in match.group():
+                tokens.append(("newline", "\n"))
+            continue
+        if kind == "string":
+            value, pos = _read_string(text, pos)
+            tokens.append(("string", value))
+        elif kind == "heredoc":
+            marker = match.group("marker")
+            end = re.compile(rf"^[ \t]*{marker}[ \t]*$", re.MULTILINE).search(text, pos)
+            if not end:
+                raise HclError(f"unterminated heredoc {marker}")
+            body = text[pos:end.start()]
+            if match.group().startswith("<<-"):
+                lines = body.split("\n")
+                indent = min((len(l) - len(l.lstrip()) for l in lines if l.strip()), default=0)
+                body = "\n".join(l[indent:] for l in lines)
+            tokens.append(("string", body))
+            pos = end.end()
+        elif kind == "number":
+            value = match.group()
+            tokens.append(("number", float(value) if "." in value else int(value)))
+        else:
+            tokens.append((kind, match.group()))
+    tokens.append(("eof", None))
+    return tokens
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self, offset=0):
+        return self.tokens[self.pos + offset]
+
+    def next(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def expect(self, value):
+        token = self.next()
+        if token[1] != value:
+            raise HclError(f"expected {value!r}, got {token[1]!r}")
+        return token
+
+    def skip_newlines(self):
+        while self.peek()[0] == "newline":
+            self.pos += 1
+
+    def body(self, closing=None):
+        """속성과 블록 목록 파싱 - closing('}') 또는 파일 끝까지"""
+        attributes = {}
+        blocks = []
+        while True:
+            self.skip_newlines()
+            kind, value = self.peek()
+            if kind == "eof" or value == closing:
+                return attributes, blocks
+            if kind != "ident":
+                raise HclError(f"unexpected {value!r}")
+            self.next()
+            if self.peek()[1] == "=":
+                self.next()
+                attributes[value] = self.expression()
+                continue
+            labels = []
+            while self.peek()[0] in ("string", "ident"):
+                labels.append(self.next()[1])
+            self.expect("{")
+            attrs, children = self.body("}")
+            self.expect("}")
+            blocks.append(Block(value, labels, attrs, children))
+
+    def expression(self):
+        """값 하나 파싱 - 연산자가 섞인 식은 원문 Raw로 보존"""
+        start = self.pos
+        value = self.primary()
+        if self.peek()[0] == "punct" and self.peek()[1] not in (",", ")", "]", "}", ":", "=", "=>"):
+            depth = 0
+            while True:
+                kind, token = self.peek()
+                if kind == "eof" or (depth == 0 and (kind == "newline" or token in (",", ")", "]", "}"))):
+                    break
+                depth += token in ("(", "[", "{")
+                depth -= token in (")", "]", "}")
+                self.next()
+            value = Raw(" ".join(str(token) for _, token in self.tokens[start:self.pos] if _ != "newline"))
+        return value
+
+    def primary(self):
+        kind, value = self.next()
+        if kind in ("string", "number"):
+            return value
+        if kind == "ident":
+            if value in ("true", "false"):
+                return value == "true"
+            if value == "null":
+                return None
+            if self.peek()[1] == "(":
+                self.next()
+                return Call(value, self.sequence(")"))
+            return Ref(value)
+        if value == "[":
+            return self.sequence("]")
+        if value == "{":
+            return self.object()
+        if value == "-" and self.peek()[0] == "number":
+            return -self.next()[1]
+        raise HclError(f"unexpected {value!r}")
+
+    def sequence(self, closing):
+        items = []
+        while True:
+            self.skip_newlines()
+            if self.peek()[1] == closing:
+                self.next()
+                return items
+            items.append(self.expression())
+            self.skip_newlines()
+            if self.peek()[1] == ",":
+                self.next()
+
+    def object(self):
+        items = {}
+        while True:
+            self.skip_newlines()
+            if self.peek()[1] == "}":
+                self.next()
+                return items
+            kind, key = self.next()
+            if kind not in ("ident", "string"):
+                raise HclError(f"bad object key {key!r}")
+            if self.next()[1] not in ("=", ":"):
+                raise HclError(f"expected '=' after {key!r}")
+            items[key] = self.expression()
+            self.skip_newlines()
+            if self.peek()[1] == ",":
+                self.next()
+
+def parse_hcl(text):
+    """HCL 텍스트를 최상위 Block 목록과 속성 딕셔너리로 파싱 (.tfvars는 속성만 존재)"""
+    parser = _Parser(text)
+    attributes, blocks = parser.body()
+    return attributes, blocks
+
+# --- 토폴로지 모델 ------------------------------------------------------------
+
+PROTOCOL_NUMBERS = {"icmp": 1, "igmp": 2, "tcp": 6, "udp": 17, "gre": 47, "esp": 50, "ah": 51,
+                    "ipip": 94, "sctp": 132}
+PORT_PROTOCOLS = {6, 17, 132}
+
+IMPLIED_DENY_INGRESS = "implied-deny-ingress"
+IMPLIED_ALLOW_EGRESS = "implied-allow-egress"
+Decision = namedtuple("Decision", ["allowed", "rule", "priority"])
+
+@dataclass
+class Subnet:
+    name: str
+    network: str
+    cidr: str
+    region: str = None
+    private_google_access: bool = False
+
+@dataclass
+class Instance:
+    name: str
+    network: str
+    subnet: str
+    tags: list = field(default_factory=list)
+
+@dataclass
+class FirewallRule:
+    """
+    GCP 방화벽 규칙 하나 - protocols는 (프로토콜 번호 또는 None(all), 포트 구간 목록 또는 None(전체))
+    source_tags/서비스 계정 조건은 주소로 평가할 수 없어 모델링하지 않음
+    """
+    name: str
+    network: str
+    action: str
+    direction: str = "INGRESS"
+    priority: int = 1000
+    ranges: list = field(default_factory=list)
+    protocols: list = field(default_factory=list)
+    target_tags: list = field(default_factory=list)
+    source_tags: list = field(default_factory=list)
+    disabled: bool = False
+
+    def applies_to(self, tags):
+        return not self.target_tags or bool(set(self.target_tags) & set(tags))
+
+    def matches_protocol(self, protocol, port):
+        for number, ports in self.protocols:
+            if number is not None and number != protocol:
+                continue
+            if ports is None or protocol not in PORT_PROTOCOLS:
+                return True
+            if any(low <= port <= high for low, high in ports):
+                return True
+        return False
+
+    def matches_address(self, value):
+        return any(start <= value <= end for start, end in _cidr_bounds(self.ranges))
+
+    def describe(self):
+        protocols = ", ".join(
+            ("all" if number is None else _protocol_name(number))
+            + ("" if ports is None else ":" + ",".join(f"{l}" if l == h else f"{l}-{h}" for l, h in ports))
+            for number, ports in self.protocols)
+        targets = f" -> tags {','.join(self.target_tags)}" if self.target_tags else ""
+        return (f"{self.name:<28} {self.network:<10} {self.direction:<7} {self.action:<5} {self.priority:>5}  "
+                f"{','.join(self.ranges)} [{protocols}]{targets}")
+
+def _protocol_name(number):
+    return next((name for name, value in PROTOCOL_NUMBERS.items() if value == number), str(number))
+
+def _cidr_bounds(cidrs):
+    bounds = []
+    for cidr in cidrs:
+        network = ipaddress.ip_network(cidr, strict=False)
+        if network.version == 4:
+            bounds.append((int(network.network_address), int(network.broadcast_address)))
+    return bounds
+
+def _ports(values):
+    if not values:
+        return None
+    intervals = []
+    for value in values:
+        low, _, high = str(value).partition("-")
+        intervals.append((int(low), int(high or low)))
+    return sorted(intervals)
+
+class TerraformModel:
+    """*.tf 파일에서 읽은 변수, 리소스, 토폴로지"""
+
+    def __init__(self, blocks, tfvars=None):
+        self.variables = {}
+        self.resources = {}
+        for block in blocks:
+            if block.type == "variable" and block.labels:
+                self.variables[block.labels[0]] = block.attributes.get("default")
+            elif block.type == "resource" and len(block.labels) == 2:
+                self.resources[tuple(block.labels)] = block
+        self.variables.update(tfvars or {})
+
+        self.networks = {}
+        for (kind, name), block in self.resources.items():
+            if kind == "google_compute_network":
+                self.networks[name] = self.value(block.attributes.get("name", name))
+        self.subnets = [self._subnet(name, block) for (kind, name), block in self.resources.items()
+                        if kind == "google_compute_subnetwork"]
+        subnets = {subnet.name: subnet for subnet in self.subnets}
+        self.instances = []
+        for (kind, name), block in self.resources.items():
+            if kind != "google_compute_instance":
+                continue
+            interfaces = block.children("network_interface")
+            subnet = subnets.get(self.ref_name(interfaces[0].attributes.get("subnetwork"))) if interfaces else None
+            self.instances.append(Instance(self.value(block.attributes.get("name", name)),
+                                           subnet.network if subnet else None,
+                                           subnet.name if subnet else None,
+                                           list(self.value(block.attributes.get("tags", [])))))
+        self.firewall_rules = [self._firewall_rule(block) for (kind, _), block in self.resources.items()
+                               if kind == "google_compute_firewall"]
+
+    @classmethod
+    def load(cls, directory=DEFAULT_TF_DIR, tfvars_files=None):
+        """디렉터리의 *.tf와 terraform.tfvars, *.auto.tfvars를 읽어 모델 생성"""
+        blocks = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.tf"))):
+            with open(path, encoding="utf-8") as f:
+                blocks.extend(parse_hcl(f.read())[1])
+        if tfvars_files is None:
+            tfvars_files = [path for path in [os.path.join(directory, "terraform.tfvars")]
+                            + sorted(glob.glob(os.path.join(directory, "*.auto.tfvars"))) if os.path.exists(path)]
+        tfvars = {}
+        for path in tfvars_files:
+            with open(path, encoding="utf-8") as f:
+                tfvars.update(parse_hcl(f.read())[0])
+        return cls(blocks, tfvars)
+
+    def value(self, expr):
+        """var.* 참조와 문자열 보간을 풀어 값으로 변환 - 풀 수 없는 참조는 그대로 유지"""
+        if isinstance(expr, Ref):
+            return self._resolve_ref(expr)
+        if isinstance(expr, str):
+            return re.sub(r"\$\{\s*([\w.\-\[\]]+)\s*\}", self._interpolate, expr)
+        if isinstance(expr, list):
+            return [self.value(item) for item in expr]
+        if isinstance(expr, dict):
+            return {key: self.value(item) for key, item in expr.items()}
+        if isinstance(expr, Call) and expr.name in ("toset", "tolist") and len(expr.args) == 1:
+            return self.value(expr.args[0])
+        return expr
+
+    def _interpolate(self, match):
+        value = self._resolve_ref(Ref(match.group(1)))
+        return match.group(0) if isinstance(value, Ref) else str(value)
+
+    def _resolve_ref(self, ref):
+        parts = ref.path.split(".")
+        if parts[0] == "var" and len(parts) == 2 and parts[1] in self.variables:
+            return self.value(self.variables[parts[1]])
+        if len(parts) == 3 and (parts[0], parts[1]) in self.resources:
+            attribute = self.resources[(parts[0], parts[1])].attributes.get(parts[2])
+            if attribute is not None and not isinstance(attribute, Ref):
+                return self.value(attribute)
+        return ref
+
+    @staticmethod
+    def ref_name(expr):
+        """google_compute_subnetwork.dev_subnet.id 형태 참조의 리소스 이름"""
+        if isinstance(expr, Ref) and len(expr.path.split(".")) >= 2:
+            return expr.path.split(".")[1]
+        return None
+
+    def network_name(self, expr):
+        """network 속성(참조 또는 이름)을 VPC 이름으로 변환"""
+        value = self.value(expr)
+        if isinstance(value, Ref):
+            return self.networks.get(self.ref_name(value), value.path)
+        return value
+
+    def _subnet(self, name, block):
+        attrs = block.attributes
+        return Subnet(name, self.network_name(attrs.get("network")), self.value(attrs.get("ip_cidr_range")),
+                      self.value(attrs.get("region")), bool(self.value(attrs.get("private_ip_google_access"))))
+
+    def _firewall_rule(self, block):
+        attrs = block.attributes
+        direction = str(self.value(attrs.get("direction", "INGRESS"))).upper()
+        action = "deny" if block.children("deny") else "allow"
+        protocols = []
+        for clause in block.children(action):
+            protocol = str(self.value(clause.attributes.get("protocol", "all"))).lower()
+            number = None if protocol == "all" else PROTOCOL_NUMBERS.get(protocol, int(protocol) if protocol.isdigit() else -1)
+            protocols.append((number, _ports(self.value(clause.attributes.get("ports", [])))))
+        default_range = "0.0.0.0/0" if direction == "EGRESS" or "source_tags" not in attrs else None
+        ranges_attr = "destination_ranges" if direction == "EGRESS" else "source_ranges"
+        ranges = self.value(attrs.get(ranges_attr, [default_range] if default_range else []))
+        return FirewallRule(
+            name=self.value(attrs.get("name", block.labels[1])),
+            network=self.network_name(attrs.get("network")),
+            action=action,
+            direction=direction,
+            priority=int(self.value(attrs.get("priority", 1000))),
+            ranges=[r for r in ranges if isinstance(r, str)],
+            protocols=protocols,
+            target_tags=list(self.value(attrs.get("target_tags", []))),
+            source_tags=list(self.value(attrs.get("source_tags", []))),
+            disabled=bool(self.value(attrs.get("disabled", False))),
+        )
+
+    def resources_of(self, kind):
+        """(Terraform 리소스 이름, Block) 목록"""
+        return [(name, block) for (resource_kind, name), block in self.resources.items() if resource_kind == kind]
+
+    def instance(self, name):
+        return next((instance for instance in self.instances if instance.name == name), None)
+
+    def firewall(self):
+        return FirewallEngine(self.firewall_rules, self.subnets)
+
+# --- 방화벽 평가 엔진 ---------------------------------------------------------
+
+def ip_ints(ips):
+    """IPv4 문자열 목록을 uint32 정수 배열로 변환 (이미 정수 배열이면 그대로)"""
+    if np is not None and isinstance(ips, np.ndarray):
+        return ips.astype(np.uint64)
+    values = [int.from_bytes(socket.inet_aton(ip), "big") if isinstance(ip, str) else int(ip) for ip in ips]
+    return np.array(values, dtype=np.uint64) if np is not None else values
+
+def protocol_numbers(protocols):
+    """프로토콜 이름/번호 목록을 번호 배열로 변환"""
+    if np is not None and isinstance(protocols, np.ndarray):
+        return protocols.astype(np.int64)
+    values = [PROTOCOL_NUMBERS[p.lower()] if isinstance(p, str) else int(p) for p in protocols]
+    return np.array(values, dtype=np.int64) if np is not None else values
+
+def _partition(intervals_by_rule, limit):
+    """규칙별 [low, high] 구간 목록의 모든 경계로 [0, limit)를 나눈 서로소 구간의 시작점 목록"""
+    bounds = sorted({0, limit} | {low for intervals in intervals_by_rule.values() for low, _ in intervals}
+                    | {high + 1 for intervals in intervals_by_rule.values() for _, high in intervals})
+    return [b for b in bounds if b < limit]
+
+class FirewallEngine:
+    """
+    방향별로 규칙을 평가 순서(우선순위 오름차순, 같은 우선순위는 deny 먼저)로 정렬하고 비트 인덱스를 부여
+    - 주소: 모든 규칙의 CIDR 경계로 나눈 서로소 구간 + 구간별 규칙 비트마스크 (searchsorted로 조회)
+    - 포트: 프로토콜 행 x 포트 구간 비트마스크
+    - 네트워크/대상 태그: 규칙 비트마스크
+    흐름마다 네 마스크의 AND에서 가장 낮은 비트가 처음 일치하는 규칙
+    """
+
+    def __init__(self, rules, subnets):
+        self.subnets = list(subnets)
+        self.networks = sorted({subnet.network for subnet in self.subnets} | {rule.network for rule in rules})
+        self._subnet_classifier = IpClassifier([(subnet.cidr, subnet.name, True) for subnet in self.subnets])
+        self._subnet_network = {subnet.name: subnet.network for subnet in self.subnets}
+        self.rules = {}
+        self._tables = {}
+        for direction in ("INGRESS", "EGRESS"):
+            ordered = sorted((rule for rule in rules if rule.direction == direction and not rule.disabled),
+                             key=lambda rule: (rule.priority, rule.action != "deny", rule.name))
+            self.rules[direction] = ordered
+            if np is not None:
+                self._tables[direction] = self._build(ordered)
+
+    def network_of(self, ip):
+        """주소가 속한 서브넷의 VPC 이름 (없으면 None)"""
+        label = self._subnet_classifier.classify(ip)
+        return self._subnet_network.get(label.role)
+
+    # 단일 흐름 평가 (참조 구현)
+    def evaluate(self, src, dst, port, protocol, target_tags=(), direction="INGRESS"):
+        """흐름 하나의 허용 여부와 결정한 규칙"""
+        protocol = PROTOCOL_NUMBERS[protocol.lower()] if isinstance(protocol, str) else protocol
+        network = self.network_of(dst if direction == "INGRESS" else src)
+        address = int(ipaddress.IPv4Address(src if direction == "INGRESS" else dst))
+        for rule in self.rules[direction]:
+            if (rule.network == network and rule.applies_to(target_tags) and rule.matches_address(address)
+                    and rule.matches_protocol(protocol, port)):
+                return Decision(rule.action == "allow", rule.name, rule.priority)
+        if direction == "INGRESS":
+            return Decision(False, IMPLIED_DENY_INGRESS, 65535)
+        return Decision(True, IMPLIED_ALLOW_EGRESS, 65535)
+
+    # 벡터화 평가
+    def _build(self, rules):
+        words = max(1, (len(rules) + 63) // 64)
+
+        def bit(index):
+            mask = np.zeros(words, dtype=np.uint64)
+            mask[index // 64] = np.uint64(1) << np.uint64(index % 64)
+            return mask
+
+        address_intervals = {i: _cidr_bounds(rule.ranges) for i, rule in enumerate(rules)}
+        address_bounds = _partition(address_intervals, 1 << 32)
+        address_masks = np.zeros((len(address_bounds), words), dtype=np.uint64)
+        starts = np.array(address_bounds, dtype=np.uint64)
+        for i, intervals in address_intervals.items():
+            for low, high in intervals:
+                lo = np.searchsorted(starts, low)
+                hi = np.searchsorted(starts, high + 1)
+                address_masks[lo:hi] |= bit(i)
+
+        protocol_rows = sorted({number for rule in rules for number, _ in rule.protocols if number is not None})
+        row_of = np.full(256, len(protocol_rows), dtype=np.int64)  # 마지막 행: 규칙에 없는 프로토콜
+        for row, number in enumerate(protocol_rows):
+            if 0 <= number < 256:
+                row_of[number] = row
+        port_intervals = {i: [iv for _, ports in rule.protocols if ports for iv in ports]
+                          for i, rule in enumerate(rules)}
+        port_bounds = _partition(port_intervals, 65536)
+        port_starts = np.array(port_bounds, dtype=np.int64)
+        port_masks = np.zeros((len(protocol_rows) + 1, len(port_bounds), words), dtype=np.uint64)
+        for i, rule in enumerate(rules):
+            for number, ports in rule.protocols:
+                for row, row_protocol in enumerate(protocol_rows + [None]):
+                    if number is not None and row_protocol != number:
+                        continue
+                    if ports is None or row_protocol not in PORT_PROTOCOLS:
+                        port_masks[row, :] |= bit(i)
+                        continue
+                    for low, high in ports:
+                        lo = np.searchsorted(port_starts, low)
+                        hi = np.searchsorted(port_starts, high + 1)
+                        port_masks[row, lo:hi] |= bit(i)
+
+        network_masks = np.zeros((len(self.networks) + 1, words), dtype=np.uint64)  # 마지막 행: VPC 밖
+        for i, rule in enumerate(rules):
+            if rule.network in self.networks:
+                network_masks[self.networks.index(rule.network)] |= bit(i)
+        return {"words": words, "bit": bit, "address_starts": starts, "address_masks": address_masks,
+                "row_of": row_of, "port_starts": port_starts, "port_masks": port_masks,
+                "network_masks": network_masks}
+
+    def _network_indexes(self, values):
+        subnet_index = self._subnet_classifier.classify_ints(values)
+        lookup = np.array([self.networks.index(self._subnet_network[label.role])
+                           if label.role in self._subnet_network else len(self.networks)
+                           for label in self._subnet_classifier.labels], dtype=np.int64)
+        return lookup[subnet_index]
+
+    def evaluate_many(self, src, dst, ports, protocols, target_tags=(), direction="INGRESS"):
+        """
+        흐름 배열 일괄 평가 - (허용 여부 bool 배열, 결정 규칙 인덱스 배열(-1은 암시적 규칙)) 반환
+        규칙 인덱스는 self.rules[direction]의 위치
+        """
+        if np is None:
+            decisions = [self.evaluate(s, d, p, proto, target_tags, direction)
+                         for s, d, p, proto in zip(src, dst, ports, protocols)]
+            names = [rule.name for rule in self.rules[direction]]
+            return ([d.allowed for d in decisions],
+                    [names.index(d.rule) if d.rule in names else -1 for d in decisions])
+
+        table = self._tables[direction]
+        rules = self.rules[direction]
+        src = ip_ints(src)
+        dst = ip_ints(dst)
+        ports = np.asarray(ports, dtype=np.int64)
+        protocols = protocol_numbers(protocols)
+        address, owner = (src, dst) if direction == "INGRESS" else (dst, src)
+
+        target_mask = np.zeros(table["words"], dtype=np.uint64)
+        for i, rule in enumerate(rules):
+            if rule.applies_to(target_tags):
+                target_mask |= table["bit"](i)
+
+        masks = table["address_masks"][np.searchsorted(table["address_starts"], address, side="right") - 1]
+        masks &= table["network_masks"][self._network_indexes(owner)]
+        rows = table["row_of"][np.clip(protocols, 0, 255)]
+        masks &= table["port_masks"][rows, np.searchsorted(table["port_starts"], ports, side="right") - 1]
+        masks &= target_mask
+
+        # 가장 낮은 비트 = 평가 순서상 처음 일치하는 규칙
+        rule_index = np.full(len(address), -1, dtype=np.int64)
+        for word in range(table["words"] - 1, -1, -1):
+            column = masks[:, word]
+            found = column != 0
+            lowest = column[found] & (~column[found] + np.uint64(1))
+            rule_index[found] = word * 64 + np.log2(lowest.astype(np.float64)).astype(np.int64)
+        actions = np.array([rule.action == "allow" for rule in rules] + [direction == "EGRESS"], dtype=bool)
+        return actions[rule_index], rule_index
+
+    def rule_name(self, index, direction="INGRESS"):
+        if index < 0:
+            return IMPLIED_DENY_INGRESS if direction == "INGRESS" else IMPLIED_ALLOW_EGRESS
+        return self.rules[direction][index].name
+
+def _parse_flow(text):
+    """'SRC DST PORT/PROTO' 문자열 파싱"""
+    src, dst, service = text.split()
+    port, _, protocol = service.partition("/")
+    return src, dst, int(port), protocol or "tcp"
+
+def print_model(model):
+    print("Networks / subnets:")
+    for subnet in model.subnets:
+        pga = ", private Google access" if subnet.private_google_access else ""
+        print(f"  {subnet.network:<10} {subnet.name:<12} {subnet.cidr:<16} {subnet.region}{pga}")
+    print("\nInstances:")
+    for instance in model.instances:
+        print(f"  {instance.name:<16} {instance.network or '-':<10} tags: {', '.join(instance.tags) or '-'}")
+    print("\nFirewall rules (evaluation order):")
+    engine = model.firewall()
+    for direction, rules in engine.rules.items():
+        for rule in rules:
+            print(f"  {rule.describe()}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate firewall.tf rules offline against flows")
+    parser.add_argument("flows", nargs="*", help="flows as 'SRC DST PORT/PROTO', e.g. '10.0.1.5 10.1.1.10 443/tcp'")
+    parser.add_argument("--tf-dir", default=DEFAULT_TF_DIR, help="directory with the *.tf files (default: repo root)")
+    parser.add_argument("--tfvars", action="append", help="tfvars file (default: terraform.tfvars if present)")
+    parser.add_argument("--instance", help="take target tags from this instance in compute.tf")
+    parser.add_argument("--tags", default="", help="comma separated target tags of the destination")
+    parser.add_argument("--bench", type=int, metavar="N", help="evaluate N random flows and report throughput")
+    args = parser.parse_args(argv)
+
+    model = TerraformModel.load(args.tf_dir, args.tfvars)
+    engine = model.firewall()
+    tags = [tag for tag in args.tags.split(",") if tag]
+    if args.instance:
+        instance = model.instance(args.instance)
+        if instance is None:
+            parser.error(f"unknown instance {args.instance}")
+        tags += instance.tags
+
+    if not args.flows and not args.bench:
+        print_model(model)
+
+    for flow in args.flows:
+        src, dst, port, protocol = _parse_flow(flow)
+        decision = engine.evaluate(src, dst, port, protocol, tags)
+        verdict = "ALLOW" if decision.allowed else "DENY"
+        print(f"{src} -> {dst}:{port}/{protocol}  {verdict}  ({decision.rule}, priority {decision.priority})")
+
+    if args.bench:
+        if np is None:
+            parser.error("--bench requires numpy")
+        rng = np.random.default_rng(0)
+        cidrs = [ipaddress.ip_network(subnet.cidr) for subnet in model.subnets]
+        sources = [ipaddress.ip_network(c) for c in ("0.0.0.0/0", "35.235.240.0/20", "35.191.0.0/16")] + cidrs
+        pick = rng.integers(0, len(sources), args.bench)
+        src = np.array([int(n.network_address) for n in sources], dtype=np.uint64)[pick] + \
+            (rng.random(args.bench) * np.array([n.num_addresses for n in sources])[pick]).astype(np.uint64)
+        dst_net = rng.integers(0, len(cidrs), args.bench)
+        dst = np.array([int(n.network_address) for n in cidrs], dtype=np.uint64)[dst_net] + \
+            rng.integers(0, 256, args.bench).astype(np.uint64)
+        ports = rng.choice([22, 443, 500, 4500, 8080, 53], args.bench)
+        protocols = rng.choice([6, 17, 1, 50], args.bench)
+        start = time.perf_counter()
+        allowed, rule_index = engine.evaluate_many(src, dst, ports, protocols, tags)
+        elapsed = time.perf_counter() - start
+        print(f"Evaluated {args.bench:,} flows in {elapsed:.3f}s ({args.bench / elapsed:,.0f} flows/s), "
+              f"{allowed.mean() * 100:.1f}% allowed")
+        counts = np.bincount(rule_index + 1, minlength=len(engine.rules["INGRESS"]) + 1)
+        for index, count in enumerate(counts):
+            if count:
+                print(f"  {engine.rule_name(index - 1):<28} {count:>10,}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
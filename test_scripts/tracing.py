@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+tracing.py - 검증/API 테스트 단계의 중첩 스팬 계측
+--trace PATH로 켜면 단계별 스팬을 모아 Chrome trace-event JSON(chrome://tracing, Perfetto, speedscope)
+또는 OTLP/JSON 파일로 저장하고, 꺼져 있으면 span()은 공유 no-op 객체를 돌려줄 뿐 아무것도 기록하지 않음
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# 켜져 있을 때만 Tracer - 계측 지점은 이 전역 하나만 확인
+_tracer = None
+
+class _NoopSpan:
+    """계측이 꺼져 있을 때 span()이 돌려주는 공유 객체"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class Span:
+    """진행 중인 스팬 - with 블록이 끝나면 Tracer에 기록"""
+
+    __slots__ = ("tracer", "name", "attributes", "span_id", "parent_id", "thread", "start", "end", "error")
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.error = None
+
+    def __enter__(self):
+        self.tracer._push(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.tracer._pop(self)
+        return False
+
+    def set(self, **attributes):
+        """스팬 속성 추가 (예: 결과 상태, 응답 크기)"""
+        self.attributes.update(attributes)
+
+class Tracer:
+    """
+    스레드별 스팬 스택으로 부모를 정하고 끝난 스팬을 목록에 모음
+    스택이 빈 스레드(스레드 풀 작업 등)의 스팬은 루트 스팬의 자식
+    """
+
+    def __init__(self, service="gemini-tests"):
+        self.service = service
+        self.spans = []
+        self.root_id = None
+        self.trace_id = os.urandom(16).hex()
+        self._local = threading.local()
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # perf_counter 기준 시각을 Unix 시각(ns)으로 바꾸는 오프셋
+        self._epoch = time.time_ns() - time.perf_counter_ns()
+
+    def _push(self, span):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        with self._lock:
+            self._next_id += 1
+            span.span_id = self._next_id
+            thread = threading.current_thread()
+            span.thread = self._threads.setdefault(thread.ident, (len(self._threads) + 1, thread.name))[0]
+        span.parent_id = stack[-1].span_id if stack else self.root_id
+        if self.root_id is None:
+            self.root_id = span.span_id
+        stack.append(span)
+
+    def _pop(self, span):
+        stack = self._local.stack
+        # 예외로 빠져나간 안쪽 스팬이 남아 있어도 자신까지 정리
+        while stack and stack.pop() is not span:
+            pass
+        self.spans.append(span)
+
+    def chrome_trace(self):
+        """Chrome trace-event 형식 (완료 이벤트 'X', 시각은 마이크로초)"""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.service}}]
+        events += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                   for tid, name in self._threads.values()]
+        for span in sorted(self.spans, key=lambda span: span.start):
+            args = dict(span.attributes)
+            if span.error:
+                args["error"] = span.error
+            events.append({"name": span.name, "cat": self.service, "ph": "X", "pid": pid, "tid": span.thread,
+                           "ts": (self._epoch + span.start) / 1000, "dur": (span.end - span.start) / 1000,
+                           "args": args})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def otlp_trace(self):
+        """OTLP/JSON ExportTraceServiceRequest 형식 (ID는 16진수, 64비트 정수는 문자열)"""
+        spans = []
+        for span in sorted(self.spans, key=lambda span: span.start):
+            entry = {
+                "traceId": self.trace_id,
+                "spanId": f"{span.span_id:016x}",
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(self._epoch + span.start),
+                "endTimeUnixNano": str(self._epoch + span.end),
+                "attributes": [otlp_attribute(key, value) for key, value in span.attributes.items()]
+                              + [otlp_attribute("thread.id", span.thread)],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id is not None:
+                entry["parentSpanId"] = f"{span.parent_id:016x}"
+            spans.append(entry)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [otlp_attribute("service.name", self.service),
+                                        otlp_attribute("process.pid", os.getpid())]},
+            "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}],
+        }]}
+
+    def write(self, path, fmt=None):
+        """파일로 저장 - fmt가 없으면 확장자 .otlp.json / .otlp면 OTLP, 그 밖에는 Chrome 형식"""
+        fmt = fmt or trace_format(path)
+        document = self.otlp_trace() if fmt == "otlp" else self.chrome_trace()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(document, f, default=str)
+        return len(self.spans)
+
+def otlp_attribute(key, value):
+    """OTLP KeyValue (bool → boolValue, int → intValue 문자열, float → doubleValue, 그 밖에는 문자열)"""
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+def trace_format(path):
+    """파일 이름으로 형식 추측: otlp / chrome"""
+    return "otlp" if path.endswith((".otlp.json", ".otlp")) else "chrome"
+
+def span(name, **attributes):
+    """
+    중첩 스팬 컨텍스트 매니저 - with span("vertexai.init"): ...
+    계측이 꺼져 있으면 공유 no-op 객체를 돌려주므로 비용은 전역 확인 한 번
+    """
+    if _tracer is None:
+        return NOOP_SPAN
+    return Span(_tracer, name, attributes)
+
+def traced(name=None):
+    """함수 전체를 스팬으로 감싸는 데코레이터 (이름 생략 시 함수 이름)"""
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with Span(_tracer, label, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def enabled():
+    return _tracer is not None
+
+def start(service="gemini-tests"):
+    """계측 시작 - 이후 span()이 기록됨"""
+    global _tracer
+    _tracer = Tracer(service)
+    return _tracer
+
+def stop(path=None, fmt=None):
+    """계측을 끄고 path가 있으면 저장 - 저장한 스팬 수 (꺼져 있었으면 0)"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None or not path:
+        return 0
+    return tracer.write(path, fmt)
+
+# --- 저장된 trace 요약 ---------------------------------------------------------
+
+def load_spans(path):
+    """Chrome 또는 OTLP 파일에서 (이름, 스레드, 시작 µs, 길이 µs) 목록"""
+    with open(path) as f:
+        document = json.load(f)
+    if "resourceSpans" in document:
+        spans = [span for resource in document["resourceSpans"] for scope in resource["scopeSpans"]
+                 for span in scope["spans"]]
+        return [(span["name"],
+                 next((int(a["value"]["intValue"]) for a in span["attributes"] if a["key"] == "thread.id"), 0),
+                 int(span["startTimeUnixNano"]) / 1000,
+                 (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1000) for span in spans]
+    return [(event["name"], event["tid"], event["ts"], event["dur"])
+            for event in document["traceEvents"] if event.get("ph") == "X"]
+
+def summarize(spans):
+    """
+    이름별 호출 수, 전체 시간, 자체 시간(같은 스레드의 직계 자식 스팬을 뺀 시간)
+    자체 시간 내림차순 - 실제로 시간이 쓰인 단계가 위로
+    """
+    self_time = {}
+    stats = {}
+    by_thread = {}
+    for name, thread, start, duration in spans:
+        by_thread.setdefault(thread, []).append((start, -duration, name))
+    for events in by_thread.values():
+        events.sort()
+        stack = []
+        for start, negative, name in events:
+            end = start - negative
+            while stack and stack[-1][1] <= start:
+                stack.pop()
+            if stack:
+                parent = stack[-1][0]
+                self_time[parent] = self_time.get(parent, 0) + negative
+            entry = stats.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += -negative
+            self_time[name] = self_time.get(name, 0) - negative
+            stack.append((name, end))
+    return sorted(((name, count, total, self_time[name]) for name, (count, total) in stats.items()),
+                  key=lambda row: -row[3])
+
+def print_summary(rows, top=20):
+    print(f"{'span':<32} {'calls':>6} {'total ms':>10} {'self ms':>10}")
+    for name, count, total, own in rows[:top]:
+        print(f"{name[:32]:<32} {count:6d} {total / 1000:10.1f} {own / 1000:10.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a trace written with --trace (slowest steps first)")
+    parser.add_argument("trace", help="Chrome trace-event or OTLP/JSON file")
+    parser.add_argument("--top", type=int, default=20, help="number of span names to show (default: 20)")
+    args = parser.parse_args(argv)
+    spans = load_spans(args.trace)
+    if not spans:
+        print("No spans recorded")
+        return 1
+    print_summary(summarize(spans), args.top)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,23 +5,44 @@ On-premises에서 Gemini API 호출이 VPN/Interconnect를 통해 이루어지
 """
 
 import os
+import io
 import sys
 import json
 import time
 import socket
+import argparse
+import threading
 import subprocess
 import traceback
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import tracing
+from result_output import NdjsonWriter
+from path_monitor import NetlinkWatcher, CachedCheck, RollingWindow, sleep_until
+from netinfo import load_snapshot, NetinfoUnavailable, RT_TABLE_MAIN
+from async_dns import AsyncResolver
+from ip_classifier import IpClassifier
+from path_prober import probe_paths, print_paths, PGA_VIPS, TCP_SYN_RETRANSMIT
+from https_prober import probe_endpoints, print_probe_report, warm_timing, DEFAULT_HOST
+
+# Terraform 구성의 주소 대역 분류기 (PGA VIP, VPC/서브넷, BGP 링크 로컬, IAP 등)
+IP_CLASSIFIER = IpClassifier()
+GOOGLE_ACCESS_ROLES = {"private_google_access", "restricted_google_access", "google_api_vip_range"}
 
 def run_command(cmd):
-    """명령어 실행 및 결과 반환"""
-    try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=10)
-        return result.stdout.strip(), result.stderr.strip(), result.returncode
-    except subprocess.TimeoutExpired:
-        return "", "Command timed out", 1
-    except Exception as e:
-        return "", str(e), 1
+    """명령어 실행 및 결과 반환 - 문자열은 셸로, 리스트는 셸 없이 실행"""
+    with tracing.span("run_command", cmd=cmd if isinstance(cmd, str) else " ".join(cmd)) as span:
+        try:
+            result = subprocess.run(cmd, shell=isinstance(cmd, str), capture_output=True, text=True, timeout=10)
+            span.set(returncode=result.returncode)
+            return result.stdout.strip(), result.stderr.strip(), result.returncode
+        except subprocess.TimeoutExpired:
+            span.set(error="timeout")
+            return "", "Command timed out", 1
+        except Exception as e:
+            span.set(error=str(e))
+            return "", str(e), 1
 
 def check_dns_resolution():
     """DNS 해석 확인"""
@@ -35,33 +56,126 @@ def check_dns_resolution():
         "*.googleapis.com"
     ]
     
-    for endpoint in endpoints:
-        if "*" in endpoint:
-            endpoint = endpoint.replace("*", "test")
-        
+    names = [endpoint.replace("*", "test") for endpoint in endpoints]
+
+    # 모든 엔드포인트를 동시에 조회 (CNAME 체인/TTL/지연 시간 포함)
+    # 리졸버 캐시는 --watch 모드에서 실행 간에 유지됨
+    lookups = {}
+    try:
+        with tracing.span("dns.resolve_all", names=len(names)):
+            lookups = {lookup["name"]: lookup for lookup in dns_resolver().resolve_all(names)}
+    except OSError:
+        pass
+
+    results = {}
+    for endpoint in names:
+        lookup = lookups.get(endpoint)
         try:
-            # DNS 조회
-            ips = socket.gethostbyname_ex(endpoint)[2]
+            # DNS 조회 - 비동기 조회가 실패한 경우 시스템 리졸버 사용
+            if lookup and lookup["addresses"]:
+                ips = lookup["addresses"]
+            else:
+                ips = socket.gethostbyname_ex(endpoint)[2]
+                lookup = None
             print(f"\n{endpoint}:")
+            details = {}
+            if lookup:
+                for cname in lookup["cname_chain"]:
+                    print(f"  → CNAME {cname}")
+                source = "cache" if lookup["cached"] else lookup["source"]
+                ttl = f", TTL {lookup['ttl']}s" if lookup["ttl"] is not None else ""
+                print(f"  ({source}, {lookup['latency'] * 1000:.1f} ms{ttl})")
+                details = {key: lookup[key] for key in ("cname_chain", "ttl", "latency", "cached", "source")}
+            addresses = []
             for ip in ips:
                 print(f"  - {ip}")
                 
                 # IP 대역 확인
-                if ip.startswith("10.") or ip.startswith("172.") or ip.startswith("192.168."):
-                    print(f"    ✓ Private IP detected - Using private connection")
-                elif ip.startswith("199.36.153.") or ip.startswith("199.36.154."):
-                    print(f"    ✓ Google Private Access IP range - Using private connection")
+                label = IP_CLASSIFIER.classify(ip)
+                if label.role in GOOGLE_ACCESS_ROLES:
+                    print(f"    ✓ Google Private Access IP range ({label.network}) - Using private connection")
+                elif label.private:
+                    print(f"    ✓ Private IP detected ({label.role} {label.network}) - Using private connection")
                 else:
                     print(f"    ⚠️  Public IP - May be using public internet")
+                addresses.append({"ip": ip, "classification": label.role,
+                                  "network": label.network, "private": label.private})
+            results[endpoint] = {"addresses": addresses, **details}
                     
         except socket.gaierror as e:
             print(f"\n{endpoint}: DNS resolution failed - {e}")
+            results[endpoint] = {"error": str(e)}
+
+    if any("error" in result for result in results.values()):
+        status = "fail"
+    elif any(not address["private"]
+             for result in results.values() for address in result["addresses"]):
+        status = "warn"
+    else:
+        status = "pass"
+    return {"status": status, "endpoints": results}
+
+_dns_resolver = None
+
+def dns_resolver():
+    """프로세스 전체에서 공유하는 비동기 DNS 리졸버 (TTL 캐시 유지)"""
+    global _dns_resolver
+    if _dns_resolver is None:
+        _dns_resolver = AsyncResolver()
+    return _dns_resolver
 
 def check_routing_table():
     """라우팅 테이블 확인"""
     print("\n\n2. Routing Table Check")
     print("=" * 60)
-    
+
+    try:
+        snapshot = load_snapshot()
+    except NetinfoUnavailable:
+        return check_routing_table_ip_command()
+
+    result = {"status": "info", "source": snapshot.source, "api_ip": None,
+              "route_to_api": None, "path": "unknown",
+              "routes": [route.describe() for route in snapshot.routes if route.table == RT_TABLE_MAIN]}
+
+    print(f"\nCurrent routing table (from {snapshot.source}):")
+    for line in result["routes"]:
+        print(line)
+
+    print("\n\nRoutes to Google API endpoints:")
+
+    # 특정 엔드포인트로의 라우팅 확인
+    try:
+        api_ip = socket.gethostbyname("aiplatform.googleapis.com")
+    except OSError:
+        return result
+    result["api_ip"] = api_ip
+    route = snapshot.route_get(api_ip)
+    if route is None:
+        print(f"\nNo route to aiplatform.googleapis.com ({api_ip})")
+        return result
+
+    print(f"\nRoute to aiplatform.googleapis.com ({api_ip}):")
+    print(route.describe())
+    result["route_to_api"] = route.describe()
+
+    # VPN/Interconnect 인터페이스 확인
+    link = snapshot.link(route.ifname)
+    if link and link.is_vpn:
+        print("✓ Traffic appears to be routed through VPN tunnel")
+        result.update(status="pass", path="vpn_tunnel")
+    elif route.gateway is not None:
+        # Gateway IP 확인
+        if IP_CLASSIFIER.classify(str(route.gateway)).private:
+            print("✓ Traffic routed through private gateway")
+            result.update(status="pass", path="private_gateway")
+        else:
+            print("⚠️  Traffic may be routed through public internet")
+            result.update(status="warn", path="public")
+    return result
+
+def check_routing_table_ip_command():
+    """라우팅 테이블 확인 - rtnetlink/procfs를 읽을 수 없을 때 ip 명령 사용"""
     # 주요 Google API 대역 확인
     google_ranges = [
         "199.36.153.0/24",  # Google Private Access
@@ -70,38 +184,73 @@ def check_routing_table():
         "172.16.0.0/12",    # Private IP range
     ]
     
+    result = {"status": "info", "routes": [], "api_ip": None, "route_to_api": None, "path": "unknown"}
+
     print("\nCurrent routing table:")
     stdout, stderr, _ = run_command("ip route show")
     if stdout:
         print(stdout)
+        result["routes"] = stdout.split('\n')
     
     print("\n\nRoutes to Google API endpoints:")
     
     # 특정 엔드포인트로의 라우팅 확인
     try:
         api_ip = socket.gethostbyname("aiplatform.googleapis.com")
+        result["api_ip"] = api_ip
         stdout, stderr, _ = run_command(f"ip route get {api_ip}")
         if stdout:
             print(f"\nRoute to aiplatform.googleapis.com ({api_ip}):")
             print(stdout)
+            result["route_to_api"] = stdout
             
             # VPN/Interconnect 인터페이스 확인
             if "tun" in stdout or "vpn" in stdout or "vti" in stdout:
                 print("✓ Traffic appears to be routed through VPN tunnel")
+                result.update(status="pass", path="vpn_tunnel")
             elif "eth" in stdout and "via" in stdout:
                 # Gateway IP 확인
-                if "via 10." in stdout or "via 172." in stdout or "via 192.168." in stdout:
+                fields = stdout.split()
+                gateway = fields[fields.index("via") + 1]
+                if IP_CLASSIFIER.classify(gateway).private:
                     print("✓ Traffic routed through private gateway")
+                    result.update(status="pass", path="private_gateway")
                 else:
                     print("⚠️  Traffic may be routed through public internet")
+                    result.update(status="warn", path="public")
     except:
         pass
+    return result
 
 def check_network_interfaces():
     """네트워크 인터페이스 확인"""
     print("\n\n3. Network Interface Check")
     print("=" * 60)
-    
+
+    try:
+        snapshot = load_snapshot()
+    except NetinfoUnavailable:
+        return check_network_interfaces_ip_command()
+
+    vpn_interfaces = []
+    for link in snapshot.vpn_links():
+        print(f"\n✓ VPN Interface detected: {link.name}" + (f" ({link.kind})" if link.kind else ""))
+        addresses = [str(address.interface) for address in snapshot.addresses
+                     if address.ifindex == link.index or address.ifname == link.name]
+        for address in addresses:
+            print(f"  inet {address}")
+        vpn_interfaces.append({"name": link.name, "kind": link.kind, "mtu": link.mtu,
+                               "operstate": link.operstate, "addresses": addresses})
+
+    return {
+        "status": "pass" if vpn_interfaces else "warn",
+        "source": snapshot.source,
+        "vpn_interfaces": vpn_interfaces,
+    }
+
+def check_network_interfaces_ip_command():
+    """네트워크 인터페이스 확인 - rtnetlink/procfs를 읽을 수 없을 때 ip 명령 사용"""
+    vpn_interfaces = {}
     stdout, stderr, _ = run_command("ip addr show")
     if stdout:
         lines = stdout.split('\n')
@@ -116,39 +265,99 @@ def check_network_interfaces():
                     
             if current_interface and ('tun' in current_interface or 'vpn' in current_interface or 'vti' in current_interface):
                 print(f"\n✓ VPN Interface detected: {current_interface}")
+                addresses = vpn_interfaces.setdefault(current_interface, [])
                 if 'inet ' in line:
                     print(f"  {line.strip()}")
+                    addresses.append(line.split()[1])
+
+    return {
+        "status": "pass" if vpn_interfaces else "warn",
+        "vpn_interfaces": [{"name": name, "addresses": addresses}
+                           for name, addresses in vpn_interfaces.items()],
+    }
 
 def check_vpn_status():
     """VPN 연결 상태 확인"""
     print("\n\n4. VPN Connection Status")
     print("=" * 60)
     
-    # IPSec 상태 확인
+    state = {"ipsec": False, "openvpn": False, "wireguard": False}
+
+    # IPSec 상태 확인 (sudo -n: 암호가 필요하면 프롬프트 없이 실패)
     print("\nChecking IPSec status:")
-    stdout, stderr, _ = run_command("sudo ipsec status")
+    stdout, stderr, _ = run_command(["sudo", "-n", "ipsec", "status"])
     if stdout and "ESTABLISHED" in stdout:
         print("✓ IPSec connection is ESTABLISHED")
+        state["ipsec"] = True
+    elif "password is required" in stderr:
+        print("⚠️  sudo needs a password - VPN status not checked (configure passwordless sudo)")
+        state["sudo"] = False
     elif stderr and "command not found" not in stderr:
         print("⚠️  IPSec not configured or not running")
     
     # OpenVPN 상태 확인
-    stdout, stderr, _ = run_command("sudo systemctl status openvpn")
+    stdout, stderr, _ = run_command(["sudo", "-n", "systemctl", "status", "openvpn"])
     if stdout and "active (running)" in stdout:
         print("✓ OpenVPN is running")
+        state["openvpn"] = True
     
     # WireGuard 상태 확인
-    stdout, stderr, _ = run_command("sudo wg show")
+    stdout, stderr, _ = run_command(["sudo", "-n", "wg", "show"])
     if stdout and "interface:" in stdout:
         print("✓ WireGuard is configured")
+        state["wireguard"] = True
+
+    return {"status": "pass" if any(state[name] for name in ("ipsec", "openvpn", "wireguard")) else "warn", **state}
 
 def trace_route_to_api():
     """API 엔드포인트까지의 경로 추적"""
     print("\n\n5. Traceroute to API Endpoints")
     print("=" * 60)
     
+    result = {"status": "info", "target": None, "hops": [], "private_hops": 0, "total_hops": 0}
     try:
         api_ip = socket.gethostbyname("aiplatform.googleapis.com")
+    except Exception as e:
+        print(f"Traceroute failed: {e}")
+        result.update(status="fail", error=str(e))
+        return result
+    result["target"] = api_ip
+
+    # API 주소와 모든 PGA VIP를 TCP 443 SYN 탐침으로 동시에 추적 (첫 10 홉만)
+    targets = list(dict.fromkeys([api_ip] + PGA_VIPS))
+    try:
+        paths = probe_paths(targets, max_hops=10, probes=3, timeout=TCP_SYN_RETRANSMIT, mode="tcp")
+    except OSError as e:
+        print(f"\nParallel prober unavailable ({e}), falling back to traceroute")
+        return trace_route_to_api_traceroute(result)
+
+    print(f"\nTracing routes to aiplatform.googleapis.com ({api_ip}) and the Private Google Access VIPs:")
+    print_paths(paths, IP_CLASSIFIER)
+
+    hops = []
+    for hop in paths[api_ip]["hops"]:
+        labels = [IP_CLASSIFIER.classify(address) for address in hop["addresses"]]
+        hops.append(dict(hop, classification=[label.role for label in labels],
+                         private=bool(labels) and all(label.private for label in labels)))
+    private_hops = sum(1 for hop in hops if hop["private"])
+    total_hops = sum(1 for hop in hops if hop["received"])
+
+    if private_hops > 0:
+        print(f"\n✓ Found {private_hops} private IP hops out of {total_hops} responding hops")
+        print("  This indicates traffic is using private network path")
+    else:
+        print(f"\n⚠️  No private IP hops detected in {total_hops} responding hops")
+        print("  Traffic may be using public internet")
+    result.update(status="pass" if private_hops else "warn", hops=hops,
+                  private_hops=private_hops, total_hops=total_hops,
+                  reached_at=paths[api_ip]["reached_at"],
+                  vips={target: path for target, path in paths.items() if target != api_ip})
+    return result
+
+def trace_route_to_api_traceroute(result):
+    """traceroute 명령으로 경로 추적 - 병렬 탐침을 사용할 수 없을 때"""
+    api_ip = result["target"]
+    try:
         print(f"\nTracing route to aiplatform.googleapis.com ({api_ip}):")
         
         # traceroute 실행 (첫 10 홉만)
@@ -162,10 +371,15 @@ def trace_route_to_api():
                 if line.strip() and not line.startswith('traceroute'):
                     print(line)
                     total_hops += 1
+                    hop = parse_traceroute_hop(line)
                     
-                    # Private IP 확인
-                    if "10." in line or "172." in line or "192.168." in line:
-                        private_hops += 1
+                    # Private IP 확인 (RTT 값 "10.3 ms" 등은 주소가 아니므로 홉 주소만 분류)
+                    if hop["address"]:
+                        label = IP_CLASSIFIER.classify(hop["address"])
+                        hop.update(classification=label.role, private=label.private)
+                        if label.private:
+                            private_hops += 1
+                    result["hops"].append(hop)
             
             if private_hops > 0:
                 print(f"\n✓ Found {private_hops} private IP hops out of {total_hops} total hops")
@@ -173,9 +387,30 @@ def trace_route_to_api():
             else:
                 print(f"\n⚠️  No private IP hops detected in {total_hops} hops")
                 print("  Traffic may be using public internet")
+            result.update(status="pass" if private_hops else "warn",
+                          private_hops=private_hops, total_hops=total_hops)
                 
     except Exception as e:
         print(f"Traceroute failed: {e}")
+        result.update(status="fail", error=str(e))
+    return result
+
+def parse_traceroute_hop(line):
+    """'traceroute -n' 출력 한 줄을 홉 번호/주소/RTT(ms) 목록으로 변환"""
+    fields = line.split()
+    hop = {"ttl": None, "address": None, "rtt_ms": []}
+    if fields and fields[0].isdigit():
+        hop["ttl"] = int(fields[0])
+        fields = fields[1:]
+    for i, field in enumerate(fields):
+        if field == "ms" and i > 0:
+            try:
+                hop["rtt_ms"].append(float(fields[i - 1]))
+            except ValueError:
+                pass
+        elif hop["address"] is None and field != "*" and field.count(".") == 3:
+            hop["address"] = field
+    return hop
 
 def check_firewall_rules():
     """방화벽 규칙 확인"""
@@ -184,22 +419,29 @@ def check_firewall_rules():
     
     # iptables 규칙 확인
     print("\nChecking iptables rules for Google API traffic:")
-    stdout, stderr, _ = run_command("sudo iptables -L -n -v | grep -E '(199.36.153|199.36.154|443)'")
-    if stdout:
-        print(stdout)
+    # 규칙 목록은 커널 procfs로 노출되지 않으므로 iptables를 직접 실행 (셸/grep 없이)
+    stdout, stderr, _ = run_command(["sudo", "-n", "iptables", "-L", "-n", "-v"])
+    rules = [line for line in stdout.split('\n')
+             if "199.36.153" in line or "199.36.154" in line or "443" in line]
+    if rules:
+        print('\n'.join(rules))
     else:
         print("No specific rules found for Google API traffic")
+    return {"status": "info", "rules": rules}
 
 def check_private_google_access():
     """Private Google Access 설정 확인"""
     print("\n\n7. Private Google Access Configuration")
     print("=" * 60)
     
+    result = {"status": "info", "hosts_entries": [], "resolv_conf": []}
+
     print("\nChecking /etc/hosts for private endpoints:")
     stdout, stderr, _ = run_command("grep googleapis.com /etc/hosts")
     if stdout:
         print(stdout)
         print("✓ Custom DNS entries found for Google APIs")
+        result["hosts_entries"] = stdout.split('\n')
     else:
         print("No custom DNS entries in /etc/hosts")
     
@@ -207,32 +449,58 @@ def check_private_google_access():
     stdout, stderr, _ = run_command("cat /etc/resolv.conf | grep -E '(nameserver|search)'")
     if stdout:
         print(stdout)
+        result["resolv_conf"] = stdout.split('\n')
+    return result
 
 def test_actual_connection():
-    """실제 API 연결 테스트"""
+    """실제 API 연결 테스트 - 단계별 타이밍과 연결 재사용 효과 측정"""
     print("\n\n8. Actual API Connection Test")
     print("=" * 60)
     
-    # curl을 사용한 연결 테스트
-    print("\nTesting connection to Vertex AI endpoint:")
+    # DNS 응답 주소와 PGA VIP 각각에 대해 cold / TLS 재개 / keep-alive 재사용 요청 측정
+    print(f"\nTesting connection to Vertex AI endpoint ({DEFAULT_HOST}):")
+    report = probe_endpoints(DEFAULT_HOST, warm_requests=3, timeout=5.0)
+    print_probe_report(report)
     
-    # 헤더 정보 확인
-    stdout, stderr, _ = run_command(
-        "curl -I -s -X GET https://us-central1-aiplatform.googleapis.com/v1/projects"
-    )
+    reachable = [r for r in report["results"] if "error" not in r]
+    result = {
+        "status": "pass" if reachable else "fail",
+        "dns_time": report["dns_time"],
+        "resolved": report["resolved"],
+        "headers": [],
+        "details": [],
+        "endpoints": [],
+    }
+    for r in report["results"]:
+        label = IP_CLASSIFIER.classify(r["address"])
+        endpoint = {"address": r["address"], "classification": label.role, "private": label.private}
+        if "error" in r:
+            endpoint["error"] = r["error"]
+        else:
+            endpoint.update(
+                status=r["cold"]["status"],
+                cold=r["cold"]["timing"],
+                resumed=dict(r["resumed"]["timing"], session_reused=r["resumed"]["resumed"]),
+                warm=warm_timing(r["warm"]),
+            )
+        result["endpoints"].append(endpoint)
     
-    if stdout:
-        print("Response headers:")
-        for line in stdout.split('\n')[:5]:  # 처음 5줄만
+    # 연결 정보 상세 (curl -v의 Connected to / subject / issuer에 해당)
+    if reachable:
+        cold = reachable[0]["cold"]
+        result["headers"] = [f"HTTP/1.1 {cold['status']} {cold['reason']}"] + \
+            [f"{name}: {value}" for name, value in cold["headers"]]
+        cert = cold["cert"] or {}
+        subject = ", ".join("=".join(item) for rdn in cert.get("subject", ()) for item in rdn)
+        issuer = ", ".join("=".join(item) for rdn in cert.get("issuer", ()) for item in rdn)
+        result["details"] = [f"Connected to {DEFAULT_HOST} ({cold['address']}) port 443",
+                             f"subject: {subject}", f"issuer: {issuer}"]
+        print("\nConnection details:")
+        for line in result["details"]:
             print(f"  {line}")
-    
-    # 연결 정보 상세 확인
-    print("\nConnection details:")
-    stdout, stderr, _ = run_command(
-        "curl -v -s -o /dev/null https://us-central1-aiplatform.googleapis.com 2>&1 | grep -E '(Connected to|subject:|issuer:)'"
-    )
-    if stdout:
-        print(stdout)
+    if not any(e["private"] for e in result["endpoints"] if "error" not in e):
+        result["status"] = "warn" if reachable else "fail"
+    return result
 
 def generate_summary():
     """검증 결과 요약"""
@@ -270,28 +538,320 @@ Additional Commands to Run:
 - netstat -rn
 """)
 
-def main():
+# 검증 단계 목록: (이름, 함수, 선행 단계) - 출력은 이 순서대로 표시
+# sudo를 쓰는 단계(vpn, firewall)는 모두 sudo -n으로 실행하므로 작업 스레드에서 암호 프롬프트를 기다리지 않음
+CHECKS = [
+    ("dns", check_dns_resolution, ()),
+    ("routing", check_routing_table, ()),
+    ("interfaces", check_network_interfaces, ()),
+    ("vpn", check_vpn_status, ()),
+    ("traceroute", trace_route_to_api, ()),
+    ("firewall", check_firewall_rules, ()),
+    ("private_access", check_private_google_access, ()),
+    ("connection", test_actual_connection, ()),
+]
+
+class ThreadLocalStdout(io.TextIOBase):
+    """스레드별 버퍼로 print 출력을 모으는 stdout 대체 객체"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self):
+        self._local.buffer = io.StringIO()
+
+    def release(self):
+        buffer = self._local.buffer
+        self._local.buffer = None
+        return buffer.getvalue()
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            return self._stream.write(text)
+        return buffer.write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+def run_check(func, stdout=None, name=None):
+    """단일 검증 단계 실행 - stdout이 주어지면 출력을 버퍼링하고 소요 시간 측정 (name은 트레이스 스팬 이름)"""
+    if stdout:
+        stdout.capture()
+    with tracing.span(name or getattr(func, "__name__", "check")) as span:
+        start = time.perf_counter()
+        try:
+            data = func() or {"status": "info"}
+        except Exception as e:
+            print(f"\n✗ {getattr(func, '__name__', name)} failed:")
+            print(traceback.format_exc())
+            data = {"status": "fail", "error": f"{type(e).__name__}: {e}"}
+        elapsed = time.perf_counter() - start
+        span.set(status=data.get("status"))
+    return {"output": stdout.release() if stdout else "", "elapsed": elapsed, "data": data}
+
+def run_checks(checks, max_workers=8, on_result=None, echo=True):
+    """
+    선행 단계가 끝난 검증 단계를 스레드 풀에서 동시에 실행
+    각 단계의 출력은 원래 순서대로, 앞선 단계가 모두 끝나는 즉시 출력 (echo=False면 생략)
+    on_result(name, result)는 단계가 끝나는 즉시 (완료 순서대로) 호출
+    """
+    original_stdout = sys.stdout
+    stdout = ThreadLocalStdout(original_stdout)
+    sys.stdout = stdout
+
+    names = [name for name, _, _ in checks]
+    results = {}
+    pending = {}
+    next_to_print = 0
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while len(results) < len(checks):
+                # 선행 단계가 끝난 단계 제출
+                for name, func, deps in checks:
+                    if name in results or name in pending.values():
+                        continue
+                    if all(dep in results or dep not in names for dep in deps):
+                        pending[pool.submit(run_check, func, stdout, name)] = name
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    results[name] = future.result()
+                    if on_result:
+                        on_result(name, results[name])
+
+                # 앞선 단계가 모두 끝난 결과를 순서대로 출력
+                while next_to_print < len(names) and names[next_to_print] in results:
+                    result = results[names[next_to_print]]
+                    if echo:
+                        original_stdout.write(result["output"])
+                        original_stdout.write(f"\n   ({names[next_to_print]} took {result['elapsed']:.2f}s)\n")
+                        original_stdout.flush()
+                    next_to_print += 1
+    finally:
+        sys.stdout = original_stdout
+
+    return results
+
+def run_checks_serial(checks, on_result=None):
+    """검증 단계를 하나씩 순서대로 실행"""
+    results = {}
+    for name, func, _ in checks:
+        results[name] = run_check(func, name=name)
+        if on_result:
+            on_result(name, results[name])
+        print(f"\n   ({name} took {results[name]['elapsed']:.2f}s)")
+    return results
+
+# --watch 모드에서 결과를 캐시하는 단계와 무효화 조건
+WATCH_CACHE = {
+    "interfaces": {"netlink": True},
+    "private_access": {"files": ["/etc/hosts", "/etc/resolv.conf"]},
+}
+
+def classify_path(results):
+    """검증 결과로부터 API 트래픽 경로 분류: private / public / unknown"""
+    dns = results.get("dns", {}).get("data", {})
+    routing = results.get("routing", {}).get("data", {})
+    traceroute = results.get("traceroute", {}).get("data", {})
+
+    addresses = [address for endpoint in dns.get("endpoints", {}).values()
+                 for address in endpoint.get("addresses", [])]
+    if any(not address["private"] for address in addresses):
+        return "public"
+    if routing.get("path") == "public":
+        return "public"
+    if traceroute.get("total_hops") and not traceroute.get("private_hops"):
+        return "public"
+    if addresses or routing.get("path") in ("vpn_tunnel", "private_gateway"):
+        return "private"
+    return "unknown"
+
+def select_checks(names):
+    """쉼표로 구분된 단계 이름으로 CHECKS 부분 집합 선택"""
+    if not names:
+        return list(CHECKS)
+    wanted = [name.strip() for name in names.split(",") if name.strip()]
+    known = {name for name, _, _ in CHECKS}
+    unknown = [name for name in wanted if name not in known]
+    if unknown:
+        raise SystemExit(f"Unknown checks: {', '.join(unknown)} (available: {', '.join(sorted(known))})")
+    return [check for check in CHECKS if check[0] in wanted]
+
+def run_watch(args, writer=None, on_result=None):
+    """선택한 검증 단계를 주기적으로 실행하며 경로 변화를 감시 (--watch)"""
+    netlink = NetlinkWatcher()
+    checks = []
+    for name, func, deps in select_checks(args.checks):
+        policy = WATCH_CACHE.get(name)
+        if policy:
+            func = CachedCheck(func, files=policy.get("files", ()),
+                               netlink=netlink if policy.get("netlink") else None)
+        checks.append((name, func, deps))
+    window = RollingWindow(args.window)
+
+    print("=" * 60)
+    print("Gemini API Private Path Monitor")
+    print(f"Checks: {', '.join(name for name, _, _ in checks)}")
+    print(f"Interval: {args.watch:g}s, window: {args.window} runs, "
+          f"netlink change tracking: {'on' if netlink.available else 'off'}")
+    print("=" * 60)
+
+    cycle = 0
+    try:
+        while args.count is None or cycle < args.count:
+            started = time.monotonic()
+            with tracing.span("watch_cycle", cycle=cycle + 1):
+                results = run_checks(checks, max_workers=args.workers, on_result=on_result, echo=False)
+            cycle += 1
+
+            path = classify_path(results)
+            transition = window.add(time.time(), path,
+                                    {name: result["elapsed"] for name, result in results.items()})
+            statuses = " ".join(f"{name}={results[name]['data']['status']}({results[name]['elapsed']:.2f}s)"
+                                for name, _, _ in checks)
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] #{cycle} path={path} "
+                  f"private={window.path_ratio('private') * 100:.0f}% {statuses}")
+
+            if transition:
+                previous, current = transition
+                marker = "⚠️ " if current == "public" else "✓"
+                print(f"{marker} Path classification changed: {previous} -> {current}")
+                if writer:
+                    writer.emit("path_change", "fail" if current == "public" else "pass",
+                                previous=previous, current=current)
+            if writer:
+                writer.emit("watch_cycle", {"private": "pass", "public": "warn"}.get(path, "info"),
+                            time.monotonic() - started, cycle=cycle, path=path,
+                            private_ratio=window.path_ratio("private"),
+                            latency={name: window.latency_stats(name) for name, _, _ in checks})
+
+            if args.count is None or cycle < args.count:
+                sleep_until(started + args.watch)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        netlink.close()
+
+    print("\nRolling check latency (p50 / p90 / max):")
+    for name, func, _ in checks:
+        stats = window.latency_stats(name)
+        if stats:
+            cache = f" cache hits {func.hits}/{func.hits + func.misses}" if isinstance(func, CachedCheck) else ""
+            print(f"{name:<16} {stats['p50']:.2f} / {stats['p90']:.2f} / {stats['max']:.2f}s{cache}")
+
+def print_check_timings(results, wall_time):
+    """단계별 소요 시간 출력"""
+    print("\n\n" + "=" * 60)
+    print("CHECK TIMINGS")
+    print("=" * 60)
+    for name, _, _ in CHECKS:
+        if name in results:
+            print(f"{name:<16} {results[name]['elapsed']:6.2f}s")
+    total = sum(result["elapsed"] for result in results.values())
+    print(f"{'wall time':<16} {wall_time:6.2f}s (sum of checks: {total:.2f}s)")
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="Gemini API private connection verification")
+    parser.add_argument("--serial", action="store_true",
+                        help="run the checks one after another instead of concurrently")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="maximum number of checks to run at once (default: 8)")
+    parser.add_argument("--watch", type=float, metavar="SECONDS",
+                        help="keep running the checks every SECONDS and report path changes")
+    parser.add_argument("--checks",
+                        help="comma-separated checks to run in watch mode (default: all)")
+    parser.add_argument("--window", type=int, default=60,
+                        help="number of watch runs kept for rolling statistics (default: 60)")
+    parser.add_argument("--count", type=int,
+                        help="stop watch mode after this many runs")
+    parser.add_argument("--format", choices=["text", "ndjson"], default="text",
+                        help="ndjson: one JSON record per check on stdout, human-readable text on stderr")
+    parser.add_argument("--store", metavar="PATH",
+                        help="record every check result in this SQLite history (see results_store.py) "
+                             "and flag latency regressions")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="record nested spans for every check and command and write them to PATH as "
+                             "Chrome trace-event JSON (open in Perfetto/chrome://tracing), or OTLP/JSON for *.otlp.json")
+    parser.add_argument("--trace-format", choices=["chrome", "otlp"],
+                        help="trace file format (default: from the --trace file name)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """메인 실행 함수"""
+    args = parse_args(argv)
+
+    # NDJSON 모드: 레코드는 stdout, 사람이 읽는 출력은 stderr
+    # --store: 같은 레코드를 결과 이력 저장소에도 기록 (NDJSON 출력 없이도)
+    writer = None
+    on_result = None
+    store = None
+    original_stdout = sys.stdout
+    if args.store:
+        # 이력 저장소(sqlite3)는 --store일 때만 import - 원격 호스트로 보내는 실행에서도 비용 없음
+        from results_store import ResultStore
+        store = ResultStore(args.store)
+    if args.format == "ndjson" or store:
+        writer = NdjsonWriter(original_stdout if args.format == "ndjson" else None,
+                              "verify_gemini_private_connection", on_record=store.add if store else None)
+
+        def on_result(name, result):
+            data = dict(result["data"])
+            writer.emit(name, data.pop("status"), result["elapsed"], **data)
+    if args.format == "ndjson":
+        sys.stdout = sys.stderr
+    if args.trace:
+        tracing.start("verify_gemini_private_connection")
+
+    try:
+        with tracing.span("verify_gemini_private_connection", watch=bool(args.watch), serial=args.serial):
+            if args.watch:
+                run_watch(args, writer, on_result)
+            else:
+                run_verification(args, writer, on_result)
+        if store:
+            from results_store import report_run
+            report_run(store, writer)
+    finally:
+        if store:
+            store.close()
+        if args.trace:
+            print(f"Trace: {tracing.stop(args.trace, args.trace_format)} spans written to {args.trace}")
+        sys.stdout = original_stdout
+
+def run_verification(args, writer=None, on_result=None):
+    """검증 단계 실행 및 요약 출력"""
     print("=" * 60)
     print("Gemini API Private Connection Verification")
     print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     
     # 각 검증 단계 실행
-    check_dns_resolution()
-    check_routing_table()
-    check_network_interfaces()
-    check_vpn_status()
-    trace_route_to_api()
-    check_firewall_rules()
-    check_private_google_access()
-    test_actual_connection()
+    start = time.perf_counter()
+    if args.serial:
+        results = run_checks_serial(CHECKS, on_result)
+    else:
+        results = run_checks(CHECKS, max_workers=args.workers, on_result=on_result)
+    wall_time = time.perf_counter() - start
+
+    if writer:
+        statuses = [result["data"]["status"] for result in results.values()]
+        writer.emit("summary", "fail" if "fail" in statuses else "warn" if "warn" in statuses else "pass",
+                    wall_time, path=classify_path(results),
+                    **{status: statuses.count(status) for status in ("pass", "warn", "fail", "info")})
+
     generate_summary()
+    print_check_timings(results, wall_time)
     
     print("\n✅ Verification complete!")
     print("\nFor real-time traffic monitoring, run:")
     print("sudo tcpdump -i any -n -s0 -w gemini_traffic.pcap host aiplatform.googleapis.com")
-    print("\nThen analyze the pcap file to see the actual network path.")
+    print("\nThen summarize the capture by network path (PGA VIP / PSC / VPN tunnel / public):")
+    print("python3 pcap_analyzer.py gemini_traffic.pcap")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
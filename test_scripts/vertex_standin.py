@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+vertex_standin.py - 로컬 Vertex AI generateContent 대체 서버
+GenerativeModel(api_transport="rest")이 호출하는 generateContent / streamGenerateContent REST 엔드포인트를
+asyncio HTTP/1.1 서버로 흉내 내고, 서비스 시간, 초당 토큰 수, 오류/429 비율, VPN 경로 RTT를 주입
+수천 개의 동시 keep-alive 연결을 처리하여 부하 생성 클라이언트 자체의 성능을 측정할 수 있게 함
+
+사용 예:
+    python3 vertex_standin.py --port 8080 --service-ms 800 --tokens-per-sec 50 --rtt-ms 4
+    python3 1_test_gemini_api.py --api-endpoint http://127.0.0.1:8080 --load --concurrency 64
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+from dataclasses import dataclass
+from urllib.parse import urlsplit, parse_qs
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+MAX_HEADER_BYTES = 65536
+FILLER_WORDS = ("private", "google", "access", "over", "the", "ha", "vpn", "tunnel", "reaches", "gemini")
+
+@dataclass
+class StandInConfig:
+    """응답 지연/처리량/오류 주입 설정 (시간 단위: 초)"""
+    service_time: float = 0.5        # 첫 토큰까지의 중앙값
+    jitter: float = 0.3              # 서비스 시간 로그정규 sigma (0이면 고정)
+    tokens_per_sec: float = 0.0      # 0이면 모든 토큰을 즉시 생성
+    response_tokens: int = 64
+    chunk_tokens: int = 8            # 스트리밍 청크당 토큰 수
+    error_rate: float = 0.0          # 503 UNAVAILABLE 비율
+    rate_limit_rate: float = 0.0     # 429 RESOURCE_EXHAUSTED 비율
+    max_inflight: int = 0            # 초과 시 429 (0이면 제한 없음)
+    rtt: float = 0.0                 # 요청마다 더하는 왕복 지연
+    handshake_rtts: int = 0          # 새 연결의 첫 요청에 더하는 추가 왕복 수 (TCP/TLS 흉내)
+    seed: int = None
+
+class StandInStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.statuses = {}
+        self.inflight = 0
+        self.max_inflight = 0
+        self.connections = 0
+        self.max_connections = 0
+        self.tokens = 0
+
+    def snapshot(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "elapsed": elapsed,
+            "requests": self.requests,
+            "requests_per_sec": self.requests / elapsed,
+            "statuses": dict(self.statuses),
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "connections": self.connections,
+            "max_connections": self.max_connections,
+            "tokens": self.tokens,
+        }
+
+def error_body(code, status, message):
+    return {"error": {"code": code, "message": message, "status": status}}
+
+def prompt_text(body):
+    """generateContent 요청 본문의 모든 text 파트"""
+    texts = []
+    for content in body.get("contents") or []:
+        for part in content.get("parts") or []:
+            if isinstance(part, dict) and "text" in part:
+                texts.append(part["text"])
+    return "\n".join(texts)
+
+class VertexStandIn:
+    """연결마다 하나의 코루틴으로 HTTP/1.1 keep-alive 요청을 처리"""
+
+    def __init__(self, config=None):
+        self.config = config or StandInConfig()
+        self.random = random.Random(self.config.seed)
+        self.stats = StandInStats()
+
+    # --- HTTP -----------------------------------------------------------------
+
+    async def handle(self, reader, writer):
+        stats = self.stats
+        stats.connections += 1
+        stats.max_connections = max(stats.max_connections, stats.connections)
+        first = True
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                except ValueError:
+                    await self.respond(writer, 400, error_body(400, "INVALID_ARGUMENT", "bad request line"), False)
+                    return
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    # 본문 경계를 알 수 없으므로 연결 종료
+                    await self.respond(writer, 400, error_body(400, "INVALID_ARGUMENT", "bad Content-Length"), False)
+                    return
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                delay = self.config.rtt * (1 + (self.config.handshake_rtts if first else 0))
+                first = False
+                keep_alive = await self.dispatch(writer, method, target, body, keep_alive, delay)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            stats.connections -= 1
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests",
+                  503: "Service Unavailable"}.get(status, "Error")
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=UTF-8\r\n"
+                     f"Content-Length: {len(body)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body)
+        await writer.drain()
+        self.stats.statuses[status] = self.stats.statuses.get(status, 0) + 1
+
+    async def dispatch(self, writer, method, target, body, keep_alive, delay):
+        url = urlsplit(target)
+        action = url.path.rsplit(":", 1)[-1] if ":" in url.path else ""
+        self.stats.requests += 1
+        if delay:
+            await asyncio.sleep(delay)
+        if method != "POST" or action not in ("generateContent", "streamGenerateContent", "countTokens"):
+            await self.respond(writer, 404, error_body(404, "NOT_FOUND", f"{method} {url.path} not found"), keep_alive)
+            return keep_alive
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            await self.respond(writer, 400, error_body(400, "INVALID_ARGUMENT", "invalid JSON body"), keep_alive)
+            return keep_alive
+        prompt_tokens = max(1, len(prompt_text(request)) // 4)
+        if action == "countTokens":
+            await self.respond(writer, 200, {"totalTokens": prompt_tokens}, keep_alive)
+            return keep_alive
+
+        stats = self.stats
+        config = self.config
+        if config.max_inflight and stats.inflight >= config.max_inflight:
+            await self.respond(writer, 429, error_body(429, "RESOURCE_EXHAUSTED", "Quota exceeded (max inflight)"),
+                               keep_alive)
+            return keep_alive
+        # 할당량 초과는 실제 API처럼 처리 전에 바로 거절 (서비스 시간을 쓰지 않음)
+        roll = self.random.random()
+        if roll < config.rate_limit_rate:
+            await self.respond(writer, 429, error_body(429, "RESOURCE_EXHAUSTED", "Quota exceeded"), keep_alive)
+            return keep_alive
+        stats.inflight += 1
+        stats.max_inflight = max(stats.max_inflight, stats.inflight)
+        try:
+            await asyncio.sleep(self.service_time())
+            if roll < config.rate_limit_rate + config.error_rate:
+                await self.respond(writer, 503, error_body(503, "UNAVAILABLE", "Injected error"), keep_alive)
+                return keep_alive
+            model = url.path.split("/models/")[-1].split(":")[0]
+            if action == "generateContent":
+                text = await self.generate(config.response_tokens)
+                await self.respond(writer, 200, self.response(model, text, prompt_tokens, config.response_tokens),
+                                   keep_alive)
+            else:
+                await self.stream(writer, model, prompt_tokens, "sse" in parse_qs(url.query).get("alt", []))
+            return keep_alive
+        finally:
+            stats.inflight -= 1
+
+    # --- 응답 생성 ------------------------------------------------------------
+
+    def service_time(self):
+        config = self.config
+        if config.jitter <= 0 or config.service_time <= 0:
+            return config.service_time
+        return self.random.lognormvariate(math.log(config.service_time), config.jitter)
+
+    def words(self, count, offset=0):
+        return " ".join(FILLER_WORDS[(offset + i) % len(FILLER_WORDS)] for i in range(count))
+
+    async def generate(self, tokens, offset=0):
+        """tokens_per_sec 속도로 토큰 생성 (비스트리밍은 전체 생성 후 응답)"""
+        if self.config.tokens_per_sec > 0:
+            await asyncio.sleep(tokens / self.config.tokens_per_sec)
+        self.stats.tokens += tokens
+        return self.words(tokens, offset)
+
+    @staticmethod
+    def response(model, text, prompt_tokens, candidate_tokens, finished=True):
+        candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+        if finished:
+            candidate["finishReason"] = "STOP"
+        return {
+            "candidates": [candidate],
+            "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": candidate_tokens,
+                              "totalTokenCount": prompt_tokens + candidate_tokens},
+            "modelVersion": model,
+        }
+
+    async def stream(self, writer, model, prompt_tokens, sse):
+        """
+        streamGenerateContent - chunked 전송으로 청크마다 부분 응답 전송
+        ?alt=sse면 Server-Sent Events, 아니면 JSON 배열 스트림 (gapic REST 스트리밍 형식)
+        """
+        content_type = "text/event-stream" if sse else "application/json; charset=UTF-8"
+        writer.write(f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n"
+                     f"Transfer-Encoding: chunked\r\n\r\n".encode())
+
+        def send(data):
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        total = self.config.response_tokens
+        step = max(1, self.config.chunk_tokens)
+        sent = 0
+        if not sse:
+            send(b"[")
+        while sent < total:
+            count = min(step, total - sent)
+            text = await self.generate(count, sent)
+            payload = json.dumps(self.response(model, text + " ", prompt_tokens, sent + count,
+                                               finished=sent + count >= total)).encode()
+            if sse:
+                send(b"data: " + payload + b"\r\n\r\n")
+            else:
+                send((b"," if sent else b"") + payload)
+            await writer.drain()
+            sent += count
+        if not sse:
+            send(b"]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        self.stats.statuses[200] = self.stats.statuses.get(200, 0) + 1
+
+async def start_standin(host="127.0.0.1", port=0, config=None, backlog=4096):
+    """대체 서버 시작 - (asyncio 서버, VertexStandIn, 실제 포트) 반환"""
+    standin = VertexStandIn(config)
+    server = await asyncio.start_server(standin.handle, host, port, backlog=backlog, limit=MAX_HEADER_BYTES)
+    return server, standin, server.sockets[0].getsockname()[1]
+
+def raise_fd_limit():
+    """수천 개 연결을 위해 열린 파일 수 제한을 하드 한도까지 상향"""
+    if resource is None:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        target = hard if hard != resource.RLIM_INFINITY else max(soft, 65536)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            return target
+        except (ValueError, OSError):
+            pass
+    return soft
+
+def print_stats(stats):
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(stats["statuses"].items())) or "-"
+    print(f"[{stats['elapsed']:7.1f}s] {stats['requests']:>8} requests ({stats['requests_per_sec']:.1f}/s), "
+          f"inflight {stats['inflight']} (max {stats['max_inflight']}), "
+          f"connections {stats['connections']} (max {stats['max_connections']}), statuses {statuses}", flush=True)
+
+async def serve(args, config):
+    server, standin, port = await start_standin(args.host, args.port, config)
+    print(f"Vertex AI stand-in listening on http://{args.host}:{port} "
+          f"(use --api-endpoint http://{args.host}:{port})", flush=True)
+    async with server:
+        if args.report_interval > 0:
+            while True:
+                await asyncio.sleep(args.report_interval)
+                print_stats(standin.stats.snapshot())
+        else:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Vertex AI generateContent REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--service-ms", type=float, default=500, help="median time to first token (default: 500)")
+    parser.add_argument("--jitter", type=float, default=0.3, help="lognormal sigma of the service time (0: fixed)")
+    parser.add_argument("--tokens-per-sec", type=float, default=0, help="generation speed (0: instant)")
+    parser.add_argument("--response-tokens", type=int, default=64)
+    parser.add_argument("--chunk-tokens", type=int, default=8, help="tokens per streamed chunk")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered 503 UNAVAILABLE")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction answered 429 RESOURCE_EXHAUSTED")
+    parser.add_argument("--max-inflight", type=int, default=0, help="answer 429 above this many requests in flight")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="round trip added to every request (VPN path)")
+    parser.add_argument("--handshake-rtts", type=int, default=0,
+                        help="extra round trips on the first request of each connection (e.g. 2 for TCP+TLS)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--report-interval", type=float, default=10.0, help="seconds between stats lines (0: off)")
+    args = parser.parse_args(argv)
+
+    config = StandInConfig(
+        service_time=args.service_ms / 1000, jitter=args.jitter, tokens_per_sec=args.tokens_per_sec,
+        response_tokens=args.response_tokens, chunk_tokens=args.chunk_tokens, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, max_inflight=args.max_inflight, rtt=args.rtt_ms / 1000,
+        handshake_rtts=args.handshake_rtts, seed=args.seed)
+    limit = raise_fd_limit()
+    if limit:
+        print(f"Open file limit: {limit}")
+    if uvloop is not None:
+        uvloop.install()
+    try:
+        asyncio.run(serve(args, config))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())